@@ -2,25 +2,34 @@
 SceneIQ Maximizer Engine
 Optimizes tax incentive stacking across jurisdiction layers.
 
+Data access goes through an async Prisma client (by default the app's shared
+client from src.utils.database), so queries use Prisma's connection pool and
+never block the event loop. maximize() is a coroutine.
+
+Results can be memoized in a ResultCache (bounded LRU with a TTL) keyed on the
+resolved jurisdiction chain, the inputs and the rule catalog version. The
+/maximize API and the CLI share the module-level ``result_cache``.
+
 Usage:
     python maximizer.py 42.8864 -78.8784 --spend 5000000 --type all
 """
 
-import os
+import asyncio
 import logging
-from typing import Dict, List, Optional, Tuple
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass, field
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 # ── US state bounding boxes (min_lat, max_lat, min_lng, max_lng) ──────────────
-# Used for lat/lng → jurisdiction resolution without PostGIS.
+# Fallback for lat/lng → state resolution when no boundary polygons are loaded
+# (see src/services/spatial_index.py).
 _US_STATE_BOUNDS: Dict[str, Tuple[float, float, float, float]] = {
     "AL": (30.1, 35.0, -88.5, -84.9),
     "AK": (51.2, 71.4, -180.0, -130.0),
@@ -93,6 +102,16 @@ def _state_code_for_point(lat: float, lng: float) -> Optional[str]:
     )
 
 
+def _as_datetime(value) -> Optional[datetime]:
+    """Raw query results may carry timestamps as ISO strings."""
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
 # ── Data classes ──────────────────────────────────────────────────────────────
 
 @dataclass
@@ -124,6 +143,108 @@ class MaximizedResult:
     recommendations: List[str]
     jurisdictions_evaluated: int
     resolved_state: Optional[str] = None   # state code matched from lat/lng
+    jurisdiction_codes: List[str] = field(default_factory=list)   # layers evaluated, state first
+
+
+# ── Result cache ──────────────────────────────────────────────────────────────
+
+RESULT_CACHE_SIZE = 1024
+RESULT_CACHE_TTL_SECONDS = 300.0    # rules carry effective/expiration dates, so entries age out
+
+
+async def _catalog_version() -> int:
+    from src.services.rule_catalog import rule_catalog
+    # snapshot() runs the catalog's staleness checks, so writes made elsewhere bump the version
+    return (await rule_catalog.snapshot()).version
+
+
+class ResultCache:
+    """
+    Bounded LRU of MaximizedResults with a per-entry TTL.
+
+    Keys include the rule catalog version, so a rule change makes every older
+    entry unreachable; those entries then age out through the LRU/TTL.
+    Cached results are shared between callers and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = RESULT_CACHE_SIZE,
+        ttl: float = RESULT_CACHE_TTL_SECONDS,
+        version_source: Callable[[], Awaitable[int]] = _catalog_version,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._version_source = version_source
+        self._entries: "OrderedDict[Hashable, Tuple[float, MaximizedResult]]" = OrderedDict()
+        self._clock = time.monotonic
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def version(self) -> int:
+        return await self._version_source()
+
+    @staticmethod
+    def key(
+        version: int,
+        jurisdiction_ids: List[str],
+        resolved_state: Optional[str],
+        project_type: str,
+        qualified_spend: Optional[float],
+        spend_by_location: Optional[Dict[str, float]],
+    ) -> Hashable:
+        return (
+            version,
+            tuple(jurisdiction_ids),
+            resolved_state,
+            project_type.lower(),
+            qualified_spend,
+            tuple(sorted((spend_by_location or {}).items())),
+        )
+
+    def get(self, key: Hashable) -> Optional[MaximizedResult]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, result = entry
+            if self._clock() - stored_at < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            del self._entries[key]
+            self.expirations += 1
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, result: MaximizedResult) -> None:
+        self._entries[key] = (self._clock(), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else None,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+result_cache = ResultCache()
 
 
 # ── Engine ────────────────────────────────────────────────────────────────────
@@ -147,76 +268,103 @@ class SceneIQMaximizer:
         "village": 4, "district": 4, "special": 4,
     }
 
-    def __init__(self, db_url: str = None):
-        self.db_url = db_url or os.getenv("DATABASE_URL")
-        if not self.db_url:
-            raise ValueError("DATABASE_URL not set")
-
-    def _connect(self):
-        return psycopg2.connect(self.db_url)
+    def __init__(self, db=None, spatial_index=None, cache: Optional[ResultCache] = None):
+        """
+        db: a connected async Prisma client. Defaults to the app's shared
+        client (src.utils.database.prisma), which FastAPI connects at startup.
+        spatial_index: boundary polygon index; defaults to the shared one
+        loaded from data/boundaries on first lookup.
+        cache: optional ResultCache (e.g. the shared ``result_cache``);
+        without one every call recomputes.
+        """
+        if db is None:
+            from src.utils.database import prisma as db
+        self.db = db
+        self._spatial_index = spatial_index
+        self.cache = cache
+
+    @property
+    def spatial_index(self):
+        if self._spatial_index is None:
+            from src.services.spatial_index import get_spatial_index
+            self._spatial_index = get_spatial_index()
+        return self._spatial_index
 
     # ── Spatial resolution ─────────────────────────────────────────────────────
 
-    def resolve_jurisdictions_by_location(
+    def locate_chain(self, lat: float, lng: float) -> Tuple[Optional[str], Optional[Tuple[str, ...]]]:
+        """
+        Resolve a point without touching the database: (state_code, codes).
+
+        codes is the exact state → county → city chain when boundary polygons
+        are loaded for the state, or None when the state has none and every
+        direct sub-jurisdiction applies.
+        """
+        chain = self.spatial_index.locate(lat, lng)
+        state_code = next((b.state for b in chain if b.level <= 1), None) or _state_code_for_point(lat, lng)
+        if not state_code:
+            return None, None
+        if not self.spatial_index.has_subdivisions(state_code):
+            return state_code, None
+        return state_code, (state_code,) + tuple(b.code for b in chain if b.level > 1 and b.state == state_code)
+
+    async def resolve_jurisdictions_by_location(
         self,
         lat: float,
         lng: float,
     ) -> Tuple[List[Dict], Optional[str]]:
         """
-        Return (jurisdictions, state_code) for a lat/lng using bounding-box
-        matching.  Includes the matched state + all its direct sub-jurisdictions
-        (counties/cities with parentId = state.id).
+        Return (jurisdictions, state_code) for a lat/lng, state first.
+
+        With boundary polygons loaded for the state, only the jurisdictions
+        whose polygons contain the point are returned (state → county →
+        city). Otherwise the state is matched by bounding box and all of its
+        direct sub-jurisdictions are included.
         """
-        state_code = _state_code_for_point(lat, lng)
+        state_code, codes = self.locate_chain(lat, lng)
         if not state_code:
             return [], None
 
-        conn = self._connect()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        try:
-            # Get the state row
-            cur.execute(
-                "SELECT id, name, type, code FROM jurisdictions WHERE code = %s AND active = true",
-                (state_code,),
-            )
-            state_row = cur.fetchone()
-            if not state_row:
+        if codes is not None:
+            rows = await self.resolve_jurisdictions_by_codes(list(codes))
+            order = {c: i for i, c in enumerate(codes)}
+            rows.sort(key=lambda r: order.get(r["code"], len(order)))
+            if not rows or rows[0]["code"] != state_code:
                 return [], state_code
+            return rows, state_code
+
+        # State row first, then its direct sub-jurisdictions — one round-trip
+        rows = await self.db.query_raw(
+            """
+            SELECT id, name, type, code FROM jurisdictions
+            WHERE active = true
+              AND (code = $1
+                   OR "parentId" = (SELECT id FROM jurisdictions WHERE code = $1 AND active = true))
+            ORDER BY (code = $1) DESC
+            """,
+            state_code,
+        )
+        if not rows or rows[0]["code"] != state_code:
+            return [], state_code
+        return [dict(r) for r in rows], state_code
 
-            # Get all sub-jurisdictions of that state
-            cur.execute(
-                """SELECT id, name, type, code FROM jurisdictions
-                   WHERE "parentId" = %s AND active = true""",
-                (state_row["id"],),
-            )
-            subs = cur.fetchall()
-            return [dict(state_row)] + [dict(r) for r in subs], state_code
-        finally:
-            cur.close()
-            conn.close()
-
-    def resolve_jurisdictions_by_codes(
+    async def resolve_jurisdictions_by_codes(
         self,
         codes: List[str],
     ) -> List[Dict]:
         """Return jurisdiction rows for explicit code list."""
         if not codes:
             return []
-        conn = self._connect()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        try:
-            cur.execute(
-                "SELECT id, name, type, code FROM jurisdictions WHERE code = ANY(%s) AND active = true",
-                (codes,),
-            )
-            return [dict(r) for r in cur.fetchall()]
-        finally:
-            cur.close()
-            conn.close()
+        placeholders = ",".join(f"${i}" for i in range(1, len(codes) + 1))
+        rows = await self.db.query_raw(
+            f"SELECT id, name, type, code FROM jurisdictions WHERE code IN ({placeholders}) AND active = true",
+            *codes,
+        )
+        return [dict(r) for r in rows]
 
     # ── Rule fetching ──────────────────────────────────────────────────────────
 
-    def fetch_rules(
+    async def fetch_rules(
         self,
         jurisdiction_ids: List[str],
         qualified_spend: Optional[float],
@@ -235,6 +383,17 @@ class SceneIQMaximizer:
         """
         if not jurisdiction_ids:
             return [], []
+        rows = await self.fetch_rule_rows(jurisdiction_ids, project_type)
+        return self.rules_from_rows(rows, qualified_spend, spend_by_location)
+
+    async def fetch_rule_rows(
+        self,
+        jurisdiction_ids: List[str],
+        project_type: str = "all",
+    ) -> List[Dict[str, Any]]:
+        """Raw active rule rows for the given jurisdiction IDs, ordered by type and rule code."""
+        if not jurisdiction_ids:
+            return []
 
         # Exclude rules whose requirements JSON explicitly marks them as
         # inapplicable to the requested project type.
@@ -247,42 +406,43 @@ class SceneIQMaximizer:
                 "     OR (ir.requirements::jsonb->>'tvSeries') <> 'true')"
             )
 
-        conn = self._connect()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        try:
-            placeholders = ",".join(["%s"] * len(jurisdiction_ids))
-            cur.execute(
-                f"""
-                SELECT
-                    ir."jurisdictionId"                              AS jurisdiction_id,
-                    j.name                                           AS jurisdiction_name,
-                    j.type                                           AS jurisdiction_type,
-                    j.code                                           AS jurisdiction_code,
-                    ir."ruleCode"                                    AS rule_key,
-                    ir."incentiveType"                               AS rule_type,
-                    COALESCE(ir.percentage, ir."fixedAmount")        AS raw_value,
-                    CASE WHEN ir.percentage IS NOT NULL THEN 'percent'
-                         ELSE 'USD' END                              AS value_unit,
-                    NULL                                             AS source_citation,
-                    ir."effectiveDate"                               AS effective_date,
-                    ir.requirements                                  AS requirements_json
-                FROM incentive_rules ir
-                JOIN jurisdictions j ON ir."jurisdictionId" = j.id
-                WHERE ir."jurisdictionId" IN ({placeholders})
-                    AND (ir."expirationDate" IS NULL OR ir."expirationDate" > NOW())
-                    AND ir."effectiveDate" <= NOW()
-                    AND ir.active = true
-                    AND (ir.percentage IS NOT NULL OR ir."fixedAmount" IS NOT NULL)
-                    {tv_only_filter}
-                ORDER BY j.type, ir."ruleCode"
-                """,
-                jurisdiction_ids,
-            )
-            rows = cur.fetchall()
-        finally:
-            cur.close()
-            conn.close()
+        placeholders = ",".join(f"${i}" for i in range(1, len(jurisdiction_ids) + 1))
+        rows = await self.db.query_raw(
+            f"""
+            SELECT
+                ir."jurisdictionId"                              AS jurisdiction_id,
+                j.name                                           AS jurisdiction_name,
+                j.type                                           AS jurisdiction_type,
+                j.code                                           AS jurisdiction_code,
+                ir."ruleCode"                                    AS rule_key,
+                ir."incentiveType"                               AS rule_type,
+                COALESCE(ir.percentage, ir."fixedAmount")        AS raw_value,
+                CASE WHEN ir.percentage IS NOT NULL THEN 'percent'
+                     ELSE 'USD' END                              AS value_unit,
+                NULL::text                                       AS source_citation,
+                ir."effectiveDate"                               AS effective_date,
+                ir.requirements                                  AS requirements_json
+            FROM incentive_rules ir
+            JOIN jurisdictions j ON ir."jurisdictionId" = j.id
+            WHERE ir."jurisdictionId" IN ({placeholders})
+                AND (ir."expirationDate" IS NULL OR ir."expirationDate" > NOW())
+                AND ir."effectiveDate" <= NOW()
+                AND ir.active = true
+                AND (ir.percentage IS NOT NULL OR ir."fixedAmount" IS NOT NULL)
+                {tv_only_filter}
+            ORDER BY j.type, ir."ruleCode"
+            """,
+            *jurisdiction_ids,
+        )
+        return rows
 
+    def rules_from_rows(
+        self,
+        rows: List[Dict[str, Any]],
+        qualified_spend: Optional[float],
+        spend_by_location: Optional[Dict[str, float]] = None,
+    ) -> Tuple[List[ApplicableRule], List[str]]:
+        """Turn fetch_rules rows into ApplicableRules, splitting out opt-in bonuses."""
         import json as _json
         rules = []
         opt_in_warnings: list[str] = []
@@ -337,7 +497,7 @@ class SceneIQMaximizer:
                         (r["jurisdiction_type"] or "").lower(), 5
                     ),
                     source_citation=r["source_citation"] or "",
-                    effective_date=r["effective_date"] or datetime.now(),
+                    effective_date=_as_datetime(r["effective_date"]) or datetime.now(),
                 )
             )
         return rules, opt_in_warnings
@@ -410,7 +570,7 @@ class SceneIQMaximizer:
 
     # ── Main entry point ───────────────────────────────────────────────────────
 
-    def maximize(
+    async def maximize(
         self,
         *,
         lat: Optional[float] = None,
@@ -439,9 +599,9 @@ class SceneIQMaximizer:
 
         # --- Resolve jurisdictions ---
         if jurisdiction_codes:
-            jurisdictions = self.resolve_jurisdictions_by_codes(jurisdiction_codes)
+            jurisdictions = await self.resolve_jurisdictions_by_codes(jurisdiction_codes)
         elif lat is not None and lng is not None:
-            jurisdictions, resolved_state = self.resolve_jurisdictions_by_location(lat, lng)
+            jurisdictions, resolved_state = await self.resolve_jurisdictions_by_location(lat, lng)
         else:
             return MaximizedResult(
                 total_incentive_usd=0.0, qualified_spend=qualified_spend,
@@ -463,11 +623,37 @@ class SceneIQMaximizer:
 
         jurisdiction_ids = [j["id"] for j in jurisdictions]
 
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(
+                await self.cache.version(), jurisdiction_ids, resolved_state,
+                project_type, qualified_spend, spend_by_location,
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         # --- Fetch and apply rules ---
-        all_rules, opt_in_warnings = self.fetch_rules(
+        all_rules, opt_in_warnings = await self.fetch_rules(
             jurisdiction_ids, qualified_spend, project_type, spend_by_location
         )
+        result = self.compose_result(
+            jurisdictions, all_rules, opt_in_warnings, qualified_spend, resolved_state
+        )
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        return result
 
+    def compose_result(
+        self,
+        jurisdictions: List[Dict],
+        all_rules: List[ApplicableRule],
+        opt_in_warnings: List[str],
+        qualified_spend: Optional[float],
+        resolved_state: Optional[str] = None,
+    ) -> MaximizedResult:
+        """Stack fetched rules for one jurisdiction chain into a MaximizedResult."""
+        jurisdiction_codes = [j["code"] for j in jurisdictions]
         if not all_rules:
             return MaximizedResult(
                 total_incentive_usd=0.0, qualified_spend=qualified_spend,
@@ -477,6 +663,7 @@ class SceneIQMaximizer:
                 recommendations=["Run scripts/seed_incentive_rules.py or monitor.py"],
                 jurisdictions_evaluated=len(jurisdictions),
                 resolved_state=resolved_state,
+                jurisdiction_codes=jurisdiction_codes,
             )
 
         # ── Mutual exclusions ─────────────────────────────────────────────────
@@ -534,7 +721,136 @@ class SceneIQMaximizer:
             recommendations=recommendations,
             jurisdictions_evaluated=len(jurisdictions),
             resolved_state=resolved_state,
+            jurisdiction_codes=jurisdiction_codes,
+        )
+
+    # ── Batch entry point ──────────────────────────────────────────────────────
+
+    async def _resolve_chains(
+        self,
+        keys: List[Tuple[str, Optional[Tuple[str, ...]]]],
+    ) -> Dict[Tuple[str, Optional[Tuple[str, ...]]], List[Dict]]:
+        """
+        Jurisdiction rows for many locate_chain() results in at most two
+        queries: one for every polygon-chain code, one for every state that
+        falls back to "state + direct children".
+        """
+        chains: Dict[Tuple[str, Optional[Tuple[str, ...]]], List[Dict]] = {}
+        exact = [k for k in keys if k[1] is not None]
+        fallback_states = sorted({state for state, codes in keys if codes is None})
+
+        async def _exact() -> None:
+            all_codes = sorted({c for _, codes in exact for c in codes})
+            by_code = {r["code"]: r for r in await self.resolve_jurisdictions_by_codes(all_codes)}
+            for key in exact:
+                rows = [by_code[c] for c in key[1] if c in by_code]
+                chains[key] = rows if rows and rows[0]["code"] == key[0] else []
+
+        async def _fallback() -> None:
+            placeholders = ",".join(f"${i}" for i in range(1, len(fallback_states) + 1))
+            rows = await self.db.query_raw(
+                f"""
+                SELECT j.id, j.name, j.type, j.code, p.code AS parent_code
+                FROM jurisdictions j
+                LEFT JOIN jurisdictions p ON p.id = j."parentId" AND p.active = true
+                WHERE j.active = true
+                  AND (j.code IN ({placeholders}) OR p.code IN ({placeholders}))
+                """,
+                *fallback_states,
+            )
+            states: Dict[str, Dict] = {}
+            children: Dict[str, List[Dict]] = {}
+            for r in rows:
+                row = {"id": r["id"], "name": r["name"], "type": r["type"], "code": r["code"]}
+                if r["code"] in fallback_states:
+                    states[r["code"]] = row
+                if r.get("parent_code") in fallback_states:
+                    children.setdefault(r["parent_code"], []).append(row)
+            for state in fallback_states:
+                chains[(state, None)] = [states[state]] + children.get(state, []) if state in states else []
+
+        await asyncio.gather(
+            *([_exact()] if exact else []),
+            *([_fallback()] if fallback_states else []),
         )
+        return chains
+
+    async def maximize_batch(
+        self,
+        points: List[Tuple[float, float]],
+        *,
+        project_type: str = "all",
+        qualified_spend: Optional[float] = None,
+        spend_by_location: Optional[Dict[str, float]] = None,
+    ) -> List[MaximizedResult]:
+        """
+        Maximize many candidate locations for the same spend.
+
+        Points are resolved in memory, then deduplicated by the jurisdiction
+        chain they fall in: jurisdictions and rules are each fetched with a
+        single query for the whole batch and every distinct chain is stacked
+        once (chains already in the result cache are not fetched at all).
+        Returns one result per point, in input order; points in the same
+        chain share the same MaximizedResult object.
+        """
+        keys = [self.locate_chain(lat, lng) for lat, lng in points]
+        distinct = list(dict.fromkeys(k for k in keys if k[0] is not None))
+        chains = await self._resolve_chains(distinct)
+
+        by_chain: Dict[Tuple[str, Optional[Tuple[str, ...]]], MaximizedResult] = {}
+        cache_keys: Dict[Tuple[str, Optional[Tuple[str, ...]]], Hashable] = {}
+        if self.cache is not None:
+            version = await self.cache.version()
+            for key in distinct:
+                if not chains.get(key):
+                    continue
+                cache_keys[key] = self.cache.key(
+                    version, [j["id"] for j in chains[key]], key[0],
+                    project_type, qualified_spend, spend_by_location,
+                )
+                cached = self.cache.get(cache_keys[key])
+                if cached is not None:
+                    by_chain[key] = cached
+
+        jurisdiction_ids = sorted({
+            j["id"] for key, rows in chains.items() if key not in by_chain for j in rows
+        })
+        rows_by_jurisdiction: Dict[str, List[Dict[str, Any]]] = {}
+        for r in await self.fetch_rule_rows(jurisdiction_ids, project_type):
+            rows_by_jurisdiction.setdefault(r["jurisdiction_id"], []).append(r)
+
+        for key in distinct:
+            if key in by_chain:
+                continue
+            jurisdictions = chains.get(key) or []
+            if not jurisdictions:
+                by_chain[key] = MaximizedResult(
+                    total_incentive_usd=0.0, qualified_spend=qualified_spend,
+                    effective_rate=None, breakdown={}, applied_rules=[],
+                    overridden_rules=[], conflicts_resolved=[],
+                    warnings=["No matching jurisdictions found"],
+                    recommendations=["Check that jurisdictions table is seeded"],
+                    jurisdictions_evaluated=0, resolved_state=key[0],
+                )
+                continue
+            rows = [r for j in jurisdictions for r in rows_by_jurisdiction.get(j["id"], [])]
+            # Same order fetch_rules() returns for a single chain
+            rows.sort(key=lambda r: (r["jurisdiction_type"] or "", r["rule_key"]))
+            all_rules, opt_in_warnings = self.rules_from_rows(rows, qualified_spend, spend_by_location)
+            by_chain[key] = self.compose_result(
+                jurisdictions, all_rules, opt_in_warnings, qualified_spend, key[0]
+            )
+            if key in cache_keys:
+                self.cache.put(cache_keys[key], by_chain[key])
+
+        unresolved = MaximizedResult(
+            total_incentive_usd=0.0, qualified_spend=qualified_spend,
+            effective_rate=None, breakdown={}, applied_rules=[],
+            overridden_rules=[], conflicts_resolved=[],
+            warnings=["Location is outside every known jurisdiction"],
+            recommendations=[], jurisdictions_evaluated=0,
+        )
+        return [by_chain[k] if k[0] is not None else unresolved for k in keys]
 
 
 # ── CLI ───────────────────────────────────────────────────────────────────────
@@ -555,6 +871,10 @@ def main():
         "--location-spend", nargs="+", metavar="CODE:AMOUNT",
         help="Per-location spend splits, e.g. --location-spend IL:5000000 IL-COOK:2000000"
     )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Bypass the shared result cache (skips loading the rule catalog)",
+    )
     args = parser.parse_args()
 
     spend_by_location: Optional[Dict[str, float]] = None
@@ -566,15 +886,23 @@ def main():
                 parser.error(f"Invalid --location-spend value '{item}' — use CODE:AMOUNT")
             spend_by_location[code.upper()] = float(amount_str)
 
-    maximizer = SceneIQMaximizer()
-    result = maximizer.maximize(
-        lat=args.lat,
-        lng=args.lng,
-        jurisdiction_codes=args.codes,
-        project_type=args.project_type,
-        qualified_spend=args.spend,
-        spend_by_location=spend_by_location,
-    )
+    async def _run() -> MaximizedResult:
+        from src.utils.database import prisma
+        await prisma.connect()
+        try:
+            cache = None if args.no_cache else result_cache
+            return await SceneIQMaximizer(prisma, cache=cache).maximize(
+                lat=args.lat,
+                lng=args.lng,
+                jurisdiction_codes=args.codes,
+                project_type=args.project_type,
+                qualified_spend=args.spend,
+                spend_by_location=spend_by_location,
+            )
+        finally:
+            await prisma.disconnect()
+
+    result = asyncio.run(_run())
 
     print("\n" + "=" * 60)
     print("PILOTFORGE MAXIMIZER RESULT")
@@ -606,6 +934,9 @@ def main():
 
     print(f"\nApplied rules:   {len(result.applied_rules)}")
     print(f"Overridden rules: {len(result.overridden_rules)}")
+    if not args.no_cache:
+        stats = result_cache.stats()
+        print(f"Result cache:     {stats['hits']} hits / {stats['misses']} misses ({stats['size']} entries)")
 
 
 if __name__ == "__main__":
@@ -4,10 +4,34 @@ Fetches feed URLs for county/city/town jurisdictions, detects content changes
 via SHA-256 hash comparison, sends changed content to Claude for rule extraction,
 and stores extracted rules as PendingRule records for human review.
 
+Pages are compared block by block rather than as a whole:
+  - visible text is kept one block (paragraph, list item, heading) per line;
+    each jurisdiction stores a snapshot of its page's block hashes, plus the
+    rules last extracted and the blocks they came from
+  - only blocks missing from the snapshot are sent for extraction, as
+    numbered sections the extractor attributes each rule to
+  - rules whose source blocks are all still on the page are carried forward
+    without another call; rules whose blocks changed or disappeared are
+    listed on the new PendingRule as superseded
+  - a new PendingRule is only created when something changed for review
+
+Jurisdictions run as a pipeline rather than one after another:
+  - pages are fetched concurrently (FETCH_CONCURRENCY) over one pooled client,
+    and HTML is reduced to visible text as it streams in (src/utils/html_text.py)
+  - an unchanged hash short-circuits before any extraction work
+  - extraction calls run off the event loop, at most EXTRACT_CONCURRENCY at a
+    time, and stop once the run's TOKEN_BUDGET is spent; pages left over keep
+    their old hash, so the next run picks them up
+  - each finished jurisdiction is recorded in a checkpoint file; a run that
+    dies midway resumes from it instead of starting over
+
 Usage:
-    python monitor.py                  # run all active sub-jurisdictions
-    python monitor.py --code NY-ERIE   # run a single jurisdiction by code
-    python monitor.py --dry-run        # fetch and hash only, no DB writes
+    python monitor.py                      # run all active sub-jurisdictions
+    python monitor.py --code NY-ERIE       # run a single jurisdiction by code
+    python monitor.py --dry-run            # fetch and hash only, no DB writes
+    python monitor.py --extractor mock     # canned extraction, no API calls
+    python monitor.py --token-budget 200000 --extract-concurrency 4
+    python monitor.py --restart            # ignore an unfinished run's checkpoint
 """
 
 import argparse
@@ -16,15 +40,19 @@ import hashlib
 import json
 import logging
 import os
-import re
 import sys
-from datetime import datetime, timezone
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
 
 import httpx
 from anthropic import Anthropic
 from dotenv import load_dotenv
 from prisma import Json, Prisma
 
+from src.utils.html_text import HTMLTextExtractor
+
 load_dotenv(override=True)
 
 # ── Logging ───────────────────────────────────────────────────────────────────
@@ -37,16 +65,36 @@ log = logging.getLogger("pilotforge.monitor")
 
 # ── Claude client ─────────────────────────────────────────────────────────────
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-if not ANTHROPIC_API_KEY:
-    log.error("ANTHROPIC_API_KEY not set in environment")
-    sys.exit(1)
 
-claude = Anthropic(api_key=ANTHROPIC_API_KEY)
+_claude: Anthropic | None = None
+
+
+def claude_client() -> Anthropic:
+    """Created on first use, so fetch-only and stub-extractor runs need no API key."""
+    global _claude
+    if _claude is None:
+        _claude = Anthropic(api_key=ANTHROPIC_API_KEY)
+    return _claude
+
 
 SUB_JURISDICTION_TYPES = {"county", "city", "town", "borough", "district", "parish"}
 
 MAX_CONTENT_CHARS = 15_000   # truncation limit sent to Claude
+MAX_PAGE_CHARS    = 200_000  # visible text kept per page for hashing and diffing
+MAX_FETCH_CHARS   = 10_000_000   # stop reading a response body after this much
 MAX_RAW_STORED    = 5_000    # chars stored in pending_rules.rawContent
+MAX_OUTPUT_TOKENS = 2_048
+SECTION_CHARS     = 2_000    # changed blocks are grouped into sections of about this size
+
+# ── Pipeline tuning ───────────────────────────────────────────────────────────
+FETCH_TIMEOUT       = 30
+FETCH_CONCURRENCY   = int(os.getenv("MONITOR_FETCH_CONCURRENCY", "8"))
+EXTRACT_CONCURRENCY = int(os.getenv("MONITOR_EXTRACT_CONCURRENCY", "2"))
+TOKEN_BUDGET        = int(os.getenv("MONITOR_TOKEN_BUDGET", "0")) or None   # per run; unset = unlimited
+CHECKPOINT_PATH     = Path(os.getenv("MONITOR_CHECKPOINT", Path(__file__).with_name(".monitor_checkpoint.json")))
+CHECKPOINT_MAX_AGE  = timedelta(hours=12)   # older checkpoints belong to an abandoned run
+
+USER_AGENT = "SceneIQ-Monitor/1.0 (tax incentive compliance)"
 
 EXTRACTION_PROMPT = """\
 You are a tax incentive and compliance analyst for the film and TV production industry.
@@ -57,6 +105,8 @@ would need to know about. Focus on: filming permits, location fees, business lic
 payroll tax rates, sales tax exemptions, production incentives, insurance requirements, \
 and any local ordinances affecting production.
 
+The content is the new or changed part of the page, split into numbered [Section N] parts.
+
 Return ONLY a valid JSON object — no markdown, no explanation — matching this schema:
 
 {
@@ -70,7 +120,8 @@ Return ONLY a valid JSON object — no markdown, no explanation — matching thi
       "description": "Full description of the rule",
       "requirements": "Conditions or eligibility requirements, or null",
       "effective_date": "YYYY-MM-DD or null",
-      "expiration_date": "YYYY-MM-DD or null"
+      "expiration_date": "YYYY-MM-DD or null",
+      "section": <number N of the [Section N] the rule was found in>
     }
   ],
   "confidence": <0.0 to 1.0>,
@@ -89,39 +140,49 @@ Content to analyze:
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
-def _html_to_text(html: str) -> str:
-    """Return whitespace-normalised visible text from an HTML string.
-
-    Uses regex pre-stripping so malformed HTML (e.g. unclosed <head> tags)
-    doesn't suppress body text.
-    """
-    # Remove entire <head>…</head> blocks (non-greedy, case-insensitive)
-    html = re.sub(r"<head\b[^>]*>.*?</head>", "", html, flags=re.DOTALL | re.IGNORECASE)
-    # Remove script / style / noscript blocks
-    html = re.sub(
-        r"<(script|style|noscript)\b[^>]*>.*?</\1>",
-        "",
-        html,
-        flags=re.DOTALL | re.IGNORECASE,
+async def _stream_html_text(r: httpx.Response) -> str:
+    """Tokenize the body as it arrives; stop reading once MAX_PAGE_CHARS of visible text is in."""
+    parser = HTMLTextExtractor(max_chars=MAX_PAGE_CHARS)
+    received = 0
+    async for chunk in r.aiter_text():
+        # Parsing is pure Python; keep it off the loop so other fetches keep moving
+        await asyncio.to_thread(parser.feed, chunk)
+        received += len(chunk)
+        if parser.done or received >= MAX_FETCH_CHARS:
+            break
+    parser.close()
+    return parser.text()
+
+
+def http_client(timeout: int = FETCH_TIMEOUT) -> httpx.AsyncClient:
+    """One pooled client per run; connections to the same host are reused."""
+    return httpx.AsyncClient(
+        follow_redirects=True,
+        timeout=timeout,
+        headers={"User-Agent": USER_AGENT},
+        limits=httpx.Limits(max_connections=FETCH_CONCURRENCY, max_keepalive_connections=FETCH_CONCURRENCY),
     )
-    # Strip remaining tags
-    text = re.sub(r"<[^>]+>", " ", html)
-    return re.sub(r"\s+", " ", text).strip()
 
 
-async def fetch_url(url: str, timeout: int = 30) -> str | None:
+async def fetch_url(url: str, http: httpx.AsyncClient | None = None) -> str | None:
     """Fetch URL and return cleaned visible text content, or None on failure."""
+    if http is None:
+        async with http_client() as own:
+            return await fetch_url(url, own)
     try:
-        async with httpx.AsyncClient(follow_redirects=True, timeout=timeout) as http:
-            r = await http.get(
-                url,
-                headers={"User-Agent": "SceneIQ-Monitor/1.0 (tax incentive compliance)"},
-            )
+        async with http.stream("GET", url) as r:
             r.raise_for_status()
             content_type = r.headers.get("content-type", "")
             if "html" in content_type or url.endswith((".htm", ".html", ".shtml")):
-                return _html_to_text(r.text)
-            return r.text  # PDF / plain-text feeds pass through as-is
+                return await _stream_html_text(r)
+            # PDF / plain-text feeds pass through as-is
+            parts, size = [], 0
+            async for chunk in r.aiter_text():
+                parts.append(chunk)
+                size += len(chunk)
+                if size >= MAX_PAGE_CHARS:
+                    break
+            return "".join(parts)[:MAX_PAGE_CHARS]
     except httpx.HTTPStatusError as e:
         log.warning(f"HTTP {e.response.status_code} fetching {url}")
     except Exception as e:
@@ -133,6 +194,115 @@ def sha256(text: str) -> str:
     return hashlib.sha256(text.encode()).hexdigest()
 
 
+# ── Block diff ────────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class Block:
+    hash: str
+    text: str
+
+
+def page_hash(content: str) -> str:
+    """Whole-page hash, blind to how whitespace and line breaks are laid out."""
+    return sha256(" ".join(content.split()))
+
+
+def split_blocks(content: str) -> list[Block]:
+    blocks = []
+    for line in content.splitlines():
+        text = " ".join(line.split())
+        if text:
+            blocks.append(Block(sha256(text)[:16], text))
+    return blocks
+
+
+def load_snapshot(raw) -> dict:
+    """Parse jurisdictions.feedSnapshot: {"blocks": [hash, …], "rules": [{"rule": {…}, "blocks": [hash, …]}, …]}."""
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError:
+            raw = None
+    if not isinstance(raw, dict):
+        return {"blocks": [], "rules": []}
+    return {"blocks": list(raw.get("blocks") or []), "rules": list(raw.get("rules") or [])}
+
+
+def changed_sections(blocks: list[Block], seen: set[str]) -> list[list[Block]]:
+    """Runs of consecutive blocks not in `seen`, split at about SECTION_CHARS."""
+    sections: list[list[Block]] = []
+    current: list[Block] = []
+    size = 0
+    for block in blocks:
+        if block.hash in seen or (current and size + len(block.text) > SECTION_CHARS):
+            if current:
+                sections.append(current)
+            current, size = [], 0
+        if block.hash not in seen:
+            current.append(block)
+            size += len(block.text)
+    if current:
+        sections.append(current)
+    return sections
+
+
+def carry_forward(entries: list[dict], on_page: set[str]) -> tuple[list[dict], list[dict], set[str]]:
+    """
+    Split snapshot rules into (carried, superseded, stale blocks).
+
+    A rule is carried forward while every block it came from is still on the
+    page. A superseded rule's surviving blocks are stale: they go back for
+    extraction, and so does any rule sharing them, so nothing is extracted twice.
+    """
+    carried = [e for e in entries if set(e.get("blocks") or []) <= on_page]
+    superseded = [e for e in entries if not set(e.get("blocks") or []) <= on_page]
+    stale: set[str] = set()
+    while True:
+        stale = {h for e in superseded for h in e.get("blocks") or []} & on_page
+        sharing = [e for e in carried if stale & set(e.get("blocks") or [])]
+        if not sharing:
+            return carried, superseded, stale
+        carried = [e for e in carried if e not in sharing]
+        superseded += sharing
+
+
+def render_sections(sections: list[list[Block]]) -> tuple[str, list[list[Block]]]:
+    """
+    Number sections into extractor input, stopping before MAX_CONTENT_CHARS.
+    Returns the text and the sections that made it in; the first is always
+    included, truncated if it has to be.
+    """
+    parts: list[str] = []
+    sent: list[list[Block]] = []
+    size = 0
+    for n, section in enumerate(sections, 1):
+        part = f"[Section {n}]\n" + "\n".join(b.text for b in section)
+        if sent and size + len(part) > MAX_CONTENT_CHARS:
+            break
+        parts.append(part[:MAX_CONTENT_CHARS])
+        sent.append(section)
+        size += len(part) + 2
+    return "\n\n".join(parts), sent
+
+
+def attribute_rules(rules: list[dict], sent: list[list[Block]]) -> list[dict]:
+    """Snapshot entries for newly extracted rules; unattributed rules belong to every sent block."""
+    all_sent = sorted({b.hash for section in sent for b in section})
+    entries = []
+    for rule in rules:
+        rule = dict(rule)
+        try:
+            section = int(rule.pop("section", None))
+        except (TypeError, ValueError):
+            section = 0
+        if 1 <= section <= len(sent):
+            hashes = sorted({b.hash for b in sent[section - 1]})
+        else:
+            hashes = all_sent
+        entries.append({"rule": rule, "blocks": hashes})
+    return entries
+
+
 def extract_json(text: str) -> dict:
     """Find and return the first balanced JSON object in text."""
     # Try the whole text first (ideal case)
@@ -162,34 +332,43 @@ def extract_json(text: str) -> dict:
 
 MOCK_CLAUDE = os.getenv("MOCK_CLAUDE", "false").lower() == "true"
 
+# An extractor takes page text and returns the EXTRACTION_PROMPT JSON schema as a
+# dict. It is called from a worker thread, so it may block.
+Extractor = Callable[[str], dict]
+
+
+def mock_extract(content: str) -> dict:
+    """Canned extraction for local runs and tests — never calls the API."""
+    return {
+        "rules": [
+            {
+                "name": "Film Permit Fee",
+                "category": "permit_fee",
+                "rule_type": "fee",
+                "amount": 250.0,
+                "percentage": None,
+                "description": "Mock: standard filming permit fee for county locations",
+                "requirements": "Application 10 business days in advance",
+                "effective_date": "2026-01-01",
+                "expiration_date": None,
+            }
+        ],
+        "confidence": 0.5,
+        "summary": "Mock extraction — real Claude API not available",
+        "no_rules_found": False,
+    }
+
 
 def call_claude(content: str) -> dict:
     """Send content to Claude and parse JSON response."""
     if MOCK_CLAUDE:
         log.info("  [MOCK] Returning simulated extraction (set MOCK_CLAUDE=false to use real API)")
-        return {
-            "rules": [
-                {
-                    "name": "Film Permit Fee",
-                    "category": "permit_fee",
-                    "rule_type": "fee",
-                    "amount": 250.0,
-                    "percentage": None,
-                    "description": "Mock: standard filming permit fee for county locations",
-                    "requirements": "Application 10 business days in advance",
-                    "effective_date": "2026-01-01",
-                    "expiration_date": None,
-                }
-            ],
-            "confidence": 0.5,
-            "summary": "Mock extraction — real Claude API not available",
-            "no_rules_found": False,
-        }
+        return mock_extract(content)
     truncated = content[:MAX_CONTENT_CHARS]
     prompt = EXTRACTION_PROMPT.replace("{content}", truncated)
-    msg = claude.messages.create(
+    msg = claude_client().messages.create(
         model="claude-sonnet-4-6",
-        max_tokens=2048,
+        max_tokens=MAX_OUTPUT_TOKENS,
         messages=[{"role": "user", "content": prompt}],
     )
     raw = msg.content[0].text.strip()
@@ -197,25 +376,116 @@ def call_claude(content: str) -> dict:
     return extract_json(raw)
 
 
+# ── Extraction pool ───────────────────────────────────────────────────────────
+
+def estimate_tokens(content: str) -> int:
+    """Worst-case cost of one extraction call: ~4 chars per prompt token plus the full output allowance."""
+    return (len(EXTRACTION_PROMPT) + min(len(content), MAX_CONTENT_CHARS)) // 4 + MAX_OUTPUT_TOKENS
+
+
+class ExtractionPool:
+    """
+    Runs extractor calls in worker threads, at most `concurrency` at a time.
+    Each call reserves its worst-case token estimate up front; once the budget
+    cannot cover a call, extract() returns None instead of calling.
+    """
+
+    def __init__(self, extractor: Extractor, concurrency: int = EXTRACT_CONCURRENCY, token_budget: int | None = TOKEN_BUDGET):
+        self.extractor = extractor
+        self.token_budget = token_budget
+        self.tokens_reserved = 0
+        self.calls = 0
+        self._slots = asyncio.Semaphore(concurrency)
+
+    def _reserve(self, tokens: int) -> bool:
+        # Only ever called from the event loop thread, so no lock is needed
+        if self.token_budget is not None and self.tokens_reserved + tokens > self.token_budget:
+            return False
+        self.tokens_reserved += tokens
+        return True
+
+    async def extract(self, content: str) -> dict | None:
+        if not self._reserve(estimate_tokens(content)):
+            return None
+        async with self._slots:
+            self.calls += 1
+            return await asyncio.to_thread(self.extractor, content)
+
+
+# ── Checkpoint ────────────────────────────────────────────────────────────────
+
+class Checkpoint:
+    """
+    Jurisdictions finished by the current run, rewritten after each one.
+    Only a run with the same scope (--code filter) started within
+    CHECKPOINT_MAX_AGE resumes from it; a run that completes deletes it.
+    """
+
+    def __init__(self, path: Path, scope: str, started: datetime | None = None, done: dict | None = None):
+        self.path = Path(path)
+        self.scope = scope
+        self.started = started or datetime.now(timezone.utc)
+        self.done: dict[str, dict] = done or {}
+
+    @classmethod
+    def load(cls, path: Path, scope: str) -> "Checkpoint":
+        try:
+            data = json.loads(Path(path).read_text())
+            started = datetime.fromisoformat(data["started"])
+            done = dict(data["done"])
+        except FileNotFoundError:
+            return cls(path, scope)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+            return cls(path, scope)
+        if data.get("scope") != scope or datetime.now(timezone.utc) - started > CHECKPOINT_MAX_AGE:
+            return cls(path, scope)
+        return cls(path, scope, started=started, done=done)
+
+    def mark_done(self, jur_id: str, result: dict) -> None:
+        self.done[jur_id] = result
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"scope": self.scope, "started": self.started.isoformat(), "done": self.done}))
+        os.replace(tmp, self.path)   # atomic: a crash mid-write leaves the previous checkpoint
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
 # ── Core processing ───────────────────────────────────────────────────────────
 
-async def process_jurisdiction(db: Prisma, jur, dry_run: bool = False) -> dict:
+@dataclass
+class Pipeline:
+    """Shared state for one monitor run."""
+    db: Prisma
+    http: httpx.AsyncClient
+    extraction: ExtractionPool
+    fetch_slots: asyncio.Semaphore
+    dry_run: bool = False
+
+
+async def process_jurisdiction(pipe: Pipeline, jur) -> dict:
     """
-    Check one jurisdiction's feed for changes.
-    Returns a result dict with keys: name, changed, rules_found, skipped, error.
+    Check one jurisdiction's feed for changes and extract rules from the changed blocks.
+    Returns a result dict with keys: name, changed, rules_found, carried_forward, skipped, deferred, error.
     """
-    result = {"name": jur.name, "changed": False, "rules_found": 0, "skipped": False, "error": None}
+    result = {
+        "name": jur.name, "changed": False, "rules_found": 0, "carried_forward": 0,
+        "skipped": False, "deferred": False, "error": None,
+    }
+    db = pipe.db
 
-    content = await fetch_url(jur.feedUrl)
+    async with pipe.fetch_slots:
+        content = await fetch_url(jur.feedUrl, pipe.http)
     if content is None:
         result["error"] = "fetch_failed"
         return result
 
-    new_hash = sha256(content)
+    new_hash = page_hash(content)
 
     if jur.feedLastHash == new_hash:
         log.info(f"  [{jur.code}] No change")
-        if not dry_run:
+        if not pipe.dry_run:
             await db.jurisdiction.update(
                 where={"id": jur.id},
                 data={"feedLastChecked": datetime.now(timezone.utc)},
@@ -223,58 +493,114 @@ async def process_jurisdiction(db: Prisma, jur, dry_run: bool = False) -> dict:
         result["skipped"] = True
         return result
 
-    log.info(f"  [{jur.code}] Change detected — sending to Claude")
     result["changed"] = True
+    blocks = split_blocks(content)
+    on_page = {b.hash for b in blocks}
+    snapshot = load_snapshot(jur.feedSnapshot)
+    carried, superseded, stale = carry_forward(snapshot["rules"], on_page)
+    sections = changed_sections(blocks, set(snapshot["blocks"]) - stale)
+    extract_content, sent = render_sections(sections)
 
-    if dry_run:
-        log.info(f"  [{jur.code}] DRY RUN — skipping Claude call and DB write")
-        return result
+    changed_blocks = sum(len(section) for section in sections)
+    log.info(f"  [{jur.code}] Change detected — {changed_blocks} of {len(blocks)} block(s) to extract")
 
-    try:
-        extracted = call_claude(content)
-    except (json.JSONDecodeError, ValueError) as e:
-        log.error(f"  [{jur.code}] Claude returned invalid JSON: {e}")
-        result["error"] = "claude_json_error"
-        return result
-    except Exception as e:
-        log.error(f"  [{jur.code}] Claude API error: {type(e).__name__}: {e}")
-        result["error"] = "claude_api_error"
+    if pipe.dry_run:
+        log.info(f"  [{jur.code}] DRY RUN — skipping Claude call and DB write")
         return result
 
-    rule_count = len(extracted.get("rules", []))
-    confidence = extracted.get("confidence", 0.0)
-    log.info(f"  [{jur.code}] {rule_count} rule(s) extracted, confidence={confidence:.2f}")
+    extracted = {"rules": [], "confidence": None, "summary": "No new or changed content", "no_rules_found": True}
+    if sent:
+        log.info(f"  [{jur.code}] Sending {len(sent)} section(s), {len(extract_content):,} chars, to Claude")
+        try:
+            extracted = await pipe.extraction.extract(extract_content)
+        except (json.JSONDecodeError, ValueError) as e:
+            log.error(f"  [{jur.code}] Claude returned invalid JSON: {e}")
+            result["error"] = "claude_json_error"
+            return result
+        except Exception as e:
+            log.error(f"  [{jur.code}] Claude API error: {type(e).__name__}: {e}")
+            result["error"] = "claude_api_error"
+            return result
+
+        if extracted is None:
+            # Hash and snapshot are left alone so the next run sees the change again
+            log.warning(f"  [{jur.code}] Token budget exhausted — deferred to the next run")
+            result["deferred"] = True
+            return result
+
+    new_rules = attribute_rules(extracted.get("rules", []), sent)
+
+    # Blocks that did not fit this call stay out of the snapshot, so they count as changed next time
+    unsent = {b.hash for section in sections[len(sent):] for b in section}
+    if unsent:
+        log.warning(f"  [{jur.code}] {len(sections) - len(sent)} section(s) over the {MAX_CONTENT_CHARS:,}-char limit left for the next run")
+
+    rule_count = len(new_rules)
+    confidence = extracted.get("confidence") or 0.0
+    log.info(f"  [{jur.code}] {rule_count} rule(s) extracted, {len(carried)} carried forward, "
+             f"{len(superseded)} superseded, confidence={confidence:.2f}")
 
     now = datetime.now(timezone.utc)
 
-    await db.pendingrule.create(
-        data={
-            "jurisdiction": {"connect": {"id": jur.id}},
-            "sourceUrl": jur.feedUrl,
-            "rawContent": content[:MAX_RAW_STORED],
-            "extractedData": Json(json.dumps(extracted)),
-            "confidence": confidence,
-            "status": "pending",
-            "updatedAt": now,
-        }
-    )
-
-    await db.jurisdiction.update(
-        where={"id": jur.id},
-        data={"feedLastHash": new_hash, "feedLastChecked": now},
-    )
+    if new_rules or superseded:
+        await db.pendingrule.create(
+            data={
+                "jurisdiction": {"connect": {"id": jur.id}},
+                "sourceUrl": jur.feedUrl,
+                "rawContent": extract_content[:MAX_RAW_STORED],
+                "extractedData": Json(json.dumps({
+                    **extracted,
+                    "rules": [entry["rule"] for entry in new_rules],
+                    "superseded_rules": [entry["rule"] for entry in superseded],
+                    "carried_forward": len(carried),
+                    "changed_blocks": changed_blocks,
+                    "total_blocks": len(blocks),
+                })),
+                "confidence": confidence,
+                "status": "pending",
+                "updatedAt": now,
+            }
+        )
+
+    update = {
+        "feedSnapshot": Json({
+            "blocks": [b.hash for b in blocks if b.hash not in unsent],
+            "rules": carried + new_rules,
+        }),
+        "feedLastChecked": now,
+    }
+    if not unsent:
+        update["feedLastHash"] = new_hash
+    await db.jurisdiction.update(where={"id": jur.id}, data=update)
 
     result["rules_found"] = rule_count
+    result["carried_forward"] = len(carried)
     return result
 
 
-async def main(code_filter: str | None = None, dry_run: bool = False):
+async def main(
+    code_filter: str | None = None,
+    dry_run: bool = False,
+    extractor: Extractor | None = None,
+    fetch_concurrency: int = FETCH_CONCURRENCY,
+    extract_concurrency: int = EXTRACT_CONCURRENCY,
+    token_budget: int | None = TOKEN_BUDGET,
+    checkpoint_path: Path = CHECKPOINT_PATH,
+    resume: bool = True,
+) -> dict:
     log.info("═" * 60)
     log.info("SceneIQ Sub-Jurisdiction Monitor")
     if dry_run:
         log.info("DRY RUN MODE — no database writes")
     log.info("═" * 60)
 
+    extractor = extractor or call_claude
+    if extractor is call_claude and not (dry_run or MOCK_CLAUDE or ANTHROPIC_API_KEY):
+        log.error("ANTHROPIC_API_KEY not set in environment")
+        sys.exit(1)
+
+    totals = {"changed": 0, "skipped": 0, "deferred": 0, "errors": 0, "rules": 0, "resumed": 0}
+
     db = Prisma()
     await db.connect()
 
@@ -291,38 +617,89 @@ async def main(code_filter: str | None = None, dry_run: bool = False):
         if not jurisdictions:
             log.warning("No matching sub-jurisdictions with feedUrl found.")
             log.warning("Run: python scripts/seed_sub_jurisdictions.py")
-            return
+            return totals
+
+        checkpoint = None
+        if not dry_run:
+            scope = code_filter or "all"
+            checkpoint = Checkpoint.load(checkpoint_path, scope) if resume else Checkpoint(checkpoint_path, scope)
+            if checkpoint.done:
+                totals["resumed"] = sum(1 for jur in jurisdictions if jur.id in checkpoint.done)
+                jurisdictions = [jur for jur in jurisdictions if jur.id not in checkpoint.done]
+                log.info(f"Resuming run started {checkpoint.started:%Y-%m-%d %H:%M} — {totals['resumed']} already done")
 
         log.info(f"Monitoring {len(jurisdictions)} jurisdiction(s)")
         log.info("")
 
-        totals = {"changed": 0, "skipped": 0, "errors": 0, "rules": 0}
+        async with http_client() as http:
+            pipe = Pipeline(
+                db=db,
+                http=http,
+                extraction=ExtractionPool(extractor, extract_concurrency, token_budget),
+                fetch_slots=asyncio.Semaphore(fetch_concurrency),
+                dry_run=dry_run,
+            )
 
-        for jur in jurisdictions:
-            log.info(f"▶ {jur.name} ({jur.code})")
-            result = await process_jurisdiction(db, jur, dry_run=dry_run)
+            async def run_one(jur) -> dict:
+                log.info(f"▶ {jur.name} ({jur.code})")
+                try:
+                    result = await process_jurisdiction(pipe, jur)
+                except Exception as e:
+                    log.error(f"  [{jur.code}] {type(e).__name__}: {e}")
+                    return {"name": jur.name, "error": "db_error"}
+                if checkpoint is not None and not result["error"] and not result["deferred"]:
+                    checkpoint.mark_done(jur.id, result)
+                return result
 
+            results = await asyncio.gather(*(run_one(jur) for jur in jurisdictions))
+
+        for result in results:
             if result["error"]:
                 totals["errors"] += 1
-                log.warning(f"  Error: {result['error']}")
+                log.warning(f"  {result['name']}: {result['error']}")
+            elif result["deferred"]:
+                totals["deferred"] += 1
             elif result["skipped"]:
                 totals["skipped"] += 1
             else:
                 totals["changed"] += 1
                 totals["rules"] += result["rules_found"]
 
+        if checkpoint is not None:
+            checkpoint.clear()
+
         log.info("")
         log.info("─" * 60)
         log.info(f"Complete — changed: {totals['changed']}  unchanged: {totals['skipped']}  errors: {totals['errors']}  pending rules queued: {totals['rules']}")
+        if not dry_run:
+            budget = f" of {token_budget:,}" if token_budget is not None else ""
+            log.info(f"Extraction calls: {pipe.extraction.calls}  tokens reserved: {pipe.extraction.tokens_reserved:,}{budget}")
+        if totals["deferred"]:
+            log.warning(f"Token budget exhausted — {totals['deferred']} changed page(s) deferred to the next run")
 
     finally:
         await db.disconnect()
 
+    return totals
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="SceneIQ Sub-Jurisdiction Monitor")
     parser.add_argument("--code",    help="Run a single jurisdiction by code (e.g. NY-ERIE)")
     parser.add_argument("--dry-run", action="store_true", help="Fetch only, no DB writes or Claude calls")
+    parser.add_argument("--extractor", choices=["claude", "mock"], default="claude", help="mock returns a canned extraction without calling the API")
+    parser.add_argument("--fetch-concurrency",   type=int, default=FETCH_CONCURRENCY,   help="Pages fetched at once")
+    parser.add_argument("--extract-concurrency", type=int, default=EXTRACT_CONCURRENCY, help="Extraction calls in flight at once")
+    parser.add_argument("--token-budget",        type=int, default=TOKEN_BUDGET,        help="Stop extracting once this many tokens are reserved")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint of an unfinished run")
     args = parser.parse_args()
 
-    asyncio.run(main(code_filter=args.code, dry_run=args.dry_run))
+    asyncio.run(main(
+        code_filter=args.code,
+        dry_run=args.dry_run,
+        extractor=mock_extract if args.extractor == "mock" else call_claude,
+        fetch_concurrency=args.fetch_concurrency,
+        extract_concurrency=args.extract_concurrency,
+        token_budget=args.token_budget,
+        resume=not args.restart,
+    ))
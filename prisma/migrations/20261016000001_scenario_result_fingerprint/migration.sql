@@ -0,0 +1,5 @@
+-- Stacking engine result cache: fingerprint of the inputs each row was computed from.
+-- Rows whose fingerprint no longer matches the current rule graph are recomputed on read.
+
+ALTER TABLE "scenario_optimization_results"
+    ADD COLUMN IF NOT EXISTS "stackFingerprint" TEXT;
@@ -0,0 +1,5 @@
+-- Feed ingestion: HTTP validators for conditional fetches of each source's feed.
+
+ALTER TABLE "monitoring_sources"
+    ADD COLUMN IF NOT EXISTS "feedEtag" TEXT,
+    ADD COLUMN IF NOT EXISTS "feedLastModified" TEXT;
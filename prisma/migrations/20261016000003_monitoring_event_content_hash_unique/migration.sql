@@ -0,0 +1,10 @@
+-- Feed ingestion dedups with INSERT … ON CONFLICT ("contentHash"), which needs a unique index.
+-- Drop duplicate events left by earlier concurrent runs first, keeping the oldest of each.
+
+DELETE FROM "monitoring_events" a
+USING "monitoring_events" b
+WHERE a."contentHash" = b."contentHash"
+  AND (a."createdAt", a."id") > (b."createdAt", b."id");
+
+CREATE UNIQUE INDEX IF NOT EXISTS "monitoring_events_contentHash_key"
+    ON "monitoring_events"("contentHash");
@@ -0,0 +1,5 @@
+-- Sub-jurisdiction monitor: block hashes of the last extracted page and the
+-- rules attributed to them, so only changed blocks are re-extracted.
+
+ALTER TABLE "jurisdictions"
+    ADD COLUMN IF NOT EXISTS "feedSnapshot" JSONB;
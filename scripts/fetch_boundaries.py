@@ -0,0 +1,214 @@
+"""
+Download US Census cartographic boundary files and convert the shapes that
+match our jurisdictions into GeoJSON for src/services/spatial_index.py.
+
+    python scripts/fetch_boundaries.py [--year 2023] [--out data/boundaries]
+
+Writes states.geojson, counties.geojson and places.geojson (1:500k generalized
+shapes, NAD83 lon/lat, which is within a metre or two of WGS-84). Only
+features that match an active row in `jurisdictions` are written, tagged
+with that row's code and type:
+
+  - states by postal code (IL)
+  - counties/parishes/boroughs and cities/towns by name within their state
+    ("Cook County" ~ COOK, "New York City" ~ New York), or by the part of the
+    code after the state (CA-SANDIEGO ~ San Diego); CODE_ALIASES covers codes
+    that neither rule can find (CA-LA, the NYC boroughs)
+
+Jurisdictions that could not be matched are listed at the end; add them to
+CODE_ALIASES or supply their polygons by hand. Needs DATABASE_URL.
+The shapefiles are read with the standard library only.
+"""
+import argparse
+import io
+import json
+import os
+import re
+import struct
+import sys
+import zipfile
+from array import array
+from pathlib import Path
+
+import httpx
+import psycopg2
+
+BASE_URL = "https://www2.census.gov/geo/tiger/GENZ{year}/shp/cb_{year}_{area}_{layer}_500k.zip"
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+COUNTY_TYPES = {"county", "parish", "borough"}
+PLACE_TYPES = {"city", "town", "village"}
+
+# jurisdiction code -> Census NAME of the county or place it covers
+CODE_ALIASES = {
+    "CA-LA": "Los Angeles",
+    "NY-MANHATTAN": "New York",
+    "NY-BROOKLYN": "Kings",
+    "NY-QUEENS": "Queens",
+    "NY-BRONX": "Bronx",
+    "NY-STATEN-ISLAND": "Richmond",
+}
+
+
+# ── Shapefile reading ─────────────────────────────────────────────────────────
+
+def _dbf_records(data: bytes) -> list[dict]:
+    count, header_len, record_len = struct.unpack("<IHH", data[4:12])
+    fields, pos = [], 32
+    while data[pos] != 0x0D:
+        name = data[pos:pos + 11].split(b"\0", 1)[0].decode("ascii")
+        fields.append((name, data[pos + 16]))
+        pos += 32
+    records = []
+    for i in range(count):
+        pos = header_len + i * record_len + 1       # skip the deletion flag
+        record = {}
+        for name, length in fields:
+            record[name] = data[pos:pos + length].decode("utf-8", "replace").strip()
+            pos += length
+        records.append(record)
+    return records
+
+
+def _signed_area(ring: list) -> float:
+    return sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(ring, ring[1:])) / 2
+
+
+def _inside(x: float, y: float, ring: list) -> bool:
+    inside = False
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:]):
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            inside = not inside
+    return inside
+
+
+def _polygons(rings: list) -> list:
+    """Group shapefile rings (outer clockwise, holes counter-clockwise) into GeoJSON polygons."""
+    outers = [[r] for r in rings if _signed_area(r) < 0]
+    for ring in rings:
+        if _signed_area(ring) >= 0:
+            owner = next((p for p in outers if _inside(*ring[0], p[0])), None)
+            if owner is not None:
+                owner.append(ring)
+            else:
+                outers.append([ring])
+    return outers
+
+
+def _shp_shapes(data: bytes) -> list:
+    shapes, pos = [], 100
+    while pos < len(data):
+        _, words = struct.unpack(">ii", data[pos:pos + 8])
+        content = data[pos + 8:pos + 8 + words * 2]
+        pos += 8 + words * 2
+        if struct.unpack("<i", content[:4])[0] != 5:        # only polygons; null shapes have no geometry
+            shapes.append(None)
+            continue
+        n_parts, n_points = struct.unpack("<ii", content[36:44])
+        parts = list(struct.unpack(f"<{n_parts}i", content[44:44 + 4 * n_parts])) + [n_points]
+        coords = array("d", content[44 + 4 * n_parts:44 + 4 * n_parts + 16 * n_points])
+        if sys.byteorder != "little":
+            coords.byteswap()
+        points = [[round(coords[2 * i], 6), round(coords[2 * i + 1], 6)] for i in range(n_points)]
+        shapes.append(_polygons([points[a:b] for a, b in zip(parts, parts[1:])]))
+    return shapes
+
+
+def read_shapefile(payload: bytes) -> list[tuple[dict, list]]:
+    with zipfile.ZipFile(io.BytesIO(payload)) as zf:
+        shp = next(n for n in zf.namelist() if n.endswith(".shp"))
+        records = _dbf_records(zf.read(shp[:-4] + ".dbf"))
+        shapes = _shp_shapes(zf.read(shp))
+    return [(r, s) for r, s in zip(records, shapes) if s]
+
+
+# ── Matching ──────────────────────────────────────────────────────────────────
+
+def _norm(name: str) -> str:
+    name = name.lower()
+    name = re.sub(r"^(city|town|village) of ", "", name)
+    name = re.sub(r" (county|parish|borough|city|town|village)$", "", name)
+    return re.sub(r"[^a-z0-9]", "", name)
+
+
+def _feature(code: str, name: str, jtype: str, polygons: list) -> dict:
+    return {
+        "type": "Feature",
+        "properties": {"code": code, "name": name, "type": jtype},
+        "geometry": {"type": "MultiPolygon", "coordinates": polygons},
+    }
+
+
+def _match(jurisdictions: list, shapes: dict) -> tuple[list, list]:
+    """Features for every jurisdiction found in shapes ({(state, normalized name): polygons}), and the rest."""
+    features, missing = [], []
+    for code, name, jtype in jurisdictions:
+        state, rest = code.split("-", 1)
+        keys = [_norm(CODE_ALIASES[code])] if code in CODE_ALIASES else [_norm(name), _norm(rest)]
+        polygons = next((shapes[(state, k)] for k in keys if (state, k) in shapes), None)
+        if polygons is None:
+            missing.append(f"{code} ({name})")
+        else:
+            features.append(_feature(code, name, jtype, polygons))
+    return features, missing
+
+
+def _write(path: Path, features: list) -> None:
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}, separators=(",", ":")))
+    print(f"[ok] {path.name}: {len(features)} features")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--year", default="2023", help="Census vintage (GENZ<year>)")
+    parser.add_argument("--out", default=str(REPO_ROOT / "data" / "boundaries"), help="output directory")
+    args = parser.parse_args()
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    cur = conn.cursor()
+    cur.execute("SELECT code, name, lower(type) FROM jurisdictions WHERE active ORDER BY code")
+    rows = cur.fetchall()
+    conn.close()
+
+    def fetch(area: str, layer: str) -> list:
+        url = BASE_URL.format(year=args.year, area=area, layer=layer)
+        print(f"Downloading {url}")
+        r = httpx.get(url, follow_redirects=True, timeout=300)
+        r.raise_for_status()
+        return read_shapefile(r.content)
+
+    states = fetch("us", "state")
+    codes = {code for code, _, _ in rows}
+    state_fips = {r["STATEFP"]: r["STUSPS"] for r, _ in states}
+    _write(out / "states.geojson", [
+        _feature(r["STUSPS"], r["NAME"], "state", polygons) for r, polygons in states if r["STUSPS"] in codes
+    ])
+
+    counties = [row for row in rows if "-" in row[0] and row[2] in COUNTY_TYPES and row[0][:2] in state_fips.values()]
+    places = [row for row in rows if "-" in row[0] and row[2] in PLACE_TYPES and row[0][:2] in state_fips.values()]
+    missing = []
+
+    county_shapes = {(state_fips[r["STATEFP"]], _norm(r["NAME"])): p
+                     for r, p in fetch("us", "county") if r["STATEFP"] in state_fips}
+    features, unmatched = _match(counties, county_shapes)
+    _write(out / "counties.geojson", features)
+    missing += unmatched
+
+    place_shapes = {}
+    for fips, state in sorted(state_fips.items()):
+        if any(code.startswith(f"{state}-") for code, _, _ in places):
+            place_shapes.update({(state, _norm(r["NAME"])): p for r, p in fetch(fips, "place")})
+    features, unmatched = _match(places, place_shapes)
+    _write(out / "places.geojson", features)
+    missing += unmatched
+
+    if missing:
+        print(f"\n{len(missing)} jurisdiction(s) without a matching shape (add to CODE_ALIASES or supply by hand):")
+        for m in missing:
+            print(f"  {m}")
+
+
+if __name__ == "__main__":
+    main()
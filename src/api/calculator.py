@@ -4,6 +4,7 @@ Calculator API endpoints - Tax credit calculations
 from fastapi import APIRouter, HTTPException, status
 import json
 from typing import Dict, Any
+import numpy as np
 from pydantic import BaseModel
 
 from src.models.calculator import (
@@ -22,9 +23,17 @@ from src.models.calculator import (
     ScenarioCalculateResponse,
     ScenarioResult,
     DateBasedRulesRequest,
-    DateBasedRulesResponse
+    DateBasedRulesResponse,
+    SweepCalculateRequest,
+    SweepCalculateResponse,
+    SweepCurve,
+    SweepBreakpoint,
+    MAX_COMPARE_JURISDICTIONS
 )
 from src.utils.database import prisma
+from src.services import comparison_engine
+from src.services.comparison_engine import best_rule_for_budget
+from src.services.rule_catalog import rule_catalog
 
 router = APIRouter(prefix="/calculate", tags=["Calculator"])
 
@@ -44,11 +53,12 @@ async def calculate_quick(request: QuickCalcRequest):
     if not production:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Production not found")
 
-    rules = await prisma.incentiverule.find_many(
-        where={"jurisdictionId": request.jurisdiction_id, "active": True},
-        order={"percentage": "desc"},
-        take=1,
-    )
+    catalog = await rule_catalog.snapshot()
+    rules = sorted(
+        catalog.incentive_rules(request.jurisdiction_id, active_only=True),
+        key=lambda r: r.percentage or 0,
+        reverse=True,
+    )[:1]
 
     total_expenses = production.budgetTotal
     qualified_expenses = production.budgetQualifying if production.budgetQualifying else total_expenses * 0.8
@@ -87,10 +97,10 @@ async def calculate_simple(request: SimpleCalculateRequest):
     Returns detailed calculation with requirements check.
     """
     
+    catalog = await rule_catalog.snapshot()
+    
     # Get jurisdiction
-    jurisdiction = await prisma.jurisdiction.find_unique(
-        where={"id": request.jurisdictionId}
-    )
+    jurisdiction = catalog.jurisdiction(request.jurisdictionId)
     
     if not jurisdiction:
         raise HTTPException(
@@ -99,9 +109,7 @@ async def calculate_simple(request: SimpleCalculateRequest):
         )
     
     # Get rule
-    rule = await prisma.incentiverule.find_unique(
-        where={"id": request.ruleId}
-    )
+    rule = catalog.incentive_rule(request.ruleId)
     
     if not rule:
         raise HTTPException(
@@ -178,10 +186,13 @@ async def calculate_compare(request: CompareCalculateRequest):
     Compare estimated tax credits across multiple jurisdictions.
     
     - **productionBudget**: Total production budget
-    - **jurisdictionIds**: List of 2-10 jurisdictions to compare
+    - **jurisdictionIds**: List of 2-200 jurisdictions to compare
     - **qualifyingBudget**: Optional override for qualifying budget
     
     Returns ranked comparison of all jurisdictions with best recommendation.
+    Rules for every requested jurisdiction come from the in-memory rule
+    catalog, so ranking the full jurisdiction list costs no extra queries,
+    and the ranking is shared with the comparison PDF and Excel exports.
     """
     
     if len(request.jurisdictionIds) < 2:
@@ -190,124 +201,35 @@ async def calculate_compare(request: CompareCalculateRequest):
             detail="Must compare at least 2 jurisdictions"
         )
     
-    if len(request.jurisdictionIds) > 10:
+    if len(request.jurisdictionIds) > MAX_COMPARE_JURISDICTIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot compare more than 10 jurisdictions at once"
+            detail=f"Cannot compare more than {MAX_COMPARE_JURISDICTIONS} jurisdictions at once"
         )
     
-    # Get all jurisdictions
-    jurisdictions = await prisma.jurisdiction.find_many(
-        where={"id": {"in": request.jurisdictionIds}}
-    )
+    catalog = await rule_catalog.snapshot()
     
-    if len(jurisdictions) != len(request.jurisdictionIds):
+    # Rank jurisdictions by their best rule (shared with the PDF and Excel exports)
+    try:
+        comparison = comparison_engine.compare(
+            catalog, request.jurisdictionIds, request.productionBudget, request.qualifyingBudget
+        )
+    except comparison_engine.UnknownJurisdictions:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="One or more jurisdictions not found"
         )
     
-    qualifying_budget = request.qualifyingBudget if request.qualifyingBudget else request.productionBudget
-    
-    # Calculate for each jurisdiction (use best rule for each)
-    comparisons = []
-    
-    for jurisdiction in jurisdictions:
-        # Get all active rules for this jurisdiction
-        rules = await prisma.incentiverule.find_many(
-            where={
-                "jurisdictionId": jurisdiction.id,
-                "active": True
-            }
-        )
-        
-        if not rules:
-            # No active rules - add with zero credit
-            comparisons.append({
-                "jurisdiction": jurisdiction.name,
-                "jurisdictionId": jurisdiction.id,
-                "ruleName": "No active programs",
-                "ruleCode": "NONE",
-                "incentiveType": "none",
-                "percentage": None,
-                "estimatedCredit": 0,
-                "meetsRequirements": False
-            })
-            continue
-        
-        # Calculate credit for each rule, take the best one
-        best_credit = 0
-        best_rule = rules[0]
-        meets_requirements = False
-        
-        for rule in rules:
-            # Calculate credit
-            if rule.percentage:
-                credit = qualifying_budget * (rule.percentage / 100)
-            elif rule.fixedAmount:
-                credit = rule.fixedAmount
-            else:
-                credit = 0
-            
-            # Check minimum
-            meets_min = True
-            if rule.minSpend:
-                meets_min = qualifying_budget >= rule.minSpend
-                if not meets_min:
-                    credit = 0
-            
-            # Apply cap
-            if rule.maxCredit and credit > rule.maxCredit:
-                credit = rule.maxCredit
-            
-            # Track best
-            if credit > best_credit:
-                best_credit = credit
-                best_rule = rule
-                meets_requirements = meets_min
-        
-        comparisons.append({
-            "jurisdiction": jurisdiction.name,
-            "jurisdictionId": jurisdiction.id,
-            "ruleName": best_rule.ruleName,
-            "ruleCode": best_rule.ruleCode,
-            "incentiveType": best_rule.incentiveType,
-            "percentage": best_rule.percentage,
-            "estimatedCredit": best_credit,
-            "meetsRequirements": meets_requirements
-        })
-    
-    # Sort by estimated credit (descending)
-    comparisons.sort(key=lambda x: x["estimatedCredit"], reverse=True)
-    
-    # Add rank and calculate savings
-    for i, comp in enumerate(comparisons):
-        comp["rank"] = i + 1
-        comp["savings"] = comp["estimatedCredit"]
-    
-    # Best and worst
-    best = comparisons[0]
-    worst = comparisons[-1]
-    savings_vs_worst = best["estimatedCredit"] - worst["estimatedCredit"]
-    
     # Convert to Pydantic models
-    comparison_results = [ComparisonResult(**comp) for comp in comparisons]
-    best_result = ComparisonResult(**best)
-    
-    # Generate notes
-    notes = []
-    notes.append(f"🏆 Best option: {best['jurisdiction']} with ${best['estimatedCredit']:,.0f} credit")
-    notes.append(f"💰 Saves ${savings_vs_worst:,.0f} vs lowest option ({worst['jurisdiction']})")
-    
-    if best["percentage"]:
-        notes.append(f"📊 Top rate: {best['percentage']}% ({best['ruleName']})")
+    def to_result(option) -> ComparisonResult:
+        return ComparisonResult(**option.to_dict(), savings=option.credit)
     
     return CompareCalculateResponse(
         totalBudget=request.productionBudget,
-        comparisons=comparison_results,
-        bestOption=best_result,
-        savingsVsWorst=savings_vs_worst,
-        notes=notes
+        comparisons=[to_result(option) for option in comparison.options],
+        bestOption=to_result(comparison.best),
+        savingsVsWorst=comparison.savings_vs_worst,
+        notes=comparison.notes()
     )
 
 
@@ -322,10 +244,10 @@ async def calculate_jurisdiction_options(
     Useful for seeing all options in one place.
     """
     
+    catalog = await rule_catalog.snapshot()
+    
     # Get jurisdiction
-    jurisdiction = await prisma.jurisdiction.find_unique(
-        where={"id": jurisdiction_id}
-    )
+    jurisdiction = catalog.jurisdiction(jurisdiction_id)
     
     if not jurisdiction:
         raise HTTPException(
@@ -334,12 +256,7 @@ async def calculate_jurisdiction_options(
         )
     
     # Get all rules
-    rules = await prisma.incentiverule.find_many(
-        where={
-            "jurisdictionId": jurisdiction_id,
-            "active": True
-        }
-    )
+    rules = catalog.incentive_rules(jurisdiction_id, active_only=True)
     
     if not rules:
         return {
@@ -409,10 +326,10 @@ async def check_compliance(request: ComplianceCheckRequest):
     Returns detailed compliance status with action items.
     """
     
+    catalog = await rule_catalog.snapshot()
+    
     # Get rule
-    rule = await prisma.incentiverule.find_unique(
-        where={"id": request.ruleId}
-    )
+    rule = catalog.incentive_rule(request.ruleId)
     
     if not rule:
         raise HTTPException(
@@ -421,9 +338,7 @@ async def check_compliance(request: ComplianceCheckRequest):
         )
     
     # Get jurisdiction
-    jurisdiction = await prisma.jurisdiction.find_unique(
-        where={"id": rule.jurisdictionId}
-    )
+    jurisdiction = catalog.jurisdiction(rule.jurisdictionId)
     
     # Get production if ID provided
     production = None
@@ -744,10 +659,10 @@ async def get_date_based_rules(request: DateBasedRulesRequest):
     - Understanding expired programs
     """
     
+    catalog = await rule_catalog.snapshot()
+    
     # Get jurisdiction
-    jurisdiction = await prisma.jurisdiction.find_unique(
-        where={"id": request.jurisdictionId}
-    )
+    jurisdiction = catalog.jurisdiction(request.jurisdictionId)
     
     if not jurisdiction:
         raise HTTPException(
@@ -756,9 +671,7 @@ async def get_date_based_rules(request: DateBasedRulesRequest):
         )
     
     # Get all rules for jurisdiction
-    all_rules = await prisma.incentiverule.find_many(
-        where={"jurisdictionId": request.jurisdictionId}
-    )
+    all_rules = catalog.incentive_rules(request.jurisdictionId)
     
     active_rules = []
     upcoming_rules = []
@@ -832,10 +745,10 @@ async def calculate_scenarios(request: ScenarioCalculateRequest):
     Returns comparison of all scenarios with recommendations.
     """
     
+    catalog = await rule_catalog.snapshot()
+    
     # Get jurisdiction
-    jurisdiction = await prisma.jurisdiction.find_unique(
-        where={"id": request.jurisdictionId}
-    )
+    jurisdiction = catalog.jurisdiction(request.jurisdictionId)
     
     if not jurisdiction:
         raise HTTPException(
@@ -844,9 +757,7 @@ async def calculate_scenarios(request: ScenarioCalculateRequest):
         )
     
     # Get all rules for jurisdiction
-    all_rules = await prisma.incentiverule.find_many(
-        where={"jurisdictionId": request.jurisdictionId}
-    )
+    all_rules = catalog.incentive_rules(request.jurisdictionId)
     
     from datetime import datetime
     
@@ -996,3 +907,169 @@ async def calculate_scenarios(request: ScenarioCalculateRequest):
     )
 
 
+def rule_credit_matrix(rules, qualifying: np.ndarray) -> np.ndarray:
+    """
+    Vectorized credit for every rule at every qualifying amount.
+    
+    Returns an array of shape (len(rules), len(qualifying)) applying the same
+    percentage / fixed amount, minimum spend and cap logic as
+    best_rule_for_budget, one whole row per rule.
+    """
+    pct = np.array([r.percentage or 0.0 for r in rules])[:, None]
+    fixed = np.array([r.fixedAmount or 0.0 for r in rules])[:, None]
+    min_spend = np.array([r.minSpend or 0.0 for r in rules])[:, None]
+    cap = np.array([r.maxCredit or np.inf for r in rules])[:, None]
+    
+    credits = np.where(pct != 0, qualifying[None, :] * (pct / 100), fixed)
+    credits = np.where(qualifying[None, :] < min_spend, 0.0, credits)
+    return np.minimum(credits, cap)
+
+
+def _rule_breakpoints(rules, budgets: np.ndarray, best_idx: np.ndarray, best: np.ndarray, qualifying_ratio: float) -> list:
+    """
+    Budgets where the best rule's minimum spend unlocks or its cap starts to bind.
+    
+    A rule's breakpoint only changes the jurisdiction curve if that rule is
+    the best option at the first grid budget on or after it, so breakpoints
+    of rules that never lead there are left out.
+    """
+    def _leads_after(k: int, budget: float) -> bool:
+        i = int(np.searchsorted(budgets, budget, side="left"))
+        return i < len(budgets) and best_idx[i] == k and best[i] > 0
+    
+    budget_min, budget_max = float(budgets[0]), float(budgets[-1])
+    breakpoints = []
+    for k, rule in enumerate(rules):
+        unlock = rule.minSpend / qualifying_ratio if rule.minSpend else None
+        if unlock and budget_min < unlock <= budget_max and _leads_after(k, unlock):
+            breakpoints.append(SweepBreakpoint(
+                kind="min_spend_unlock",
+                budget=unlock,
+                ruleName=rule.ruleName,
+                ruleCode=rule.ruleCode,
+                notes=f"Minimum spend of ${rule.minSpend:,.0f} is met"
+            ))
+        if rule.percentage and rule.maxCredit:
+            binds = rule.maxCredit / (rule.percentage / 100) / qualifying_ratio
+            binds = max(binds, unlock or 0)
+            if budget_min < binds <= budget_max and _leads_after(k, binds):
+                breakpoints.append(SweepBreakpoint(
+                    kind="cap_binds",
+                    budget=binds,
+                    ruleName=rule.ruleName,
+                    ruleCode=rule.ruleCode,
+                    notes=f"Credit capped at ${rule.maxCredit:,.0f} from here on"
+                ))
+    return breakpoints
+
+
+@router.post("/sweep", response_model=SweepCalculateResponse, summary="Sweep credits across a budget range")
+async def calculate_sweep(request: SweepCalculateRequest):
+    """
+    Evaluate every jurisdiction's best credit across a grid of budgets.
+    
+    - **jurisdictionIds**: Jurisdictions to sweep (up to 200)
+    - **budgetMin** / **budgetMax**: Budget range, inclusive
+    - **steps**: Number of budget points (up to 5,000)
+    - **logScale**: Space points geometrically (useful for $250k → $200M)
+    - **qualifyingRatio**: Share of each budget that qualifies
+    
+    The whole jurisdiction × rule × budget grid is computed as array
+    operations, so one call replaces hundreds of /scenario requests when
+    drawing a credit chart. Each curve lists its breakpoints: where a
+    minimum spend unlocks, where a cap binds, and where the best rule changes.
+    """
+    
+    if request.budgetMax <= request.budgetMin:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="budgetMax must be greater than budgetMin"
+        )
+    
+    catalog = await rule_catalog.snapshot()
+    
+    jurisdictions = [j for j in map(catalog.jurisdiction, dict.fromkeys(request.jurisdictionIds)) if j]
+    
+    if len(jurisdictions) != len(set(request.jurisdictionIds)):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="One or more jurisdictions not found"
+        )
+    
+    if request.logScale:
+        budgets = np.geomspace(request.budgetMin, request.budgetMax, request.steps)
+    else:
+        budgets = np.linspace(request.budgetMin, request.budgetMax, request.steps)
+    qualifying = budgets * request.qualifyingRatio
+    
+    curves = []
+    best_by_jurisdiction = np.zeros((len(jurisdictions), len(budgets)))
+    
+    for row, jurisdiction in enumerate(jurisdictions):
+        rules = catalog.incentive_rules(jurisdiction.id, active_only=True)
+        
+        if not rules:
+            curves.append(SweepCurve(
+                jurisdiction=jurisdiction.name,
+                jurisdictionId=jurisdiction.id,
+                credits=[0.0] * len(budgets),
+                bestRuleCodes=[None] * len(budgets),
+                maxCredit=0.0
+            ))
+            continue
+        
+        matrix = rule_credit_matrix(rules, qualifying)
+        best_idx = matrix.argmax(axis=0)
+        best = matrix[best_idx, np.arange(len(budgets))]
+        best_by_jurisdiction[row] = best
+        
+        # No positive credit means no rule applies at that budget
+        codes = np.array([r.ruleCode for r in rules], dtype=object)[best_idx]
+        codes[best <= 0] = None
+        
+        breakpoints = _rule_breakpoints(rules, budgets, best_idx, best, request.qualifyingRatio)
+        unlocked_at = {
+            (int(np.searchsorted(budgets, b.budget, side="left")), b.ruleCode)
+            for b in breakpoints if b.kind == "min_spend_unlock"
+        }
+        for i in np.flatnonzero(codes[1:] != codes[:-1]) + 1:
+            # Transitions from / to "no rule" are already min-spend breakpoints
+            if codes[i] is None or codes[i - 1] is None:
+                continue
+            rule = rules[best_idx[i]]
+            # The rule took the lead because its minimum spend unlocked on this step
+            if (int(i), rule.ruleCode) in unlocked_at:
+                continue
+            breakpoints.append(SweepBreakpoint(
+                kind="best_rule_change",
+                budget=float(budgets[i]),
+                ruleName=rule.ruleName,
+                ruleCode=rule.ruleCode,
+                notes=f"{rule.ruleName} becomes the best option"
+            ))
+        breakpoints.sort(key=lambda b: b.budget)
+        
+        curves.append(SweepCurve(
+            jurisdiction=jurisdiction.name,
+            jurisdictionId=jurisdiction.id,
+            credits=np.round(best, 2).tolist(),
+            bestRuleCodes=codes.tolist(),
+            maxCredit=float(best.max()),
+            breakpoints=breakpoints
+        ))
+    
+    leader_idx = best_by_jurisdiction.argmax(axis=0)
+    leader_ids = np.array([j.id for j in jurisdictions], dtype=object)[leader_idx]
+    leader_ids[best_by_jurisdiction.max(axis=0) <= 0] = None
+    
+    notes = [f"📈 {len(curves)} jurisdiction(s) × {len(budgets)} budget points"]
+    top = max(curves, key=lambda c: c.maxCredit)
+    if top.maxCredit > 0:
+        notes.append(f"🏆 Highest credit on the range: {top.jurisdiction} with ${top.maxCredit:,.0f}")
+    
+    return SweepCalculateResponse(
+        budgets=np.round(budgets, 2).tolist(),
+        curves=curves,
+        leaders=leader_ids.tolist(),
+        notes=notes
+    )
@@ -1,21 +1,43 @@
 """
 Excel Export API endpoints
+
+Comparison and scenario workbooks are kept in the on-disk report cache
+(src/services/report_cache.py) and served from it, with an ETag, when the
+same request comes in again on the same day and rule data.
+
+The expense ledger export streams: expenses are read LEDGER_BATCH_ROWS at a
+time in ledger order (the next page loads while the current one is being
+written) into a write-only workbook on disk, which is then sent as a file and
+deleted. Memory stays flat however long the ledger is.
 """
-from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import Response
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import FileResponse, Response
+from starlette.background import BackgroundTask
 from datetime import datetime
+from typing import AsyncIterator, List, Optional
+import asyncio
 import json
+import logging
+import os
+import tempfile
 
 from src.models.report import (
     GenerateComparisonReportRequest,
     GenerateComplianceReportRequest,
     GenerateScenarioReportRequest
 )
+from src.services import comparison_engine, report_cache
+from src.services.rule_catalog import rule_catalog
 from src.utils.database import prisma
 from src.utils.excel_generator import excel_generator
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/excel", tags=["Excel Exports"])
 
+XLSX_MEDIA_TYPE = report_cache.FORMATS["xlsx"]
+LEDGER_BATCH_ROWS = 5_000
+
 
 def parse_json_field(field):
     """Parse JSON field that might be string or dict"""
@@ -24,8 +46,39 @@ def parse_json_field(field):
     return field if field else {}
 
 
+def _cached_download(http_request: Request, key: str, filename: str) -> Optional[Response]:
+    """304 or the cached workbook for this cache key; None if it has to be generated."""
+    headers = {"ETag": report_cache.etag(key)}
+    path = report_cache.report_cache.get(key, "xlsx")
+    if report_cache.etag_matches(http_request.headers.get("if-none-match"), key, cached=path is not None):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if path is None:
+        return None
+    return FileResponse(
+        path,
+        media_type=XLSX_MEDIA_TYPE,
+        headers={**headers, "Content-Disposition": f"attachment; filename={filename}", "X-Report-Cache": "hit"},
+    )
+
+
+async def _cached_workbook(key: str, filename: str, excel_bytes: bytes) -> Response:
+    """Store a freshly generated workbook in the report cache and return it."""
+    try:
+        await asyncio.to_thread(report_cache.report_cache.put, key, "xlsx", excel_bytes)
+    except OSError as e:
+        logger.warning(f"Could not cache workbook {filename}: {e}")
+    return Response(
+        content=excel_bytes,
+        media_type=XLSX_MEDIA_TYPE,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "ETag": report_cache.etag(key),
+        }
+    )
+
+
 @router.post("/comparison", summary="Export jurisdiction comparison to Excel")
-async def export_comparison_excel(request: GenerateComparisonReportRequest):
+async def export_comparison_excel(request: GenerateComparisonReportRequest, http_request: Request):
     """
     Export jurisdiction comparison to formatted Excel spreadsheet.
     
@@ -36,70 +89,27 @@ async def export_comparison_excel(request: GenerateComparisonReportRequest):
     - Professional formatting
     """
     
-    # Get jurisdictions
-    jurisdictions = await prisma.jurisdiction.find_many(
-        where={"id": {"in": request.jurisdictionIds}}
-    )
+    catalog = await rule_catalog.snapshot()
+    
+    # Create filename
+    filename = f"comparison_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     
-    if len(jurisdictions) != len(request.jurisdictionIds):
+    # Serve a repeat of this request from the report cache
+    cache_key = report_cache.cache_key("comparison", "xlsx", request.model_dump(mode="json"), catalog.fingerprint)
+    cached = _cached_download(http_request, cache_key, filename)
+    if cached is not None:
+        return cached
+    
+    # Rank jurisdictions by their best rule (shared with /calculate/compare)
+    try:
+        comparison = comparison_engine.compare(catalog, request.jurisdictionIds, request.budget)
+    except comparison_engine.UnknownJurisdictions:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="One or more jurisdictions not found"
         )
     
-    # Calculate for each jurisdiction
-    comparisons = []
-    
-    for jurisdiction in jurisdictions:
-        rules = await prisma.incentiverule.find_many(
-            where={
-                "jurisdictionId": jurisdiction.id,
-                "active": True
-            }
-        )
-        
-        if not rules:
-            continue
-        
-        best_credit = 0
-        best_rule = None
-        
-        for rule in rules:
-            if rule.percentage:
-                credit = request.budget * (rule.percentage / 100)
-            elif rule.fixedAmount:
-                credit = rule.fixedAmount
-            else:
-                credit = 0
-            
-            if rule.minSpend and request.budget < rule.minSpend:
-                credit = 0
-            
-            if rule.maxCredit and credit > rule.maxCredit:
-                credit = rule.maxCredit
-            
-            if credit > best_credit:
-                best_credit = credit
-                best_rule = rule
-        
-        if best_rule:
-            comparisons.append({
-                "jurisdiction": jurisdiction.name,
-                "jurisdictionId": jurisdiction.id,
-                "ruleName": best_rule.ruleName,
-                "ruleCode": best_rule.ruleCode,
-                "incentiveType": best_rule.incentiveType,
-                "percentage": best_rule.percentage,
-                "estimatedCredit": best_credit,
-                "rank": 0
-            })
-    
-    # Sort by credit amount
-    comparisons.sort(key=lambda x: x["estimatedCredit"], reverse=True)
-    
-    # Add ranks
-    for i, comp in enumerate(comparisons):
-        comp["rank"] = i + 1
+    comparisons = comparison.report_rows()
     
     if not comparisons:
         raise HTTPException(
@@ -114,17 +124,8 @@ async def export_comparison_excel(request: GenerateComparisonReportRequest):
         comparisons=comparisons
     )
     
-    # Create filename
-    filename = f"comparison_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    
     # Return Excel as download
-    return Response(
-        content=excel_bytes,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
-    )
+    return await _cached_workbook(cache_key, filename, excel_bytes)
 
 
 @router.post("/compliance", summary="Export compliance report to Excel")
@@ -139,10 +140,10 @@ async def export_compliance_excel(request: GenerateComplianceReportRequest):
     - Professional formatting
     """
     
+    catalog = await rule_catalog.snapshot()
+    
     # Get rule
-    rule = await prisma.incentiverule.find_unique(
-        where={"id": request.ruleId}
-    )
+    rule = catalog.incentive_rule(request.ruleId)
     
     if not rule:
         raise HTTPException(
@@ -151,9 +152,7 @@ async def export_compliance_excel(request: GenerateComplianceReportRequest):
         )
     
     # Get jurisdiction
-    jurisdiction = await prisma.jurisdiction.find_unique(
-        where={"id": rule.jurisdictionId}
-    )
+    jurisdiction = catalog.jurisdiction(rule.jurisdictionId)
     
     # Parse requirements
     requirements_data = parse_json_field(rule.requirements)
@@ -288,7 +287,7 @@ async def export_compliance_excel(request: GenerateComplianceReportRequest):
 
 
 @router.post("/scenario", summary="Export scenario analysis to Excel")
-async def export_scenario_excel(request: GenerateScenarioReportRequest):
+async def export_scenario_excel(request: GenerateScenarioReportRequest, http_request: Request):
     """
     Export scenario analysis to formatted Excel spreadsheet.
     
@@ -299,10 +298,19 @@ async def export_scenario_excel(request: GenerateScenarioReportRequest):
     - Professional formatting
     """
     
+    catalog = await rule_catalog.snapshot()
+    
+    # Create filename
+    filename = f"scenario_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    
+    # Serve a repeat of this request from the report cache
+    cache_key = report_cache.cache_key("scenario", "xlsx", request.model_dump(mode="json"), catalog.fingerprint)
+    cached = _cached_download(http_request, cache_key, filename)
+    if cached is not None:
+        return cached
+    
     # Get jurisdiction
-    jurisdiction = await prisma.jurisdiction.find_unique(
-        where={"id": request.jurisdictionId}
-    )
+    jurisdiction = catalog.jurisdiction(request.jurisdictionId)
     
     if not jurisdiction:
         raise HTTPException(
@@ -311,12 +319,7 @@ async def export_scenario_excel(request: GenerateScenarioReportRequest):
         )
     
     # Get available rules
-    rules = await prisma.incentiverule.find_many(
-        where={
-            "jurisdictionId": request.jurisdictionId,
-            "active": True
-        }
-    )
+    rules = catalog.incentive_rules(request.jurisdictionId, active_only=True)
     
     if not rules:
         raise HTTPException(
@@ -382,14 +385,74 @@ async def export_scenario_excel(request: GenerateScenarioReportRequest):
         scenarios=scenario_results
     )
     
+    # Return Excel as download
+    return await _cached_workbook(cache_key, filename, excel_bytes)
+
+
+async def _expense_batches(production_id: str) -> AsyncIterator[List]:
+    """A production's expenses in ledger order, one page at a time; the next page is read while the caller handles this one"""
+    async def page(after: Optional[str]):
+        return await prisma.expense.find_many(
+            where={"productionId": production_id},
+            order=[{"expenseDate": "asc"}, {"id": "asc"}],
+            take=LEDGER_BATCH_ROWS,
+            **({"cursor": {"id": after}, "skip": 1} if after else {})
+        )
+
+    pending = asyncio.create_task(page(None))
+    try:
+        while pending is not None:
+            batch = await pending
+            pending = asyncio.create_task(page(batch[-1].id)) if len(batch) == LEDGER_BATCH_ROWS else None
+            if batch:
+                yield batch
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+@router.get("/expenses/{production_id}", summary="Export a production's expense ledger to Excel")
+async def export_expense_ledger(production_id: str):
+    """
+    Export every expense line of a production to an Excel workbook.
+    
+    Returns a downloadable Excel workbook with:
+    - Summary sheet with totals and spend by category
+    - Ledger sheet with one row per expense, oldest first
+    
+    Built in constant memory, so it scales to ledgers of hundreds of thousands of lines.
+    """
+    
+    production = await prisma.production.find_unique(where={"id": production_id})
+    
+    if not production:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Production with ID {production_id} not found"
+        )
+    
+    # Stream expenses into a write-only workbook on disk
+    fd, path = tempfile.mkstemp(prefix="ledger-", suffix=".xlsx")
+    os.close(fd)
+    try:
+        ledger = excel_generator.expense_ledger(production.title)
+        async for batch in _expense_batches(production_id):
+            await asyncio.to_thread(ledger.append, batch)
+        await asyncio.to_thread(ledger.save, path)
+    except BaseException:
+        os.unlink(path)
+        raise
+    logger.info(f"📊 Expense ledger for {production_id}: {ledger.rows:,} rows, {os.path.getsize(path):,} bytes")
+    
     # Create filename
-    filename = f"scenario_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    filename = f"expenses_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     
-    # Return Excel as download
-    return Response(
-        content=excel_bytes,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    # Send the file, then delete it
+    return FileResponse(
+        path,
+        media_type=XLSX_MEDIA_TYPE,
         headers={
             "Content-Disposition": f"attachment; filename={filename}"
-        }
-    )
\ No newline at end of file
+        },
+        background=BackgroundTask(os.unlink, path)
+    )
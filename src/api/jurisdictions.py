@@ -13,6 +13,7 @@ from src.models.jurisdiction import (
     JurisdictionList
 )
 from src.utils.database import prisma
+from src.services.rule_catalog import rule_catalog
 
 router = APIRouter(prefix="/jurisdictions", tags=["Jurisdictions"])
 
@@ -93,6 +94,7 @@ async def create_jurisdiction(jurisdiction: JurisdictionCreate):
     new_jurisdiction = await prisma.jurisdiction.create(
         data=jurisdiction.model_dump()
     )
+    rule_catalog.invalidate()
     
     return new_jurisdiction
 
@@ -121,6 +123,7 @@ async def update_jurisdiction(jurisdiction_id: str, jurisdiction: JurisdictionUp
         where={"id": jurisdiction_id},
         data=update_data
     )
+    rule_catalog.invalidate()
     
     return updated
 
@@ -145,5 +148,6 @@ async def delete_jurisdiction(jurisdiction_id: str):
     await prisma.jurisdiction.delete(
         where={"id": jurisdiction_id}
     )
+    rule_catalog.invalidate()
     
     return None
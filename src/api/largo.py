@@ -7,7 +7,7 @@ from datetime import datetime, timezone
 from fastapi import APIRouter
 from pydantic import BaseModel
 from typing import Optional, List
-from src.utils.database import prisma
+from src.services.rule_catalog import rule_catalog
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/integrations", tags=["Integrations"])
@@ -27,29 +27,21 @@ class LargoProject(BaseModel):
 @router.post("/largo/project", summary="Evaluate a project from Largo or MMB Connector")
 async def evaluate_largo_project(project: LargoProject):
     location_terms = [loc.strip() for loc in (project.locations or []) if loc.strip()]
+    catalog = await rule_catalog.snapshot()
+    active_jurisdictions = catalog.jurisdictions(active_only=True)
 
     # Collect unique jurisdictions matching any of the location terms
     seen_ids: set = set()
     jurisdictions = []
     for term in location_terms:
-        matches = await prisma.jurisdiction.find_many(
-            where={
-                "OR": [
-                    {"code": {"equals": term.upper()}},
-                    {"name": {"contains": term}},
-                ],
-                "active": True,
-            }
-        )
+        matches = [j for j in active_jurisdictions if j.code == term.upper() or term in j.name]
         for j in matches:
             if j.id not in seen_ids:
                 seen_ids.add(j.id)
                 jurisdictions.append(j)
 
     if not jurisdictions:
-        jurisdictions = await prisma.jurisdiction.find_many(
-            where={"active": True}, order={"name": "asc"}, take=5
-        )
+        jurisdictions = active_jurisdictions[:5]
 
     budget = project.budget or 0
     qualifying_spend = budget * 0.8
@@ -58,9 +50,10 @@ async def evaluate_largo_project(project: LargoProject):
     total_credits = 0.0
 
     for j in jurisdictions:
-        rules = await prisma.incentiverule.find_many(
-            where={"jurisdictionId": j.id, "active": True},
-            order={"percentage": "desc"},
+        rules = sorted(
+            catalog.incentive_rules(j.id, active_only=True),
+            key=lambda r: r.percentage or 0,
+            reverse=True,
         )
         if not rules:
             continue
@@ -9,6 +9,7 @@ import logging
 from datetime import datetime, timezone
 
 from src.utils.database import prisma
+from src.services.rule_catalog import rule_catalog
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/local-rules", tags=["Local Rules"])
@@ -161,6 +162,7 @@ async def create_local_rule(body: LocalRuleCreate):
         },
         include={"jurisdiction": True},
     )
+    rule_catalog.invalidate()
     return _serialize(rule)
 
 
@@ -192,6 +194,7 @@ async def update_local_rule(rule_id: str, body: LocalRuleUpdate):
         data=data,
         include={"jurisdiction": True},
     )
+    rule_catalog.invalidate()
     return _serialize(updated)
 
 
@@ -207,6 +210,7 @@ async def delete_local_rule(rule_id: str):
         where={"id": rule_id},
         data={"active": False, "updatedAt": datetime.now(timezone.utc)},
     )
+    rule_catalog.invalidate()
     return {"message": "Local rule deactivated"}
 
 
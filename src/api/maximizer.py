@@ -8,29 +8,35 @@ down incentive package.
 Routes
 ------
 POST /maximize                        Full maximize (lat/lng or codes + spend)
+POST /maximize/batch                  Rank many candidate points for one spend figure
 GET  /maximize/lookup                 Resolve which jurisdictions a point falls in
+GET  /maximize/cache-stats            Hit/miss counters of the shared result cache
 GET  /maximize/maximum-possible-credit  Best-case incentive summary card data
 """
 
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import List, Literal, Optional
 import logging
 
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 
-from maximizer import SceneIQMaximizer
+from maximizer import SceneIQMaximizer, result_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/maximize", tags=["Maximizer"])
 
+MAX_BATCH_POINTS = 5_000
+
 _engine = None
 
 
 def _get_engine() -> SceneIQMaximizer:
+    # Shares the app's Prisma client, so queries use its pool and don't block the loop,
+    # and the module-level result cache the CLI uses too
     global _engine
     if _engine is None:
-        _engine = SceneIQMaximizer()
+        _engine = SceneIQMaximizer(cache=result_cache)
     return _engine
 
 
@@ -80,6 +86,60 @@ class MaximizeResponse(BaseModel):
     recommendations: List[str]
 
 
+class BatchPoint(BaseModel):
+    id: Optional[str] = Field(None, description="Caller's label for the point, echoed back")
+    lat: float = Field(..., ge=-90, le=90, description="Latitude (WGS-84)")
+    lng: float = Field(..., ge=-180, le=180, description="Longitude (WGS-84)")
+
+
+class MaximizeBatchRequest(BaseModel):
+    points: List[BatchPoint] = Field(..., min_length=1, max_length=MAX_BATCH_POINTS)
+    project_type: str = Field("all", description="Project type filter (e.g. 'film', 'solar')")
+    qualified_spend: Optional[float] = Field(
+        None, description="Qualified production spend in USD, applied to every point"
+    )
+    spend_by_location: Optional[dict] = Field(
+        None, description="Per-jurisdiction qualifying spend (CODE -> USD), as for POST /maximize"
+    )
+    sort_by: Literal["total_incentive_usd", "effective_rate", "input"] = Field(
+        "total_incentive_usd", description="Order of the returned results; 'input' keeps request order"
+    )
+    descending: bool = True
+    limit: Optional[int] = Field(None, ge=1, description="Return only the first N results after sorting")
+
+
+class BatchPointResult(BaseModel):
+    index: int                      # position in the request
+    id: Optional[str]
+    lat: float
+    lng: float
+    rank: int                       # 1 = highest total_incentive_usd; ties share a rank
+    resolved_state: Optional[str]
+    jurisdiction_codes: List[str]
+    total_incentive_usd: float
+    effective_rate: Optional[float]
+    breakdown: dict
+    warnings: List[str]
+
+
+class MaximizeBatchResponse(BaseModel):
+    points_evaluated: int
+    chains_evaluated: int           # distinct jurisdiction chains the points resolved to
+    qualified_spend: Optional[float]
+    results: List[BatchPointResult]
+
+
+class CacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: Optional[float]
+    size: int
+    maxsize: int
+    ttl_seconds: float
+    evictions: int
+    expirations: int
+
+
 class LookupResponse(BaseModel):
     resolved_state: Optional[str]
     jurisdictions: List[dict]
@@ -125,7 +185,7 @@ async def maximize(req: MaximizeRequest):
 
     try:
         engine = _get_engine()
-        result = engine.maximize(
+        result = await engine.maximize(
             lat=req.lat,
             lng=req.lng,
             jurisdiction_codes=req.jurisdiction_codes,
@@ -151,11 +211,65 @@ async def maximize(req: MaximizeRequest):
     )
 
 
+@router.post("/batch", response_model=MaximizeBatchResponse)
+async def maximize_batch(req: MaximizeBatchRequest):
+    try:
+        engine = _get_engine()
+        results = await engine.maximize_batch(
+            [(p.lat, p.lng) for p in req.points],
+            project_type=req.project_type,
+            qualified_spend=req.qualified_spend,
+            spend_by_location=req.spend_by_location,
+        )
+    except Exception as exc:
+        logger.error(f"Maximizer batch error: {exc}")
+        raise HTTPException(status_code=500, detail=f"Maximizer error: {exc}")
+
+    totals = sorted((r.total_incentive_usd for r in results), reverse=True)
+    rank_of = {}
+    for position, total in enumerate(totals, start=1):
+        rank_of.setdefault(total, position)
+
+    rows = [
+        BatchPointResult(
+            index=i,
+            id=p.id,
+            lat=p.lat,
+            lng=p.lng,
+            rank=rank_of[r.total_incentive_usd],
+            resolved_state=r.resolved_state,
+            jurisdiction_codes=r.jurisdiction_codes,
+            total_incentive_usd=r.total_incentive_usd,
+            effective_rate=r.effective_rate,
+            breakdown=r.breakdown,
+            warnings=r.warnings,
+        )
+        for i, (p, r) in enumerate(zip(req.points, results))
+    ]
+    if req.sort_by == "total_incentive_usd":
+        rows.sort(key=lambda row: row.total_incentive_usd, reverse=req.descending)
+    elif req.sort_by == "effective_rate":
+        missing = float("-inf") if req.descending else float("inf")    # no rate sorts last
+        rows.sort(
+            key=lambda row: row.effective_rate if row.effective_rate is not None else missing,
+            reverse=req.descending,
+        )
+    if req.limit is not None:
+        rows = rows[:req.limit]
+
+    return MaximizeBatchResponse(
+        points_evaluated=len(results),
+        chains_evaluated=len({tuple(r.jurisdiction_codes) for r in results if r.jurisdiction_codes}),
+        qualified_spend=req.qualified_spend,
+        results=rows,
+    )
+
+
 @router.get("/lookup", response_model=LookupResponse)
 async def lookup_jurisdictions(lat: float, lng: float):
     try:
         engine = _get_engine()
-        jurisdictions, state_code = engine.resolve_jurisdictions_by_location(lat, lng)
+        jurisdictions, state_code = await engine.resolve_jurisdictions_by_location(lat, lng)
     except Exception as exc:
         logger.error(f"Lookup error: {exc}")
         raise HTTPException(status_code=500, detail=str(exc))
@@ -169,6 +283,11 @@ async def lookup_jurisdictions(lat: float, lng: float):
     )
 
 
+@router.get("/cache-stats", response_model=CacheStatsResponse)
+async def cache_stats():
+    return CacheStatsResponse(**result_cache.stats())
+
+
 @router.get("/maximum-possible-credit", response_model=MaximumPossibleCreditResponse)
 async def maximum_possible_credit(
     jurisdiction: Optional[str] = Query(default=None, description="Optional jurisdiction filter, e.g. New Jersey"),
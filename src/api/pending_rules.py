@@ -8,6 +8,7 @@ import logging
 from datetime import datetime, timezone
 
 from src.utils.database import prisma
+from src.services.rule_catalog import rule_catalog
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/pending-rules", tags=["Pending Rules"])
@@ -132,6 +133,9 @@ async def approve_rule(rule_id: str, body: ReviewRequest = ReviewRequest()):
         except Exception as e:
             logger.warning(f"Could not promote rule {i+1}: {e}")
 
+    if promoted:
+        rule_catalog.invalidate()
+
     logger.info(f"Approved pending rule {rule_id} — promoted {promoted} local rule(s)")
     return {**_serialize(updated), "promotedRules": promoted}
 
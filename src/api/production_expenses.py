@@ -1,14 +1,21 @@
 """
 Production-scoped expense endpoints — nested under /productions/{id}/expenses.
 Matches the URL pattern expected by the frontend API client.
+
+Whole cost reports go to /productions/{id}/expenses/import (CSV, XLSX or
+NDJSON; see src/services/expense_import.py).
 """
+import asyncio
 import logging
+import time
+from tempfile import SpooledTemporaryFile
 from typing import Optional
 from datetime import date, timedelta
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, Request, status
 from pydantic import BaseModel
 
+from src.services import expense_import
 from src.utils.database import prisma
 
 logger = logging.getLogger(__name__)
@@ -224,6 +231,116 @@ async def create_expense(production_id: str, data: ExpenseCreate):
     return expense
 
 
+_SPOOL_MAX_MEMORY = 8 * 1024 * 1024   # uploads above this spill to disk
+_SPOOL_WRITE_SIZE = 64 * 1024
+
+
+async def _spool_body(request: Request) -> SpooledTemporaryFile:
+    """Spool the raw body, writing on a worker thread once it may be on disk."""
+    spool = SpooledTemporaryFile(max_size=_SPOOL_MAX_MEMORY)
+    buffered = bytearray()
+    async for chunk in request.stream():
+        buffered += chunk
+        if len(buffered) >= _SPOOL_WRITE_SIZE:
+            await asyncio.to_thread(spool.write, bytes(buffered))
+            buffered.clear()
+
+    def finish() -> None:
+        spool.write(bytes(buffered))
+        spool.seek(0)
+
+    await asyncio.to_thread(finish)
+    return spool
+
+
+@router.post("/productions/{production_id}/expenses/import",
+             summary="Bulk-import expenses from a CSV, XLSX or NDJSON file")
+async def import_expenses(
+    production_id: str,
+    request: Request,
+    format: Optional[str] = Query(None, description="csv, xlsx or ndjson; taken from the upload's file name or Content-Type if omitted"),
+    dry_run: bool = Query(False, description="Validate every row but write nothing"),
+):
+    """
+    Import a cost report in one request. Send the file as the raw body
+    (Content-Type text/csv, application/x-ndjson or the XLSX type) or as a
+    multipart upload in the `file` field.
+
+    Valid rows are inserted in batches; invalid rows are skipped and listed
+    in `errors` with their line number (the first 1,000 of them).
+    """
+    prod = await prisma.production.find_unique(where={"id": production_id})
+    if not prod:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Production not found")
+
+    content_type = request.headers.get("content-type") or ""
+    if content_type.split(";")[0].strip().lower() == "multipart/form-data":
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "Multipart upload must include a 'file' field")
+        f, fmt = upload.file, format or expense_import.detect_format(upload.content_type, upload.filename)
+    else:
+        f, fmt = await _spool_body(request), format or expense_import.detect_format(content_type)
+    if fmt not in expense_import.FORMATS:
+        f.close()
+        raise HTTPException(
+            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            "Send a CSV, XLSX or NDJSON file, or pass ?format=csv|xlsx|ndjson"
+        )
+
+    started = time.perf_counter()
+    read = imported = rejected = 0
+    errors: list = []
+    chunks = expense_import.read_chunks(f, fmt, production_id, expense_import.CHUNK_ROWS)
+    pending = None
+    try:
+        # Parse the next chunk on a worker thread while this one is inserted
+        pending = asyncio.ensure_future(asyncio.to_thread(next, chunks, None))
+        while (chunk := await pending) is not None:
+            pending = asyncio.ensure_future(asyncio.to_thread(next, chunks, None))
+            read += chunk.read
+            rejected += len(chunk.errors)
+            if len(errors) < expense_import.MAX_REPORTED_ERRORS:
+                errors.extend(chunk.errors[:expense_import.MAX_REPORTED_ERRORS - len(errors)])
+            if chunk.rows and not dry_run:
+                imported += await prisma.expense.create_many(data=chunk.rows)
+            elif dry_run:
+                imported += len(chunk.rows)
+        pending = None
+    except expense_import.ImportFileError as e:
+        pending = None
+        done = f" ({imported} rows imported before the error)" if imported and not dry_run else ""
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, f"{e}{done}")
+    finally:
+        if pending is not None:
+            # Let the parse in flight finish before its file is closed
+            try:
+                await pending
+            except Exception:
+                pass
+        chunks.close()
+        f.close()
+
+    seconds = time.perf_counter() - started
+    logger.info(
+        f"Expense import for production {production_id}: {read} rows read, "
+        f"{imported} {'valid' if dry_run else 'imported'}, {rejected} rejected in {seconds:.1f}s"
+    )
+    return {
+        "productionId":    production_id,
+        "format":          fmt,
+        "dryRun":          dry_run,
+        "rowsRead":        read,
+        "imported":        0 if dry_run else imported,
+        "valid":           imported,
+        "rejected":        rejected,
+        "errors":          errors,
+        "errorsTruncated": rejected > len(errors),
+        "seconds":         round(seconds, 3),
+    }
+
+
 @router.delete("/productions/{production_id}/expenses/{expense_id}",
                status_code=status.HTTP_204_NO_CONTENT,
                summary="Delete an expense")
@@ -1,10 +1,23 @@
 """
 Reports API endpoints - PDF Report Generation
+
+PDFs render on a process pool (src/services/report_renderer.py). By default
+an endpoint waits a few seconds and returns the PDF; a report that takes
+longer comes back as 202 with a job to poll. ?mode=async always returns the
+job, ?mode=inline waits for the PDF.
+
+Comparison and scenario PDFs are kept in the on-disk report cache
+(src/services/report_cache.py): a repeat of the same request on the same day
+and rule data is served straight from the file, whatever the mode, with an
+ETag the client can revalidate with If-None-Match.
 """
-from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import Response
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse, JSONResponse, Response
 from datetime import datetime
+from typing import Literal, Optional
+import asyncio
 import json
+import logging
 
 from src.models.report import (
     GenerateComparisonReportRequest,
@@ -12,11 +25,16 @@ from src.models.report import (
     GenerateScenarioReportRequest,
     ReportResponse
 )
-from src.utils.database import prisma
-from src.utils.pdf_generator import pdf_generator
+from src.services import comparison_engine, report_cache, report_renderer
+from src.services.rule_catalog import rule_catalog
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
+RenderMode = Literal["auto", "inline", "async"]
+_MODE_QUERY = Query("auto", description="auto: PDF if ready within a few seconds, else a job; inline: wait for the PDF; async: always a job")
+
 
 def parse_json_field(field):
     """Parse JSON field that might be string or dict"""
@@ -25,8 +43,93 @@ def parse_json_field(field):
     return field if field else {}
 
 
+def _pdf_download(job: report_renderer.RenderJob) -> Response:
+    headers = {
+        "Content-Disposition": f"attachment; filename={job.filename}",
+        "Server-Timing": job.server_timing(),
+        "X-Report-Job": job.id,
+    }
+    if job.cache_key:
+        headers["ETag"] = report_cache.etag(job.cache_key)
+    return Response(content=job.pdf, media_type="application/pdf", headers=headers)
+
+
+def _cached_download(http_request: Request, key: str, filename: str) -> Optional[Response]:
+    """304 or the cached PDF for this cache key; None if it has to be rendered."""
+    headers = {"ETag": report_cache.etag(key)}
+    path = report_cache.report_cache.get(key, "pdf")
+    if report_cache.etag_matches(http_request.headers.get("if-none-match"), key, cached=path is not None):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if path is None:
+        return None
+    return FileResponse(
+        path,
+        media_type=report_cache.FORMATS["pdf"],
+        headers={**headers, "Content-Disposition": f"attachment; filename={filename}", "X-Report-Cache": "hit"},
+    )
+
+
+def _store_in_cache(job: report_renderer.RenderJob) -> None:
+    try:
+        report_cache.report_cache.put(job.cache_key, "pdf", job.pdf)
+    except OSError as e:
+        logger.warning(f"Could not cache {job.kind} report {job.id}: {e}")
+
+
+def _job_response(http_request: Request, job: report_renderer.RenderJob) -> JSONResponse:
+    status_url = str(http_request.url_for("get_report_job", job_id=job.id))
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={**job.to_dict(), "statusUrl": status_url, "downloadUrl": f"{status_url}/download"},
+        headers={"Location": status_url, "Retry-After": "2"},
+    )
+
+
+def _finished_response(job: report_renderer.RenderJob) -> Response:
+    if job.status == "failed":
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Report rendering failed: {job.error}"
+        )
+    return _pdf_download(job)
+
+
+async def _render(
+    http_request: Request, mode: str, kind: str, filename: str, cache_key: Optional[str] = None, **kwargs
+) -> Response:
+    """Queue a render and answer with the PDF or a job handle, depending on mode and how long it takes."""
+    try:
+        job = report_renderer.submit(kind, filename, kwargs, cache_key=cache_key)
+    except report_renderer.RendererBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Report renderer is busy — try again shortly",
+            headers={"Retry-After": "5"},
+        )
+    if cache_key:
+        loop = asyncio.get_running_loop()
+
+        def _finished(_) -> None:
+            # Runs after the job's own done callback, so status and pdf are set
+            if job.status == "done":
+                loop.run_in_executor(None, _store_in_cache, job)
+
+        job.future.add_done_callback(_finished)
+    if mode == "async":
+        return _job_response(http_request, job)
+
+    timeout = report_renderer.RENDER_TIMEOUT_SECONDS if mode == "inline" else report_renderer.INLINE_WAIT_SECONDS
+    if await report_renderer.wait(job, timeout):
+        return _finished_response(job)
+    return _job_response(http_request, job)
+
+
 @router.post("/comparison", summary="Generate jurisdiction comparison PDF report")
-async def generate_comparison_report(request: GenerateComparisonReportRequest):
+async def generate_comparison_report(
+    request: GenerateComparisonReportRequest,
+    http_request: Request,
+    mode: RenderMode = _MODE_QUERY,
+):
     """
     Generate a professional PDF report comparing tax incentives across multiple jurisdictions.
     
@@ -37,71 +140,27 @@ async def generate_comparison_report(request: GenerateComparisonReportRequest):
     - Recommendations
     """
     
-    # Get jurisdictions
-    jurisdictions = await prisma.jurisdiction.find_many(
-        where={"id": {"in": request.jurisdictionIds}}
-    )
+    catalog = await rule_catalog.snapshot()
+    
+    # Create filename
+    filename = f"comparison_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
     
-    if len(jurisdictions) != len(request.jurisdictionIds):
+    # Serve a repeat of this request from the report cache
+    cache_key = report_cache.cache_key("comparison", "pdf", request.model_dump(mode="json"), catalog.fingerprint)
+    cached = _cached_download(http_request, cache_key, filename)
+    if cached is not None:
+        return cached
+    
+    # Rank jurisdictions by their best rule (shared with /calculate/compare)
+    try:
+        comparison = comparison_engine.compare(catalog, request.jurisdictionIds, request.budget)
+    except comparison_engine.UnknownJurisdictions:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="One or more jurisdictions not found"
         )
     
-    # Calculate for each jurisdiction (reuse comparison logic)
-    comparisons = []
-    
-    for jurisdiction in jurisdictions:
-        # Get best rule for this jurisdiction
-        rules = await prisma.incentiverule.find_many(
-            where={
-                "jurisdictionId": jurisdiction.id,
-                "active": True
-            }
-        )
-        
-        if not rules:
-            continue
-        
-        best_credit = 0
-        best_rule = None
-        
-        for rule in rules:
-            if rule.percentage:
-                credit = request.budget * (rule.percentage / 100)
-            elif rule.fixedAmount:
-                credit = rule.fixedAmount
-            else:
-                credit = 0
-            
-            if rule.minSpend and request.budget < rule.minSpend:
-                credit = 0
-            
-            if rule.maxCredit and credit > rule.maxCredit:
-                credit = rule.maxCredit
-            
-            if credit > best_credit:
-                best_credit = credit
-                best_rule = rule
-        
-        if best_rule:
-            comparisons.append({
-                "jurisdiction": jurisdiction.name,
-                "jurisdictionId": jurisdiction.id,
-                "ruleName": best_rule.ruleName,
-                "ruleCode": best_rule.ruleCode,
-                "incentiveType": best_rule.incentiveType,
-                "percentage": best_rule.percentage,
-                "estimatedCredit": best_credit,
-                "rank": 0  # Will be set after sorting
-            })
-    
-    # Sort by credit amount
-    comparisons.sort(key=lambda x: x["estimatedCredit"], reverse=True)
-    
-    # Add ranks
-    for i, comp in enumerate(comparisons):
-        comp["rank"] = i + 1
+    comparisons = comparison.report_rows()
     
     if not comparisons:
         raise HTTPException(
@@ -111,29 +170,22 @@ async def generate_comparison_report(request: GenerateComparisonReportRequest):
     
     best_option = comparisons[0]
     
-    # Generate PDF
-    pdf_bytes = pdf_generator.generate_comparison_report(
+    # Render PDF off the event loop
+    return await _render(
+        http_request, mode, "comparison", filename, cache_key,
         production_title=request.productionTitle,
         budget=request.budget,
         comparisons=comparisons,
         best_option=best_option
     )
-    
-    # Create filename
-    filename = f"comparison_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-    
-    # Return PDF as download
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
-    )
 
 
 @router.post("/compliance", summary="Generate compliance verification PDF report")
-async def generate_compliance_report(request: GenerateComplianceReportRequest):
+async def generate_compliance_report(
+    request: GenerateComplianceReportRequest,
+    http_request: Request,
+    mode: RenderMode = _MODE_QUERY,
+):
     """
     Generate a professional PDF report verifying production compliance with incentive requirements.
     
@@ -144,10 +196,10 @@ async def generate_compliance_report(request: GenerateComplianceReportRequest):
     - Action items
     """
     
+    catalog = await rule_catalog.snapshot()
+    
     # Get rule
-    rule = await prisma.incentiverule.find_unique(
-        where={"id": request.ruleId}
-    )
+    rule = catalog.incentive_rule(request.ruleId)
     
     if not rule:
         raise HTTPException(
@@ -156,9 +208,7 @@ async def generate_compliance_report(request: GenerateComplianceReportRequest):
         )
     
     # Get jurisdiction
-    jurisdiction = await prisma.jurisdiction.find_unique(
-        where={"id": rule.jurisdictionId}
-    )
+    jurisdiction = catalog.jurisdiction(rule.jurisdictionId)
     
     # Parse requirements
     requirements_data = parse_json_field(rule.requirements)
@@ -269,8 +319,12 @@ async def generate_compliance_report(request: GenerateComplianceReportRequest):
             if rule.maxCredit and estimated_credit > rule.maxCredit:
                 estimated_credit = rule.maxCredit
     
-    # Generate PDF
-    pdf_bytes = pdf_generator.generate_compliance_report(
+    # Create filename
+    filename = f"compliance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    
+    # Render PDF off the event loop
+    return await _render(
+        http_request, mode, "compliance", filename,
         production_title=request.productionTitle,
         jurisdiction=jurisdiction.name,
         rule_name=rule.ruleName,
@@ -278,22 +332,14 @@ async def generate_compliance_report(request: GenerateComplianceReportRequest):
         overall_status=overall_status,
         estimated_credit=estimated_credit
     )
-    
-    # Create filename
-    filename = f"compliance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-    
-    # Return PDF as download
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
-    )
 
 
 @router.post("/scenario", summary="Generate scenario analysis PDF report")
-async def generate_scenario_report(request: GenerateScenarioReportRequest):
+async def generate_scenario_report(
+    request: GenerateScenarioReportRequest,
+    http_request: Request,
+    mode: RenderMode = _MODE_QUERY,
+):
     """
     Generate a professional PDF report analyzing multiple production scenarios.
     
@@ -304,10 +350,19 @@ async def generate_scenario_report(request: GenerateScenarioReportRequest):
     - Recommendations
     """
     
+    catalog = await rule_catalog.snapshot()
+    
+    # Create filename
+    filename = f"scenario_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    
+    # Serve a repeat of this request from the report cache
+    cache_key = report_cache.cache_key("scenario", "pdf", request.model_dump(mode="json"), catalog.fingerprint)
+    cached = _cached_download(http_request, cache_key, filename)
+    if cached is not None:
+        return cached
+    
     # Get jurisdiction
-    jurisdiction = await prisma.jurisdiction.find_unique(
-        where={"id": request.jurisdictionId}
-    )
+    jurisdiction = catalog.jurisdiction(request.jurisdictionId)
     
     if not jurisdiction:
         raise HTTPException(
@@ -316,12 +371,7 @@ async def generate_scenario_report(request: GenerateScenarioReportRequest):
         )
     
     # Get available rules
-    rules = await prisma.incentiverule.find_many(
-        where={
-            "jurisdictionId": request.jurisdictionId,
-            "active": True
-        }
-    )
+    rules = catalog.incentive_rules(request.jurisdictionId, active_only=True)
     
     if not rules:
         raise HTTPException(
@@ -381,23 +431,50 @@ async def generate_scenario_report(request: GenerateScenarioReportRequest):
     
     best_scenario = scenario_results[0]
     
-    # Generate PDF
-    pdf_bytes = pdf_generator.generate_scenario_report(
+    # Render PDF off the event loop
+    return await _render(
+        http_request, mode, "scenario", filename, cache_key,
         production_title=request.productionTitle,
         jurisdiction=jurisdiction.name,
         base_budget=request.baseProductionBudget,
         scenarios=scenario_results,
         best_scenario=best_scenario
     )
-    
-    # Create filename
-    filename = f"scenario_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-    
-    # Return PDF as download
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
-    )
\ No newline at end of file
+
+
+@router.get("/jobs/{job_id}", summary="Report render job status")
+async def get_report_job(job_id: str):
+    """Status and timing of a queued report render."""
+    job = report_renderer.get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report job not found or expired"
+        )
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}/download", summary="Download a rendered report")
+async def download_report_job(
+    job_id: str,
+    http_request: Request,
+    wait: float = Query(0, ge=0, le=60, description="Seconds to wait for the render to finish"),
+):
+    """
+    The PDF once the job is done; 202 with the job status while it is still rendering.
+    Pass wait=N to hold the request open until the PDF is ready (up to N seconds).
+    """
+    job = report_renderer.get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report job not found or expired"
+        )
+    if await report_renderer.wait(job, wait):
+        return _finished_response(job)
+    return _job_response(http_request, job)
+
+
+@router.get("/renderer/stats", summary="Report renderer load and timing")
+async def get_renderer_stats():
+    return {**report_renderer.stats(), "cache": report_cache.report_cache.stats()}
\ No newline at end of file
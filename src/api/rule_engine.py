@@ -9,13 +9,29 @@ Contract stability:
     * Bad request payload -> 422 (FastAPI)
     * Engine runtime error -> 500 (safe message)
 - Optional debug: ?debug=true adds trace/meta/warnings
+
+Batch (/evaluate-batch):
+- Body is either JSON ({"items": [EvaluateRequest, ...]} or a bare list) or
+  NDJSON (one EvaluateRequest per line; raw body or multipart "file" upload)
+- Response streams NDJSON, one line per item in completion order:
+  {"index": n, "status": 200, "result": {...}} or {"index": n, "status": 404, "error": "..."}
+- Item errors never fail the batch; status uses the same mapping as /evaluate
+  (plus 413 for an NDJSON line longer than MAX_LINE_BYTES)
 """
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
-from fastapi import APIRouter, HTTPException, Query
+from itertools import islice
+from tempfile import SpooledTemporaryFile
+from typing import Any, AsyncIterator, BinaryIO, Iterator, Tuple
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import ValidationError
 
+from src.rule_engine.batch import MAX_BATCH_ITEMS, MAX_LINE_BYTES, BatchItemError, evaluate_batch_stream
 from src.rule_engine.engine import evaluate
 from src.rule_engine.models import EvaluateRequest, EvaluateResponse
 
@@ -65,3 +81,121 @@ async def evaluate_rule_engine(
     except Exception as e:
         logger.exception("Unhandled rule engine error")
         raise HTTPException(status_code=500, detail="Internal Server Error") from e
+
+
+_NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/jsonlines"}
+_SPOOL_MAX_MEMORY = 8 * 1024 * 1024   # NDJSON bodies above this spill to disk
+_READ_SIZE = 64 * 1024
+_LINES_PER_READ = 256                  # NDJSON lines read per worker-thread hop
+
+
+async def _spool_body(request: Request) -> SpooledTemporaryFile:
+    """
+    Read the whole request body into a spooled temp file before responding.
+
+    StreamingResponse (Starlette 0.27) listens for client disconnects on the
+    same receive channel, which would swallow body chunks if we read them
+    lazily from inside the response iterator. Writes go through a worker
+    thread in _READ_SIZE blocks, since past _SPOOL_MAX_MEMORY they hit disk.
+    """
+    spool = SpooledTemporaryFile(max_size=_SPOOL_MAX_MEMORY)
+    buffered = bytearray()
+    async for chunk in request.stream():
+        buffered += chunk
+        if len(buffered) >= _READ_SIZE:
+            await asyncio.to_thread(spool.write, bytes(buffered))
+            buffered.clear()
+
+    def finish() -> None:
+        spool.write(bytes(buffered))
+        spool.seek(0)
+
+    await asyncio.to_thread(finish)
+    return spool
+
+
+def _read_ndjson(f: BinaryIO) -> Iterator[Tuple[int, Any]]:
+    index = 0
+    while True:
+        line = f.readline(MAX_LINE_BYTES + 1)
+        if not line:
+            break
+        if len(line) > MAX_LINE_BYTES and not line.endswith(b"\n"):
+            while True:
+                rest = f.readline(_READ_SIZE)
+                if not rest or rest.endswith(b"\n"):
+                    break
+            yield index, BatchItemError(413, f"Line exceeds {MAX_LINE_BYTES} bytes")
+            index += 1
+            continue
+        if line.strip():
+            yield index, line
+            index += 1
+
+
+async def _ndjson_lines(f: BinaryIO) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yield (index, raw line) items from a file of NDJSON; blank lines are skipped.
+
+    Lines longer than MAX_LINE_BYTES are skipped over in bounded reads and
+    reported as a 413 item instead of being buffered. The file (possibly
+    spilled to disk) is read on a worker thread, _LINES_PER_READ lines at a time.
+    """
+    lines = _read_ndjson(f)
+    try:
+        while batch := await asyncio.to_thread(lambda: list(islice(lines, _LINES_PER_READ))):
+            for item in batch:
+                yield item
+    finally:
+        f.close()
+
+
+async def _json_items(items: list) -> AsyncIterator[Tuple[int, Any]]:
+    for index, item in enumerate(items):
+        yield index, item
+
+
+@router.post("/evaluate-batch")
+async def evaluate_rule_engine_batch(
+    request: Request,
+    debug: bool = Query(False, description="Include debug trace/meta in each result"),
+):
+    """
+    Evaluate many jurisdiction/expense payloads in one call.
+
+    Accepts a JSON body (`{"items": [...]}` or a list of EvaluateRequest) or an
+    NDJSON body (`Content-Type: application/x-ndjson`, or a multipart upload
+    in the `file` field). NDJSON input is spooled (to disk past 8 MB) before
+    evaluation starts; results stream back as NDJSON while they are computed.
+    """
+    content_type = (request.headers.get("content-type") or "").split(";")[0].strip().lower()
+
+    if content_type in _NDJSON_TYPES:
+        items = _ndjson_lines(await _spool_body(request))
+    elif content_type == "multipart/form-data":
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Multipart upload must include an NDJSON 'file' field")
+        items = _ndjson_lines(upload.file)
+    else:
+        try:
+            body = json.loads(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}") from e
+        if isinstance(body, dict):
+            body = body.get("items")
+        if not isinstance(body, list):
+            raise HTTPException(status_code=422, detail="Body must be a list of items or {\"items\": [...]}")
+        if len(body) > MAX_BATCH_ITEMS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {MAX_BATCH_ITEMS} items per JSON batch; use NDJSON for larger runs",
+            )
+        items = _json_items(body)
+
+    return StreamingResponse(
+        evaluate_batch_stream(items, debug=debug),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -6,22 +6,65 @@ POST /stacking-engine/calculate
 
 POST /stacking-engine/compare
   → Compare two or more jurisdiction stacks side by side.
+
+GET /stacking-engine/scenarios/{scenario_id}
+  → Stack for a saved ProductionScenario, served from scenario_optimization_results while valid.
+
+GET /stacking-engine/productions/{production_id}/scenarios
+  → Stacks for every scenario of a production, recomputing only the stale ones.
+
+POST /stacking-engine/optimize
+  → Split a total budget across candidate jurisdictions to maximize the total incentive.
+
+POST /stacking-engine/scenarios/{scenario_id}/optimize
+  → Same, with budget, category spend and shooting days taken from a ProductionScenario.
+
+Each request takes one rule catalog snapshot and prefetches a _StackGraph
+(the jurisdiction's full ancestry chain from the catalog's closure, the
+inheritance policies on every edge, and every level's state and local
+rules) per distinct jurisdiction; stacks are then computed from those graphs
+without further awaits, so a six-way compare costs one snapshot read and
+deep chains (city → county → state → country) stay O(depth).
+
+ProductionScenario stacks are materialized into ScenarioOptimizationResult.
+Each row carries a fingerprint of the scenario inputs and of every
+jurisdiction, rule and policy row in the stack's graph (ids + rule content,
+without timestamps or feed-monitoring columns), so a rule change anywhere in
+the ancestry chain — including one picked up by the catalog's staleness probe
+— makes the row stale on its next read without any write-side hook, while a
+monitor pass does not. expiresAt bounds how long a row is trusted regardless.
+
+The optimizer reduces each candidate's resolved stack to piecewise-linear
+terms (rate × eligible category share, minimum spend, cap) and hands them to
+src/services/budget_optimizer.py. Rules whose minShootDays requirement the
+planned days don't meet are left out before solving.
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
-from datetime import datetime, timezone, date
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone, date
 from decimal import Decimal
-from typing import Optional
+from typing import Any, Optional, Union
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from prisma import Json
+from prisma.errors import PrismaError
 from pydantic import BaseModel, Field
 
 from src.utils.database import prisma
+from src.services.budget_optimizer import AllocationCandidate, IncentiveTerm, optimize_allocation
+from src.services.rule_catalog import CatalogSnapshot, row_content, rule_catalog
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/stacking-engine", tags=["Stacking Engine"])
 
+RESULT_TTL = timedelta(days=7)
+MAX_OPTIMIZE_CANDIDATES = 12
+
 
 # ── Request / response models ──────────────────────────────────────────────────
 
@@ -64,6 +107,59 @@ class CompareRequest(BaseModel):
     scenarios: list[ScenarioInput] = Field(..., min_length=2, max_length=6)
 
 
+class ScenarioStack(BaseModel):
+    scenario_id:    str
+    scenario_name:  str
+    cached:         bool
+    computed_at:    Optional[str] = None
+    expires_at:     Optional[str] = None
+    result:         Optional[StackResult] = None
+    error:          Optional[str] = None
+
+
+class OptimizeCandidate(BaseModel):
+    jurisdiction_code:  str
+    min_spend:          Optional[float] = Field(None, ge=0, description="Spend that must go to this location")
+    max_spend:          Optional[float] = Field(None, gt=0, description="Most this location can absorb")
+    shooting_days:      Optional[int]   = Field(None, ge=0, description="Planned shooting days here")
+
+
+class OptimizeRequest(BaseModel):
+    total_budget:       float = Field(..., gt=0, description="Qualified spend to allocate, in USD")
+    candidates:         list[OptimizeCandidate] = Field(..., min_length=1, max_length=MAX_OPTIMIZE_CANDIDATES)
+    spend_by_category:  Optional[dict[str, float]] = Field(
+        None, description="Budget mix by expense category, e.g. {'labor': 5000000, 'rentals': 2000000}"
+    )
+    production_start:   Optional[str] = None   # ISO date YYYY-MM-DD
+
+
+class AllocationLayer(BaseModel):
+    code:            str
+    name:            str
+    incentive_value: float
+    eligible_share:  float
+
+
+class CandidateAllocationResult(BaseModel):
+    jurisdiction_code:  str
+    jurisdiction_name:  str
+    spend:              float
+    incentive:          float
+    effective_rate:     Optional[float]
+    layers:             list[AllocationLayer]
+    warnings:           list[str]
+
+
+class OptimizeResult(BaseModel):
+    total_budget:           float
+    total_incentive:        float
+    effective_rate:         float
+    unallocated:            float
+    allocations:            list[CandidateAllocationResult]
+    combinations_evaluated: int
+    warnings:               list[str]
+
+
 # ── Core stacking logic ───────────────────────────────────────────────────────
 
 def _parse_date(s: Optional[str]) -> Optional[date]:
@@ -83,102 +179,192 @@ def _is_active_on(effective_date: Optional[datetime], expiration_date: Optional[
     return True
 
 
-async def _compute_stack(scenario: ScenarioInput) -> StackResult:
-    today = _parse_date(scenario.production_start) or date.today()
-    qs = Decimal(str(scenario.qualified_spend))
-    warnings: list[str] = []
-    layers: list[StackLayer] = []
+@dataclass(frozen=True)
+class _StackGraph:
+    """Everything _compute_stack reads for one jurisdiction, from a single catalog snapshot."""
+    chain: tuple            # the jurisdiction, then parent, grandparent, … (catalog ancestry closure)
+    edge_policies: tuple    # edge_policies[i]: policies between chain[i] and chain[i + 1], by priority
+    rules: tuple            # rules[i]: incentive rules of chain[i]
+    local_rules: tuple      # local_rules[i]: local rules of chain[i]
+
+    @property
+    def jurisdiction(self) -> Any:
+        return self.chain[0]
 
-    # ── 1. Look up jurisdiction ───────────────────────────────────────────────
-    jur = await prisma.jurisdiction.find_unique(
-        where={"code": scenario.jurisdiction_code},
-        include={
-            "incentiveRules": True,
-            "localRules": True,
-        },
-    )
 
+def _load_graph(catalog: CatalogSnapshot, jurisdiction_code: str) -> _StackGraph:
+    jur = catalog.jurisdiction_by_code(jurisdiction_code)
     if not jur:
-        # Try as a sub-jurisdiction (county/city) — look up parent
-        jur = await prisma.jurisdiction.find_first(
-            where={"code": scenario.jurisdiction_code},
-        )
-        if not jur:
-            raise HTTPException(status_code=404, detail=f"Jurisdiction '{scenario.jurisdiction_code}' not found")
-
-    # ── 2. If this is a sub-jurisdiction, also load parent state rules ────────
-    parent_rules = []
-    if jur.parentId:
-        parent = await prisma.jurisdiction.find_unique(
-            where={"id": jur.parentId},
-            include={"incentiveRules": True},
-        )
-        if parent:
-            parent_rules = parent.incentiveRules or []
-            # Check inheritance policy
-            policy = await prisma.inheritancepolicy.find_first(
-                where={"childJurisdictionId": jur.id, "parentJurisdictionId": jur.parentId},
-            )
-            if policy and policy.policyType == "additive":
-                # Stack parent state rules on top
-                for rule in parent_rules:
-                    if not rule.active:
-                        continue
-                    if not _is_active_on(rule.effectiveDate, rule.expirationDate, today):
-                        warnings.append(f"State rule '{rule.ruleName}' is outside its effective date range — skipped")
-                        continue
-                    incentive = _calc_incentive(rule.percentage, rule.fixedAmount, rule.maxCredit, qs)
-                    if incentive > 0:
-                        layers.append(StackLayer(
-                            source="state_incentive_rule",
-                            name=rule.ruleName,
-                            code=rule.ruleCode,
-                            category=rule.incentiveType,
-                            rule_type=rule.creditType or "refundable",
-                            rate=rule.percentage,
-                            fixed_amount=rule.fixedAmount,
-                            incentive_value=float(incentive),
-                            notes=f"Inherited from {parent.name} (additive policy)",
-                        ))
-
-    # ── 3. State-level incentive rules ────────────────────────────────────────
-    state_rules = jur.incentiveRules or []
-    for rule in state_rules:
-        if not rule.active:
-            continue
-        if not _is_active_on(rule.effectiveDate, rule.expirationDate, today):
-            warnings.append(f"Rule '{rule.ruleName}' is outside its effective date range — skipped")
-            continue
+        raise HTTPException(status_code=404, detail=f"Jurisdiction '{jurisdiction_code}' not found")
+    chain = (jur, *catalog.ancestors(jur.id))
+    return _StackGraph(
+        chain=chain,
+        edge_policies=tuple(
+            tuple(catalog.policies_between(child.id, parent.id))
+            for child, parent in zip(chain, chain[1:])
+        ),
+        rules=tuple(tuple(catalog.incentive_rules(j.id)) for j in chain),
+        local_rules=tuple(tuple(catalog.local_rules(j.id)) for j in chain),
+    )
 
-        # Min spend check
-        if rule.minSpend and qs < Decimal(str(rule.minSpend)):
-            warnings.append(
-                f"Rule '{rule.ruleName}' requires min spend ${rule.minSpend:,.0f} "
-                f"— qualified spend ${float(qs):,.0f} is below threshold"
-            )
-            continue
 
-        incentive = _calc_incentive(rule.percentage, rule.fixedAmount, rule.maxCredit, qs)
-        if incentive > 0:
-            layers.append(StackLayer(
-                source="state_incentive_rule",
-                name=rule.ruleName,
-                code=rule.ruleCode,
-                category=rule.incentiveType,
-                rule_type=rule.creditType or "refundable",
-                rate=rule.percentage,
-                fixed_amount=rule.fixedAmount,
-                incentive_value=float(incentive),
-            ))
+def _load_graphs(catalog: CatalogSnapshot, codes: list[str]) -> dict[str, Union[_StackGraph, HTTPException]]:
+    """One graph per distinct code; unknown codes map to their 404."""
+    graphs: dict[str, Union[_StackGraph, HTTPException]] = {}
+    for code in dict.fromkeys(codes):
+        try:
+            graphs[code] = _load_graph(catalog, code)
+        except HTTPException as e:
+            graphs[code] = e
+    return graphs
 
-    # ── 4. Local rules (county/city approved rules) ───────────────────────────
-    local_rules = jur.localRules or []
-    active_local = [r for r in local_rules if r.active]
 
-    if not active_local and not jur.parentId:
-        warnings.append("No local rules found for this jurisdiction — only state rules applied")
+# ── Inheritance resolution ────────────────────────────────────────────────────
+#
+# Per rule category, walking the ancestry nearest-first, each child → parent
+# edge's policy decides whether the parent's rules reach the jurisdiction:
+#
+#   additive   parent rules stack on top of the rules below
+#   override   rules below win; the parent's apply only if nothing below
+#              has a rule in that category
+#   strict     the parent's rules replace every rule below in that category
+#
+# The policy for a category is the first (lowest priority) one with that
+# ruleCategory, else the first category-less one. An edge with neither stops
+# inheritance of that category from every ancestor above it.
+
+_StackEntry = tuple     # (level, kind, rule, policyType or None)
+
+
+def _rule_category(kind: str, rule: Any) -> str:
+    return ((rule.incentiveType if kind == "incentive" else rule.category) or "").lower()
+
+
+def _rule_name(kind: str, rule: Any) -> str:
+    return rule.ruleName if kind == "incentive" else rule.name
+
+
+def _edge_policy(policies: tuple, category: str) -> Optional[Any]:
+    generic = None
+    for p in policies:
+        rule_category = (p.ruleCategory or "").lower()
+        if rule_category == category:
+            return p
+        if not rule_category and generic is None:
+            generic = p
+    return generic
+
+
+def _resolve_inheritance(graph: _StackGraph) -> tuple[list[_StackEntry], list[str]]:
+    """
+    Return the rules that apply to the jurisdiction, outermost ancestor
+    first, and a warning for every active rule dropped by override/strict.
+    """
+    kept: dict[str, list[_StackEntry]] = {}
+    warnings: list[str] = []
+    order: dict[int, int] = {}      # id(rule) -> position in the catalog walk
+
+    for level, jur in enumerate(graph.chain):
+        by_category: dict[str, list[_StackEntry]] = {}
+        for kind, rules in (("incentive", graph.rules[level]), ("local", graph.local_rules[level])):
+            for rule in rules:
+                if rule.active:
+                    order[id(rule)] = len(order)
+                    by_category.setdefault(_rule_category(kind, rule), []).append((level, kind, rule, None))
+
+        for category, entries in by_category.items():
+            below = kept.setdefault(category, [])
+            if level == 0:
+                below.extend(entries)
+                continue
+
+            policies = [_edge_policy(graph.edge_policies[i], category) for i in range(level)]
+            if any(p is None for p in policies):
+                continue
+            modes = [(p.policyType or "").lower() for p in policies]
+            if any(m not in ("additive", "override", "strict") for m in modes):
+                continue
+
+            # Override on any edge: rules at or below that edge win over this ancestor
+            winner = next((
+                e for j, m in enumerate(modes) if m == "override"
+                for e in below if e[0] <= j
+            ), None)
+            if winner is not None:
+                for _, kind, rule, _ in entries:
+                    warnings.append(
+                        f"{jur.name} rule '{_rule_name(kind, rule)}' overridden by "
+                        f"{graph.chain[winner[0]].name} ({category or 'uncategorized'})"
+                    )
+                continue
+
+            # Strict on any edge: this ancestor's rules replace everything at or below it
+            strict_edge = max((j for j, m in enumerate(modes) if m == "strict"), default=-1)
+            if strict_edge >= 0:
+                for _, kind, rule, _ in [e for e in below if e[0] <= strict_edge]:
+                    warnings.append(
+                        f"Rule '{_rule_name(kind, rule)}' blocked by strict {jur.name} policy "
+                        f"({category or 'uncategorized'})"
+                    )
+                below[:] = [e for e in below if e[0] > strict_edge]
+
+            below.extend((lvl, kind, rule, modes[-1]) for lvl, kind, rule, _ in entries)
 
-    for rule in active_local:
+    selected = [e for entries in kept.values() for e in entries]
+    selected.sort(key=lambda e: (-e[0], order[id(e[2])]))
+    return selected, warnings
+
+
+# ── Stack computation ─────────────────────────────────────────────────────────
+
+def _compute_stack(scenario: ScenarioInput, graph: _StackGraph) -> StackResult:
+    today = _parse_date(scenario.production_start) or date.today()
+    qs = Decimal(str(scenario.qualified_spend))
+    warnings: list[str] = []
+    layers: list[StackLayer] = []
+
+    # ── 1. Jurisdiction (resolved by _load_graph) ─────────────────────────────
+    jur = graph.jurisdiction
+
+    # ── 2. Resolve the ancestry chain against inheritance policies ────────────
+    selected, inheritance_warnings = _resolve_inheritance(graph)
+    warnings.extend(inheritance_warnings)
+
+    for level, kind, rule, policy_type in selected:
+        inherited_from = graph.chain[level] if level else None
+        notes = f"Inherited from {inherited_from.name} ({policy_type} policy)" if inherited_from else None
+
+        # ── 3. Incentive rules (state and inherited) ──────────────────────────
+        if kind == "incentive":
+            if not _is_active_on(rule.effectiveDate, rule.expirationDate, today):
+                prefix = f"Inherited rule '{rule.ruleName}'" if inherited_from else f"Rule '{rule.ruleName}'"
+                warnings.append(f"{prefix} is outside its effective date range — skipped")
+                continue
+
+            # Min spend check
+            if rule.minSpend and qs < Decimal(str(rule.minSpend)):
+                warnings.append(
+                    f"Rule '{rule.ruleName}' requires min spend ${rule.minSpend:,.0f} "
+                    f"— qualified spend ${float(qs):,.0f} is below threshold"
+                )
+                continue
+
+            incentive = _calc_incentive(rule.percentage, rule.fixedAmount, rule.maxCredit, qs)
+            if incentive > 0:
+                layers.append(StackLayer(
+                    source="state_incentive_rule",
+                    name=rule.ruleName,
+                    code=rule.ruleCode,
+                    category=rule.incentiveType,
+                    rule_type=rule.creditType or "refundable",
+                    rate=rule.percentage,
+                    fixed_amount=rule.fixedAmount,
+                    incentive_value=float(incentive),
+                    notes=notes,
+                ))
+            continue
+
+        # ── 4. Local rules (county/city approved rules) ───────────────────────
         if not _is_active_on(rule.effectiveDate, rule.expirationDate, today):
             warnings.append(f"Local rule '{rule.name}' is expired or not yet effective — skipped")
             continue
@@ -195,6 +381,8 @@ async def _compute_stack(scenario: ScenarioInput) -> StackResult:
 
         incentive = _calc_incentive(rule.percentage, rule.amount, None, qs)
         if incentive > 0:
+            if notes is None and rule.extractedBy != "manual":
+                notes = f"Extracted by {rule.extractedBy}"
             layers.append(StackLayer(
                 source="local_rule",
                 name=rule.name,
@@ -204,9 +392,12 @@ async def _compute_stack(scenario: ScenarioInput) -> StackResult:
                 rate=rule.percentage,
                 fixed_amount=rule.amount,
                 incentive_value=float(incentive),
-                notes=f"Extracted by {rule.extractedBy}" if rule.extractedBy != "manual" else None,
+                notes=notes,
             ))
 
+    if not any(r.active for r in graph.local_rules[0]) and not jur.parentId:
+        warnings.append("No local rules found for this jurisdiction — only state rules applied")
+
     # ── 5. Aggregate ──────────────────────────────────────────────────────────
     total = sum(Decimal(str(l.incentive_value)) for l in layers)
     effective_rate = float(total / qs) if qs > 0 else 0.0
@@ -244,26 +435,335 @@ def _calc_incentive(
     return value
 
 
+# ── Persisted scenario results ────────────────────────────────────────────────
+
+_SCENARIO_INCLUDE = {"production": True, "optimizationResult": True}
+
+
+def _scenario_input(scenario: Any, catalog: CatalogSnapshot) -> ScenarioInput:
+    """Map a ProductionScenario (with its production) onto the stacking inputs."""
+    production = scenario.production
+    jur = catalog.jurisdiction(production.jurisdictionId)
+    if not jur:
+        raise HTTPException(status_code=404, detail=f"Jurisdiction '{production.jurisdictionId}' not found")
+    spend = scenario.qualifiedSpend or scenario.totalBudget
+    if not spend or spend <= 0:
+        raise HTTPException(status_code=422, detail="Scenario has no qualified spend or total budget")
+    return ScenarioInput(
+        production_id=production.id,
+        jurisdiction_code=jur.code,
+        qualified_spend=spend,
+        local_hire_percent=scenario.localHirePercent,
+        shooting_days=scenario.shootingDays,
+        production_start=production.startDate.date().isoformat() if production.startDate else None,
+    )
+
+
+def _result_fingerprint(scenario: ScenarioInput, graph: _StackGraph) -> str:
+    """
+    Hash of the scenario inputs and of the rule content of every row the stack is computed from.
+
+    Timestamps and the feed-monitoring columns are left out (see rule_catalog.row_content):
+    the monitor rewrites those on every pass without changing any rule.
+    """
+    def rows(items):
+        return [(r.id, hashlib.sha256(row_content(r).encode()).hexdigest()) for r in items]
+
+    payload = {
+        "scenario": scenario.model_dump(),
+        "chain": rows(graph.chain),
+        "policies": [rows(level) for level in graph.edge_policies],
+        "rules": [rows(level) for level in graph.rules],
+        "local_rules": [rows(level) for level in graph.local_rules],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _is_fresh(row: Optional[Any], fingerprint: str, now: datetime) -> bool:
+    if row is None or row.stackFingerprint != fingerprint:
+        return False
+    return row.expiresAt is None or row.expiresAt > now
+
+
+def _result_from_row(row: Any, scenario: ScenarioInput, jur: Any) -> StackResult:
+    total = row.totalIncentiveValue or 0.0
+    return StackResult(
+        jurisdiction_code=jur.code,
+        jurisdiction_name=jur.name,
+        qualified_spend=scenario.qualified_spend,
+        layers=[StackLayer(**layer) for layer in (row.recommendedStack or [])],
+        total_incentive=total,
+        effective_rate=round(total / scenario.qualified_spend, 4),
+        warnings=list(row.warnings or []),
+    )
+
+
+async def _save_result(scenario_id: str, result: StackResult, fingerprint: str, now: datetime) -> None:
+    # Json columns must be wrapped, or the client sends lists/dicts as input objects
+    data = {
+        "recommendedStack": Json([layer.model_dump() for layer in result.layers]),
+        "totalIncentiveValue": result.total_incentive,
+        "effectiveRate": result.effective_rate,
+        "warnings": Json(list(result.warnings)),
+        "stackFingerprint": fingerprint,
+        "createdAt": now,
+        "expiresAt": now + RESULT_TTL,
+    }
+    try:
+        await prisma.scenariooptimizationresult.upsert(
+            where={"scenarioId": scenario_id},
+            data={"create": {**data, "scenarioId": scenario_id}, "update": data},
+        )
+    except PrismaError as e:
+        # The computed stack is still returned; the next read simply recomputes
+        logger.warning(f"Failed to persist stack for scenario {scenario_id}: {e}")
+
+
+async def _scenario_stacks(scenarios: list[Any], catalog: CatalogSnapshot, refresh: bool = False) -> list[ScenarioStack]:
+    """Serve each scenario from its stored result when fresh, else compute and persist it."""
+    now = datetime.now(timezone.utc)
+    graphs: dict[str, Union[_StackGraph, HTTPException]] = {}
+    stacks: list[ScenarioStack] = []
+    saves = []
+
+    for scenario in scenarios:
+        try:
+            scenario_input = _scenario_input(scenario, catalog)
+        except HTTPException as e:
+            stacks.append(ScenarioStack(scenario_id=scenario.id, scenario_name=scenario.name, cached=False, error=e.detail))
+            continue
+
+        code = scenario_input.jurisdiction_code
+        if code not in graphs:
+            graphs.update(_load_graphs(catalog, [code]))
+        graph = graphs[code]
+        if isinstance(graph, HTTPException):
+            stacks.append(ScenarioStack(scenario_id=scenario.id, scenario_name=scenario.name, cached=False, error=graph.detail))
+            continue
+
+        fingerprint = _result_fingerprint(scenario_input, graph)
+        row = scenario.optimizationResult
+        if not refresh and _is_fresh(row, fingerprint, now):
+            stacks.append(ScenarioStack(
+                scenario_id=scenario.id,
+                scenario_name=scenario.name,
+                cached=True,
+                computed_at=row.createdAt.isoformat(),
+                expires_at=row.expiresAt.isoformat() if row.expiresAt else None,
+                result=_result_from_row(row, scenario_input, graph.jurisdiction),
+            ))
+            continue
+
+        result = _compute_stack(scenario_input, graph)
+        saves.append(_save_result(scenario.id, result, fingerprint, now))
+        stacks.append(ScenarioStack(
+            scenario_id=scenario.id,
+            scenario_name=scenario.name,
+            cached=False,
+            computed_at=now.isoformat(),
+            expires_at=(now + RESULT_TTL).isoformat(),
+            result=result,
+        ))
+
+    if saves:
+        await asyncio.gather(*saves)
+    return stacks
+
+
+# ── Budget allocation ─────────────────────────────────────────────────────────
+
+def _eligible_share(rule: Any, spend_by_category: Optional[dict[str, float]]) -> float:
+    """Share of the budget mix in categories the rule counts; 1.0 when no mix is given."""
+    mix = {c.lower(): v for c, v in (spend_by_category or {}).items() if v and v > 0}
+    total = sum(mix.values())
+    if not total:
+        return 1.0
+    eligible = {e.lower() for e in rule.eligibleExpenses or []}
+    excluded = {e.lower() for e in rule.excludedExpenses or []}
+    counts_all = not eligible or bool(eligible & {"all", "all_production"})
+    share = sum(v for c, v in mix.items() if c not in excluded and (counts_all or c in eligible))
+    return share / total
+
+
+def _min_shoot_days(rule: Any) -> Optional[int]:
+    if not rule.requirements:
+        return None
+    try:
+        data = json.loads(rule.requirements)
+    except ValueError:
+        return None     # free-text requirements (local rules)
+    return data.get("minShootDays") if isinstance(data, dict) else None
+
+
+def _allocation_candidate(
+    spec: OptimizeCandidate,
+    graph: _StackGraph,
+    spend_by_category: Optional[dict[str, float]],
+    check_date: date,
+) -> tuple[AllocationCandidate, list[str]]:
+    """Reduce a candidate's resolved stack to solver terms."""
+    jur = graph.jurisdiction
+    selected, warnings = _resolve_inheritance(graph)
+    terms: list[IncentiveTerm] = []
+
+    for _, kind, rule, _ in selected:
+        name = _rule_name(kind, rule)
+        if not _is_active_on(rule.effectiveDate, rule.expirationDate, check_date):
+            warnings.append(f"Rule '{name}' is outside its effective date range — skipped")
+            continue
+        min_days = _min_shoot_days(rule)
+        if min_days and (spec.shooting_days or 0) < min_days:
+            warnings.append(
+                f"Rule '{name}' requires {min_days} shooting days in {jur.name} "
+                f"— {spec.shooting_days or 0} planned, excluded"
+            )
+            continue
+
+        if kind == "incentive":
+            terms.append(IncentiveTerm(
+                code=rule.ruleCode,
+                name=rule.ruleName,
+                rate=(rule.percentage or 0.0) / 100,
+                fixed_amount=rule.fixedAmount or 0.0,
+                min_spend=rule.minSpend or 0.0,
+                cap=rule.maxCredit or None,
+                eligible_share=_eligible_share(rule, spend_by_category),
+            ))
+        else:
+            terms.append(IncentiveTerm(
+                code=rule.code,
+                name=rule.name,
+                rate=(rule.percentage or 0.0) / 100,
+                fixed_amount=rule.amount or 0.0,
+            ))
+
+    candidate = AllocationCandidate(
+        code=jur.code,
+        name=jur.name,
+        terms=tuple(terms),
+        min_spend=spec.min_spend or 0.0,
+        max_spend=spec.max_spend,
+    )
+    return candidate, warnings
+
+
+def _optimize(request: OptimizeRequest, catalog: CatalogSnapshot) -> OptimizeResult:
+    codes = [c.jurisdiction_code for c in request.candidates]
+    duplicates = sorted({c for c in codes if codes.count(c) > 1})
+    if duplicates:
+        raise HTTPException(status_code=422, detail=f"Duplicate candidate jurisdictions: {', '.join(duplicates)}")
+
+    check_date = _parse_date(request.production_start) or date.today()
+    candidates: list[AllocationCandidate] = []
+    candidate_warnings: list[list[str]] = []
+    for spec in request.candidates:
+        graph = _load_graph(catalog, spec.jurisdiction_code)
+        candidate, warnings = _allocation_candidate(spec, graph, request.spend_by_category, check_date)
+        candidates.append(candidate)
+        candidate_warnings.append(warnings)
+
+    try:
+        plan = optimize_allocation(request.total_budget, candidates)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    allocations = []
+    for allocation, warnings in zip(plan.allocations, candidate_warnings):
+        if allocation.spend > 0 and allocation.incentive == 0:
+            warnings.append("No incentive earned at the allocated spend")
+        allocations.append(CandidateAllocationResult(
+            jurisdiction_code=allocation.code,
+            jurisdiction_name=allocation.name,
+            spend=round(allocation.spend, 2),
+            incentive=round(allocation.incentive, 2),
+            effective_rate=round(allocation.effective_rate, 4) if allocation.effective_rate is not None else None,
+            layers=[
+                AllocationLayer(
+                    code=term.code,
+                    name=term.name,
+                    incentive_value=round(value, 2),
+                    eligible_share=round(term.eligible_share, 4),
+                )
+                for term, value in allocation.term_values if value
+            ],
+            warnings=warnings,
+        ))
+
+    warnings = list(plan.warnings)
+    if plan.unallocated > 0.005:
+        warnings.append(f"${plan.unallocated:,.0f} of the budget earns no further incentive at any candidate")
+    return OptimizeResult(
+        total_budget=plan.total_budget,
+        total_incentive=round(plan.total_incentive, 2),
+        effective_rate=round(plan.total_incentive / plan.total_budget, 4),
+        unallocated=round(plan.unallocated, 2),
+        allocations=allocations,
+        combinations_evaluated=plan.combinations_evaluated,
+        warnings=warnings,
+    )
+
+
+def _scenario_optimize_request(scenario: Any, catalog: CatalogSnapshot) -> tuple[OptimizeRequest, list[str]]:
+    """Candidates from daysByJurisdiction (else the production's jurisdiction), budget from the scenario."""
+    budget = scenario.qualifiedSpend or scenario.totalBudget
+    if not budget or budget <= 0:
+        raise HTTPException(status_code=422, detail="Scenario has no qualified spend or total budget")
+
+    warnings: list[str] = []
+    candidates: list[OptimizeCandidate] = []
+    for entry in scenario.daysByJurisdiction or []:
+        jur = catalog.jurisdiction(entry.get("jurisdiction_id") or "")
+        if not jur:
+            label = entry.get("jurisdiction_id") or entry.get("sub_jurisdiction_id")
+            warnings.append(f"daysByJurisdiction entry '{label}' is not a catalog jurisdiction — skipped")
+            continue
+        if any(c.jurisdiction_code == jur.code for c in candidates):
+            continue
+        candidates.append(OptimizeCandidate(jurisdiction_code=jur.code, shooting_days=entry.get("days")))
+
+    if not candidates:
+        jur = catalog.jurisdiction(scenario.production.jurisdictionId)
+        if not jur:
+            raise HTTPException(status_code=404, detail=f"Jurisdiction '{scenario.production.jurisdictionId}' not found")
+        candidates.append(OptimizeCandidate(jurisdiction_code=jur.code, shooting_days=scenario.shootingDays))
+
+    start = scenario.production.startDate
+    request = OptimizeRequest(
+        total_budget=budget,
+        candidates=candidates[:MAX_OPTIMIZE_CANDIDATES],
+        spend_by_category=scenario.spendByCategory or None,
+        production_start=start.date().isoformat() if start else None,
+    )
+    if len(candidates) > MAX_OPTIMIZE_CANDIDATES:
+        warnings.append(f"Only the first {MAX_OPTIMIZE_CANDIDATES} jurisdictions were considered")
+    return request, warnings
+
+
 # ── Endpoints ─────────────────────────────────────────────────────────────────
 
 @router.post("/calculate", summary="Calculate full incentive stack for a scenario")
 async def calculate_stack(request: CalculateRequest):
-    result = await _compute_stack(request.scenario)
-    return result
+    catalog = await rule_catalog.snapshot()
+    scenario = request.scenario
+    return _compute_stack(scenario, _load_graph(catalog, scenario.jurisdiction_code))
 
 
 @router.post("/compare", summary="Compare incentive stacks across jurisdictions")
 async def compare_stacks(request: CompareRequest):
+    # One snapshot for every scenario: a single staleness check and a consistent view
+    catalog = await rule_catalog.snapshot()
+    graphs = _load_graphs(catalog, [s.jurisdiction_code for s in request.scenarios])
+
     results = []
     for scenario in request.scenarios:
-        try:
-            result = await _compute_stack(scenario)
-            results.append(result)
-        except HTTPException as e:
+        graph = graphs[scenario.jurisdiction_code]
+        if isinstance(graph, HTTPException):
             results.append({
                 "jurisdiction_code": scenario.jurisdiction_code,
-                "error": e.detail,
+                "error": graph.detail,
             })
+            continue
+        results.append(_compute_stack(scenario, graph))
 
     # Sort by total incentive descending
     results.sort(key=lambda r: r.total_incentive if isinstance(r, StackResult) else -1, reverse=True)
@@ -292,3 +792,58 @@ async def jurisdictions_with_local_rules():
         """
     )
     return {"jurisdictions": results}
+
+
+@router.get("/scenarios/{scenario_id}", summary="Incentive stack for a saved production scenario")
+async def scenario_stack(
+    scenario_id: str,
+    refresh: bool = Query(False, description="Recompute even if a stored result is still valid"),
+):
+    scenario = await prisma.productionscenario.find_unique(where={"id": scenario_id}, include=_SCENARIO_INCLUDE)
+    if not scenario:
+        raise HTTPException(status_code=404, detail=f"Scenario '{scenario_id}' not found")
+    catalog = await rule_catalog.snapshot()
+    (stack,) = await _scenario_stacks([scenario], catalog, refresh)
+    return stack
+
+
+@router.get("/productions/{production_id}/scenarios", summary="Incentive stacks for every scenario of a production")
+async def production_scenario_stacks(
+    production_id: str,
+    refresh: bool = Query(False, description="Recompute every scenario even if stored results are valid"),
+):
+    """One scenario query and one catalog snapshot; only stale scenarios are recomputed."""
+    scenarios = await prisma.productionscenario.find_many(
+        where={"productionId": production_id},
+        include=_SCENARIO_INCLUDE,
+        order={"createdAt": "asc"},
+    )
+    if not scenarios and not await prisma.production.find_unique(where={"id": production_id}):
+        raise HTTPException(status_code=404, detail=f"Production '{production_id}' not found")
+
+    catalog = await rule_catalog.snapshot()
+    stacks = await _scenario_stacks(scenarios, catalog, refresh)
+    return {
+        "production_id": production_id,
+        "scenarios": stacks,
+        "cached": sum(1 for s in stacks if s.cached),
+        "computed": sum(1 for s in stacks if s.result is not None and not s.cached),
+    }
+
+
+@router.post("/optimize", summary="Allocate a budget across jurisdictions to maximize total incentive")
+async def optimize_budget(request: OptimizeRequest):
+    catalog = await rule_catalog.snapshot()
+    return _optimize(request, catalog)
+
+
+@router.post("/scenarios/{scenario_id}/optimize", summary="Optimal budget allocation for a saved production scenario")
+async def optimize_scenario(scenario_id: str):
+    scenario = await prisma.productionscenario.find_unique(where={"id": scenario_id}, include={"production": True})
+    if not scenario:
+        raise HTTPException(status_code=404, detail=f"Scenario '{scenario_id}' not found")
+    catalog = await rule_catalog.snapshot()
+    request, warnings = _scenario_optimize_request(scenario, catalog)
+    result = _optimize(request, catalog)
+    result.warnings[:0] = warnings
+    return result
@@ -1,6 +1,7 @@
 """
 SceneIQ - Tax Incentive Intelligence for Film & TV
 """
+import asyncio
 from contextlib import asynccontextmanager
 import logging
 from pathlib import Path
@@ -14,6 +15,13 @@ from src.utils.database import prisma
 from src.utils.auth_utils import hash_password
 from src.utils.seed import run_migrations, seed_all
 from src.utils.scheduler import start_scheduler, stop_scheduler
+from src.services.email_queue import stop_email_queue
+from src.services.report_renderer import shutdown_report_renderer
+from src.services.rule_catalog import rule_catalog
+from src.rule_engine.registry import load_rules
+from src.rule_engine.watcher import start_rule_watcher, stop_rule_watcher
+from src.rule_engine.batch import shutdown_batch_pool
+from src.services.spatial_index import get_spatial_index
 from src.api.routes import router
 from src.api.largo import router as largo_router
 
@@ -40,8 +48,18 @@ async def lifespan(app: FastAPI):
         logger.info("✅ Database connected")
         await _seed_admin()
         await seed_all()
+        await rule_catalog.load()
     except Exception as e:
         logger.warning(f"⚠️  Database init failed: {e}")
+    try:
+        load_rules()
+        start_rule_watcher()
+    except Exception as e:
+        logger.error(f"❌ Rule registry failed to load: {e}")
+    try:
+        await asyncio.to_thread(get_spatial_index)
+    except Exception as e:
+        logger.error(f"❌ Jurisdiction boundaries failed to load: {e}")
     try:
         start_scheduler()
     except Exception as e:
@@ -49,6 +67,10 @@ async def lifespan(app: FastAPI):
     yield
     logger.info("🛑 Shutting down SceneIQ")
     stop_scheduler()
+    await stop_email_queue()
+    await stop_rule_watcher()
+    shutdown_batch_pool()
+    shutdown_report_renderer()
     try:
         if prisma.is_connected():
             await prisma.disconnect()
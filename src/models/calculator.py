@@ -6,6 +6,14 @@ from typing import Optional, Dict, Any, List
 from datetime import date
 
 
+# Upper bound on jurisdictions per /calculate/compare call — large enough to
+# rank every jurisdiction the platform supports in one request.
+MAX_COMPARE_JURISDICTIONS = 200
+
+# Upper bound on budget points per /calculate/sweep call.
+MAX_SWEEP_STEPS = 5000
+
+
 class SimpleCalculateRequest(BaseModel):
     """Request for simple tax credit calculation"""
     productionBudget: float = Field(..., description="Total production budget in USD", gt=0)
@@ -45,7 +53,7 @@ class SimpleCalculateResponse(BaseModel):
 class CompareCalculateRequest(BaseModel):
     """Request for comparing multiple jurisdictions"""
     productionBudget: float = Field(..., description="Total production budget in USD", gt=0)
-    jurisdictionIds: List[str] = Field(..., description="List of jurisdiction IDs to compare", min_items=2, max_items=10)
+    jurisdictionIds: List[str] = Field(..., description="List of jurisdiction IDs to compare", min_items=2, max_items=MAX_COMPARE_JURISDICTIONS)
     qualifyingBudget: Optional[float] = Field(None, description="Override qualifying budget")
 
 
@@ -245,6 +253,45 @@ class ScenarioCalculateResponse(BaseModel):
     expiredRules: int = Field(default=0, description="Number of expired rules")
 
 
+# Budget Sweep Models
+
+class SweepCalculateRequest(BaseModel):
+    """Request for a multi-budget credit sweep across jurisdictions"""
+    jurisdictionIds: List[str] = Field(..., description="Jurisdiction IDs to sweep", min_items=1, max_items=MAX_COMPARE_JURISDICTIONS)
+    budgetMin: float = Field(..., description="Lowest production budget in the sweep", gt=0)
+    budgetMax: float = Field(..., description="Highest production budget in the sweep", gt=0)
+    steps: int = Field(default=100, description="Number of budget points (inclusive of both ends)", ge=2, le=MAX_SWEEP_STEPS)
+    logScale: bool = Field(default=False, description="Space budget points geometrically instead of linearly")
+    qualifyingRatio: float = Field(default=1.0, description="Share of each budget that qualifies", gt=0, le=1)
+
+
+class SweepBreakpoint(BaseModel):
+    """Budget at which a jurisdiction's credit curve changes shape"""
+    kind: str = Field(..., description="min_spend_unlock, cap_binds or best_rule_change")
+    budget: float = Field(..., description="Production budget where the breakpoint occurs")
+    ruleName: Optional[str] = Field(None, description="Rule that causes the breakpoint")
+    ruleCode: Optional[str] = Field(None, description="Rule code")
+    notes: Optional[str] = Field(None, description="Explanation")
+
+
+class SweepCurve(BaseModel):
+    """Credit curve for one jurisdiction across the budget grid"""
+    jurisdiction: str
+    jurisdictionId: str
+    credits: List[float] = Field(..., description="Best estimated credit at each budget point")
+    bestRuleCodes: List[Optional[str]] = Field(..., description="Rule producing the best credit at each point")
+    maxCredit: float = Field(..., description="Highest credit anywhere on the curve")
+    breakpoints: List[SweepBreakpoint] = Field(default_factory=list)
+
+
+class SweepCalculateResponse(BaseModel):
+    """Response for a budget sweep"""
+    budgets: List[float] = Field(..., description="Budget grid shared by every curve")
+    curves: List[SweepCurve]
+    leaders: List[Optional[str]] = Field(..., description="Jurisdiction ID with the highest credit at each budget point")
+    notes: List[str] = Field(default_factory=list)
+
+
 class DateBasedRulesRequest(BaseModel):
     """Request for date-based rule selection"""
     jurisdictionId: str = Field(..., description="Jurisdiction ID")
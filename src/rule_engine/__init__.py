@@ -4,7 +4,15 @@ Rule Engine package (canonical exports)
 Keep this file in sync with registry.py / engine.py public APIs.
 """
 
-from .engine import evaluate, evaluate_rule, EvalResult
+from .engine import (
+    evaluate,
+    evaluate_rule,
+    EvalResult,
+    CompiledRule,
+    compile_rule,
+    get_compiled_rule,
+    clear_compiled_rules,
+)
 from .registry import (
     get_rules_dir,
     ensure_rules_dir,
@@ -13,12 +21,23 @@ from .registry import (
     find_rule_path,
     get_rule_path,
     list_rule_codes,
+    RuleFile,
+    RuleRegistry,
+    get_registry,
+    load_rules,
+    rules_version,
+    find_rule_file,
+    get_rule_file,
 )
 
 __all__ = [
     "evaluate",
     "evaluate_rule",
     "EvalResult",
+    "CompiledRule",
+    "compile_rule",
+    "get_compiled_rule",
+    "clear_compiled_rules",
     "get_rules_dir",
     "ensure_rules_dir",
     "normalize_code",
@@ -26,4 +45,11 @@ __all__ = [
     "find_rule_path",
     "get_rule_path",
     "list_rule_codes",
+    "RuleFile",
+    "RuleRegistry",
+    "get_registry",
+    "load_rules",
+    "rules_version",
+    "find_rule_file",
+    "get_rule_file",
 ]
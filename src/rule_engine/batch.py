@@ -0,0 +1,238 @@
+"""
+Batch rule evaluation
+
+Evaluates many EvaluateRequest payloads across a process pool and yields one
+NDJSON line per item as chunks complete:
+
+    {"index": 0, "status": 200, "result": {...}}
+    {"index": 1, "status": 404, "error": "Rule file not found ..."}
+
+Items are parsed and validated inside the workers (raw dicts or raw NDJSON
+lines are shipped as-is), so the event loop only batches and forwards.
+Chunks start small and grow to BATCH_CHUNK_SIZE so the first results come
+back immediately; at most two chunks per worker are in flight, so memory
+stays flat no matter how long the input is.
+
+If a worker dies, the broken pool is shut down, every chunk still queued on
+it is reported as status 500 in one pass, and the rest of the stream is
+submitted to a fresh pool.
+
+Each worker keeps its own rule registry. The parent's rules_version() is sent
+with every chunk and a worker rescans its rules directory when it changes, so
+hot-reloaded rules reach the pool too.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from .engine import evaluate
+from .models import EvaluateRequest
+from .registry import get_registry, rules_version
+
+logger = logging.getLogger(__name__)
+
+BATCH_CHUNK_SIZE = 256
+FIRST_CHUNK_SIZE = 16
+MAX_BATCH_ITEMS = 50_000          # JSON body limit (NDJSON input is streamed)
+MAX_LINE_BYTES = 1024 * 1024      # longest accepted NDJSON line
+_WORKERS_ENV = "RULE_ENGINE_BATCH_WORKERS"
+
+_TIGHT_FIELDS = {"jurisdiction_code", "total_eligible_spend", "total_incentive_amount", "breakdown"}
+
+BatchItem = Tuple[int, Any]
+
+
+@dataclass(frozen=True)
+class BatchItemError:
+    """Payload for an item that was rejected before evaluation (e.g. an oversized line)."""
+    status: int
+    error: str
+
+
+# ── Worker side ───────────────────────────────────────────────────────────────
+
+_worker_rules_version: Optional[int] = None
+
+
+def _json_default(value: Any) -> Any:
+    # Match FastAPI's encoder: Decimal -> float
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def evaluate_item(index: int, raw: Any, debug: bool = False) -> Dict[str, Any]:
+    """
+    Evaluate one batch item; never raises. Status codes mirror /rule-engine/evaluate.
+    """
+    if isinstance(raw, BatchItemError):
+        return {"index": index, "status": raw.status, "error": raw.error}
+    try:
+        if isinstance(raw, (bytes, str)):
+            raw = json.loads(raw)
+        req = EvaluateRequest.model_validate(raw)
+    except ValidationError as e:
+        return {"index": index, "status": 422, "error": json.loads(e.json(include_url=False))}
+    except ValueError as e:
+        return {"index": index, "status": 400, "error": f"Invalid JSON: {e}"}
+
+    try:
+        res = evaluate(req)
+    except FileNotFoundError as e:
+        return {"index": index, "status": 404, "error": str(e)}
+    except ValueError as e:
+        return {"index": index, "status": 400, "error": str(e)}
+    except Exception:
+        logger.exception("Unhandled rule engine error in batch item %s", index)
+        return {"index": index, "status": 500, "error": "Internal Server Error"}
+
+    result = res.model_dump() if debug else res.model_dump(include=_TIGHT_FIELDS)
+    return {"index": index, "status": 200, "result": result}
+
+
+def evaluate_chunk(chunk: List[BatchItem], debug: bool, parent_rules_version: int) -> List[str]:
+    """Process-pool entry point: evaluate a chunk and return encoded NDJSON lines."""
+    global _worker_rules_version
+    if _worker_rules_version is not None and _worker_rules_version != parent_rules_version:
+        get_registry().refresh()
+    _worker_rules_version = parent_rules_version
+
+    return [
+        json.dumps(evaluate_item(index, raw, debug), default=_json_default, separators=(",", ":"))
+        for index, raw in chunk
+    ]
+
+
+# ── Pool ──────────────────────────────────────────────────────────────────────
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+
+
+def _worker_count() -> int:
+    configured = (os.getenv(_WORKERS_ENV) or "").strip()
+    if configured.isdigit() and int(configured) > 0:
+        return int(configured)
+    return max(1, min(os.cpu_count() or 1, 8))
+
+
+def get_batch_pool() -> ProcessPoolExecutor:
+    """Lazily start the shared evaluation pool."""
+    global _pool, _pool_workers
+    if _pool is None:
+        _pool_workers = _worker_count()
+        # spawn: the API process runs threads (anyio, file watcher) that fork would copy mid-state
+        _pool = ProcessPoolExecutor(
+            max_workers=_pool_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info(f"Rule engine batch pool started with {_pool_workers} workers")
+    return _pool
+
+
+def shutdown_batch_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Shut down a broken pool; the next get_batch_pool() starts a new one."""
+    global _pool
+    if _pool is pool:
+        _pool = None
+        logger.error("Rule engine batch pool crashed; starting a new one")
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ── Streaming driver ──────────────────────────────────────────────────────────
+
+async def _chunks(items: AsyncIterable[BatchItem]) -> AsyncIterator[List[BatchItem]]:
+    size = FIRST_CHUNK_SIZE
+    chunk: List[BatchItem] = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+            size = min(size * 2, BATCH_CHUNK_SIZE)
+    if chunk:
+        yield chunk
+
+
+async def evaluate_batch_stream(items: AsyncIterable[BatchItem], *, debug: bool = False) -> AsyncIterator[str]:
+    """
+    Evaluate ``(index, payload)`` items on the process pool, yielding NDJSON
+    lines (newline-terminated) in completion order.
+    """
+    loop = asyncio.get_running_loop()
+    get_batch_pool()
+    max_in_flight = _pool_workers * 2
+    version = rules_version()
+    pending: Dict[asyncio.Future, Tuple[ProcessPoolExecutor, List[BatchItem]]] = {}
+
+    def _failed(chunk: List[BatchItem]) -> List[str]:
+        return [
+            json.dumps({"index": index, "status": 500, "error": "Internal Server Error"}) + "\n"
+            for index, _ in chunk
+        ]
+
+    def _submit(chunk: List[BatchItem]) -> None:
+        pool = get_batch_pool()
+        try:
+            fut = loop.run_in_executor(pool, evaluate_chunk, chunk, debug, version)
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            pool = get_batch_pool()
+            fut = loop.run_in_executor(pool, evaluate_chunk, chunk, debug, version)
+        pending[fut] = (pool, chunk)
+
+    def _drain(done) -> List[str]:
+        lines: List[str] = []
+        for fut in done:
+            if fut not in pending:
+                continue    # already failed along with its broken pool
+            pool, chunk = pending.pop(fut)
+            try:
+                lines.extend(line + "\n" for line in fut.result())
+            except BrokenProcessPool:
+                _discard_pool(pool)
+                lines.extend(_failed(chunk))
+                for other in [f for f, (p, _) in pending.items() if p is pool]:
+                    _, other_chunk = pending.pop(other)
+                    other.cancel()
+                    lines.extend(_failed(other_chunk))
+        return lines
+
+    try:
+        async for chunk in _chunks(items):
+            _submit(chunk)
+
+            if len(pending) >= max_in_flight:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            else:
+                done = [f for f in pending if f.done()]
+            for line in _drain(done):
+                yield line
+
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for line in _drain(done):
+                yield line
+    finally:
+        # Client went away mid-stream — don't leave queued chunks running
+        for fut in pending:
+            fut.cancel()
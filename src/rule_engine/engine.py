@@ -4,11 +4,11 @@ from dataclasses import dataclass
 from datetime import date, datetime
 from decimal import Decimal
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
 import json
 
-from .models import EvaluateRequest, EvaluateResponse
-from .registry import get_rule_path
+from .models import EvaluateRequest, EvaluateResponse, ExpenseItem
+from .registry import get_rule_file
 
 
 @dataclass
@@ -42,101 +42,226 @@ def load_rule_from_file(path: str | Path) -> Dict[str, Any]:
     return json.loads(p.read_text(encoding="utf-8"))
 
 
-def evaluate_rule(
-    *,
-    rule: Dict[str, Any],
-    jurisdiction_code: str,
-    production_start_date: Optional[str],
-    expenses: List[Dict[str, Any]],
-) -> EvalResult:
-    trace: List[Dict[str, Any]] = []
-    flags: List[str] = []
+@dataclass(frozen=True)
+class CompiledRule:
+    """
+    Rule JSON parsed once into an immutable evaluator.
 
-    if not rule.get("active", False):
-        return EvalResult(False, Decimal("0"), Decimal("0"), ["RULE_INACTIVE"], [{"step": "rule_inactive"}])
+    Category sets, effective dates, rate and caps are resolved at compile
+    time so evaluate() only walks the expenses.
+    """
+    active: bool
+    jurisdiction_code: str
+    effective_from: Optional[date]
+    effective_to: Optional[date]
+    qualified_categories: FrozenSet[str]
+    exclude_categories: FrozenSet[str]
+    in_state_required: bool
+    labor_residency_required: bool
+    min_qualified_spend: Decimal
+    rate: Decimal
+    base: str
+    max_benefit: Optional[Decimal]
+    rule_id: str
+    rule_name: str
+    rule_type: str
+
+    def evaluate(
+        self,
+        *,
+        jurisdiction_code: str,
+        production_start_date: Optional[str],
+        expenses: Iterable[Mapping[str, Any]],
+    ) -> EvalResult:
+        return self._evaluate(jurisdiction_code, production_start_date, lambda: self._qualified_total(expenses))
+
+    def evaluate_items(
+        self,
+        *,
+        jurisdiction_code: str,
+        production_start_date: Optional[str],
+        items: Iterable[ExpenseItem],
+    ) -> EvalResult:
+        """
+        Evaluate validated ExpenseItem models directly (the /rule-engine path).
+
+        API expenses are always qualified, in-state and resident, so only the
+        category filter and the amount sum run per line.
+        """
+        return self._evaluate(jurisdiction_code, production_start_date, lambda: self._item_total(items))
+
+    def _evaluate(
+        self,
+        jurisdiction_code: str,
+        production_start_date: Optional[str],
+        qualified_total_fn: Callable[[], Tuple[Decimal, int, int]],
+    ) -> EvalResult:
+        trace: List[Dict[str, Any]] = []
+        flags: List[str] = []
+
+        if not self.active:
+            return EvalResult(False, Decimal("0"), Decimal("0"), ["RULE_INACTIVE"], [{"step": "rule_inactive"}])
+
+        if jurisdiction_code.strip().upper() != self.jurisdiction_code:
+            return EvalResult(False, Decimal("0"), Decimal("0"), ["JURISDICTION_MISMATCH"], [{"step": "jurisdiction_mismatch"}])
+
+        prod_date = _parse_date(production_start_date) if production_start_date else None
+
+        if prod_date and self.effective_from and prod_date < self.effective_from:
+            return EvalResult(False, Decimal("0"), Decimal("0"), ["OUTSIDE_EFFECTIVE_DATES"], [{"step": "prod_before_effective_from"}])
+        if prod_date and self.effective_to and prod_date > self.effective_to:
+            return EvalResult(False, Decimal("0"), Decimal("0"), ["OUTSIDE_EFFECTIVE_DATES"], [{"step": "prod_after_effective_to"}])
+
+        qualified_total, counted, skipped = qualified_total_fn()
+        trace.append({"step": "compute_qualified_total", "qualified_total": str(qualified_total), "counted": counted, "skipped": skipped})
+
+        if self.min_qualified_spend and qualified_total < self.min_qualified_spend:
+            flags.append("BELOW_MIN_QUALIFIED_SPEND")
+            trace.append({"step": "min_spend_failed", "min_required": str(self.min_qualified_spend), "actual": str(qualified_total)})
+            return EvalResult(False, Decimal("0"), qualified_total, flags, trace)
+
+        base_total = qualified_total
+        if self.base != "qualified_spend_total":
+            flags.append("BASE_FALLBACK_TO_QUALIFIED_SPEND_TOTAL")
+            trace.append({"step": "base_fallback", "requested_base": self.base, "used_base": "qualified_spend_total"})
+
+        benefit = base_total * self.rate
+        trace.append({"step": "apply_rate", "rate": str(self.rate), "base_total": str(base_total), "benefit_pre_cap": str(benefit)})
+
+        if self.max_benefit is not None and benefit > self.max_benefit:
+            benefit = self.max_benefit
+            flags.append("CAPPED_MAX_BENEFIT")
+            trace.append({"step": "cap_applied", "max_benefit": str(self.max_benefit), "benefit_post_cap": str(benefit)})
+
+        return EvalResult(True, benefit, qualified_total, flags, trace)
+
+    def _qualified_total(self, expenses: Iterable[Mapping[str, Any]]) -> Tuple[Decimal, int, int]:
+        # Hot loop for large ledgers: bind everything to locals once.
+        qualified = self.qualified_categories
+        excluded = self.exclude_categories
+        in_state_required = self.in_state_required
+        labor_residency_required = self.labor_residency_required
+        dec = _dec
+
+        total = Decimal("0")
+        counted = 0
+        skipped = 0
+
+        for e in expenses:
+            category = str(e.get("category", "") or "").strip().lower()
+
+            if qualified and category not in qualified:
+                skipped += 1
+                continue
+            if excluded and category in excluded:
+                skipped += 1
+                continue
+
+            if not e.get("qualified", True):
+                skipped += 1
+                continue
+            if in_state_required and not e.get("in_state", True):
+                skipped += 1
+                continue
+            if labor_residency_required and e.get("labor", False) and not e.get("resident", True):
+                skipped += 1
+                continue
+
+            amount = e.get("amount", 0)
+            total += amount if type(amount) is Decimal else dec(amount or 0)
+            counted += 1
+
+        return total, counted, skipped
+
+    def _item_total(self, items: Iterable[ExpenseItem]) -> Tuple[Decimal, int, int]:
+        qualified = self.qualified_categories
+        excluded = self.exclude_categories
+        dec = _dec
+
+        total = Decimal("0")
+        counted = 0
+        skipped = 0
+
+        for e in items:
+            category = e.category.strip().lower()
+            if (qualified and category not in qualified) or (excluded and category in excluded):
+                skipped += 1
+                continue
+            amount = e.amount
+            total += amount if type(amount) is Decimal else dec(amount)
+            counted += 1
+
+        return total, counted, skipped
+
+
+def compile_rule(rule: Dict[str, Any]) -> CompiledRule:
+    """Parse a rule JSON dict into a CompiledRule."""
+    eligibility = rule.get("eligibility", {}) or {}
+    calc = rule.get("calculation", {}) or {}
+    caps = calc.get("caps", {}) or {}
+    max_benefit = caps.get("max_benefit", None)
+    code = str(rule.get("jurisdiction_code", "")).strip().upper()
 
-    if jurisdiction_code.strip().upper() != str(rule.get("jurisdiction_code", "")).strip().upper():
-        return EvalResult(False, Decimal("0"), Decimal("0"), ["JURISDICTION_MISMATCH"], [{"step": "jurisdiction_mismatch"}])
+    return CompiledRule(
+        active=bool(rule.get("active", False)),
+        jurisdiction_code=code,
+        effective_from=_parse_date(rule.get("effective_from")),
+        effective_to=_parse_date(rule.get("effective_to")),
+        qualified_categories=frozenset(str(x).strip().lower() for x in (eligibility.get("qualified_categories", []) or [])),
+        exclude_categories=frozenset(str(x).strip().lower() for x in (eligibility.get("exclude_categories", []) or [])),
+        in_state_required=bool(eligibility.get("in_state_required", False)),
+        labor_residency_required=bool(eligibility.get("labor_residency_required", False)),
+        min_qualified_spend=_dec(eligibility.get("min_qualified_spend", 0) or 0),
+        rate=_dec(calc.get("rate", 0) or 0),
+        base=str(calc.get("base", "qualified_spend_total")),
+        max_benefit=_dec(max_benefit) if max_benefit is not None else None,
+        rule_id=str(rule.get("id") or rule.get("rule_id") or f"{code}-MVP"),
+        rule_name=str(rule.get("name") or rule.get("rule_name") or f"{code} Incentive Rule"),
+        rule_type=str(rule.get("type") or rule.get("rule_type") or "credit"),
+    )
 
-    eff_from = _parse_date(rule.get("effective_from"))
-    eff_to = _parse_date(rule.get("effective_to"))
-    prod_date = _parse_date(production_start_date) if production_start_date else None
 
-    if prod_date and eff_from and prod_date < eff_from:
-        return EvalResult(False, Decimal("0"), Decimal("0"), ["OUTSIDE_EFFECTIVE_DATES"], [{"step": "prod_before_effective_from"}])
-    if prod_date and eff_to and prod_date > eff_to:
-        return EvalResult(False, Decimal("0"), Decimal("0"), ["OUTSIDE_EFFECTIVE_DATES"], [{"step": "prod_after_effective_to"}])
+# Compiled rules per jurisdiction code, stored with the (path, registry version)
+# they were compiled from so a reloaded rule file is recompiled on the next call.
+_compiled_cache: Dict[str, Tuple[Path, int, CompiledRule]] = {}
 
-    eligibility = rule.get("eligibility", {}) or {}
-    calc = rule.get("calculation", {}) or {}
 
-    qualified_categories = {str(x).strip().lower() for x in (eligibility.get("qualified_categories", []) or [])}
-    exclude_categories = {str(x).strip().lower() for x in (eligibility.get("exclude_categories", []) or [])}
-    in_state_required = bool(eligibility.get("in_state_required", False))
-    labor_residency_required = bool(eligibility.get("labor_residency_required", False))
-    min_qualified_spend = _dec(eligibility.get("min_qualified_spend", 0) or 0)
-
-    qualified_total = Decimal("0")
-    counted = 0
-    skipped = 0
-
-    for e in expenses:
-        amount = _dec(e.get("amount", 0) or 0)
-        category = str(e.get("category", "") or "").strip().lower()
-
-        is_qualified = bool(e.get("qualified", True))
-        in_state = bool(e.get("in_state", True))
-        is_labor = bool(e.get("labor", False))
-        is_resident = bool(e.get("resident", True))
-
-        if qualified_categories and category not in qualified_categories:
-            skipped += 1
-            continue
-        if exclude_categories and category in exclude_categories:
-            skipped += 1
-            continue
-
-        if not is_qualified:
-            skipped += 1
-            continue
-        if in_state_required and not in_state:
-            skipped += 1
-            continue
-        if labor_residency_required and is_labor and not is_resident:
-            skipped += 1
-            continue
-
-        qualified_total += amount
-        counted += 1
-
-    trace.append({"step": "compute_qualified_total", "qualified_total": str(qualified_total), "counted": counted, "skipped": skipped})
-
-    if min_qualified_spend and qualified_total < min_qualified_spend:
-        flags.append("BELOW_MIN_QUALIFIED_SPEND")
-        trace.append({"step": "min_spend_failed", "min_required": str(min_qualified_spend), "actual": str(qualified_total)})
-        return EvalResult(False, Decimal("0"), qualified_total, flags, trace)
-
-    rate = _dec(calc.get("rate", 0) or 0)
-    base = str(calc.get("base", "qualified_spend_total"))
-
-    base_total = qualified_total
-    if base != "qualified_spend_total":
-        flags.append("BASE_FALLBACK_TO_QUALIFIED_SPEND_TOTAL")
-        trace.append({"step": "base_fallback", "requested_base": base, "used_base": "qualified_spend_total"})
-
-    benefit = base_total * rate
-    trace.append({"step": "apply_rate", "rate": str(rate), "base_total": str(base_total), "benefit_pre_cap": str(benefit)})
+def get_compiled_rule(code: str) -> CompiledRule:
+    """
+    Return the compiled rule for a jurisdiction code.
 
-    caps = calc.get("caps", {}) or {}
-    max_benefit = caps.get("max_benefit", None)
-    if max_benefit is not None:
-        max_benefit_d = _dec(max_benefit)
-        if benefit > max_benefit_d:
-            benefit = max_benefit_d
-            flags.append("CAPPED_MAX_BENEFIT")
-            trace.append({"step": "cap_applied", "max_benefit": str(max_benefit_d), "benefit_post_cap": str(benefit)})
+    Served from the in-memory rule registry; recompiles only when the
+    registry has swapped in a new version of the rule file.
+    Raises FileNotFoundError for unknown jurisdictions (same as get_rule_path).
+    """
+    c = (code or "").strip().upper()
+    entry = get_rule_file(c)
+
+    cached = _compiled_cache.get(c)
+    if cached and cached[0] == entry.path and cached[1] == entry.version:
+        return cached[2]
+
+    compiled = compile_rule(entry.data)
+    _compiled_cache[c] = (entry.path, entry.version, compiled)
+    return compiled
 
-    return EvalResult(True, benefit, qualified_total, flags, trace)
+
+def clear_compiled_rules() -> None:
+    _compiled_cache.clear()
+
+
+def evaluate_rule(
+    *,
+    rule: Dict[str, Any],
+    jurisdiction_code: str,
+    production_start_date: Optional[str],
+    expenses: List[Dict[str, Any]],
+) -> EvalResult:
+    return compile_rule(rule).evaluate(
+        jurisdiction_code=jurisdiction_code,
+        production_start_date=production_start_date,
+        expenses=expenses,
+    )
 
 
 def evaluate(req: EvaluateRequest) -> EvaluateResponse:
@@ -149,12 +274,7 @@ def evaluate(req: EvaluateRequest) -> EvaluateResponse:
           rule_id, rule_name, rule_type, applied_amount
     """
     code = (getattr(req, "jurisdiction_code", "") or "").strip().upper()
-    rule_path = get_rule_path(code)
-
-    if not rule_path:
-        raise FileNotFoundError(f"No rule file found for jurisdiction: {code}")
-
-    rule = load_rule_from_file(rule_path)
+    compiled = get_compiled_rule(code)
 
     production_start_date = (
         getattr(req, "production_start_date", None)
@@ -162,39 +282,21 @@ def evaluate(req: EvaluateRequest) -> EvaluateResponse:
         or None
     )
 
-    expenses_payload: List[Dict[str, Any]] = []
-    for e in getattr(req, "expenses", []) or []:
-        expenses_payload.append(
-            {
-                "category": getattr(e, "category", None),
-                "amount": getattr(e, "amount", None),
-                "qualified": True,
-                "labor": bool(getattr(e, "is_payroll", False)),
-                "in_state": True,
-                "resident": True,
-            }
-        )
-
-    result = evaluate_rule(
-        rule=rule,
+    result = compiled.evaluate_items(
         jurisdiction_code=code,
         production_start_date=production_start_date,
-        expenses=expenses_payload,
+        items=getattr(req, "expenses", None) or (),
     )
 
-    # Required breakdown fields (pull from rule json if present)
-    rule_id = str(rule.get("id") or rule.get("rule_id") or f"{code}-MVP")
-    rule_name = str(rule.get("name") or rule.get("rule_name") or f"{code} Incentive Rule")
-    rule_type = str(rule.get("type") or rule.get("rule_type") or "credit")
-
+    # Required breakdown fields (pulled from rule json at compile time)
     breakdown_item = {
-        "rule_id": rule_id,
-        "rule_name": rule_name,
-        "rule_type": rule_type,
+        "rule_id": compiled.rule_id,
+        "rule_name": compiled.rule_name,
+        "rule_type": compiled.rule_type,
         "applied_amount": result.benefit_amount,
         # Extra keys are fine if your model allows them; if not, pydantic will ignore only if configured.
         "eligible_spend": result.qualified_spend_total,
-        "rate_applied": _dec((rule.get("calculation", {}) or {}).get("rate", 0) or 0),
+        "rate_applied": compiled.rate,
         "base": "qualified_spend_total",
     }
 
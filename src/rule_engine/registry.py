@@ -8,13 +8,28 @@ Source of truth:
 Behavior:
   - get_rule_path(code) raises FileNotFoundError if not found
   - find_rule_path(code) returns Optional[Path]
+  - get_rule_file(code) returns the parsed, in-memory RuleFile (or raises)
+
+In-memory registry:
+  - Every *.json under the rules directory is read and parsed once, on first
+    use (or at startup via load_rules()), into a RuleRegistry.
+  - Lookups are served from memory — no stat/glob/read per evaluation.
+  - refresh() / reload_path() re-read only files whose mtime changed; each
+    swapped file gets a new version and rules_version() increases, so callers
+    can key derived caches on it. src/rule_engine/watcher.py drives reloads.
 """
 
 from __future__ import annotations
 
+import json
+import logging
 import os
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Set
+from typing import Any, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
 
 # src/rule_engine/registry.py -> parents[2] is repo root (repo/src/rule_engine/registry.py)
 REPO_ROOT = Path(__file__).resolve().parents[2]
@@ -23,6 +38,16 @@ REPO_ROOT = Path(__file__).resolve().parents[2]
 _RULES_DIR_ENV = "TAX_RULES_DIR"
 
 
+def _resolve_rules_dir(override: str) -> Path:
+    if override:
+        p = Path(override)
+        return p if p.is_absolute() else (REPO_ROOT / p).resolve()
+    return (REPO_ROOT / "rules").resolve()
+
+
+_resolved_dirs: Dict[str, Path] = {}
+
+
 def get_rules_dir() -> Path:
     """
     Returns the rules directory.
@@ -31,10 +56,10 @@ def get_rules_dir() -> Path:
     Override: TAX_RULES_DIR (absolute or relative to repo root)
     """
     override = (os.getenv(_RULES_DIR_ENV) or "").strip()
-    if override:
-        p = Path(override)
-        return p if p.is_absolute() else (REPO_ROOT / p).resolve()
-    return (REPO_ROOT / "rules").resolve()
+    rules_dir = _resolved_dirs.get(override)
+    if rules_dir is None:
+        rules_dir = _resolved_dirs[override] = _resolve_rules_dir(override)
+    return rules_dir
 
 
 def normalize_code(code: str) -> str:
@@ -45,44 +70,194 @@ def rule_filename(code: str) -> str:
     return f"{normalize_code(code)}.json"
 
 
-def find_rule_path(code: str) -> Optional[Path]:
+@dataclass(frozen=True)
+class RuleFile:
     """
-    Returns the rule file path if it exists, else None.
+    One parsed rule file. ``version`` changes whenever the file is swapped.
+
+    ``data`` is shared by every reader — treat it as read-only.
+    """
+    code: str
+    path: Path
+    mtime_ns: int
+    version: int
+    data: Dict[str, Any]
+
+
+class RuleRegistry:
+    """
+    In-memory index of the rule files in one directory.
+
+    Readers never touch the filesystem; refresh() and reload_path() do, and
+    replace only the entries whose file changed. The index dict is swapped
+    wholesale under a lock, so a concurrent reader sees either the old or the
+    new mapping, never a half-updated one.
+    """
+
+    def __init__(self, rules_dir: Path) -> None:
+        self.rules_dir = rules_dir
+        self._files: Dict[str, RuleFile] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """Increments every time a rule file is added, replaced or removed."""
+        return self._version
+
+    def get(self, code: str) -> Optional[RuleFile]:
+        return self._files.get(normalize_code(code))
+
+    def codes(self) -> Set[str]:
+        return set(self._files)
+
+    def refresh(self) -> Set[str]:
+        """
+        Rescan the directory and reload files whose mtime changed.
+
+        Returns the set of codes that were added, replaced or removed.
+        """
+        with self._lock:
+            seen: Dict[str, Path] = {}
+            if self.rules_dir.is_dir():
+                for f in self.rules_dir.glob("*.json"):
+                    if f.is_file():
+                        seen[f.stem.upper()] = f
+
+            files = dict(self._files)
+            changed: Set[str] = set()
+            for code in set(files) - set(seen):
+                del files[code]
+                changed.add(code)
+                self._version += 1
+                logger.info(f"Rule file removed: {code}")
+            for code, path in seen.items():
+                if self._reload_into(files, code, path):
+                    changed.add(code)
+
+            if changed:
+                self._files = files
+        return changed
+
+    def reload_path(self, path: Path) -> bool:
+        """
+        Reload (or drop, if it no longer exists) a single rule file.
+
+        Returns True if the registry changed.
+        """
+        path = Path(path)
+        if path.suffix.lower() != ".json" or path.parent.resolve() != self.rules_dir.resolve():
+            return False
+        code = path.stem.upper()
+        with self._lock:
+            files = dict(self._files)
+            if path.is_file():
+                changed = self._reload_into(files, code, path)
+            else:
+                changed = files.pop(code, None) is not None
+                if changed:
+                    self._version += 1
+                    logger.info(f"Rule file removed: {code}")
+            if changed:
+                self._files = files
+        return changed
+
+    def _reload_into(self, files: Dict[str, RuleFile], code: str, path: Path) -> bool:
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return False
+        current = files.get(code)
+        if current is not None and current.path == path and current.mtime_ns == mtime:
+            return False
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            # Keep serving the previous version of a rule if an edit is mid-write or broken
+            logger.error(f"Rule file {path.name} could not be loaded: {e}")
+            return False
+        self._version += 1
+        files[code] = RuleFile(code=code, path=path, mtime_ns=mtime, version=self._version, data=data)
+        if current is not None:
+            logger.info(f"Rule file reloaded: {code} (v{self._version})")
+        return True
+
+
+_registries: Dict[Path, RuleRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry() -> RuleRegistry:
+    """
+    Returns the registry for the current rules directory, loading it on first use.
     """
     rules_dir = get_rules_dir()
+    registry = _registries.get(rules_dir)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.get(rules_dir)
+            if registry is None:
+                registry = RuleRegistry(rules_dir)
+                registry.refresh()
+                _registries[rules_dir] = registry
+    return registry
+
+
+def load_rules() -> RuleRegistry:
+    """
+    Loads (or rescans) every rule file under the rules directory. Called at startup.
+    """
+    registry = get_registry()
+    registry.refresh()
+    logger.info(f"Rule registry v{registry.version} — {len(registry.codes())} rule files in {registry.rules_dir}")
+    return registry
+
+
+def rules_version() -> int:
+    return get_registry().version
+
+
+def find_rule_file(code: str) -> Optional[RuleFile]:
+    """
+    Returns the in-memory rule file if present, else None.
+    """
     c = normalize_code(code)
     if not c:
         return None
+    return get_registry().get(c)
+
 
-    candidate = rules_dir / rule_filename(c)
-    return candidate if candidate.is_file() else None
+def get_rule_file(code: str) -> RuleFile:
+    """
+    Returns the in-memory rule file or raises FileNotFoundError.
+    """
+    entry = find_rule_file(code)
+    if entry is None:
+        c = normalize_code(code) or "<empty>"
+        raise FileNotFoundError(f"Rule file not found for jurisdiction '{c}' in {get_rules_dir()}")
+    return entry
+
+
+def find_rule_path(code: str) -> Optional[Path]:
+    """
+    Returns the rule file path if it exists, else None.
+    """
+    entry = find_rule_file(code)
+    return entry.path if entry else None
 
 
 def get_rule_path(code: str) -> Path:
     """
     Returns the rule file path or raises FileNotFoundError.
     """
-    p = find_rule_path(code)
-    if not p:
-        rules_dir = get_rules_dir()
-        c = normalize_code(code) or "<empty>"
-        raise FileNotFoundError(f"Rule file not found for jurisdiction '{c}' in {rules_dir}")
-    return p
+    return get_rule_file(code).path
 
 
 def list_rule_codes() -> Set[str]:
     """
     Lists available jurisdiction codes from the rules directory.
     """
-    rules_dir = get_rules_dir()
-    if not rules_dir.exists():
-        return set()
-
-    codes: Set[str] = set()
-    for f in rules_dir.glob("*.json"):
-        if f.is_file():
-            codes.add(f.stem.upper())
-    return codes
+    return get_registry().codes()
 
 
 def ensure_rules_dir() -> Path:
@@ -0,0 +1,93 @@
+"""
+Rule file watcher
+
+Keeps the in-memory rule registry (registry.py) in sync with the rules
+directory while the API is running:
+  - watchfiles (if installed) reports edited/added/removed *.json files and
+    only those files are reloaded
+  - otherwise the directory is rescanned every RULES_POLL_SECONDS
+
+Start/stop is hooked into the FastAPI lifespan in src/main.py.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Optional
+
+from .registry import RuleRegistry, get_registry
+
+logger = logging.getLogger(__name__)
+
+RULES_POLL_SECONDS = 5.0
+
+_task: Optional[asyncio.Task] = None
+_stop: Optional[asyncio.Event] = None
+
+
+async def _watch_with_watchfiles(registry: RuleRegistry, stop: asyncio.Event) -> None:
+    from watchfiles import awatch
+
+    async for changes in awatch(
+        registry.rules_dir,
+        stop_event=stop,
+        watch_filter=lambda _change, path: path.lower().endswith(".json"),
+        recursive=False,
+    ):
+        for _change, path in changes:
+            await asyncio.to_thread(registry.reload_path, Path(path))
+
+
+async def _watch_by_polling(registry: RuleRegistry, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=RULES_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            await asyncio.to_thread(registry.refresh)
+
+
+async def watch_rules(registry: RuleRegistry, stop: asyncio.Event) -> None:
+    """Reload rule files as they change until ``stop`` is set."""
+    try:
+        await _watch_with_watchfiles(registry, stop)
+    except ImportError:
+        logger.info(f"watchfiles not installed — polling rules every {RULES_POLL_SECONDS:g}s")
+        await _watch_by_polling(registry, stop)
+
+
+def start_rule_watcher() -> None:
+    """Start watching the rules directory. Called once at application startup."""
+    global _task, _stop
+    if _task is not None and not _task.done():
+        return
+    registry = get_registry()
+    if not registry.rules_dir.is_dir():
+        logger.warning(f"Rules directory {registry.rules_dir} does not exist — hot reload disabled")
+        return
+    _stop = asyncio.Event()
+    _task = asyncio.create_task(watch_rules(registry, _stop), name="rule-watcher")
+    logger.info(f"✅ Watching {registry.rules_dir} for rule changes")
+
+
+async def stop_rule_watcher() -> None:
+    global _task, _stop
+    if _task is None:
+        return
+    task, _task = _task, None
+    _stop.set()
+    _stop = None
+    try:
+        await asyncio.wait_for(asyncio.shield(task), timeout=5)
+    except asyncio.TimeoutError:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            # Swallow the watcher's own cancellation; re-raise if shutdown itself was cancelled
+            current = asyncio.current_task()
+            if current is not None and current.cancelling():
+                raise
+    except Exception as e:
+        logger.error(f"Rule watcher stopped with error: {e}")
@@ -0,0 +1,221 @@
+"""
+Budget allocation across candidate jurisdictions.
+
+Given a total budget and a set of candidate locations, each with the incentive
+terms its stack resolves to, find the spend split that maximizes the total
+incentive. Used by the stacking engine's /optimize endpoints; this module has
+no database access.
+
+Model:
+  - A term pays ``rate × eligible_share × spend`` (or ``fixed_amount``), capped
+    at ``cap``, once the location's spend reaches ``min_spend``. So each
+    location's value is piecewise linear in its spend: concave between its
+    minimum-spend thresholds (caps only flatten it) with upward jumps at them.
+  - A location may receive nothing unless the caller set a minimum spend for
+    it; ``max_spend`` bounds how much it can absorb.
+
+Solver:
+  - Every location gets a *level*: one of its minimum-spend thresholds, its own
+    floor (usually 0) included. A flat grant with no threshold pays on any
+    spend at all, so a location holding one also gets the level
+    ``MIN_PAID_SPEND`` (one cent) above a zero floor. Fixing the levels leaves
+    a concave problem under one budget constraint, which is solved exactly by
+    filling linear segments in order of decreasing marginal rate on top of the
+    level floors.
+  - Levels are enumerated depth-first, pruning any combination whose floors
+    already exceed the budget, and each fill is scored with the exact value
+    function. Locations typically have one or two thresholds, so this is a
+    few hundred segment fills — never an enumeration of spend splits.
+    ``max_combinations`` bounds the search; if it is hit the best plan found
+    so far is returned with ``truncated`` set.
+
+Budget that earns nothing at any location is reported as ``unallocated``.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+MAX_COMBINATIONS = 50_000
+MIN_PAID_SPEND = 0.01                   # smallest spend that unlocks a no-threshold flat grant
+_EPSILON = 1e-9
+
+
+@dataclass(frozen=True)
+class IncentiveTerm:
+    """One rule in a location's stack, reduced to what its value depends on."""
+    code: str
+    name: str
+    rate: float = 0.0                   # fraction of eligible spend (0.30 = 30%)
+    fixed_amount: float = 0.0           # used when rate is 0
+    min_spend: float = 0.0
+    cap: Optional[float] = None
+    eligible_share: float = 1.0         # share of the location's spend in eligible categories
+
+    @property
+    def slope(self) -> float:
+        return self.rate * self.eligible_share
+
+    def value(self, spend: float) -> float:
+        if spend <= 0 or spend + _EPSILON < self.min_spend:
+            return 0.0
+        value = self.slope * spend if self.rate else self.fixed_amount
+        if self.cap is not None:
+            value = min(value, self.cap)
+        return value
+
+
+@dataclass(frozen=True)
+class AllocationCandidate:
+    code: str
+    name: str
+    terms: Tuple[IncentiveTerm, ...]
+    min_spend: float = 0.0              # caller's floor: the location must receive at least this
+    max_spend: Optional[float] = None   # caller's ceiling
+
+    def value(self, spend: float) -> float:
+        return sum(t.value(spend) for t in self.terms)
+
+
+@dataclass
+class CandidateAllocation:
+    code: str
+    name: str
+    spend: float
+    incentive: float
+    term_values: List[Tuple[IncentiveTerm, float]]
+
+    @property
+    def effective_rate(self) -> Optional[float]:
+        return self.incentive / self.spend if self.spend > 0 else None
+
+
+@dataclass
+class AllocationPlan:
+    total_budget: float
+    allocations: List[CandidateAllocation]
+    total_incentive: float
+    unallocated: float
+    combinations_evaluated: int
+    truncated: bool = False
+    warnings: List[str] = field(default_factory=list)
+
+
+def _levels(candidate: AllocationCandidate, upper: float) -> List[float]:
+    """Spend floors worth trying for a candidate: its own floor and every threshold above it."""
+    floors = {candidate.min_spend}
+    floors.update(t.min_spend for t in candidate.terms if candidate.min_spend < t.min_spend <= upper)
+    # A fixed amount pays once spend is positive, which a zero floor never is
+    if candidate.min_spend <= 0 < MIN_PAID_SPEND <= upper and any(
+        not t.rate and t.fixed_amount > 0 and t.min_spend <= 0 for t in candidate.terms
+    ):
+        floors.add(MIN_PAID_SPEND)
+    return sorted(floors)
+
+
+def _segments(candidate: AllocationCandidate, floor: float, upper: float) -> List[Tuple[float, float]]:
+    """(marginal rate, length) pieces of the candidate's value above floor, steepest first."""
+    active = [t for t in candidate.terms if t.rate and t.min_spend <= floor + _EPSILON]
+    knees = sorted({t.cap / t.slope for t in active if t.cap is not None and t.slope > 0})
+    points = [floor, *(k for k in knees if floor < k < upper), upper]
+
+    segments = []
+    for a, b in zip(points, points[1:]):
+        mid = (a + b) / 2
+        slope = sum(t.slope for t in active if t.cap is None or t.slope * mid < t.cap)
+        if slope > 0 and b > a:
+            segments.append((slope, b - a))
+    return segments
+
+
+def _fill(
+    candidates: Sequence[AllocationCandidate],
+    floors: Sequence[float],
+    uppers: Sequence[float],
+    budget: float,
+) -> List[float]:
+    spend = list(floors)
+    remaining = budget - sum(spend)
+    pieces = []
+    for i, (candidate, floor) in enumerate(zip(candidates, floors)):
+        pieces.extend((slope, length, i) for slope, length in _segments(candidate, floor, uppers[i]))
+    pieces.sort(key=lambda p: -p[0])
+    for _, length, i in pieces:
+        if remaining <= _EPSILON:
+            break
+        take = min(length, remaining)
+        spend[i] += take
+        remaining -= take
+    return spend
+
+
+def optimize_allocation(
+    total_budget: float,
+    candidates: Sequence[AllocationCandidate],
+    max_combinations: int = MAX_COMBINATIONS,
+) -> AllocationPlan:
+    """Split total_budget across candidates to maximize the summed incentive."""
+    uppers = [min(c.max_spend if c.max_spend is not None else total_budget, total_budget) for c in candidates]
+    for c, upper in zip(candidates, uppers):
+        if c.min_spend > upper + _EPSILON:
+            raise ValueError(f"{c.code}: minimum spend ${c.min_spend:,.0f} exceeds its spend ceiling ${upper:,.0f}")
+    if sum(c.min_spend for c in candidates) > total_budget + _EPSILON:
+        raise ValueError(f"Candidate minimum spends exceed the total budget of ${total_budget:,.0f}")
+
+    options = [_levels(c, upper) for c, upper in zip(candidates, uppers)]
+    # Smallest floor still reachable by the candidates after position i, for pruning
+    tail_floor = [0.0] * (len(candidates) + 1)
+    for i in range(len(candidates) - 1, -1, -1):
+        tail_floor[i] = tail_floor[i + 1] + options[i][0]
+
+    best_value = -1.0
+    best_spend: List[float] = [0.0] * len(candidates)
+    evaluated = 0
+    truncated = False
+    floors: List[float] = [0.0] * len(candidates)
+
+    def search(i: int, committed: float) -> None:
+        nonlocal best_value, best_spend, evaluated, truncated
+        if truncated:
+            return
+        if i == len(candidates):
+            if evaluated >= max_combinations:
+                truncated = True
+                return
+            evaluated += 1
+            spend = _fill(candidates, floors, uppers, total_budget)
+            value = sum(c.value(s) for c, s in zip(candidates, spend))
+            if value > best_value + _EPSILON:
+                best_value, best_spend = value, spend
+            return
+        for level in options[i]:
+            if committed + level + tail_floor[i + 1] > total_budget + _EPSILON:
+                break       # levels are ascending
+            floors[i] = level
+            search(i + 1, committed + level)
+
+    search(0, 0.0)
+
+    allocations = []
+    for c, spend in zip(candidates, best_spend):
+        term_values = [(t, t.value(spend)) for t in c.terms]
+        allocations.append(CandidateAllocation(
+            code=c.code,
+            name=c.name,
+            spend=spend,
+            incentive=sum(v for _, v in term_values),
+            term_values=term_values,
+        ))
+
+    warnings = []
+    if truncated:
+        warnings.append(f"Search stopped after {max_combinations:,} level combinations — plan may not be optimal")
+    return AllocationPlan(
+        total_budget=total_budget,
+        allocations=allocations,
+        total_incentive=sum(a.incentive for a in allocations),
+        unallocated=max(total_budget - sum(best_spend), 0.0),
+        combinations_evaluated=evaluated,
+        truncated=truncated,
+        warnings=warnings,
+    )
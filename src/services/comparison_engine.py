@@ -0,0 +1,203 @@
+"""
+Jurisdiction comparison.
+
+/calculate/compare, /reports/comparison and /excel/comparison all rank the
+same thing: for each requested jurisdiction, the active incentive rule that
+yields the largest credit on the qualifying budget. ``compare()`` works it
+out once per (catalog version, budgets, jurisdictions) and keeps the result,
+so a user who views a comparison and then exports it as PDF and Excel costs
+one computation, not three. Every endpoint renders from the same
+``Comparison``:
+
+  - ``options`` ranks every requested jurisdiction; one with no active rule
+    or no positive credit sorts last with a zero credit (the calculator
+    lists these, the documents leave them out)
+  - ``eligible`` is the ranked prefix with a positive credit, and
+    ``report_rows()`` is that prefix in the dict form the PDF and Excel
+    generators take
+
+Results are immutable and shared between requests; render from them, don't
+modify them.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+MAX_CACHED_COMPARISONS = 256
+
+
+class UnknownJurisdictions(LookupError):
+    """One or more requested jurisdiction ids are not in the catalog."""
+
+
+def best_rule_for_budget(rules, qualifying_budget: float):
+    """
+    Pick the rule yielding the highest credit for a qualifying budget.
+
+    Returns (rule, credit, meets_minimum). With no positive credit the first
+    rule is returned with a zero credit and meets_minimum=False.
+    """
+    best_credit = 0
+    best_rule = rules[0]
+    meets_requirements = False
+
+    for rule in rules:
+        # Calculate credit
+        if rule.percentage:
+            credit = qualifying_budget * (rule.percentage / 100)
+        elif rule.fixedAmount:
+            credit = rule.fixedAmount
+        else:
+            credit = 0
+
+        # Check minimum
+        meets_min = True
+        if rule.minSpend:
+            meets_min = qualifying_budget >= rule.minSpend
+            if not meets_min:
+                credit = 0
+
+        # Apply cap
+        if rule.maxCredit and credit > rule.maxCredit:
+            credit = rule.maxCredit
+
+        # Track best
+        if credit > best_credit:
+            best_credit = credit
+            best_rule = rule
+            meets_requirements = meets_min
+
+    return best_rule, best_credit, meets_requirements
+
+
+@dataclass(frozen=True)
+class JurisdictionOption:
+    """The best rule of one jurisdiction at the compared budget."""
+    rank: int
+    jurisdiction: Any
+    rule: Optional[Any]                 # None: no active rules
+    credit: float
+    meets_requirements: bool
+
+    def to_dict(self) -> Dict[str, Any]:
+        rule = self.rule
+        return {
+            "jurisdiction": self.jurisdiction.name,
+            "jurisdictionId": self.jurisdiction.id,
+            "ruleName": rule.ruleName if rule else "No active programs",
+            "ruleCode": rule.ruleCode if rule else "NONE",
+            "incentiveType": rule.incentiveType if rule else "none",
+            "percentage": rule.percentage if rule else None,
+            "estimatedCredit": self.credit,
+            "meetsRequirements": self.meets_requirements,
+            "rank": self.rank,
+        }
+
+
+@dataclass(frozen=True)
+class Comparison:
+    budget: float
+    qualifying_budget: float
+    catalog_version: int
+    options: Tuple[JurisdictionOption, ...]
+
+    @property
+    def eligible(self) -> Tuple[JurisdictionOption, ...]:
+        """Options with a positive credit; zero credits sort last, so this is a prefix of ``options``."""
+        return tuple(o for o in self.options if o.credit > 0)
+
+    @property
+    def best(self) -> JurisdictionOption:
+        return self.options[0]
+
+    @property
+    def worst(self) -> JurisdictionOption:
+        return self.options[-1]
+
+    @property
+    def savings_vs_worst(self) -> float:
+        return self.best.credit - self.worst.credit
+
+    def notes(self) -> List[str]:
+        best, worst = self.best, self.worst
+        notes = [
+            f"🏆 Best option: {best.jurisdiction.name} with ${best.credit:,.0f} credit",
+            f"💰 Saves ${self.savings_vs_worst:,.0f} vs lowest option ({worst.jurisdiction.name})",
+        ]
+        if best.rule is not None and best.rule.percentage:
+            notes.append(f"📊 Top rate: {best.rule.percentage}% ({best.rule.ruleName})")
+        return notes
+
+    def report_rows(self) -> List[Dict[str, Any]]:
+        """Eligible options as the ``comparisons`` list of the PDF and Excel generators."""
+        return [option.to_dict() for option in self.eligible]
+
+
+_results: "OrderedDict[tuple, Comparison]" = OrderedDict()
+_lock = threading.Lock()
+_counts: Dict[str, int] = {"computed": 0, "reused": 0}
+
+
+def _compute(catalog, jurisdictions: Sequence[Any], budget: float, qualifying_budget: float) -> Comparison:
+    ranked = []
+    for jurisdiction in jurisdictions:
+        rules = catalog.incentive_rules(jurisdiction.id, active_only=True)
+        if not rules:
+            ranked.append((jurisdiction, None, 0, False))
+            continue
+        ranked.append((jurisdiction, *best_rule_for_budget(rules, qualifying_budget)))
+
+    # Stable: ties keep the requested order
+    ranked.sort(key=lambda r: r[2], reverse=True)
+    return Comparison(
+        budget=budget,
+        qualifying_budget=qualifying_budget,
+        catalog_version=catalog.version,
+        options=tuple(
+            JurisdictionOption(rank=i + 1, jurisdiction=j, rule=rule, credit=credit, meets_requirements=meets)
+            for i, (j, rule, credit, meets) in enumerate(ranked)
+        ),
+    )
+
+
+def compare(
+    catalog,
+    jurisdiction_ids: Sequence[str],
+    budget: float,
+    qualifying_budget: Optional[float] = None,
+) -> Comparison:
+    """
+    Rank jurisdictions by their best credit on qualifying_budget (budget if not given).
+
+    Raises UnknownJurisdictions if an id is missing from the catalog (or repeated).
+    """
+    qualifying = qualifying_budget if qualifying_budget else budget
+    key = (catalog.version, budget, qualifying, tuple(jurisdiction_ids))
+    with _lock:
+        cached = _results.get(key)
+        if cached is not None:
+            _results.move_to_end(key)
+            _counts["reused"] += 1
+            return cached
+
+    jurisdictions = [j for j in map(catalog.jurisdiction, dict.fromkeys(jurisdiction_ids)) if j]
+    if len(jurisdictions) != len(jurisdiction_ids):
+        raise UnknownJurisdictions("One or more jurisdictions not found")
+
+    result = _compute(catalog, jurisdictions, budget, qualifying)
+    with _lock:
+        if _results and next(reversed(_results))[0] != catalog.version:
+            # The catalog reloaded: nothing computed on the old rules is reusable
+            _results.clear()
+        _results[key] = result
+        while len(_results) > MAX_CACHED_COMPARISONS:
+            _results.popitem(last=False)
+        _counts["computed"] += 1
+    return result
+
+
+def stats() -> Dict[str, int]:
+    return {**_counts, "cached": len(_results)}
@@ -10,7 +10,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Sequence
 
 from src.utils.database import prisma
-from src.services.email_service import send_email
+from src.services.email_queue import email_queue
 
 logger = logging.getLogger(__name__)
 
@@ -161,5 +161,5 @@ async def send_daily_digest() -> None:
             f"SceneIQ {label} Digest — {len(events)} new event{'s' if len(events) != 1 else ''}"
         )
         html = _build_html(events, label)
-        send_email(email, subject, html)
-        logger.info(f"[digest] Sent {label} digest to {email} ({len(events)} events)")
+        email_queue.enqueue(email, subject, html)
+        logger.info(f"[digest] Queued {label} digest for {email} ({len(events)} events)")
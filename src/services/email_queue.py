@@ -0,0 +1,214 @@
+"""
+Background email delivery.
+
+``enqueue()`` puts a message on an in-process queue and returns immediately;
+a small pool of workers drains it over long-lived, authenticated SMTP
+sessions (see src/services/email_service.py for configuration):
+
+  - each worker owns one session, opened on first use and closed after
+    IDLE_SECONDS without traffic (servers drop idle connections anyway)
+  - a worker takes up to BATCH_SIZE queued messages at a time and sends them
+    over its session in one thread hop
+  - a dropped connection or a 4xx reply is retried up to MAX_ATTEMPTS times
+    with exponential backoff, reconnecting first; 5xx replies (bad address,
+    rejected content) are logged and dropped
+
+Workers start lazily on the first enqueue from the event loop. The FastAPI
+lifespan calls ``stop_email_queue()`` on shutdown, which gives queued mail
+a few seconds to drain.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import smtplib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from src.services import email_service
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = 3
+BATCH_SIZE = 50
+MAX_QUEUED = 50_000
+MAX_ATTEMPTS = 4
+RETRY_BASE_SECONDS = 2.0
+IDLE_SECONDS = 60.0
+DRAIN_SECONDS = 10.0
+
+
+@dataclass(frozen=True)
+class OutgoingEmail:
+    to: str
+    subject: str
+    html: str
+    text: Optional[str] = None
+
+
+def _is_transient(exc: Exception) -> bool:
+    """Worth retrying on a fresh connection: network trouble or a 4xx reply."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    return isinstance(exc, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError))
+
+
+class _Session:
+    """One worker's SMTP connection. Only ever used from that worker's thread hops."""
+
+    def __init__(self) -> None:
+        self._srv: Optional[smtplib.SMTP] = None
+
+    def send(self, batch: List[OutgoingEmail]) -> List[Tuple[OutgoingEmail, Optional[Exception]]]:
+        results: List[Tuple[OutgoingEmail, Optional[Exception]]] = []
+        for i, item in enumerate(batch):
+            if self._srv is None:
+                try:
+                    self._srv = email_service.open_connection()
+                except Exception as exc:
+                    # No session: the rest of the batch fails the same way
+                    return results + [(rest, exc) for rest in batch[i:]]
+            try:
+                msg = email_service.build_message(item.to, item.subject, item.html, item.text)
+                self._srv.sendmail(msg["From"], [item.to], msg.as_string())
+                results.append((item, None))
+            except Exception as exc:
+                if _is_transient(exc) and not isinstance(exc, smtplib.SMTPRecipientsRefused):
+                    self.close()    # reconnect for whatever comes next
+                results.append((item, exc))
+        return results
+
+    def close(self) -> None:
+        srv, self._srv = self._srv, None
+        if srv is None:
+            return
+        try:
+            srv.quit()
+        except Exception:
+            srv.close()
+
+    @property
+    def is_open(self) -> bool:
+        return self._srv is not None
+
+
+class EmailQueue:
+    def __init__(self, pool_size: int = POOL_SIZE, batch_size: int = BATCH_SIZE, max_queued: int = MAX_QUEUED) -> None:
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self.max_queued = max_queued
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: List[asyncio.Task] = []
+        self._counts: Dict[str, int] = {"queued": 0, "sent": 0, "failed": 0, "retried": 0, "dropped": 0}
+
+    def enqueue(self, to: str, subject: str, html: str, text: Optional[str] = None) -> bool:
+        """Queue one email for delivery. Never blocks or raises; False if it was not queued."""
+        if not email_service.smtp_configured():
+            logger.info(f"[email no-op] to={to!r} subject={subject!r} (SMTP_HOST not configured)")
+            return False
+        try:
+            self._ensure_started()
+            self._queue.put_nowait(OutgoingEmail(to, subject, html, text))
+        except RuntimeError:
+            logger.error(f"[email error] to={to!r}: enqueue called outside the event loop")
+            return False
+        except asyncio.QueueFull:
+            self._counts["dropped"] += 1
+            logger.error(f"[email error] to={to!r}: delivery queue full ({self.max_queued}) — dropped")
+            return False
+        self._counts["queued"] += 1
+        return True
+
+    def enqueue_many(self, recipients: List[str], subject: str, html: str, text: Optional[str] = None) -> int:
+        return sum(self.enqueue(to, subject, html, text) for to in recipients)
+
+    async def flush(self) -> None:
+        """Wait until everything queued so far has been delivered or given up on."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self, timeout: float = DRAIN_SECONDS) -> None:
+        """Drain for up to ``timeout`` seconds, then stop the workers and close their sessions."""
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Email queue stopped with {self._queue.qsize()} message(s) undelivered")
+        workers, self._workers = self._workers, []
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._queue = self._loop = None
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._counts, "pending": self._queue.qsize() if self._queue is not None else 0}
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()       # RuntimeError outside the loop
+        if self._queue is None or loop is not self._loop:
+            # First use, or the previous loop is gone along with its workers
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._loop = loop
+            self._workers = []
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker(), name=f"email-worker-{i}")
+                for i in range(self.pool_size)
+            ]
+            logger.info(f"✅ Email delivery pool started ({self.pool_size} connections)")
+
+    async def _next_batch(self, session: _Session) -> List[OutgoingEmail]:
+        queue = self._queue
+        while True:
+            try:
+                first = await asyncio.wait_for(queue.get(), timeout=IDLE_SECONDS)
+                break
+            except asyncio.TimeoutError:
+                if session.is_open:
+                    await asyncio.to_thread(session.close)
+        batch = [first]
+        while len(batch) < self.batch_size and not queue.empty():
+            batch.append(queue.get_nowait())
+        return batch
+
+    async def _worker(self) -> None:
+        session = _Session()
+        try:
+            while True:
+                batch = await self._next_batch(session)
+                try:
+                    await self._deliver(session, batch)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+        finally:
+            session.close()
+
+    async def _deliver(self, session: _Session, batch: List[OutgoingEmail]) -> None:
+        pending = batch
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            results = await asyncio.to_thread(session.send, pending)
+            pending = []
+            for item, exc in results:
+                if exc is None:
+                    self._counts["sent"] += 1
+                elif _is_transient(exc) and attempt < MAX_ATTEMPTS:
+                    pending.append(item)
+                else:
+                    self._counts["failed"] += 1
+                    logger.error(f"[email error] to={item.to!r} after {attempt} attempt(s): {exc}")
+            if not pending:
+                return
+            self._counts["retried"] += len(pending)
+            await asyncio.sleep(RETRY_BASE_SECONDS * 2 ** (attempt - 1))
+
+
+email_queue = EmailQueue()
+
+
+async def stop_email_queue() -> None:
+    await email_queue.stop()
@@ -11,6 +11,11 @@ Configuration (all via environment / .env):
 If SMTP_HOST is blank the send is a no-op (logs the email instead).
 This allows the rest of the codebase to call send_email() unconditionally
 without crashing when SMTP is not configured.
+
+send_email() is synchronous and opens one session per call; it suits scripts.
+Code running on the event loop should enqueue through
+src/services/email_queue.py, which delivers over a pool of persistent
+connections in the background.
 """
 import logging
 import smtplib
@@ -23,6 +28,45 @@ from src.utils.config import settings
 logger = logging.getLogger(__name__)
 
 
+def smtp_configured() -> bool:
+    return bool(settings.SMTP_HOST)
+
+
+def from_address() -> str:
+    return settings.SMTP_FROM or settings.SMTP_USER
+
+
+def build_message(to: str, subject: str, html: str, text: str | None = None) -> MIMEMultipart:
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = from_address()
+    msg["To"] = to
+
+    if text:
+        msg.attach(MIMEText(text, "plain"))
+    msg.attach(MIMEText(html, "html"))
+    return msg
+
+
+def open_connection(timeout: float = 30.0) -> smtplib.SMTP:
+    """Open and authenticate an SMTP session (SSL on 465, STARTTLS otherwise)."""
+    context = ssl.create_default_context()
+    if settings.SMTP_PORT == 465:
+        srv = smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT, context=context, timeout=timeout)
+    else:
+        srv = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=timeout)
+    try:
+        if settings.SMTP_PORT != 465:
+            srv.ehlo()
+            srv.starttls(context=context)
+        if settings.SMTP_USER:
+            srv.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+    except Exception:
+        srv.close()
+        raise
+    return srv
+
+
 def send_email(to: str, subject: str, html: str, text: str | None = None) -> bool:
     """
     Send a single email.
@@ -30,34 +74,17 @@ def send_email(to: str, subject: str, html: str, text: str | None = None) -> boo
     Returns True on success, False on failure (never raises).
     Falls back to plain-text log when SMTP is not configured.
     """
-    if not settings.SMTP_HOST:
+    if not smtp_configured():
         logger.info(
             f"[email no-op] to={to!r} subject={subject!r} "
             "(SMTP_HOST not configured — set in .env to enable real delivery)"
         )
         return False
 
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = subject
-    msg["From"] = settings.SMTP_FROM or settings.SMTP_USER
-    msg["To"] = to
-
-    if text:
-        msg.attach(MIMEText(text, "plain"))
-    msg.attach(MIMEText(html, "html"))
-
+    msg = build_message(to, subject, html, text)
     try:
-        context = ssl.create_default_context()
-        if settings.SMTP_PORT == 465:
-            with smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT, context=context) as srv:
-                srv.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-                srv.sendmail(msg["From"], [to], msg.as_string())
-        else:
-            with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as srv:
-                srv.ehlo()
-                srv.starttls(context=context)
-                srv.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-                srv.sendmail(msg["From"], [to], msg.as_string())
+        with open_connection() as srv:
+            srv.sendmail(msg["From"], [to], msg.as_string())
         logger.info(f"[email sent] to={to!r} subject={subject!r}")
         return True
     except Exception as exc:
@@ -66,5 +93,21 @@ def send_email(to: str, subject: str, html: str, text: str | None = None) -> boo
 
 
 def send_emails_bulk(recipients: list[str], subject: str, html: str, text: str | None = None) -> int:
-    """Send the same email to multiple recipients. Returns success count."""
-    return sum(send_email(r, subject, html, text) for r in recipients)
+    """Send the same email to multiple recipients over one session. Returns success count."""
+    if not smtp_configured():
+        return sum(send_email(r, subject, html, text) for r in recipients)
+
+    sent = 0
+    try:
+        with open_connection() as srv:
+            for to in recipients:
+                msg = build_message(to, subject, html, text)
+                try:
+                    srv.sendmail(msg["From"], [to], msg.as_string())
+                    sent += 1
+                except smtplib.SMTPRecipientsRefused as exc:
+                    logger.error(f"[email error] to={to!r}: {exc}")
+    except Exception as exc:
+        logger.error(f"[email error] bulk send stopped after {sent}/{len(recipients)}: {exc}")
+    logger.info(f"[email sent] {sent}/{len(recipients)} recipients subject={subject!r}")
+    return sent
@@ -0,0 +1,264 @@
+"""
+Bulk expense import.
+
+Cost reports exported from production accounting run to hundreds of
+thousands of lines, so /productions/{id}/expenses/import takes the whole
+file at once (CSV, XLSX or NDJSON) instead of one POST per expense:
+
+  - the file is read a row at a time (the csv module, openpyxl read-only
+    mode, one JSON object per line), never loaded whole
+  - rows are validated in chunks of CHUNK_ROWS; a bad row is reported with
+    its line number and does not stop the import
+  - each chunk of valid rows goes to the database in one ``create_many``,
+    while the next chunk is being parsed on a worker thread
+
+Amounts may be negative (refunds, reversals; "(500.00)" is read as -500)
+but not zero. Column headers are matched loosely ("Expense Date",
+"expense_date" and "expenseDate" all work; see FIELD_ALIASES), and unknown
+columns are ignored.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import math
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+CHUNK_ROWS = 2_000
+MAX_IMPORT_ROWS = 500_000
+MAX_REPORTED_ERRORS = 1_000
+
+FORMATS = ("csv", "xlsx", "ndjson")
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/jsonlines": "ndjson",
+}
+EXTENSIONS = {".csv": "csv", ".xlsx": "xlsx", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+FIELD_ALIASES = {
+    "expensedate": "expenseDate", "date": "expenseDate", "transactiondate": "expenseDate",
+    "paymentdate": "paymentDate", "datepaid": "paymentDate",
+    "category": "category",
+    "subcategory": "subcategory",
+    "description": "description", "memo": "description",
+    "amount": "amount",
+    "isqualifying": "isQualifying", "qualifying": "isQualifying",
+    "qualifyingnote": "qualifyingNote", "note": "qualifyingNote",
+    "vendorname": "vendorName", "vendor": "vendorName", "payee": "vendorName",
+    "vendorlocation": "vendorLocation",
+    "receiptnumber": "receiptNumber", "receipt": "receiptNumber", "receiptno": "receiptNumber",
+    "invoicenumber": "invoiceNumber", "invoice": "invoiceNumber", "invoiceno": "invoiceNumber",
+}
+REQUIRED_FIELDS = ("expenseDate", "category", "description", "amount")
+_TEXT_FIELDS = ("category", "subcategory", "description", "qualifyingNote",
+                "vendorName", "vendorLocation", "receiptNumber", "invoiceNumber")
+_TRUE = {"true", "t", "yes", "y", "1", "x"}
+_FALSE = {"false", "f", "no", "n", "0"}
+
+
+class ImportFileError(ValueError):
+    """The file as a whole cannot be read: wrong format, bad encoding, missing columns."""
+
+
+@dataclass
+class Chunk:
+    rows: List[Dict[str, Any]] = field(default_factory=list)        # Expense create data
+    errors: List[Dict[str, Any]] = field(default_factory=list)      # {"row": line, "errors": [...]}
+    read: int = 0
+
+
+def detect_format(content_type: Optional[str], filename: Optional[str] = None) -> Optional[str]:
+    if filename:
+        ext = filename[filename.rfind("."):].lower() if "." in filename else ""
+        if ext in EXTENSIONS:
+            return EXTENSIONS[ext]
+    return CONTENT_TYPES.get((content_type or "").split(";")[0].strip().lower())
+
+
+def _field_name(header: Any) -> Optional[str]:
+    return FIELD_ALIASES.get(re.sub(r"[^a-z0-9]", "", str(header or "").lower()))
+
+
+def _map_header(headers: List[Any]) -> List[Optional[str]]:
+    fields = [_field_name(h) for h in headers]
+    missing = [f for f in REQUIRED_FIELDS if f not in fields]
+    if missing:
+        raise ImportFileError(f"Missing required column(s): {', '.join(missing)}")
+    return fields
+
+
+# ── Readers: (line number, {field: raw value}) ────────────────────────────────
+
+def _csv_records(f: BinaryIO) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    text = io.TextIOWrapper(f, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if header is None:
+            return
+        fields = _map_header(header)
+        for values in reader:
+            if any(v.strip() for v in values):
+                yield reader.line_num, {f: v for f, v in zip(fields, values) if f}
+    except UnicodeDecodeError as e:
+        raise ImportFileError(f"CSV is not UTF-8 encoded: {e}") from e
+    except csv.Error as e:
+        raise ImportFileError(f"Unreadable CSV: {e}") from e
+    finally:
+        text.detach()
+
+
+def _xlsx_records(f: BinaryIO) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    from openpyxl import load_workbook
+
+    try:
+        wb = load_workbook(f, read_only=True, data_only=True)
+    except Exception as e:
+        raise ImportFileError(f"Unreadable XLSX: {e}") from e
+    try:
+        fields = None
+        for line, values in enumerate(wb.worksheets[0].iter_rows(values_only=True), 1):
+            if all(v is None or str(v).strip() == "" for v in values):
+                continue
+            if fields is None:
+                fields = _map_header(list(values))
+                continue
+            yield line, {f: v for f, v in zip(fields, values) if f}
+    finally:
+        wb.close()
+
+
+def _ndjson_records(f: BinaryIO) -> Iterator[Tuple[int, Any]]:
+    for line, raw in enumerate(f, 1):
+        if not raw.strip():
+            continue
+        try:
+            obj = json.loads(raw)
+        except ValueError as e:
+            yield line, ValueError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(obj, dict):
+            yield line, ValueError("Each line must be a JSON object")
+            continue
+        yield line, {name: v for k, v in obj.items() if (name := _field_name(k))}
+
+
+_READERS = {"csv": _csv_records, "xlsx": _xlsx_records, "ndjson": _ndjson_records}
+
+
+# ── Validation ────────────────────────────────────────────────────────────────
+
+def _parse_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    for parse in (lambda t: date.fromisoformat(t[:10]), lambda t: datetime.strptime(t, "%m/%d/%Y").date()):
+        try:
+            return parse(text)
+        except ValueError:
+            pass
+    raise ValueError(f"unrecognised date {text!r} (use YYYY-MM-DD)")
+
+
+def _parse_amount(value: Any) -> float:
+    if value is None or value == "":
+        raise ValueError("required")
+    if isinstance(value, bool):
+        raise ValueError("must be a number")
+    if isinstance(value, (int, float)):
+        amount = float(value)
+    else:
+        text = str(value).strip().replace(",", "").replace("$", "")
+        if text.startswith("(") and text.endswith(")"):
+            text = "-" + text[1:-1]
+        try:
+            amount = float(text)
+        except ValueError:
+            raise ValueError(f"{value!r} is not a number") from None
+    # Negative lines are refunds and reversals, as the single-expense endpoint allows
+    if amount == 0 or not math.isfinite(amount):
+        raise ValueError("must be a non-zero amount")
+    return amount
+
+
+def _parse_bool(value: Any) -> bool:
+    if value is None or str(value).strip() == "":
+        return True
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError(f"{value!r} is not yes/no")
+
+
+def validate_record(production_id: str, record: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """Expense create data for one record, or the list of what is wrong with it."""
+    errors: List[str] = []
+    data: Dict[str, Any] = {"productionId": production_id}
+
+    for name in _TEXT_FIELDS:
+        value = record.get(name)
+        text = str(value).strip() if value is not None else ""
+        if text:
+            data[name] = text
+        elif name in REQUIRED_FIELDS:
+            errors.append(f"{name}: required")
+
+    for name, parse in (("amount", _parse_amount), ("isQualifying", _parse_bool)):
+        try:
+            data[name] = parse(record.get(name))
+        except ValueError as e:
+            errors.append(f"{name}: {e}")
+
+    for name in ("expenseDate", "paymentDate"):
+        value = record.get(name)
+        if value is None or str(value).strip() == "":
+            if name in REQUIRED_FIELDS:
+                errors.append(f"{name}: required")
+            continue
+        try:
+            data[name] = _parse_date(value).isoformat() + "T00:00:00Z"
+        except ValueError as e:
+            errors.append(f"{name}: {e}")
+
+    return (None, errors) if errors else (data, [])
+
+
+def read_chunks(f: BinaryIO, fmt: str, production_id: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[Chunk]:
+    """Parse and validate a file, chunk_rows records at a time. Raises ImportFileError."""
+    if fmt not in _READERS:
+        raise ImportFileError(f"Unsupported format: {fmt}")
+    chunk = Chunk()
+    total = 0
+    for line, record in _READERS[fmt](f):
+        total += 1
+        if total > MAX_IMPORT_ROWS:
+            raise ImportFileError(f"At most {MAX_IMPORT_ROWS:,} rows per import")
+        chunk.read += 1
+        if isinstance(record, Exception):
+            chunk.errors.append({"row": line, "errors": [str(record)]})
+        else:
+            data, errors = validate_record(production_id, record)
+            if errors:
+                chunk.errors.append({"row": line, "errors": errors})
+            else:
+                chunk.rows.append(data)
+        if chunk.read >= chunk_rows:
+            yield chunk
+            chunk = Chunk()
+    if chunk.read:
+        yield chunk
@@ -5,24 +5,43 @@ Fetches each MonitoringSource that has a configured feedUrl, parses it with
 feedparser, deduplicates entries by SHA-256 content hash, and persists new
 items to the MonitoringEvent table.
 
-feedparser.parse() is synchronous and blocking, so it is dispatched to a
-thread-pool executor to avoid stalling the asyncio event loop.
+Sources are fetched concurrently (at most MAX_CONCURRENT_FETCHES at a time)
+over one shared httpx client per run. Each request is conditional: the ETag
+and Last-Modified a source last answered with are stored on its row
+(feedEtag / feedLastModified) and sent back as If-None-Match /
+If-Modified-Since, so an unchanged feed costs a 304 and no parsing.
+
+feedparser.parse() is synchronous and CPU-bound, so the downloaded bytes are
+parsed in a worker thread to avoid stalling the asyncio event loop.
+
+Deduplication is set-based: a feed's entries are hashed, duplicates within
+the batch dropped, and the rest written in one INSERT … ON CONFLICT DO
+NOTHING against the unique index on "contentHash". The RETURNING clause
+tells us exactly which events are new, so concurrent runs can't both insert
+(or both announce) the same entry.
 """
 import asyncio
 import hashlib
 import logging
-import re
+import uuid
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, Optional
 
 import feedparser  # type: ignore
+import httpx
 
 from src.utils.database import prisma
+from src.utils.html_text import html_to_text
 
 logger = logging.getLogger(__name__)
 
-_HTML_TAG_RE = re.compile(r"<[^>]+>")
-_WHITESPACE_RE = re.compile(r"\s+")
+MAX_ENTRIES_PER_FEED = 25
+MAX_CONCURRENT_FETCHES = 16
+FETCH_TIMEOUT_SECONDS = 30.0
+_USER_AGENT = "SceneIQ-FeedIngestion/1.0 (tax incentive compliance)"
+
+MAX_SUMMARY_CHARS = 600
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
@@ -33,9 +52,9 @@ def _content_hash(title: str, url: Optional[str], published_raw: str) -> str:
     return hashlib.sha256(raw.encode()).hexdigest()
 
 
-def _strip_html(text: str) -> str:
-    text = _HTML_TAG_RE.sub(" ", text)
-    return _WHITESPACE_RE.sub(" ", text).strip()
+def _strip_html(text: str, max_chars: Optional[int] = None) -> str:
+    """Visible text of an HTML fragment on one line."""
+    return html_to_text(text, max_chars).replace("\n", " ")
 
 
 def _parse_published(entry) -> Optional[datetime]:
@@ -59,6 +78,111 @@ def _severity_from_entry(title: str, summary: str) -> str:
     return "info"
 
 
+def _events_from_entries(entries: list, source_id: str) -> list[dict]:
+    """MonitoringEvent rows for a feed's entries, first occurrence of each content hash only."""
+    events: dict[str, dict] = {}
+    for entry in entries[:MAX_ENTRIES_PER_FEED]:
+        title       = _strip_html(getattr(entry, "title", "") or "").strip() or "(no title)"
+        url         = getattr(entry, "link", None) or None
+        raw_summary = getattr(entry, "summary", None) or getattr(entry, "description", None) or ""
+        summary     = _strip_html(raw_summary, MAX_SUMMARY_CHARS) or None
+        published_raw = getattr(entry, "published", "") or getattr(entry, "updated", "") or ""
+        hash_val    = _content_hash(title, url, published_raw)
+        if hash_val in events:
+            continue
+        events[hash_val] = {
+            "sourceId":    source_id,
+            "title":       title[:255],
+            "summary":     summary,
+            "url":         url,
+            "contentHash": hash_val,
+            "severity":    _severity_from_entry(title, summary or ""),
+            "publishedAt": _parse_published(entry),
+        }
+    return list(events.values())
+
+
+_EVENT_COLUMNS = ("id", "sourceId", "title", "summary", "url", "contentHash", "severity", "publishedAt", "createdAt")
+
+
+def _timestamp_param(value: Optional[datetime]) -> Optional[str]:
+    # Prisma stores DateTime as UTC in timestamp(3) columns
+    return value.astimezone(timezone.utc).replace(tzinfo=None).isoformat() if value else None
+
+
+async def _insert_new_events(events: list[dict]) -> set[str]:
+    """Insert events in one statement, skipping known content hashes; returns the hashes inserted."""
+    if not events:
+        return set()
+    now = datetime.now(timezone.utc)
+    params: list = []
+    rows = []
+    for event in events:
+        base = len(params)
+        rows.append(
+            "(" + ", ".join(
+                f"${base + i}::timestamp(3)" if col in ("publishedAt", "createdAt") else f"${base + i}"
+                for i, col in enumerate(_EVENT_COLUMNS, start=1)
+            ) + ")"
+        )
+        params.extend([
+            str(uuid.uuid4()), event["sourceId"], event["title"], event["summary"], event["url"],
+            event["contentHash"], event["severity"], _timestamp_param(event["publishedAt"]), _timestamp_param(now),
+        ])
+    columns = ", ".join(f'"{c}"' for c in _EVENT_COLUMNS)
+    inserted = await prisma.query_raw(
+        f"""
+        INSERT INTO monitoring_events ({columns})
+        VALUES {", ".join(rows)}
+        ON CONFLICT ("contentHash") DO NOTHING
+        RETURNING "contentHash"
+        """,
+        *params,
+    )
+    return {row["contentHash"] for row in inserted}
+
+
+# ── Fetching ──────────────────────────────────────────────────────────────────
+
+@dataclass
+class FeedResponse:
+    not_modified: bool
+    content: bytes = b""
+    headers: Optional[dict] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+def _http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        follow_redirects=True,
+        timeout=FETCH_TIMEOUT_SECONDS,
+        headers={"User-Agent": _USER_AGENT},
+        limits=httpx.Limits(max_connections=MAX_CONCURRENT_FETCHES),
+    )
+
+
+async def _fetch_feed(http: httpx.AsyncClient, source: Any) -> FeedResponse:
+    """Conditional GET of a source's feed; raises on network errors and non-2xx/304 replies."""
+    headers = {}
+    if source.feedEtag:
+        headers["If-None-Match"] = source.feedEtag
+    if source.feedLastModified:
+        headers["If-Modified-Since"] = source.feedLastModified
+
+    response = await http.get(source.feedUrl, headers=headers)
+    if response.status_code == 304:
+        return FeedResponse(not_modified=True)
+    response.raise_for_status()
+    return FeedResponse(
+        not_modified=False,
+        content=response.content,
+        headers=dict(response.headers),
+        etag=response.headers.get("etag"),
+        last_modified=response.headers.get("last-modified"),
+    )
+
+
 # ── Core ingestion ────────────────────────────────────────────────────────────
 
 async def ingest_source(source_id: str) -> int:
@@ -69,24 +193,36 @@ async def ingest_source(source_id: str) -> int:
     source = await prisma.monitoringsource.find_unique(where={"id": source_id})
     if not source or not source.feedUrl or not source.active:
         return 0
+    async with _http_client() as http:
+        return await _ingest(source, http)
 
+
+async def _ingest(source: Any, http: httpx.AsyncClient) -> int:
+    source_id = source.id
     logger.info(f"Fetching feed: {source.name} ({source.feedUrl})")
 
-    # Run blocking feedparser call off the event loop
-    loop = asyncio.get_event_loop()
     try:
-        feed = await asyncio.wait_for(
-            loop.run_in_executor(None, feedparser.parse, source.feedUrl),
-            timeout=30.0,
-        )
-    except asyncio.TimeoutError:
+        fetched = await _fetch_feed(http, source)
+    except httpx.TimeoutException:
         logger.warning(f"Feed timeout for {source.name} ({source.feedUrl})")
         return 0
     except Exception as exc:
         logger.warning(f"Feed fetch error for {source.name}: {exc}")
         return 0
 
+    if fetched.not_modified:
+        logger.info(f"ℹ️  {source.name}: feed not modified")
+        await prisma.monitoringsource.update(
+            where={"id": source_id},
+            data={"lastFetched": datetime.now(timezone.utc)},
+        )
+        return 0
+
+    # Parse the downloaded bytes off the event loop
+    feed = await asyncio.to_thread(feedparser.parse, fetched.content, response_headers=fetched.headers)
+
     if feed.bozo and not feed.entries:
+        # Validators are not stored, so a broken feed is re-downloaded next run
         logger.warning(f"Malformed or empty feed for {source.name}: {getattr(feed, 'bozo_exception', 'unknown')}")
         await prisma.monitoringsource.update(
             where={"id": source_id},
@@ -94,49 +230,32 @@ async def ingest_source(source_id: str) -> int:
         )
         return 0
 
-    new_count = 0
-    for entry in feed.entries[:25]:
-        title       = _strip_html(getattr(entry, "title", "") or "").strip() or "(no title)"
-        url         = getattr(entry, "link", None) or None
-        raw_summary = getattr(entry, "summary", None) or getattr(entry, "description", None) or ""
-        summary     = _strip_html(raw_summary)[:600] or None
-        published_raw = getattr(entry, "published", "") or getattr(entry, "updated", "") or ""
-        published   = _parse_published(entry)
-        hash_val    = _content_hash(title, url, published_raw)
+    events = _events_from_entries(feed.entries, source_id)
+    inserted = await _insert_new_events(events)
+    new_count = len(inserted)
 
-        # Skip duplicates
-        existing = await prisma.monitoringevent.find_first(where={"contentHash": hash_val})
-        if existing:
+    for event in events:
+        if event["contentHash"] not in inserted:
             continue
-
-        severity = _severity_from_entry(title, summary or "")
-
-        await prisma.monitoringevent.create(data={
-            "sourceId":    source_id,
-            "title":       title[:255],
-            "summary":     summary,
-            "url":         url,
-            "contentHash": hash_val,
-            "severity":    severity,
-            "publishedAt": published,
-        })
-        new_count += 1
-
-        # Fire email notifications for matching subscribers (best-effort, non-blocking)
+        # Queue email notifications for matching subscribers (best-effort, non-blocking)
         try:
             await _notify_subscribers(
-                title=title[:255],
-                url=url,
+                title=event["title"],
+                url=event["url"],
                 source_name=source.name,
                 jurisdiction=source.jurisdiction,
-                severity=severity,
+                severity=event["severity"],
             )
         except Exception as exc:
-            logger.warning(f"Notification dispatch failed for event '{title[:60]}': {exc}")
+            logger.warning(f"Notification dispatch failed for event '{event['title'][:60]}': {exc}")
 
     await prisma.monitoringsource.update(
         where={"id": source_id},
-        data={"lastFetched": datetime.now(timezone.utc)},
+        data={
+            "lastFetched": datetime.now(timezone.utc),
+            "feedEtag": fetched.etag,
+            "feedLastModified": fetched.last_modified,
+        },
     )
 
     if new_count:
@@ -155,10 +274,12 @@ async def _notify_subscribers(
     severity: str,
 ) -> None:
     """
-    Send email alerts to all active NotificationPreference records whose
+    Queue email alerts for all active NotificationPreference records whose
     jurisdiction filter matches (or is empty, meaning subscribe to all).
+    Delivery happens in the background (src/services/email_queue.py).
     """
-    from src.utils.email import send_email, build_monitoring_alert_html  # lazy import
+    from src.services.email_queue import email_queue  # lazy import
+    from src.utils.email import build_monitoring_alert_html
 
     prefs = await prisma.notificationpreference.find_many(where={"active": True})
     if not prefs:
@@ -177,7 +298,7 @@ async def _notify_subscribers(
         # Empty jurisdictions list = subscribe to everything
         if pref.jurisdictions and jurisdiction and jurisdiction.upper() not in [j.upper() for j in pref.jurisdictions]:
             continue
-        await send_email(to=pref.emailAddress, subject=subject, body_html=html)
+        email_queue.enqueue(to=pref.emailAddress, subject=subject, html=html)
 
 
 async def ingest_all_sources() -> int:
@@ -196,12 +317,18 @@ async def ingest_all_sources() -> int:
         return 0
 
     logger.info(f"Starting feed ingestion for {len(sources)} source(s)")
-    total = 0
-    for source in sources:
-        try:
-            total += await ingest_source(source.id)
-        except Exception as exc:
-            logger.error(f"Ingestion error for source {source.name}: {exc}", exc_info=True)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+
+    async def _one(source) -> int:
+        async with semaphore:
+            try:
+                return await _ingest(source, http)
+            except Exception as exc:
+                logger.error(f"Ingestion error for source {source.name}: {exc}", exc_info=True)
+                return 0
+
+    async with _http_client() as http:
+        total = sum(await asyncio.gather(*(_one(source) for source in sources)))
 
     logger.info(f"Feed ingestion complete — {total} new event(s) from {len(sources)} source(s)")
     return total
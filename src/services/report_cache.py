@@ -0,0 +1,200 @@
+"""
+On-disk cache of generated report documents.
+
+Comparison and scenario reports (PDF and Excel) are pure functions of the
+request, the rule tables and the day they are generated on (the documents
+print the date), so a repeat of the same request is served from disk instead
+of being rendered again:
+
+  - ``cache_key()`` hashes the kind, the format, the request in canonical
+    JSON, the rule catalog's content fingerprint and today's date; the key is
+    the file name and, quoted, the response ETag
+  - a client presenting that ETag in If-None-Match gets a 304 without the
+    file being touched; ``*`` only matches while the document is cached.
+    The report endpoints are POSTs, for which RFC 9110 says a failed
+    If-None-Match is a 412; they answer 304 instead on purpose, because the
+    POST is a read (the body is the query) and clients revalidate downloads
+    with it exactly as they would a GET
+  - files are written atomically (temp file + rename), so concurrent workers
+    sharing the directory never see a partial document
+  - the directory is bounded by MAX_BYTES; the least recently served files
+    are evicted first
+
+Cache directory and size come from REPORT_CACHE_DIR and
+REPORT_CACHE_MAX_BYTES. Recency is tracked in this process and persisted as
+the file mtime, so a restart picks the LRU order back up from the disk.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_BYTES = 512 * 1024 * 1024
+_DIR_ENV = "REPORT_CACHE_DIR"
+_MAX_BYTES_ENV = "REPORT_CACHE_MAX_BYTES"
+
+FORMATS = {
+    "pdf": "application/pdf",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def cache_key(kind: str, fmt: str, request: Dict[str, Any], catalog_fingerprint: str) -> str:
+    """Content address of one rendered document."""
+    normalized = json.dumps(
+        {"kind": kind, "format": fmt, "request": request,
+         "catalog": catalog_fingerprint, "date": date.today().isoformat()},
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def etag(key: str) -> str:
+    return f'"{key}"'
+
+
+def etag_matches(if_none_match: Optional[str], key: str, cached: bool = False) -> bool:
+    """True if an If-None-Match header names this key (weak or strong), or is * and the document is cached."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            if cached:
+                return True
+        elif tag.removeprefix("W/") == etag(key):
+            return True
+    return False
+
+
+class ReportCache:
+    def __init__(self, directory: Optional[Path] = None, max_bytes: Optional[int] = None) -> None:
+        self._configured_dir = directory
+        self._configured_max = max_bytes
+        self._index: Optional["OrderedDict[str, int]"] = None    # file name -> size, least recent first
+        self._size = 0
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+    @property
+    def directory(self) -> Path:
+        if self._configured_dir is not None:
+            return self._configured_dir
+        configured = (os.getenv(_DIR_ENV) or "").strip()
+        return Path(configured) if configured else Path(tempfile.gettempdir()) / "tax-incentive-reports"
+
+    @property
+    def max_bytes(self) -> int:
+        if self._configured_max is not None:
+            return self._configured_max
+        configured = (os.getenv(_MAX_BYTES_ENV) or "").strip()
+        return int(configured) if configured.isdigit() else MAX_BYTES
+
+    def get(self, key: str, fmt: str) -> Optional[Path]:
+        """Path of the cached document, or None. Marks it most recently used."""
+        name = f"{key}.{fmt}"
+        path = self.directory / name
+        with self._lock:
+            index = self._load_index()
+            if name not in index:
+                # Another worker may have written it since we scanned
+                try:
+                    size = path.stat().st_size
+                except OSError:
+                    self._counts["misses"] += 1
+                    return None
+                index[name] = size
+                self._size += size
+            index.move_to_end(name)
+            self._counts["hits"] += 1
+        try:
+            os.utime(path)
+        except OSError:
+            # Evicted by another worker between the check and now
+            with self._lock:
+                self._forget(name)
+                self._counts["hits"] -= 1
+                self._counts["misses"] += 1
+            return None
+        return path
+
+    def put(self, key: str, fmt: str, data: bytes) -> Path:
+        """Store a document and evict least recently used ones past max_bytes."""
+        directory = self.directory
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"{key}.{fmt}"
+        path = directory / name
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            index = self._load_index()
+            self._forget(name)
+            index[name] = len(data)
+            self._size += len(data)
+            self._counts["stored"] += 1
+            self._evict(keep=name)
+        return path
+
+    def clear(self) -> None:
+        with self._lock:
+            for name in list(self._load_index()):
+                (self.directory / name).unlink(missing_ok=True)
+            self._index, self._size = None, 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            index = self._load_index()
+            return {**self._counts, "entries": len(index), "bytes": self._size, "maxBytes": self.max_bytes}
+
+    # ── Internals (call with the lock held) ───────────────────────────────────
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            entries = []
+            try:
+                for entry in os.scandir(self.directory):
+                    if entry.is_file() and not entry.name.startswith("."):
+                        st = entry.stat()
+                        entries.append((st.st_mtime, entry.name, st.st_size))
+            except FileNotFoundError:
+                pass
+            entries.sort()
+            self._index = OrderedDict((name, size) for _, name, size in entries)
+            self._size = sum(size for _, _, size in entries)
+        return self._index
+
+    def _forget(self, name: str) -> None:
+        size = self._index.pop(name, None) if self._index is not None else None
+        if size is not None:
+            self._size -= size
+
+    def _evict(self, keep: str) -> None:
+        limit = self.max_bytes
+        for name in list(self._index):
+            if self._size <= limit:
+                break
+            if name == keep:
+                continue
+            (self.directory / name).unlink(missing_ok=True)
+            self._forget(name)
+            self._counts["evicted"] += 1
+            logger.info(f"Report cache evicted {name}")
+
+
+report_cache = ReportCache()
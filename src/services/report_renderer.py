@@ -0,0 +1,230 @@
+"""
+Off-loop PDF rendering
+
+reportlab is pure-Python CPU work, so report PDFs are rendered on a process
+pool instead of in the route handler:
+
+  - ``submit()`` queues a render and returns a RenderJob at once; at most
+    eight jobs per worker may be waiting or running, beyond that it raises
+    RendererBusy and the endpoint answers 503 with Retry-After
+  - the endpoint waits a few seconds for the job; small reports come back
+    inline, anything slower is handed to the client as a job to poll at
+    /reports/jobs/{id} and download when done
+  - each job records how long it queued and how long it rendered; the
+    endpoints expose both as a Server-Timing header
+
+Jobs and their PDFs live in this API process for RESULT_TTL_SECONDS after
+they finish. If a worker dies, its pool is discarded and the jobs on it fail;
+the next submit starts a fresh pool.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INLINE_WAIT_SECONDS = 3.0         # longer than this and the client gets a job handle
+RENDER_TIMEOUT_SECONDS = 120.0    # longest an inline=true request waits
+RESULT_TTL_SECONDS = 900
+MAX_RETAINED_JOBS = 256
+_WORKERS_ENV = "REPORT_RENDER_WORKERS"
+
+REPORT_KINDS = ("comparison", "compliance", "scenario")
+
+
+class RendererBusy(Exception):
+    """Too many renders already waiting; try again shortly."""
+
+
+@dataclass
+class RenderJob:
+    id: str
+    kind: str
+    filename: str
+    submitted_at: float = field(default_factory=time.time)
+    status: str = "pending"           # pending | done | failed
+    pdf: Optional[bytes] = None
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    render_seconds: Optional[float] = None
+    cache_key: Optional[str] = None   # set when the PDF also goes to the report cache
+    future: Optional[asyncio.Future] = field(default=None, repr=False)
+
+    @property
+    def queue_seconds(self) -> Optional[float]:
+        return self.started_at - self.submitted_at if self.started_at is not None else None
+
+    def server_timing(self) -> str:
+        return f"queue;dur={(self.queue_seconds or 0) * 1000:.1f}, render;dur={(self.render_seconds or 0) * 1000:.1f}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        def iso(ts: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts is not None else None
+
+        return {
+            "jobId": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "filename": self.filename,
+            "submittedAt": iso(self.submitted_at),
+            "finishedAt": iso(self.finished_at),
+            "queueSeconds": round(self.queue_seconds, 3) if self.queue_seconds is not None else None,
+            "renderSeconds": round(self.render_seconds, 3) if self.render_seconds is not None else None,
+            "sizeBytes": len(self.pdf) if self.pdf is not None else None,
+            "error": self.error,
+        }
+
+
+# ── Worker side ───────────────────────────────────────────────────────────────
+
+def render_report(kind: str, kwargs: Dict[str, Any]) -> Tuple[bytes, float, float]:
+    """Process-pool entry point: returns (pdf bytes, wall-clock start, render seconds)."""
+    from src.utils.pdf_generator import pdf_generator     # built once per worker process
+
+    started = time.time()
+    t0 = time.perf_counter()
+    pdf = getattr(pdf_generator, f"generate_{kind}_report")(**kwargs)
+    return pdf, started, time.perf_counter() - t0
+
+
+# ── Pool ──────────────────────────────────────────────────────────────────────
+
+_pool: Optional[Executor] = None
+_pool_workers = 0
+_jobs: "OrderedDict[str, RenderJob]" = OrderedDict()
+_counts: Dict[str, float] = {"completed": 0, "failed": 0, "rejected": 0, "render_seconds": 0.0}
+
+
+def _worker_count() -> int:
+    configured = (os.getenv(_WORKERS_ENV) or "").strip()
+    if configured.isdigit() and int(configured) > 0:
+        return int(configured)
+    return max(1, min(os.cpu_count() or 1, 4))
+
+
+def max_pending() -> int:
+    return _worker_count() * 8
+
+
+def get_render_pool() -> Executor:
+    """Lazily start the shared render pool."""
+    global _pool, _pool_workers
+    if _pool is None:
+        _pool_workers = _worker_count()
+        # spawn: the API process runs threads (anyio, file watcher) that fork would copy mid-state
+        _pool = ProcessPoolExecutor(
+            max_workers=_pool_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info(f"Report render pool started with {_pool_workers} workers")
+    return _pool
+
+
+def shutdown_report_renderer() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _discard_pool(pool: Executor) -> None:
+    """Shut down a broken pool; the next get_render_pool() starts a new one."""
+    global _pool
+    if _pool is pool:
+        _pool = None
+        logger.error("Report render pool crashed; starting a new one")
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ── Jobs ──────────────────────────────────────────────────────────────────────
+
+def _prune() -> None:
+    now = time.time()
+    for job_id, job in list(_jobs.items()):
+        expired = job.finished_at is not None and now - job.finished_at > RESULT_TTL_SECONDS
+        if expired or (len(_jobs) > MAX_RETAINED_JOBS and job.status != "pending"):
+            del _jobs[job_id]
+
+
+def pending_count() -> int:
+    return sum(1 for job in _jobs.values() if job.status == "pending")
+
+
+def submit(kind: str, filename: str, kwargs: Dict[str, Any], cache_key: Optional[str] = None) -> RenderJob:
+    """Queue a render on the pool. Raises RendererBusy when the queue is full."""
+    if kind not in REPORT_KINDS:
+        raise ValueError(f"Unknown report kind: {kind}")
+    _prune()
+    if pending_count() >= max_pending():
+        _counts["rejected"] += 1
+        raise RendererBusy(f"{pending_count()} reports already rendering")
+
+    loop = asyncio.get_running_loop()
+    job = RenderJob(id=str(uuid.uuid4()), kind=kind, filename=filename, cache_key=cache_key)
+    pool = get_render_pool()
+    try:
+        future = loop.run_in_executor(pool, render_report, kind, kwargs)
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        pool = get_render_pool()
+        future = loop.run_in_executor(pool, render_report, kind, kwargs)
+
+    def _finished(fut: asyncio.Future) -> None:
+        job.finished_at = time.time()
+        try:
+            job.pdf, job.started_at, job.render_seconds = fut.result()
+        except (Exception, asyncio.CancelledError) as e:
+            if isinstance(e, BrokenProcessPool):
+                _discard_pool(pool)
+            job.status = "failed"
+            job.error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            _counts["failed"] += 1
+            logger.error(f"❌ {kind} report {job.id} failed to render: {job.error}")
+            return
+        job.status = "done"
+        _counts["completed"] += 1
+        _counts["render_seconds"] += job.render_seconds
+        logger.info(f"📄 {kind} report {job.id}: queued {job.queue_seconds:.2f}s, rendered {job.render_seconds:.2f}s, {len(job.pdf):,} bytes")
+
+    future.add_done_callback(_finished)
+    job.future = future
+    _jobs[job.id] = job
+    return job
+
+
+async def wait(job: RenderJob, timeout: float) -> bool:
+    """Wait up to timeout seconds for a job; True once it has finished either way."""
+    if job.status == "pending" and job.future is not None and timeout > 0:
+        # The job's done callback was registered first, so it has run by the time this returns
+        await asyncio.wait({job.future}, timeout=timeout)
+    return job.status != "pending"
+
+
+def get_job(job_id: str) -> Optional[RenderJob]:
+    _prune()
+    return _jobs.get(job_id)
+
+
+def stats() -> Dict[str, Any]:
+    completed = int(_counts["completed"])
+    return {
+        "workers": _pool_workers or _worker_count(),
+        "pending": pending_count(),
+        "maxPending": max_pending(),
+        "completed": completed,
+        "failed": int(_counts["failed"]),
+        "rejected": int(_counts["rejected"]),
+        "avgRenderSeconds": round(_counts["render_seconds"] / completed, 3) if completed else None,
+    }
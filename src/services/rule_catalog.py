@@ -0,0 +1,324 @@
+"""
+In-process incentive rule catalog.
+
+Holds every Jurisdiction, IncentiveRule, LocalRule and InheritancePolicy row in
+memory, indexed by id / code / parent, so the calculator, stacking engine,
+reports, Excel exports and the Largo integration can resolve rules without a
+database round-trip per request.
+
+The catalog is loaded once in the FastAPI lifespan (src/main.py) and is
+read-through: the first read after an invalidation reloads all four tables in
+a single pass. Endpoints that write jurisdictions or rules call
+``rule_catalog.invalidate()`` once the write has committed.
+
+Readers take a ``CatalogSnapshot`` and do synchronous lookups against it. A
+snapshot is never mutated after it is built — a reload swaps in a new one —
+so a request always sees a consistent view even if an invalidation lands
+mid-request. ``version`` increments on every reload so callers can key
+in-process caches on it; ``fingerprint`` is a digest of the rows themselves,
+for caches that outlive the process (it is the same after a restart, and on
+every replica, as long as the rule tables are).
+
+``invalidate()`` only reaches the current process. Other API replicas, the
+seed/update scripts, src/setup_database.py and direct SQL write the same
+tables without telling us, so ``snapshot()`` also guards against staleness:
+
+  - every PROBE_INTERVAL_SECONDS one reader runs a single cheap query for the
+    row count and max("updatedAt") of the rule tables, plus a digest of the
+    jurisdictions' rule-relevant columns (feed monitoring writes to that table
+    on every pass and must not count as a rule change), and reloads if that
+    fingerprint moved
+  - a snapshot older than MAX_AGE_SECONDS is reloaded regardless, which also
+    covers raw SQL updates that leave "updatedAt" untouched
+
+So a write made elsewhere is served stale for at most PROBE_INTERVAL_SECONDS
+(or MAX_AGE_SECONDS if it bypasses "updatedAt").
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.database import prisma
+
+logger = logging.getLogger(__name__)
+
+PROBE_INTERVAL_SECONDS = 30.0
+MAX_AGE_SECONDS = 600.0
+# Columns left out of CatalogSnapshot.fingerprint: the monitor rewrites the feed
+# columns on every pass, and timestamps change without the content changing
+FINGERPRINT_EXCLUDED_FIELDS = frozenset({
+    "createdAt", "updatedAt", "feedUrl", "feedLastChecked", "feedLastHash", "feedSnapshot",
+})
+
+# The monitor rewrites the jurisdictions' feed columns (and so "updatedAt") on
+# every pass, so that table is probed by a digest of its rule-relevant columns
+_FINGERPRINT_SQL = """
+SELECT 'jurisdictions' AS "table", COUNT(*)::bigint AS "rows", md5(string_agg(
+    ROW(id, name, code, country, type, description, website, currency, "treatyPartners", active, "parentId")::text,
+    E'\\n' ORDER BY id
+)) AS "marker" FROM jurisdictions
+UNION ALL
+SELECT 'incentive_rules', COUNT(*)::bigint, MAX("updatedAt")::text FROM incentive_rules
+UNION ALL
+SELECT 'local_rules', COUNT(*)::bigint, MAX("updatedAt")::text FROM local_rules
+UNION ALL
+SELECT 'inheritance_policies', COUNT(*)::bigint, MAX("updatedAt")::text FROM inheritance_policies
+"""
+
+
+# ── Snapshot ──────────────────────────────────────────────────────────────────
+
+def row_content(row: Any) -> str:
+    """Canonical JSON of a catalog row's rule content, without FINGERPRINT_EXCLUDED_FIELDS."""
+    data = row.model_dump() if hasattr(row, "model_dump") else vars(row)
+    return json.dumps(
+        {k: v for k, v in data.items() if k not in FINGERPRINT_EXCLUDED_FIELDS}, sort_keys=True, default=str
+    )
+
+
+class CatalogSnapshot:
+    """Immutable, indexed view of the rule tables at one point in time."""
+
+    def __init__(
+        self,
+        version: int,
+        jurisdictions: List[Any],
+        incentive_rules: List[Any],
+        local_rules: List[Any],
+        policies: List[Any],
+    ) -> None:
+        self.version = version
+        self.loaded_at = datetime.now(timezone.utc)
+        self._rows = (jurisdictions, incentive_rules, local_rules, policies)
+        self._fingerprint: Optional[str] = None
+
+        self._jurisdictions = sorted(jurisdictions, key=lambda j: j.name)
+        self._jur_by_id: Dict[str, Any] = {j.id: j for j in jurisdictions}
+        self._jur_by_code: Dict[str, Any] = {j.code: j for j in jurisdictions}
+        self._children: Dict[str, List[Any]] = defaultdict(list)
+        for j in self._jurisdictions:
+            if j.parentId:
+                self._children[j.parentId].append(j)
+
+        # Ancestry closure: id -> (parent, grandparent, …), stopping at a missing parent or a cycle
+        self._ancestors: Dict[str, Tuple[Any, ...]] = {}
+        for j in jurisdictions:
+            chain: List[Any] = []
+            seen = {j.id}
+            parent = self._jur_by_id.get(j.parentId) if j.parentId else None
+            while parent is not None and parent.id not in seen:
+                chain.append(parent)
+                seen.add(parent.id)
+                parent = self._jur_by_id.get(parent.parentId) if parent.parentId else None
+            self._ancestors[j.id] = tuple(chain)
+
+        self._rule_by_id: Dict[str, Any] = {r.id: r for r in incentive_rules}
+        self._rules_by_jur: Dict[str, List[Any]] = defaultdict(list)
+        for r in incentive_rules:
+            self._rules_by_jur[r.jurisdictionId].append(r)
+
+        self._local_by_jur: Dict[str, List[Any]] = defaultdict(list)
+        for r in local_rules:
+            self._local_by_jur[r.jurisdictionId].append(r)
+
+        self._policies_by_child: Dict[str, List[Any]] = defaultdict(list)
+        for p in sorted(policies, key=lambda p: p.priority):
+            self._policies_by_child[p.childJurisdictionId].append(p)
+
+        self.counts = {
+            "jurisdictions": len(jurisdictions),
+            "incentiveRules": len(incentive_rules),
+            "localRules": len(local_rules),
+            "inheritancePolicies": len(policies),
+        }
+
+    @property
+    def fingerprint(self) -> str:
+        """sha256 of every row's rule content (see FINGERPRINT_EXCLUDED_FIELDS), computed on first use."""
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            for table, rows in zip(("jurisdictions", "incentive_rules", "local_rules", "policies"), self._rows):
+                digest.update(table.encode())
+                for row in sorted(rows, key=lambda r: r.id):
+                    digest.update(row_content(row).encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    # Jurisdictions
+
+    def jurisdictions(self, active_only: bool = False) -> List[Any]:
+        """All jurisdictions ordered by name."""
+        if active_only:
+            return [j for j in self._jurisdictions if j.active]
+        return list(self._jurisdictions)
+
+    def jurisdiction(self, jurisdiction_id: str) -> Optional[Any]:
+        return self._jur_by_id.get(jurisdiction_id)
+
+    def jurisdiction_by_code(self, code: str) -> Optional[Any]:
+        return self._jur_by_code.get(code)
+
+    def children(self, parent_id: str) -> List[Any]:
+        return list(self._children.get(parent_id, ()))
+
+    def ancestors(self, jurisdiction_id: str) -> List[Any]:
+        """Parent, grandparent, … up to the root, nearest first."""
+        return list(self._ancestors.get(jurisdiction_id, ()))
+
+    # Incentive rules
+
+    def incentive_rule(self, rule_id: str) -> Optional[Any]:
+        return self._rule_by_id.get(rule_id)
+
+    def incentive_rules(self, jurisdiction_id: str, active_only: bool = False) -> List[Any]:
+        rules = self._rules_by_jur.get(jurisdiction_id, ())
+        if active_only:
+            return [r for r in rules if r.active]
+        return list(rules)
+
+    # Local rules
+
+    def local_rules(self, jurisdiction_id: str, active_only: bool = False) -> List[Any]:
+        rules = self._local_by_jur.get(jurisdiction_id, ())
+        if active_only:
+            return [r for r in rules if r.active]
+        return list(rules)
+
+    # Inheritance policies
+
+    def policies(self, child_id: str) -> List[Any]:
+        """Policies for a child jurisdiction, ordered by ascending priority."""
+        return list(self._policies_by_child.get(child_id, ()))
+
+    def policy(self, child_id: str, parent_id: str) -> Optional[Any]:
+        for p in self._policies_by_child.get(child_id, ()):
+            if p.parentJurisdictionId == parent_id:
+                return p
+        return None
+
+    def policies_between(self, child_id: str, parent_id: str) -> List[Any]:
+        """Every policy (one per ruleCategory) on a child → parent edge, ordered by ascending priority."""
+        return [p for p in self._policies_by_child.get(child_id, ()) if p.parentJurisdictionId == parent_id]
+
+
+# ── Catalog ───────────────────────────────────────────────────────────────────
+
+class RuleCatalog:
+    """Read-through holder for the current ``CatalogSnapshot``."""
+
+    def __init__(
+        self,
+        probe_interval: float = PROBE_INTERVAL_SECONDS,
+        max_age: float = MAX_AGE_SECONDS,
+    ) -> None:
+        self.probe_interval = probe_interval
+        self.max_age = max_age
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._version = 0
+        self._generation = 0
+        self._lock = asyncio.Lock()
+        self._clock = time.monotonic
+        self._loaded_mono = 0.0
+        self._probed_mono = 0.0
+        self._fingerprint: Optional[Tuple] = None
+        self._probing = False
+
+    @property
+    def version(self) -> int:
+        """Version of the most recently loaded snapshot (0 before first load)."""
+        return self._version
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._snapshot is not None
+
+    async def load(self) -> CatalogSnapshot:
+        """Fetch all rule tables and install a fresh snapshot."""
+        async with self._lock:
+            return await self._load_locked()
+
+    async def snapshot(self) -> CatalogSnapshot:
+        """Return the current snapshot, reloading first if it was invalidated or is stale."""
+        snap = self._snapshot
+        if snap is not None:
+            now = self._clock()
+            if now - self._loaded_mono >= self.max_age:
+                logger.info(f"Rule catalog v{snap.version} exceeded max age — reloading")
+                self.invalidate()
+            elif now - self._probed_mono >= self.probe_interval and not self._probing:
+                await self._probe(snap)
+            snap = self._snapshot
+            if snap is not None:
+                return snap
+        async with self._lock:
+            # Another waiter may have reloaded while we queued on the lock
+            if self._snapshot is not None:
+                return self._snapshot
+            return await self._load_locked()
+
+    def invalidate(self) -> None:
+        """Drop the current snapshot; the next read reloads from the database."""
+        self._generation += 1
+        if self._snapshot is not None:
+            logger.info(f"Rule catalog v{self._version} invalidated")
+        self._snapshot = None
+
+    async def _probe(self, snap: CatalogSnapshot) -> None:
+        # One reader probes; everyone else keeps using the current snapshot meanwhile
+        self._probing = True
+        try:
+            fingerprint = await self._read_fingerprint()
+        finally:
+            self._probing = False
+            self._probed_mono = self._clock()
+        if fingerprint is None or self._fingerprint is None:
+            return
+        if fingerprint != self._fingerprint and self._snapshot is snap:
+            logger.info(f"Rule tables changed outside this process — reloading catalog v{snap.version}")
+            self.invalidate()
+
+    async def _read_fingerprint(self) -> Optional[Tuple]:
+        try:
+            rows = await prisma.query_raw(_FINGERPRINT_SQL)
+        except Exception as e:
+            logger.warning(f"Rule catalog staleness probe failed: {e}")
+            return None
+        return tuple(sorted((r["table"], int(r["rows"]), str(r["marker"])) for r in rows))
+
+    async def _load_locked(self) -> CatalogSnapshot:
+        generation = self._generation
+        # Fingerprint first: a write landing during the load then shows up on the next probe
+        fingerprint = await self._read_fingerprint()
+        jurisdictions, incentive_rules, local_rules, policies = await asyncio.gather(
+            prisma.jurisdiction.find_many(),
+            prisma.incentiverule.find_many(),
+            prisma.localrule.find_many(),
+            prisma.inheritancepolicy.find_many(),
+        )
+        self._version += 1
+        snap = CatalogSnapshot(self._version, jurisdictions, incentive_rules, local_rules, policies)
+
+        # A write that invalidated while we were reading may not be reflected
+        # in these rows — hand the snapshot to this caller but don't keep it.
+        if generation == self._generation:
+            self._snapshot = snap
+            self._fingerprint = fingerprint
+            self._loaded_mono = self._probed_mono = self._clock()
+        logger.info(
+            f"Rule catalog v{snap.version} loaded — "
+            f"{snap.counts['jurisdictions']} jurisdictions, "
+            f"{snap.counts['incentiveRules']} incentive rules, "
+            f"{snap.counts['localRules']} local rules, "
+            f"{snap.counts['inheritancePolicies']} inheritance policies"
+        )
+        return snap
+
+
+rule_catalog = RuleCatalog()
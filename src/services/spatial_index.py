@@ -0,0 +1,257 @@
+"""
+Point-in-polygon index for jurisdiction boundaries.
+
+Loads state / county / city boundary polygons from GeoJSON files and answers
+"which jurisdictions contain this lat/lng?" with exact polygon tests, so the
+maximizer evaluates only the layers a location really sits in.
+
+Data:
+  - Every *.geojson / *.json FeatureCollection under BOUNDARIES_DIR
+    (env JURISDICTION_BOUNDARIES_DIR, default <repo>/data/boundaries) is
+    loaded once, on first use.
+  - Each Feature needs ``properties.code`` matching Jurisdiction.code
+    (e.g. "IL", "IL-COOK", "IL-CHICAGO"); ``properties.type`` (state,
+    county, city, …) and ``properties.name`` are optional. The state of a
+    sub-jurisdiction is the code prefix before the first "-".
+  - Geometry is Polygon or MultiPolygon in WGS-84 (lng, lat), holes allowed.
+
+Index:
+  - A uniform grid (CELL_DEGREES) maps each cell to the boundaries whose
+    bounding box overlaps it. A lookup touches one cell, prefilters by
+    bounding box and ray-casts only the few polygons left; rings with many
+    vertices are tested with NumPy.
+
+States that have no county/city polygons loaded are flagged by
+``has_subdivisions()`` so callers can fall back to "state + all children".
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+_BOUNDARIES_ENV = "JURISDICTION_BOUNDARIES_DIR"
+
+CELL_DEGREES = 0.5
+_NUMPY_RING_MIN = 64     # rings shorter than this are faster in pure Python
+
+# Same ordering the maximizer uses for conflict priority
+LEVELS = {
+    "federal": 0, "country": 0,
+    "state": 1, "province": 1,
+    "county": 2, "parish": 2, "borough": 2,
+    "city": 3, "town": 3,
+    "village": 4, "district": 4, "special": 4,
+}
+
+Ring = Tuple[Tuple[float, float], ...]
+
+
+def get_boundaries_dir() -> Path:
+    override = (os.getenv(_BOUNDARIES_ENV) or "").strip()
+    if override:
+        p = Path(override)
+        return p if p.is_absolute() else (REPO_ROOT / p).resolve()
+    return REPO_ROOT / "data" / "boundaries"
+
+
+# ── Geometry ──────────────────────────────────────────────────────────────────
+
+def _point_in_ring(lng: float, lat: float, ring) -> bool:
+    """Even-odd ray casting; ``ring`` is a tuple of (lng, lat) or an (n, 2) array."""
+    if isinstance(ring, np.ndarray):
+        x0, y0 = ring[:, 0], ring[:, 1]
+        x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+        crosses = (y0 > lat) != (y1 > lat)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_at = x0 + (lat - y0) * (x1 - x0) / (y1 - y0)
+        return bool(np.count_nonzero(crosses & (lng < x_at)) % 2)
+
+    inside = False
+    x0, y0 = ring[-1]
+    for x1, y1 in ring:
+        if (y1 > lat) != (y0 > lat) and lng < x1 + (lat - y1) * (x0 - x1) / (y0 - y1):
+            inside = not inside
+        x0, y0 = x1, y1
+    return inside
+
+
+@dataclass(frozen=True)
+class _Polygon:
+    bbox: Tuple[float, float, float, float]     # min_lng, min_lat, max_lng, max_lat
+    outer: object
+    holes: Tuple[object, ...]
+
+    def contains(self, lng: float, lat: float) -> bool:
+        min_lng, min_lat, max_lng, max_lat = self.bbox
+        if not (min_lng <= lng <= max_lng and min_lat <= lat <= max_lat):
+            return False
+        if not _point_in_ring(lng, lat, self.outer):
+            return False
+        return not any(_point_in_ring(lng, lat, h) for h in self.holes)
+
+
+def _prepare_ring(coords: Sequence[Sequence[float]]):
+    ring = tuple((float(c[0]), float(c[1])) for c in coords)
+    if len(ring) > 1 and ring[0] == ring[-1]:
+        ring = ring[:-1]
+    if len(ring) >= _NUMPY_RING_MIN:
+        return np.asarray(ring, dtype=float)
+    return ring
+
+
+def _ring_bbox(coords: Sequence[Sequence[float]]) -> Tuple[float, float, float, float]:
+    xs = [c[0] for c in coords]
+    ys = [c[1] for c in coords]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+@dataclass(frozen=True)
+class Boundary:
+    code: str
+    name: str
+    type: str
+    level: int
+    state: str
+    bbox: Tuple[float, float, float, float]
+    polygons: Tuple[_Polygon, ...]
+
+    def contains(self, lat: float, lng: float) -> bool:
+        return any(p.contains(lng, lat) for p in self.polygons)
+
+
+def boundary_from_feature(feature: dict) -> Optional[Boundary]:
+    """Build a Boundary from a GeoJSON Feature; None if it has no code or usable geometry."""
+    props = feature.get("properties") or {}
+    code = str(props.get("code") or "").strip().upper()
+    geometry = feature.get("geometry") or {}
+    gtype = geometry.get("type")
+    coords = geometry.get("coordinates") or []
+    if not code or gtype not in ("Polygon", "MultiPolygon"):
+        return None
+
+    parts = [coords] if gtype == "Polygon" else coords
+    polygons = []
+    for rings in parts:
+        if not rings or len(rings[0]) < 3:
+            continue
+        polygons.append(_Polygon(
+            bbox=_ring_bbox(rings[0]),
+            outer=_prepare_ring(rings[0]),
+            holes=tuple(_prepare_ring(h) for h in rings[1:] if len(h) >= 3),
+        ))
+    if not polygons:
+        return None
+
+    jtype = str(props.get("type") or ("state" if "-" not in code else "county")).lower()
+    return Boundary(
+        code=code,
+        name=str(props.get("name") or code),
+        type=jtype,
+        level=LEVELS.get(jtype, 5),
+        state=code.split("-", 1)[0],
+        bbox=(
+            min(p.bbox[0] for p in polygons), min(p.bbox[1] for p in polygons),
+            max(p.bbox[2] for p in polygons), max(p.bbox[3] for p in polygons),
+        ),
+        polygons=tuple(polygons),
+    )
+
+
+# ── Index ─────────────────────────────────────────────────────────────────────
+
+class SpatialIndex:
+    """Uniform-grid index of jurisdiction boundaries."""
+
+    def __init__(self, boundaries: Iterable[Boundary], cell_degrees: float = CELL_DEGREES) -> None:
+        self.cell = cell_degrees
+        self._boundaries: List[Boundary] = sorted(boundaries, key=lambda b: (b.level, b.code))
+        self._grid: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self._subdivided: Set[str] = set()
+
+        for i, b in enumerate(self._boundaries):
+            min_lng, min_lat, max_lng, max_lat = b.bbox
+            for cx in range(self._cell(min_lng), self._cell(max_lng) + 1):
+                for cy in range(self._cell(min_lat), self._cell(max_lat) + 1):
+                    self._grid[(cx, cy)].append(i)
+            if b.level > LEVELS["state"]:
+                self._subdivided.add(b.state)
+
+    def _cell(self, degrees: float) -> int:
+        return math.floor(degrees / self.cell)
+
+    def __len__(self) -> int:
+        return len(self._boundaries)
+
+    def locate(self, lat: float, lng: float) -> List[Boundary]:
+        """All boundaries containing the point, outermost (state) first."""
+        candidates = self._grid.get((self._cell(lng), self._cell(lat)), ())
+        # Grid buckets keep the level-sorted order, so the result is ordered too
+        return [self._boundaries[i] for i in candidates if self._boundaries[i].contains(lat, lng)]
+
+    def state_for_point(self, lat: float, lng: float) -> Optional[str]:
+        for b in self.locate(lat, lng):
+            if b.level <= LEVELS["state"]:
+                return b.state
+        return None
+
+    def has_subdivisions(self, state_code: str) -> bool:
+        """True if county/city polygons were loaded for this state."""
+        return state_code.upper() in self._subdivided
+
+
+def load_boundaries(directory: Optional[Path] = None) -> SpatialIndex:
+    """Read every GeoJSON FeatureCollection in ``directory`` into a SpatialIndex."""
+    directory = directory or get_boundaries_dir()
+    boundaries: List[Boundary] = []
+    if directory.is_dir():
+        for path in sorted(directory.iterdir()):
+            if path.suffix.lower() not in (".geojson", ".json"):
+                continue
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.error(f"Boundary file {path.name} could not be loaded: {e}")
+                continue
+            if not isinstance(data, dict):
+                logger.error(f"Boundary file {path.name} could not be loaded: not a GeoJSON object")
+                continue
+            features = (data.get("features") or []) if data.get("type") == "FeatureCollection" else [data]
+            if not isinstance(features, list):
+                logger.error(f"Boundary file {path.name} could not be loaded: features is not a list")
+                continue
+            boundaries.extend(b for f in features if isinstance(f, dict) and (b := boundary_from_feature(f)))
+    index = SpatialIndex(boundaries)
+    if len(index):
+        logger.info(f"Spatial index loaded — {len(index)} boundaries from {directory}")
+    else:
+        logger.warning(
+            f"No jurisdiction boundaries in {directory} — locations resolve by state bounding box only, "
+            f"with no exact county/city matching (run scripts/fetch_boundaries.py to install polygons)"
+        )
+    return index
+
+
+_index: Optional[SpatialIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_spatial_index() -> SpatialIndex:
+    """Shared index, loaded on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_boundaries()
+    return _index
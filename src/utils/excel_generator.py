@@ -1,14 +1,145 @@
 """
 Excel Export Generator
 Professional Excel spreadsheet generation for tax incentive data
+
+Report workbooks are small and built in memory. Expense ledgers can run to
+hundreds of thousands of lines, so ``expense_ledger()`` returns a
+write-only workbook instead: rows are appended batch by batch as they are
+read from the database and go straight to a temporary file, and column
+widths are estimated from the first batch rather than by rescanning every
+cell. openpyxl serializes rows several times faster when lxml is installed.
 """
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
-from datetime import datetime
-from typing import List, Dict, Any
+from collections import defaultdict
+from datetime import date, datetime
+from typing import List, Dict, Any, Iterable, Optional, Sequence
 import io
 
+WIDTH_SAMPLE_ROWS = 200
+MAX_COLUMN_WIDTH = 50
+
+LEDGER_COLUMNS = [
+    'Date', 'Category', 'Subcategory', 'Description', 'Vendor', 'Vendor Location',
+    'Invoice #', 'Receipt #', 'Qualifying', 'Amount', 'Payment Date', 'Qualifying Note'
+]
+_AMOUNT_COLUMN = LEDGER_COLUMNS.index('Amount')
+
+
+def _excel_date(value: Optional[datetime]) -> Optional[date]:
+    """Excel has no time zones; ledger dates are written as plain dates"""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def estimate_column_widths(rows: Iterable[Sequence[Any]]) -> List[int]:
+    """Column widths that fit the longest value in a sample of rows"""
+    lengths: List[int] = []
+    for row in rows:
+        for i, value in enumerate(row):
+            if i == len(lengths):
+                lengths.append(0)
+            if value is not None:
+                lengths[i] = max(lengths[i], len(str(value)))
+    return [min(length + 2, MAX_COLUMN_WIDTH) for length in lengths]
+
+
+class ExpenseLedgerWriter:
+    """
+    Write-only expense ledger: a Summary sheet and a Ledger sheet with one row
+    per expense. Only running totals are kept in memory.
+    """
+
+    def __init__(self, generator: "ExcelExportGenerator", production_title: str):
+        self.generator = generator
+        self.production_title = production_title
+        self.wb = Workbook(write_only=True)
+        self._summary = self.wb.create_sheet("Summary")
+        self._ledger = self.wb.create_sheet("Ledger")
+        self._ledger.freeze_panes = 'A2'
+        self.rows = 0
+        self.total = 0.0
+        self.qualifying = 0.0
+        self._by_category: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+
+    def _row(self, expense) -> List[Any]:
+        return [
+            _excel_date(expense.expenseDate),
+            expense.category,
+            expense.subcategory,
+            expense.description,
+            expense.vendorName,
+            expense.vendorLocation,
+            expense.invoiceNumber,
+            expense.receiptNumber,
+            'Yes' if expense.isQualifying else 'No',
+            expense.amount,
+            _excel_date(expense.paymentDate),
+            expense.qualifyingNote,
+        ]
+
+    def _header(self, sample: List[List[Any]]) -> None:
+        # Write-only sheets take column widths before the first row
+        widths = estimate_column_widths([LEDGER_COLUMNS, *sample[:WIDTH_SAMPLE_ROWS]])
+        for i, width in enumerate(widths, 1):
+            self._ledger.column_dimensions[get_column_letter(i)].width = width
+        self._ledger.append([self.generator._header_cell(self._ledger, title) for title in LEDGER_COLUMNS])
+
+    def append(self, expenses: Sequence[Any]) -> None:
+        """Write one batch of Expense rows"""
+        rows = [self._row(e) for e in expenses]
+        if rows and self.rows == 0:
+            self._header(rows)
+        for expense, row in zip(expenses, rows):
+            amount = WriteOnlyCell(self._ledger, value=row[_AMOUNT_COLUMN])
+            amount.number_format = '$#,##0.00'
+            row[_AMOUNT_COLUMN] = amount
+            self._ledger.append(row)
+
+            self.rows += 1
+            self.total += expense.amount
+            category = self._by_category[expense.category]
+            category[0] += 1
+            category[1] += expense.amount
+            if expense.isQualifying:
+                self.qualifying += expense.amount
+                category[2] += expense.amount
+
+    def _write_summary(self) -> None:
+        ws = self._summary
+        for column, width in zip('ABCD', (24, 14, 18, 18)):
+            ws.column_dimensions[column].width = width
+
+        def cell(value, number_format=None, font=None):
+            c = WriteOnlyCell(ws, value=value)
+            if number_format:
+                c.number_format = number_format
+            if font:
+                c.font = font
+            return c
+
+        money = '$#,##0.00'
+        ws.append([cell("Expense Ledger", font=self.generator.title_font)])
+        ws.append([])
+        ws.append(["Production:", self.production_title])
+        ws.append(["Export Date:", datetime.now().strftime('%B %d, %Y')])
+        ws.append(["Line Items:", self.rows])
+        ws.append(["Total Spend:", cell(self.total, money)])
+        ws.append(["Qualifying Spend:", cell(self.qualifying, money)])
+        ws.append(["Non-Qualifying Spend:", cell(self.total - self.qualifying, money)])
+        ws.append([])
+        ws.append([self.generator._header_cell(ws, title) for title in ('Category', 'Line Items', 'Amount', 'Qualifying')])
+        for name, (count, amount, qualifying) in sorted(self._by_category.items(), key=lambda kv: -kv[1][1]):
+            ws.append([name, count, cell(amount, money), cell(qualifying, money)])
+
+    def save(self, path: str) -> None:
+        """Write the summary and assemble the .xlsx at path"""
+        if self.rows == 0:
+            self._header([])
+        self._write_summary()
+        self.wb.save(path)
+
 
 class ExcelExportGenerator:
     """Generate professional Excel exports"""
@@ -34,19 +165,20 @@ class ExcelExportGenerator:
             cell.alignment = Alignment(horizontal='center', vertical='center')
             cell.border = self.border
     
+    def _header_cell(self, ws, value):
+        """Styled header cell for a write-only sheet"""
+        cell = WriteOnlyCell(ws, value=value)
+        cell.fill = self.header_fill
+        cell.font = self.header_font
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+        cell.border = self.border
+        return cell
+    
     def _auto_adjust_column_width(self, ws):
-        """Auto-adjust column widths based on content"""
-        for column in ws.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
+        """Auto-adjust column widths from the first WIDTH_SAMPLE_ROWS rows"""
+        sample = ws.iter_rows(max_row=min(ws.max_row, WIDTH_SAMPLE_ROWS), values_only=True)
+        for i, width in enumerate(estimate_column_widths(sample), 1):
+            ws.column_dimensions[get_column_letter(i)].width = width
     
     def generate_comparison_workbook(
         self,
@@ -341,6 +473,10 @@ class ExcelExportGenerator:
         wb.save(buffer)
         buffer.seek(0)
         return buffer.getvalue()
+    
+    def expense_ledger(self, production_title: str) -> ExpenseLedgerWriter:
+        """Start a streaming expense ledger; append() batches, then save() to a file"""
+        return ExpenseLedgerWriter(self, production_title)
 
 
 # Global Excel generator instance
@@ -0,0 +1,133 @@
+"""
+Visible text from HTML, extracted incrementally.
+
+``HTMLTextExtractor`` is fed the document in chunks as it arrives (it is an
+``html.parser.HTMLParser``, so it tokenizes as it goes) and keeps only what a
+reader would see:
+
+  - <head>, <script>, <style> and <noscript> content is dropped on the fly;
+    an unclosed <head> ends at the first tag that cannot be in one, as in a
+    browser, so body text is never lost to it
+  - every tag is a word break, and block-level tags end a line, so the text
+    comes out one whitespace-normalised block per line
+  - once ``max_chars`` of text is collected, ``done`` is set and further
+    input is ignored; callers stop reading at that point
+  - character references (``&amp;``, ``&nbsp;``, ``&copy``) are left exactly
+    as written, as the regex extraction this replaced left them; monitored
+    page hashes and feed event content hashes are computed over this text
+
+Memory stays bounded by ``max_chars`` plus the parser's look-ahead for one
+unfinished tag, whatever the size of the document.
+"""
+from __future__ import annotations
+
+from html.parser import HTMLParser
+from typing import List, Optional
+
+SKIP_TAGS = frozenset({"head", "script", "style", "noscript"})
+_HEAD_TAGS = frozenset({"base", "link", "meta", "noscript", "script", "style", "template", "title"})
+BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "fieldset",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+    "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table", "tbody", "td", "tfoot",
+    "th", "thead", "tr", "ul",
+})
+
+_RUN_FLUSH_CHARS = 4_096     # longest text run held before committing its complete words
+# "&" is swapped for a private-use character on the way in, so the tokenizer
+# never sees (or decodes) a character reference, and swapped back on the way out
+_AMP = "\ue000"
+FEED_CHUNK_CHARS = 65_536
+
+
+class HTMLTextExtractor(HTMLParser):
+    def __init__(self, max_chars: Optional[int] = None) -> None:
+        super().__init__(convert_charrefs=False)
+        self.max_chars = max_chars
+        self.done = False
+        self._lines: List[str] = []
+        self._words: List[str] = []     # current line
+        self._run: List[str] = []       # text since the last tag; may end mid-word
+        self._run_len = 0
+        self._size = 0                  # chars committed, counting one separator per word
+        self._skipping: List[str] = []
+
+    # ── Tokenizer callbacks ───────────────────────────────────────────────────
+
+    def handle_starttag(self, tag, attrs) -> None:
+        self._flush_run()
+        if self._skipping and self._skipping[-1] == "head" and tag not in _HEAD_TAGS:
+            self._skipping.pop()
+        if tag in SKIP_TAGS:
+            self._skipping.append(tag)
+        elif tag in BLOCK_TAGS:
+            self._end_line()
+
+    def handle_endtag(self, tag) -> None:
+        self._flush_run()
+        if tag in self._skipping:
+            while self._skipping.pop() != tag:
+                pass
+        elif tag in BLOCK_TAGS:
+            self._end_line()
+
+    def handle_data(self, data) -> None:
+        if self._skipping or self.done:
+            return
+        self._run.append(data)
+        self._run_len += len(data)
+        if self._run_len > _RUN_FLUSH_CHARS:
+            self._flush_run(partial=True)
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def feed(self, data: str) -> None:
+        if not self.done:
+            super().feed(data.replace("&", _AMP))
+
+    def close(self) -> None:
+        if not self.done:
+            super().close()
+        self._flush_run()
+        self._end_line()
+
+    def text(self) -> str:
+        """Blocks collected so far, one per line; call close() first to include the last one."""
+        return "\n".join(self._lines)
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _flush_run(self, partial: bool = False) -> None:
+        if not self._run:
+            return
+        run = "".join(self._run)
+        words = run.split()
+        keep = ""
+        if partial and words and not run[-1].isspace() and len(words[-1]) < _RUN_FLUSH_CHARS:
+            # The run may continue in the next chunk: hold back its trailing partial word
+            keep = words.pop()
+        self._run = [keep] if keep else []
+        self._run_len = len(keep)
+        for word in words:
+            if self.max_chars is not None and self._size + len(word) > self.max_chars:
+                self.done = True
+                self._run, self._run_len = [], 0
+                return
+            self._words.append(word.replace(_AMP, "&"))
+            self._size += len(word) + 1
+
+    def _end_line(self) -> None:
+        if self._words:
+            self._lines.append(" ".join(self._words))
+            self._words = []
+
+
+def html_to_text(html: str, max_chars: Optional[int] = None) -> str:
+    """Visible text of an HTML string, one block per line, at most max_chars of it."""
+    parser = HTMLTextExtractor(max_chars)
+    for start in range(0, len(html), FEED_CHUNK_CHARS):
+        parser.feed(html[start:start + FEED_CHUNK_CHARS])
+        if parser.done:
+            break
+    parser.close()
+    return parser.text()
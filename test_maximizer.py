@@ -1,4 +1,7 @@
+import asyncio
+
 from maximizer import SceneIQMaximizer, MaximizedResult
+from src.utils.database import prisma
 
 
 def print_result(result: MaximizedResult, label: str = ""):
@@ -44,11 +47,12 @@ def print_result(result: MaximizedResult, label: str = ""):
             print(f"  --> {r}")
 
 
-def test_maximizer():
-    engine = SceneIQMaximizer()
+async def test_maximizer():
+    await prisma.connect()
+    engine = SceneIQMaximizer(prisma)
 
     # ── Scenario 1: Erie County (Buffalo) — lat/lng, $5M spend ────────────────
-    result1 = engine.maximize(
+    result1 = await engine.maximize(
         lat=42.8864,
         lng=-78.8784,
         project_type="film",
@@ -57,7 +61,7 @@ def test_maximizer():
     print_result(result1, "Erie County (Buffalo) — $5M qualified spend")
 
     # ── Scenario 2: NYC stacking — explicit codes, $10M spend ─────────────────
-    result2 = engine.maximize(
+    result2 = await engine.maximize(
         jurisdiction_codes=["NY", "NY-NYC"],
         project_type="film",
         qualified_spend=10_000_000,
@@ -65,13 +69,14 @@ def test_maximizer():
     print_result(result2, "NYC stacking (NY + NY-NYC) — $10M qualified spend")
 
     # ── Scenario 3: no qualified_spend — should warn cleanly ──────────────────
-    result3 = engine.maximize(
+    result3 = await engine.maximize(
         lat=42.8864,
         lng=-78.8784,
         project_type="film",
     )
     print_result(result3, "Erie County — no qualified_spend (raw rates)")
+    await prisma.disconnect()
 
 
 if __name__ == "__main__":
-    test_maximizer()
+    asyncio.run(test_maximizer())
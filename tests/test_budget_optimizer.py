@@ -0,0 +1,100 @@
+"""
+Tests for the budget allocation solver (src/services/budget_optimizer.py)
+"""
+import itertools
+
+import pytest
+
+from src.services.budget_optimizer import AllocationCandidate, IncentiveTerm, optimize_allocation
+
+
+def _candidate(code, *terms, min_spend=0.0, max_spend=None):
+    return AllocationCandidate(code=code, name=code, terms=tuple(terms), min_spend=min_spend, max_spend=max_spend)
+
+
+def _term(code, rate=0.0, fixed=0.0, min_spend=0.0, cap=None, share=1.0):
+    return IncentiveTerm(code=code, name=code, rate=rate, fixed_amount=fixed, min_spend=min_spend, cap=cap,
+                         eligible_share=share)
+
+
+def _spend(plan):
+    return {a.code: round(a.spend) for a in plan.allocations}
+
+
+class TestOptimizeAllocation:
+    """Piecewise-linear allocation under one budget constraint"""
+
+    def test_all_spend_goes_to_the_best_uncapped_rate(self):
+        plan = optimize_allocation(10_000_000, [
+            _candidate("GA", _term("GA-FTC", rate=0.20)),
+            _candidate("NM", _term("NM-FTC", rate=0.25)),
+        ])
+        assert _spend(plan) == {"GA": 0, "NM": 10_000_000}
+        assert plan.total_incentive == pytest.approx(2_500_000)
+
+    def test_cap_moves_the_remainder_to_the_next_best_rate(self):
+        plan = optimize_allocation(10_000_000, [
+            _candidate("GA", _term("GA-FTC", rate=0.20)),
+            _candidate("NM", _term("NM-FTC", rate=0.25, cap=1_000_000)),
+        ])
+        assert _spend(plan) == {"GA": 6_000_000, "NM": 4_000_000}
+        assert plan.total_incentive == pytest.approx(2_200_000)
+
+    def test_minimum_spend_threshold_is_reached_when_it_pays(self):
+        # The 10% bonus only unlocks at $8M, worth more than splitting at the margin
+        plan = optimize_allocation(10_000_000, [
+            _candidate("GA", _term("GA-FTC", rate=0.20)),
+            _candidate("IL", _term("IL-BASE", rate=0.15), _term("IL-BONUS", rate=0.10, min_spend=8_000_000)),
+        ])
+        assert _spend(plan) == {"GA": 0, "IL": 10_000_000}
+        assert plan.total_incentive == pytest.approx(2_500_000)
+
+    def test_flat_grant_without_threshold_is_collected(self):
+        # B's grant pays on any spend, so one cent there beats putting everything in A
+        plan = optimize_allocation(10_000_000, [
+            _candidate("A", _term("A-FTC", rate=0.30)),
+            _candidate("B", _term("B-FTC", rate=0.25), _term("B-GRANT", fixed=100_000)),
+        ])
+        spend = {a.code: a.spend for a in plan.allocations}
+        assert 0 < spend["B"] <= 1
+        assert spend["A"] == pytest.approx(10_000_000, abs=1)
+        assert plan.total_incentive == pytest.approx(3_100_000, abs=1)
+
+    def test_caller_floors_and_ceilings_are_respected(self):
+        plan = optimize_allocation(10_000_000, [
+            _candidate("GA", _term("GA-FTC", rate=0.20), min_spend=3_000_000),
+            _candidate("NM", _term("NM-FTC", rate=0.25), max_spend=5_000_000),
+        ])
+        assert _spend(plan) == {"GA": 5_000_000, "NM": 5_000_000}
+
+    def test_eligible_share_scales_the_rate(self):
+        plan = optimize_allocation(1_000_000, [
+            _candidate("CA", _term("CA-FTC", rate=0.30, share=0.5)),
+            _candidate("GA", _term("GA-FTC", rate=0.20)),
+        ])
+        assert _spend(plan) == {"CA": 0, "GA": 1_000_000}
+
+    def test_budget_earning_nothing_is_unallocated(self):
+        plan = optimize_allocation(5_000_000, [_candidate("NM", _term("NM-FTC", rate=0.25, cap=500_000))])
+        assert plan.total_incentive == pytest.approx(500_000)
+        assert plan.unallocated == pytest.approx(3_000_000)
+
+    def test_infeasible_floors_raise(self):
+        with pytest.raises(ValueError, match="exceed the total budget"):
+            optimize_allocation(1_000_000, [
+                _candidate("GA", min_spend=600_000), _candidate("NM", min_spend=600_000),
+            ])
+
+    def test_matches_exhaustive_search_on_a_grid(self):
+        candidates = [
+            _candidate("A", _term("A1", rate=0.25, cap=600_000), _term("A2", rate=0.05, min_spend=3_000_000)),
+            _candidate("B", _term("B1", rate=0.20, min_spend=1_000_000), _term("B2", fixed=150_000, min_spend=2_000_000)),
+            _candidate("C", _term("C1", rate=0.22, cap=900_000)),
+        ]
+        budget, step = 6_000_000, 250_000
+        best = max(
+            sum(c.value(s * step) for c, s in zip(candidates, split))
+            for split in itertools.product(range(budget // step + 1), repeat=3)
+            if sum(split) * step <= budget
+        )
+        assert optimize_allocation(budget, candidates).total_incentive >= best - 1e-6
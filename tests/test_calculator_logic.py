@@ -259,4 +259,122 @@ class TestEdgeCases:
         ]
         
         assert len(comparisons) == 1
-        assert comparisons[0]["credit"] > 0
\ No newline at end of file
+        assert comparisons[0]["credit"] > 0
+
+class TestBestRuleForBudget:
+    """Test best-rule selection shared by the comparison endpoint"""
+    
+    @staticmethod
+    def _rule(code, percentage=None, fixedAmount=None, minSpend=None, maxCredit=None):
+        from types import SimpleNamespace
+        return SimpleNamespace(ruleCode=code, percentage=percentage, fixedAmount=fixedAmount,
+                               minSpend=minSpend, maxCredit=maxCredit)
+    
+    def test_picks_highest_credit_after_min_spend_and_cap(self):
+        """Min spend zeroes a rule, cap limits another"""
+        from src.api.calculator import best_rule_for_budget
+        rules = [
+            self._rule("HIGH-MIN", percentage=40.0, minSpend=10000000),
+            self._rule("CAPPED", percentage=35.0, maxCredit=1000000),
+            self._rule("BASE", percentage=25.0),
+        ]
+        
+        rule, credit, meets = best_rule_for_budget(rules, 5000000)
+        
+        assert rule.ruleCode == "BASE"
+        assert credit == 1250000
+        assert meets is True
+    
+    def test_no_positive_credit_returns_first_rule(self):
+        """All rules below minimum spend"""
+        from src.api.calculator import best_rule_for_budget
+        rules = [self._rule("A", percentage=20.0, minSpend=1000000), self._rule("B", percentage=30.0, minSpend=2000000)]
+        
+        rule, credit, meets = best_rule_for_budget(rules, 500000)
+        
+        assert rule.ruleCode == "A"
+        assert credit == 0
+        assert meets is False
+
+
+class TestRuleCreditMatrix:
+    """Test vectorized credit grid used by /calculate/sweep"""
+    
+    def test_matches_scalar_best_rule(self):
+        """Column-wise max equals best_rule_for_budget at each budget"""
+        import numpy as np
+        from src.api.calculator import best_rule_for_budget, rule_credit_matrix
+        rules = [
+            TestBestRuleForBudget._rule("MIN", percentage=30.0, minSpend=2000000),
+            TestBestRuleForBudget._rule("CAP", percentage=25.0, maxCredit=1500000),
+            TestBestRuleForBudget._rule("FIXED", fixedAmount=400000),
+        ]
+        budgets = np.linspace(250000, 20000000, 50)
+        
+        matrix = rule_credit_matrix(rules, budgets)
+        
+        assert matrix.shape == (3, 50)
+        for i, budget in enumerate(budgets):
+            _, expected, _ = best_rule_for_budget(rules, float(budget))
+            assert matrix[:, i].max() == pytest.approx(expected)
+    
+    def test_min_spend_and_cap_thresholds(self):
+        """Credit is zero below minimum spend and flat once capped"""
+        import numpy as np
+        from src.api.calculator import rule_credit_matrix
+        rules = [TestBestRuleForBudget._rule("R", percentage=20.0, minSpend=1000000, maxCredit=500000)]
+        
+        row = rule_credit_matrix(rules, np.array([999999.0, 1000000.0, 2500000.0, 5000000.0]))[0]
+        
+        assert row.tolist() == [0.0, 200000.0, 500000.0, 500000.0]
+
+
+class TestCalculateSweep:
+    """Test /calculate/sweep curves, breakpoints and leaders against a stubbed catalog"""
+    
+    @staticmethod
+    def _catalog():
+        from types import SimpleNamespace
+        from src.services.rule_catalog import CatalogSnapshot
+        
+        def jur(id, name):
+            return SimpleNamespace(id=id, code=id.upper(), name=name, parentId=None, active=True)
+        
+        def rule(id, jid, percentage, minSpend=None, maxCredit=None):
+            return SimpleNamespace(id=id, jurisdictionId=jid, ruleName=f"{id} credit", ruleCode=id.upper(),
+                                   percentage=percentage, fixedAmount=None, minSpend=minSpend,
+                                   maxCredit=maxCredit, active=True)
+        
+        return CatalogSnapshot(
+            1,
+            [jur("a", "Alpha"), jur("b", "Beta")],
+            [
+                rule("min", "a", 30.0, minSpend=1000000),
+                rule("base", "a", 20.0),
+                rule("never", "a", 10.0, minSpend=500000),
+                rule("capped", "b", 22.0, maxCredit=300000),
+            ],
+            [],
+            [],
+        )
+    
+    @pytest.mark.asyncio
+    async def test_breakpoints_and_leaders(self):
+        """Only the leading rule's breakpoints are reported, without a duplicate best_rule_change"""
+        from unittest.mock import AsyncMock, patch
+        from src.api.calculator import calculate_sweep
+        from src.models.calculator import SweepCalculateRequest
+        
+        request = SweepCalculateRequest(jurisdictionIds=["a", "b"], budgetMin=250000, budgetMax=5000000, steps=20)
+        with patch("src.api.calculator.rule_catalog.snapshot", AsyncMock(return_value=self._catalog())):
+            response = await calculate_sweep(request)
+        
+        alpha, beta = response.curves
+        assert [(b.kind, b.ruleCode) for b in alpha.breakpoints] == [("min_spend_unlock", "MIN")]
+        assert alpha.breakpoints[0].budget == pytest.approx(1000000)
+        assert [(b.kind, b.ruleCode) for b in beta.breakpoints] == [("cap_binds", "CAPPED")]
+        assert alpha.bestRuleCodes[0] == "BASE"
+        assert alpha.bestRuleCodes[-1] == "MIN"
+        assert response.leaders[0] == "b"
+        assert response.leaders[-1] == "a"
+        assert alpha.maxCredit == pytest.approx(1500000)
@@ -0,0 +1,145 @@
+"""
+Tests for the shared jurisdiction comparison (src/services/comparison_engine.py)
+"""
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.calculator import router as calculator_router
+from src.api.excel import router as excel_router
+from src.api.reports import router as reports_router
+from src.services import comparison_engine, report_cache, report_renderer
+from src.services.comparison_engine import UnknownJurisdictions, compare
+from src.services.rule_catalog import CatalogSnapshot
+
+
+def _jur(id, name):
+    return SimpleNamespace(id=id, name=name, code=id.upper(), parentId=None, active=True)
+
+
+def _rule(id, jid, pct=None, fixed=None, min_spend=None, cap=None):
+    return SimpleNamespace(
+        id=id, jurisdictionId=jid, active=True, ruleName=f"{id} program", ruleCode=id.upper(),
+        incentiveType="tax_credit", percentage=pct, fixedAmount=fixed, minSpend=min_spend, maxCredit=cap,
+        requirements={},
+    )
+
+
+def _catalog(version=1):
+    return CatalogSnapshot(
+        version=version,
+        jurisdictions=[_jur("ga", "Georgia"), _jur("nm", "New Mexico"), _jur("tx", "Texas"), _jur("ny", "New York")],
+        incentive_rules=[
+            _rule("ga-1", "ga", pct=30.0),
+            _rule("nm-1", "nm", pct=25.0), _rule("nm-2", "nm", pct=40.0, cap=1_000_000),
+            _rule("ny-1", "ny", pct=30.0, min_spend=10_000_000),
+        ],
+        local_rules=[],
+        policies=[],
+    )
+
+
+@pytest.fixture(autouse=True)
+def fresh_results():
+    comparison_engine._results.clear()
+    for key in comparison_engine._counts:
+        comparison_engine._counts[key] = 0
+    yield
+    comparison_engine._results.clear()
+
+
+class TestCompare:
+    def test_ranks_by_best_rule(self):
+        result = compare(_catalog(), ["nm", "ga", "tx", "ny"], 5_000_000)
+
+        assert [o.jurisdiction.id for o in result.options] == ["ga", "nm", "tx", "ny"]
+        assert [o.rank for o in result.options] == [1, 2, 3, 4]
+        ga, nm, tx, ny = result.options
+        assert ga.credit == 1_500_000 and ga.rule.id == "ga-1"
+        assert nm.credit == 1_250_000 and nm.rule.id == "nm-1"     # 40% capped at 1M loses to 25%
+        assert tx.rule is None and tx.credit == 0
+        assert ny.credit == 0 and not ny.meets_requirements         # below the minimum spend
+        assert result.savings_vs_worst == 1_500_000
+
+    def test_report_rows_leave_out_zero_credits(self):
+        result = compare(_catalog(), ["tx", "ga", "nm"], 5_000_000)
+
+        assert result.eligible == result.options[:2]
+        rows = result.report_rows()
+        assert [(r["jurisdiction"], r["rank"], r["estimatedCredit"]) for r in rows] == [
+            ("Georgia", 1, 1_500_000), ("New Mexico", 2, 1_250_000)
+        ]
+        assert rows[0]["ruleCode"] == "GA-1" and rows[0]["percentage"] == 30.0
+
+    def test_qualifying_budget_overrides_budget(self):
+        result = compare(_catalog(), ["ga", "nm"], 5_000_000, qualifying_budget=1_000_000)
+
+        assert result.best.credit == 400_000 and result.best.rule.id == "nm-2"
+        assert result.budget == 5_000_000
+
+    def test_unknown_or_repeated_jurisdiction_raises(self):
+        with pytest.raises(UnknownJurisdictions):
+            compare(_catalog(), ["ga", "zz"], 5_000_000)
+        with pytest.raises(UnknownJurisdictions):
+            compare(_catalog(), ["ga", "ga"], 5_000_000)
+
+    def test_result_is_reused_until_the_catalog_reloads(self):
+        catalog = _catalog()
+        first = compare(catalog, ["ga", "nm"], 5_000_000)
+
+        assert compare(catalog, ["ga", "nm"], 5_000_000) is first
+        assert compare(catalog, ["ga", "nm"], 5_000_000, qualifying_budget=5_000_000) is first
+        assert compare(catalog, ["nm", "ga"], 5_000_000) is not first
+
+        reloaded = compare(_catalog(version=2), ["ga", "nm"], 5_000_000)
+        assert reloaded is not first
+        assert all(key[0] == 2 for key in comparison_engine._results)
+        assert comparison_engine.stats()["computed"] == 3
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = FastAPI()
+    for router in (calculator_router, reports_router, excel_router):
+        app.include_router(router)
+    pool = ThreadPoolExecutor(max_workers=1)
+    report_renderer._jobs.clear()
+    with patch.object(report_renderer, "get_render_pool", return_value=pool), \
+         patch.object(report_cache, "report_cache", report_cache.ReportCache(tmp_path)), \
+         patch("src.services.rule_catalog.rule_catalog.snapshot", new=AsyncMock(return_value=_catalog())):
+        with TestClient(app) as client:
+            yield client
+    pool.shutdown(wait=True)
+    report_renderer._jobs.clear()
+
+
+class TestSharedAcrossEndpoints:
+    def test_view_then_export_both_formats_computes_once(self, client):
+        view = client.post("/calculate/compare", json={"productionBudget": 5_000_000, "jurisdictionIds": ["ga", "nm", "tx"]})
+        export = {"productionTitle": "Pilot", "budget": 5_000_000, "jurisdictionIds": ["ga", "nm", "tx"]}
+        pdf = client.post("/reports/comparison", json=export)
+        xlsx = client.post("/excel/comparison", json=export)
+
+        assert view.status_code == pdf.status_code == xlsx.status_code == 200
+        assert comparison_engine.stats() == {"computed": 1, "reused": 2, "cached": 1}
+
+        body = view.json()
+        assert [c["jurisdictionId"] for c in body["comparisons"]] == ["ga", "nm", "tx"]
+        assert body["comparisons"][2]["ruleCode"] == "NONE"
+        assert body["bestOption"]["savings"] == 1_500_000
+        assert body["notes"][0] == "🏆 Best option: Georgia with $1,500,000 credit"
+
+    def test_unknown_jurisdiction_is_404_everywhere(self, client):
+        export = {"productionTitle": "Pilot", "budget": 5_000_000, "jurisdictionIds": ["ga", "zz"]}
+        assert client.post("/calculate/compare", json={"productionBudget": 5_000_000, "jurisdictionIds": ["ga", "zz"]}).status_code == 404
+        assert client.post("/reports/comparison", json=export).status_code == 404
+        assert client.post("/excel/comparison", json=export).status_code == 404
+
+    def test_no_positive_credit_is_404_for_documents(self, client):
+        export = {"productionTitle": "Pilot", "budget": 5_000_000, "jurisdictionIds": ["tx", "ny"]}
+        assert client.post("/calculate/compare", json={"productionBudget": 5_000_000, "jurisdictionIds": ["tx", "ny"]}).status_code == 200
+        assert client.post("/excel/comparison", json=export).status_code == 404
@@ -0,0 +1,94 @@
+"""
+Tests for background email delivery (src/services/email_queue.py) against a fake SMTP server
+"""
+import smtplib
+
+import pytest
+
+from src.services import email_queue as email_queue_module
+from src.services.email_queue import EmailQueue
+from src.utils.config import settings
+
+
+class FakeSMTP:
+    """Records every message; fails sends according to a script of exceptions"""
+
+    opened = []
+
+    def __init__(self, failures=None):
+        self.sent = []
+        self.failures = failures
+        FakeSMTP.opened.append(self)
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        exc = self.failures.pop(0) if self.failures else None
+        if exc is not None:
+            raise exc
+        self.sent.extend(to_addrs)
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    FakeSMTP.opened = []
+    failures = []
+    monkeypatch.setattr(settings, "SMTP_HOST", "smtp.test")
+    monkeypatch.setattr(email_queue_module.email_service, "open_connection", lambda: FakeSMTP(failures))
+    monkeypatch.setattr(email_queue_module, "RETRY_BASE_SECONDS", 0.0)
+    return failures
+
+
+def _sent():
+    return [to for conn in FakeSMTP.opened for to in conn.sent]
+
+
+class TestEmailQueue:
+    """Queued mail is delivered over a few persistent connections"""
+
+    @pytest.mark.asyncio
+    async def test_burst_reuses_pool_connections(self, smtp):
+        queue = EmailQueue(pool_size=2, batch_size=10)
+        recipients = [f"user{i}@example.com" for i in range(100)]
+        assert queue.enqueue_many(recipients, "Alert", "<p>hi</p>") == 100
+        await queue.flush()
+        assert sorted(_sent()) == sorted(recipients)
+        assert len(FakeSMTP.opened) <= 2
+        assert queue.stats()["sent"] == 100
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_dropped_connection_is_retried_on_a_new_one(self, smtp):
+        smtp.append(smtplib.SMTPServerDisconnected("gone"))
+        queue = EmailQueue(pool_size=1)
+        queue.enqueue("a@example.com", "Alert", "<p>hi</p>")
+        await queue.flush()
+        assert _sent() == ["a@example.com"]
+        assert len(FakeSMTP.opened) == 2
+        assert queue.stats()["retried"] == 1
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_permanent_rejection_is_not_retried(self, smtp):
+        smtp.append(smtplib.SMTPRecipientsRefused({"bad@example.com": (550, b"no such user")}))
+        queue = EmailQueue(pool_size=1)
+        queue.enqueue_many(["bad@example.com", "ok@example.com"], "Alert", "<p>hi</p>")
+        await queue.flush()
+        assert _sent() == ["ok@example.com"]
+        assert queue.stats()["failed"] == 1
+        assert len(FakeSMTP.opened) == 1
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_noop_when_smtp_not_configured(self, monkeypatch):
+        monkeypatch.setattr(settings, "SMTP_HOST", "")
+        queue = EmailQueue()
+        assert queue.enqueue("a@example.com", "Alert", "<p>hi</p>") is False
+        assert queue.stats()["pending"] == 0
+
+    def test_enqueue_outside_the_loop_is_refused(self, smtp):
+        assert EmailQueue().enqueue("a@example.com", "Alert", "<p>hi</p>") is False
@@ -1,8 +1,15 @@
+import json
 from decimal import Decimal
 import pytest
 
-from src.rule_engine.engine import evaluate_rule, load_rule_from_file
-from src.rule_engine.registry import get_rule_path
+from src.rule_engine.engine import (
+    clear_compiled_rules,
+    compile_rule,
+    evaluate_rule,
+    get_compiled_rule,
+    load_rule_from_file,
+)
+from src.rule_engine.registry import get_registry, get_rule_path
 
 def _load_il_rule():
     return load_rule_from_file(get_rule_path("IL"))
@@ -55,3 +62,63 @@ def test_evaluate_rule_applies_max_benefit_cap():
     res = evaluate_rule(rule=rule, jurisdiction_code="IL", production_start_date=None, expenses=expenses)
     assert res.benefit_amount == pytest.approx(50.0)
     assert "CAPPED_MAX_BENEFIT" in res.compliance_flags
+
+def test_compile_rule_precomputes_sets_and_caps():
+    rule = _load_il_rule()
+    rule["calculation"]["caps"] = {"max_benefit": 50}
+    compiled = compile_rule(rule)
+    assert compiled.jurisdiction_code == "IL"
+    assert compiled.qualified_categories == frozenset({"production", "payroll"})
+    assert "travel" in compiled.exclude_categories
+    assert compiled.rate == Decimal("0.3")
+    assert compiled.max_benefit == Decimal("50")
+
+def test_compiled_rule_is_reusable_across_ledgers():
+    compiled = compile_rule(_load_il_rule())
+    small = [{"category": "production", "amount": "100.00"}]
+    large = [{"category": "payroll", "amount": Decimal("10.00")}] * 5000
+    assert compiled.evaluate(jurisdiction_code="IL", production_start_date=None, expenses=small).benefit_amount == Decimal("30.0000")
+    res = compiled.evaluate(jurisdiction_code="IL", production_start_date=None, expenses=large)
+    assert res.qualified_spend_total == Decimal("50000.00")
+    assert res.trace[0]["counted"] == 5000
+
+def test_get_compiled_rule_is_cached_per_code():
+    clear_compiled_rules()
+    assert get_compiled_rule("il") is get_compiled_rule("IL")
+    with pytest.raises(FileNotFoundError):
+        get_compiled_rule("ZZ")
+
+def test_get_compiled_rule_recompiles_after_hot_reload(tmp_path, monkeypatch):
+    rule = _load_il_rule()
+    monkeypatch.setenv("TAX_RULES_DIR", str(tmp_path))
+    path = tmp_path / "TX.json"
+    rule["jurisdiction_code"] = "TX"
+    path.write_text(json.dumps(rule), encoding="utf-8")
+    clear_compiled_rules()
+    first = get_compiled_rule("TX")
+    assert get_compiled_rule("TX") is first
+
+    rule["calculation"]["rate"] = 0.25
+    path.write_text(json.dumps(rule), encoding="utf-8")
+    assert get_registry().reload_path(path) is True
+    second = get_compiled_rule("TX")
+    assert second is not first
+    assert second.rate == Decimal("0.25")
+
+def test_evaluate_items_matches_mapping_path():
+    from src.rule_engine.models import ExpenseItem
+
+    compiled = compile_rule(_load_il_rule())
+    items = [
+        ExpenseItem(category=" Production ", amount=Decimal("100.00")),
+        ExpenseItem(category="payroll", amount=Decimal("50.00"), is_payroll=True),
+        ExpenseItem(category="travel", amount=Decimal("25.00")),
+    ]
+    by_items = compiled.evaluate_items(jurisdiction_code="IL", production_start_date=None, items=items)
+    by_dicts = compiled.evaluate(
+        jurisdiction_code="IL",
+        production_start_date=None,
+        expenses=[{"category": e.category, "amount": e.amount} for e in items],
+    )
+    assert by_items == by_dicts
+    assert by_items.trace[0]["counted"] == 2
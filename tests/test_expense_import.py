@@ -0,0 +1,276 @@
+"""
+Tests for bulk expense import (/productions/{id}/expenses/import)
+"""
+import io
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from openpyxl import Workbook
+
+from src.api import production_expenses
+from src.services import expense_import
+from src.services.expense_import import ImportFileError, read_chunks, validate_record
+
+CSV = (
+    "Expense Date,Category,Description,Amount,Qualifying,Vendor,Invoice #\n"
+    "2026-03-01,labor,Gaffer,\"$1,200.50\",yes,Grip Co,INV-1\n"
+    "03/02/2026,equipment,Camera rental,800,no,,\n"
+    "\n"
+    "2026-03-03,catering,,90,,,\n"
+    "not a date,travel,Flights,-5,maybe,,\n"
+)
+
+
+def _chunks(data: bytes, fmt: str, chunk_rows=1_000):
+    return list(read_chunks(io.BytesIO(data), fmt, "p1", chunk_rows=chunk_rows))
+
+
+class TestValidation:
+    def test_valid_record(self):
+        data, errors = validate_record("p1", {
+            "expenseDate": "2026-03-01", "category": " labor ", "description": "Gaffer",
+            "amount": "$1,200.50", "isQualifying": "No", "invoiceNumber": "INV-1",
+        })
+
+        assert errors == []
+        assert data == {
+            "productionId": "p1", "category": "labor", "description": "Gaffer", "invoiceNumber": "INV-1",
+            "amount": 1200.5, "isQualifying": False, "expenseDate": "2026-03-01T00:00:00Z",
+        }
+
+    def test_every_problem_is_reported(self):
+        data, errors = validate_record("p1", {
+            "expenseDate": "31/31/2026", "category": "", "amount": "$0.00", "isQualifying": "maybe",
+        })
+
+        assert data is None
+        assert errors == [
+            "category: required",
+            "description: required",
+            "amount: must be a non-zero amount",
+            "isQualifying: 'maybe' is not yes/no",
+            "expenseDate: unrecognised date '31/31/2026' (use YYYY-MM-DD)",
+        ]
+
+    @pytest.mark.parametrize("amount, expected", [("(500.00)", -500.0), ("-75", -75.0), ("$(1,250.50)", -1250.5), (-20, -20.0)])
+    def test_credit_lines_are_kept_negative(self, amount, expected):
+        data, errors = validate_record("p1", {
+            "expenseDate": "2026-03-05", "category": "equipment", "description": "Rental refund", "amount": amount,
+        })
+
+        assert errors == []
+        assert data["amount"] == expected
+
+    @pytest.mark.parametrize("amount", ["0", "-0.00", "nan", "inf", float("-inf")])
+    def test_zero_and_non_finite_amounts_are_rejected(self, amount):
+        _, errors = validate_record("p1", {
+            "expenseDate": "2026-03-05", "category": "labor", "description": "Crew", "amount": amount,
+        })
+        assert errors == ["amount: must be a non-zero amount"]
+
+    def test_spreadsheet_values(self):
+        data, errors = validate_record("p1", {
+            "expenseDate": datetime(2026, 3, 1, 9, 30), "category": "labor", "description": "Crew",
+            "amount": 250, "isQualifying": True, "paymentDate": None,
+        })
+
+        assert errors == []
+        assert data["expenseDate"] == "2026-03-01T00:00:00Z" and data["amount"] == 250.0
+        assert "paymentDate" not in data
+
+
+class TestReaders:
+    def test_csv_rows_with_line_numbers(self):
+        [chunk] = _chunks(CSV.encode("utf-8-sig"), "csv")
+
+        assert chunk.read == 4
+        assert [r["description"] for r in chunk.rows] == ["Gaffer", "Camera rental"]
+        assert chunk.rows[0]["vendorName"] == "Grip Co" and chunk.rows[1]["expenseDate"] == "2026-03-02T00:00:00Z"
+        assert [e["row"] for e in chunk.errors] == [5, 6]
+        assert chunk.errors[0]["errors"] == ["description: required"]
+
+    def test_chunking(self):
+        rows = "".join(f"2026-03-01,labor,Line {i},10\n" for i in range(5))
+        chunks = _chunks(f"date,category,description,amount\n{rows}".encode(), "csv", chunk_rows=2)
+
+        assert [c.read for c in chunks] == [2, 2, 1]
+        assert sum(len(c.rows) for c in chunks) == 5
+
+    def test_missing_required_column(self):
+        with pytest.raises(ImportFileError, match="amount"):
+            _chunks(b"date,category,description\n2026-03-01,labor,Gaffer\n", "csv")
+
+    def test_ndjson(self):
+        lines = [
+            json.dumps({"expenseDate": "2026-03-01", "category": "labor", "description": "Gaffer", "amount": 100}),
+            "",
+            "{broken",
+            json.dumps([1, 2]),
+            json.dumps({"expense_date": "2026-03-04", "Category": "travel", "memo": "Hotel", "amount": "75.25"}),
+        ]
+        [chunk] = _chunks("\n".join(lines).encode(), "ndjson")
+
+        assert chunk.read == 4
+        assert [r["description"] for r in chunk.rows] == ["Gaffer", "Hotel"]
+        assert [e["row"] for e in chunk.errors] == [3, 4]
+        assert chunk.errors[1]["errors"] == ["Each line must be a JSON object"]
+
+    def test_xlsx(self):
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["Expense Report"])
+        ws.append([])
+        ws.append(["Date", "Category", "Description", "Amount", "Qualifying"])
+        ws.append([datetime(2026, 3, 1), "labor", "Gaffer", 1200.5, "Y"])
+        ws.append([datetime(2026, 3, 2), "equipment", "Lens", None, "N"])
+        buf = io.BytesIO()
+        wb.save(buf)
+
+        # The first non-empty row is the header, so a title row is rejected as one
+        with pytest.raises(ImportFileError, match="Missing required column"):
+            _chunks(buf.getvalue(), "xlsx")
+
+        ws.delete_rows(1, 2)
+        buf = io.BytesIO()
+        wb.save(buf)
+        [chunk] = _chunks(buf.getvalue(), "xlsx")
+        assert chunk.rows[0]["amount"] == 1200.5 and chunk.rows[0]["expenseDate"] == "2026-03-01T00:00:00Z"
+        assert chunk.errors == [{"row": 3, "errors": ["amount: required"]}]
+
+    def test_not_utf8(self):
+        with pytest.raises(ImportFileError, match="UTF-8"):
+            _chunks("date,category,description,amount\n2026-03-01,caf\xe9,x,1\n".encode("latin-1"), "csv")
+
+    def test_detect_format(self):
+        assert expense_import.detect_format("text/csv; charset=utf-8") == "csv"
+        assert expense_import.detect_format("application/octet-stream", "ledger.XLSX") == "xlsx"
+        assert expense_import.detect_format("application/x-ndjson") == "ndjson"
+        assert expense_import.detect_format("text/plain") is None
+
+
+@pytest.fixture
+def db():
+    inserted = []
+
+    async def create_many(data):
+        inserted.append(list(data))
+        return len(data)
+
+    fake = SimpleNamespace(
+        production=SimpleNamespace(find_unique=AsyncMock(
+            side_effect=lambda where: SimpleNamespace(id="p1") if where["id"] == "p1" else None
+        )),
+        expense=SimpleNamespace(create_many=create_many),
+        inserted=inserted,
+    )
+    with patch.object(production_expenses, "prisma", fake):
+        yield fake
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(production_expenses.router)
+    with TestClient(app) as client:
+        yield client
+
+
+class TestImportEndpoint:
+    def test_csv_body(self, client, db):
+        resp = client.post("/productions/p1/expenses/import", content=CSV, headers={"Content-Type": "text/csv"})
+
+        body = resp.json()
+        assert resp.status_code == 200
+        assert (body["format"], body["rowsRead"], body["imported"], body["rejected"]) == ("csv", 4, 2, 2)
+        assert [e["row"] for e in body["errors"]] == [5, 6]
+        assert [r["description"] for r in db.inserted[0]] == ["Gaffer", "Camera rental"]
+        assert all(r["productionId"] == "p1" for r in db.inserted[0])
+
+    def test_inserts_one_batch_per_chunk(self, client, db):
+        rows = "".join(f'{{"date": "2026-03-01", "category": "labor", "description": "L{i}", "amount": 10}}\n' for i in range(7))
+        with patch.object(expense_import, "CHUNK_ROWS", 3):
+            resp = client.post(
+                "/productions/p1/expenses/import", content=rows, headers={"Content-Type": "application/x-ndjson"}
+            )
+
+        assert resp.json()["imported"] == 7
+        assert [len(batch) for batch in db.inserted] == [3, 3, 1]
+
+    def test_refund_lines_are_imported(self, client, db):
+        csv_body = (
+            "Date,Category,Description,Amount\n"
+            "2026-03-01,equipment,Camera rental,\"2,000.00\"\n"
+            "2026-03-09,equipment,Camera rental refund,(500.00)\n"
+        )
+        body = client.post("/productions/p1/expenses/import", content=csv_body, headers={"Content-Type": "text/csv"}).json()
+
+        assert body["imported"] == 2 and body["rejected"] == 0
+        assert sum(r["amount"] for r in db.inserted[0]) == 1_500.0
+
+    def test_large_body_is_spooled_to_disk(self, client, db):
+        rows = "".join(f"2026-03-01,labor,Line {i},10\n" for i in range(500))
+        with patch.object(production_expenses, "_SPOOL_MAX_MEMORY", 1024), \
+             patch.object(production_expenses, "_SPOOL_WRITE_SIZE", 256):
+            body = client.post(
+                "/productions/p1/expenses/import", content=f"date,category,description,amount\n{rows}",
+                headers={"Content-Type": "text/csv"},
+            ).json()
+
+        assert body["imported"] == 500
+        assert [r["description"] for r in db.inserted[0]][-1] == "Line 499"
+
+    def test_multipart_xlsx(self, client, db):
+        wb = Workbook()
+        wb.active.append(["Date", "Category", "Description", "Amount"])
+        wb.active.append([datetime(2026, 3, 1), "labor", "Gaffer", 100])
+        buf = io.BytesIO()
+        wb.save(buf)
+
+        resp = client.post(
+            "/productions/p1/expenses/import",
+            files={"file": ("cost_report.xlsx", buf.getvalue(), "application/octet-stream")},
+        )
+
+        assert resp.json()["format"] == "xlsx" and resp.json()["imported"] == 1
+
+    def test_dry_run_writes_nothing(self, client, db):
+        resp = client.post("/productions/p1/expenses/import?dry_run=true", content=CSV, headers={"Content-Type": "text/csv"})
+
+        body = resp.json()
+        assert body["dryRun"] and body["imported"] == 0 and body["valid"] == 2
+        assert db.inserted == []
+
+    def test_error_report_is_capped(self, client, db):
+        rows = "".join(f"2026-03-01,labor,L{i},0\n" for i in range(5))
+        with patch.object(expense_import, "MAX_REPORTED_ERRORS", 2):
+            body = client.post(
+                "/productions/p1/expenses/import", content=f"date,category,description,amount\n{rows}",
+                headers={"Content-Type": "text/csv"},
+            ).json()
+
+        assert body["rejected"] == 5 and len(body["errors"]) == 2 and body["errorsTruncated"]
+
+    def test_bad_file_is_400(self, client, db):
+        resp = client.post(
+            "/productions/p1/expenses/import", content="date,description\n", headers={"Content-Type": "text/csv"}
+        )
+        assert resp.status_code == 400 and "Missing required column" in resp.json()["detail"]
+
+    def test_unknown_format_is_415(self, client, db):
+        resp = client.post("/productions/p1/expenses/import", content="x", headers={"Content-Type": "text/plain"})
+        assert resp.status_code == 415
+
+    def test_format_query_overrides_content_type(self, client, db):
+        resp = client.post(
+            "/productions/p1/expenses/import?format=csv", content=CSV, headers={"Content-Type": "text/plain"}
+        )
+        assert resp.json()["imported"] == 2
+
+    def test_unknown_production_is_404(self, client, db):
+        resp = client.post("/productions/nope/expenses/import", content=CSV, headers={"Content-Type": "text/csv"})
+        assert resp.status_code == 404
@@ -0,0 +1,158 @@
+"""
+Tests for the streaming expense ledger export (/excel/expenses/{production_id})
+"""
+import os
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from openpyxl import Workbook, load_workbook
+
+from src.api import excel
+from src.utils.excel_generator import LEDGER_COLUMNS, estimate_column_widths, excel_generator
+
+
+def _expense(i, category="labor", qualifying=True, amount=100.0):
+    return SimpleNamespace(
+        id=f"e{i:04d}", productionId="p1", category=category, subcategory=None,
+        description=f"Line {i}", amount=amount, isQualifying=qualifying,
+        expenseDate=datetime(2026, 3, 1 + i % 28, 15, 30, tzinfo=timezone.utc), paymentDate=None,
+        qualifyingNote=None, vendorName="Grip Co", vendorLocation="Atlanta, GA",
+        receiptNumber=None, invoiceNumber=f"INV-{i}",
+    )
+
+
+def _read(path):
+    wb = load_workbook(path)
+    return wb, [list(r) for r in wb["Ledger"].iter_rows(values_only=True)]
+
+
+class TestExpenseLedgerWriter:
+    """Write-only ledger workbook"""
+
+    def test_rows_and_summary(self, tmp_path):
+        ledger = excel_generator.expense_ledger("Pilot")
+        ledger.append([_expense(1, "labor", True, 1000.0), _expense(2, "equipment", True, 250.0)])
+        ledger.append([_expense(3, "insurance", False, 50.0)])
+        path = tmp_path / "ledger.xlsx"
+        ledger.save(str(path))
+
+        wb, rows = _read(path)
+        assert wb.sheetnames == ["Summary", "Ledger"]
+        assert rows[0] == LEDGER_COLUMNS
+        assert len(rows) == 4
+        assert rows[1][:4] == [datetime(2026, 3, 2), "labor", None, "Line 1"]
+        assert rows[3][8] == "No" and rows[3][9] == 50.0
+        assert wb["Ledger"]["J2"].number_format == '$#,##0.00'
+        assert wb["Ledger"].freeze_panes == "A2"
+
+        summary = {r[0]: r[1] for r in wb["Summary"].iter_rows(values_only=True) if r and r[0]}
+        assert summary["Line Items:"] == 3
+        assert summary["Total Spend:"] == 1300.0
+        assert summary["Qualifying Spend:"] == 1250.0
+        assert summary["Non-Qualifying Spend:"] == 50.0
+        assert summary["labor"] == 1
+
+    def test_column_widths_come_from_the_first_batch(self, tmp_path):
+        wide = _expense(1)
+        wide.description = "x" * 30
+        ledger = excel_generator.expense_ledger("Pilot")
+        ledger.append([wide])
+        ledger.append([_expense(2)])
+        path = tmp_path / "ledger.xlsx"
+        ledger.save(str(path))
+
+        ws = load_workbook(path)["Ledger"]
+        assert ws.column_dimensions["D"].width == 32
+        assert ws.column_dimensions["A"].width == len("2026-03-02") + 2
+
+    def test_empty_ledger_has_headers(self, tmp_path):
+        ledger = excel_generator.expense_ledger("Pilot")
+        path = tmp_path / "ledger.xlsx"
+        ledger.save(str(path))
+
+        wb, rows = _read(path)
+        assert rows == [LEDGER_COLUMNS]
+        assert ledger.rows == 0
+
+    def test_estimate_column_widths(self):
+        assert estimate_column_widths([["ab", None], ["abcdef", 12345]]) == [8, 7]
+        assert estimate_column_widths([["y" * 80]]) == [50]
+
+    def test_report_sheet_widths_still_fit_content(self):
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["Jurisdiction", "Credit"])
+        ws.append(["New Mexico Film Production Tax Credit", 1500000])
+        excel_generator._auto_adjust_column_width(ws)
+
+        assert ws.column_dimensions["A"].width == len("New Mexico Film Production Tax Credit") + 2
+        assert ws.column_dimensions["B"].width == len("1500000") + 2
+
+
+class FakeExpenseTable:
+    """Cursor-paginated find_many over an in-memory ledger"""
+
+    def __init__(self, rows):
+        self.rows = sorted(rows, key=lambda e: (e.expenseDate, e.id))
+        self.calls = []
+
+    async def find_many(self, where, order, take, cursor=None, skip=0):
+        self.calls.append(cursor)
+        start = 0
+        if cursor:
+            start = next(i for i, e in enumerate(self.rows) if e.id == cursor["id"]) + skip
+        return self.rows[start:start + take]
+
+
+@pytest.fixture
+def ledger_db():
+    expenses = FakeExpenseTable([_expense(i) for i in range(10)])
+    db = SimpleNamespace(
+        production=SimpleNamespace(find_unique=AsyncMock(
+            side_effect=lambda where: SimpleNamespace(id="p1", title="Pilot") if where["id"] == "p1" else None
+        )),
+        expense=expenses,
+    )
+    with patch.object(excel, "prisma", db), patch.object(excel, "LEDGER_BATCH_ROWS", 4):
+        yield expenses
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(excel.router)
+    with TestClient(app) as client:
+        yield client
+
+
+class TestExpenseLedgerEndpoint:
+    def test_exports_every_row_in_pages(self, client, ledger_db, tmp_path):
+        created = []
+        real_mkstemp = excel.tempfile.mkstemp
+
+        def mkstemp(**kwargs):
+            fd, path = real_mkstemp(**kwargs)
+            created.append(path)
+            return fd, path
+
+        with patch.object(excel.tempfile, "mkstemp", mkstemp):
+            resp = client.get("/excel/expenses/p1")
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == excel.XLSX_MEDIA_TYPE
+        assert resp.headers["content-disposition"].startswith("attachment; filename=expenses_")
+        path = tmp_path / "out.xlsx"
+        path.write_bytes(resp.content)
+        _, rows = _read(path)
+        assert [r[3] for r in rows[1:]] == [e.description for e in ledger_db.rows]
+
+        # 10 rows in pages of 4: three reads, each continuing from the last id
+        assert ledger_db.calls == [None, {"id": ledger_db.rows[3].id}, {"id": ledger_db.rows[7].id}]
+        assert created and not os.path.exists(created[0])
+
+    def test_unknown_production_is_404(self, client, ledger_db):
+        assert client.get("/excel/expenses/nope").status_code == 404
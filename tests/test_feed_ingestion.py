@@ -0,0 +1,142 @@
+"""
+Tests for RSS/Atom feed ingestion (src/services/feed_ingestion.py) against a mock HTTP transport
+"""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from src.services import feed_ingestion
+
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Film Office</title>
+  <item><title>Credit cap raised</title><link>https://example.gov/1</link>
+        <pubDate>Mon, 05 Oct 2026 10:00:00 GMT</pubDate></item>
+  <item><title>Program sunset proposed</title><link>https://example.gov/2</link>
+        <pubDate>Tue, 06 Oct 2026 10:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+
+def _source(id, etag=None, last_modified=None):
+    return SimpleNamespace(
+        id=id, name=f"Source {id}", feedUrl=f"https://feeds.test/{id}.xml", jurisdiction="GA", active=True,
+        feedEtag=etag, feedLastModified=last_modified,
+    )
+
+
+class FakeEventTable:
+    """Answers the bulk INSERT … ON CONFLICT ("contentHash") DO NOTHING RETURNING like Postgres would"""
+
+    def __init__(self):
+        self.hashes = set()
+        self.statements = 0
+
+    async def insert(self, sql, *params):
+        self.statements += 1
+        width = len(feed_ingestion._EVENT_COLUMNS)
+        position = feed_ingestion._EVENT_COLUMNS.index("contentHash")
+        inserted = []
+        for i in range(0, len(params), width):
+            content_hash = params[i + position]
+            if content_hash not in self.hashes:
+                self.hashes.add(content_hash)
+                inserted.append({"contentHash": content_hash})
+        return inserted
+
+
+@pytest.fixture
+def db():
+    fake = MagicMock()
+    fake.events = FakeEventTable()
+    fake.monitoringsource.find_many = AsyncMock()
+    fake.monitoringsource.update = AsyncMock()
+    fake.query_raw = AsyncMock(side_effect=fake.events.insert)
+    fake.notificationpreference.find_many = AsyncMock(return_value=[])
+    with patch.object(feed_ingestion, "prisma", fake):
+        yield fake
+
+
+def _serve(requests):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=RSS, headers={"ETag": '"v1"', "Last-Modified": "Tue, 06 Oct 2026 10:00:00 GMT"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return patch.object(feed_ingestion, "_http_client", return_value=client)
+
+
+class TestFeedIngestion:
+    """Concurrent, conditional feed fetches"""
+
+    @pytest.mark.asyncio
+    async def test_new_feed_is_parsed_and_validators_stored(self, db):
+        requests = []
+        db.monitoringsource.find_many.return_value = [_source("a")]
+        with _serve(requests):
+            assert await feed_ingestion.ingest_all_sources() == 2
+        assert db.events.statements == 1
+        data = db.monitoringsource.update.await_args.kwargs["data"]
+        assert data["feedEtag"] == '"v1"'
+        assert data["feedLastModified"] == "Tue, 06 Oct 2026 10:00:00 GMT"
+
+    @pytest.mark.asyncio
+    async def test_not_modified_short_circuits(self, db):
+        requests = []
+        db.monitoringsource.find_many.return_value = [_source("a", etag='"v1"', last_modified="Tue, 06 Oct 2026")]
+        with _serve(requests), patch.object(feed_ingestion.feedparser, "parse") as parse:
+            assert await feed_ingestion.ingest_all_sources() == 0
+        parse.assert_not_called()
+        db.query_raw.assert_not_awaited()
+        assert requests[0].headers["if-modified-since"] == "Tue, 06 Oct 2026"
+        assert set(db.monitoringsource.update.await_args.kwargs["data"]) == {"lastFetched"}
+
+    @pytest.mark.asyncio
+    async def test_every_source_is_polled_and_failures_are_isolated(self, db):
+        requests = []
+        sources = [_source(str(i), etag='"v1"') for i in range(40)] + [_source("new")]
+        broken = _source("broken")
+        broken.feedUrl = "https://feeds.test/missing.xml"
+        db.monitoringsource.find_many.return_value = [*sources, broken]
+
+        def handler(request):
+            requests.append(request)
+            if request.url.path == "/missing.xml":
+                return httpx.Response(404)
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, content=RSS)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch.object(feed_ingestion, "_http_client", return_value=client):
+            assert await feed_ingestion.ingest_all_sources() == 2
+        assert len(requests) == 42
+
+
+class TestEventDeduplication:
+    """One bulk insert per feed; the unique index decides what is new"""
+
+    @pytest.mark.asyncio
+    async def test_rerun_and_duplicate_entries_insert_nothing_new(self, db):
+        db.monitoringsource.find_many.return_value = [_source("a")]
+        with _serve([]):
+            assert await feed_ingestion.ingest_all_sources() == 2
+        with _serve([]):
+            assert await feed_ingestion.ingest_all_sources() == 0
+        assert db.events.statements == 2
+
+    @pytest.mark.asyncio
+    async def test_same_entries_from_two_sources_notify_once(self, db):
+        db.monitoringsource.find_many.return_value = [_source("a"), _source("b")]
+        with _serve([]), patch.object(feed_ingestion, "_notify_subscribers", new=AsyncMock()) as notify:
+            assert await feed_ingestion.ingest_all_sources() == 2
+        assert notify.await_count == 2
+
+    def test_batch_is_deduplicated_before_insert(self):
+        entry = SimpleNamespace(title="Same", link="https://example.gov/x", published="Mon, 05 Oct 2026")
+        events = feed_ingestion._events_from_entries([entry, entry], "a")
+        assert len(events) == 1
+
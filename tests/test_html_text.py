@@ -0,0 +1,105 @@
+"""
+Tests for the incremental HTML-to-text extractor (src/utils/html_text.py)
+"""
+import re
+
+import pytest
+
+from src.utils.html_text import HTMLTextExtractor, html_to_text
+
+
+def _streamed(html, size, max_chars=None):
+    parser = HTMLTextExtractor(max_chars)
+    for i in range(0, len(html), size):
+        parser.feed(html[i:i + size])
+    parser.close()
+    return parser.text()
+
+
+def _regex_text(html):
+    """The regex extraction monitor.py used before the tokenizer, for hash compatibility checks."""
+    block = (
+        "address|article|aside|blockquote|br|dd|div|dl|dt|fieldset|figcaption|figure|footer|form|"
+        "h[1-6]|header|hr|li|main|nav|ol|p|pre|section|table|tbody|td|tfoot|th|thead|tr|ul"
+    )
+    html = re.sub(r"<head\b[^>]*>.*?</head>", "", html, flags=re.DOTALL | re.IGNORECASE)
+    html = re.sub(r"<(script|style|noscript)\b[^>]*>.*?</\1>", "", html, flags=re.DOTALL | re.IGNORECASE)
+    html = re.sub(rf"</?(?:{block})\b[^>]*>", "\n", html, flags=re.IGNORECASE)
+    text = re.sub(r"<[^>]+>", " ", html)
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>County Film Office</title>
+<style>body { color: red }</style>
+<script>var rules = "<p>not text</p>";</script></head>
+<body>
+  <nav><a href="/">Home</a> | <a href="/film">Film</a></nav>
+  <h1>Film  permits</h1>
+  <p>Permit fee is <b>$250</b>&nbsp;per&nbsp;day &amp; requires insurance.</p>
+  <ul><li>One</li><li>Two</li></ul>
+  <noscript>Enable JavaScript</noscript>
+  <!-- hidden comment -->
+</body></html>"""
+
+
+class TestHTMLToText:
+    """Visible text, one block per line"""
+
+    def test_blocks_and_hidden_content(self):
+        assert html_to_text(PAGE).splitlines() == [
+            "Home | Film",
+            "Film permits",
+            "Permit fee is $250 &nbsp;per&nbsp;day &amp; requires insurance.",
+            "One",
+            "Two",
+        ]
+
+    @pytest.mark.parametrize("size", [1, 7, 64])
+    def test_chunk_boundaries_do_not_change_the_text(self, size):
+        assert _streamed(PAGE, size) == html_to_text(PAGE)
+
+    def test_character_references_are_kept_as_written(self):
+        html = "<p>Film&nbsp;office Q&amp;A &copy 2026 &#169; R&D < 5</p>"
+        assert html_to_text(html) == "Film&nbsp;office Q&amp;A &copy 2026 &#169; R&D < 5"
+        assert _streamed(html, 3) == html_to_text(html)
+
+    @pytest.mark.parametrize("html", [
+        PAGE,
+        "<div>Film&nbsp;office</div><p>Q&amp;A &copy 2026 &#x00A9;</p>Tax &amp credits",
+        "<table><tr><td>Rate</td><td>30%&nbsp;&ndash;&nbsp;35%</td></tr></table>",
+    ])
+    def test_matches_the_regex_extraction_it_replaced(self, html):
+        # Stored page and feed hashes were computed over the old output
+        assert html_to_text(html) == _regex_text(html)
+
+    def test_every_tag_breaks_words(self):
+        assert html_to_text("Fee<b>$250</b>per<span>day</span>") == "Fee $250 per day"
+
+    def test_unclosed_head_ends_at_body_content(self):
+        html = "<html><head><title>Title</title><meta charset=utf-8><div>Body text</div><p>More"
+        assert html_to_text(html).splitlines() == ["Body text", "More"]
+
+    def test_unclosed_script_hides_the_rest(self):
+        assert html_to_text("<p>Shown</p><script>var x = 1; <p>hidden") == "Shown"
+
+    def test_stops_at_max_chars(self):
+        html = "<p>" + "word " * 10_000 + "</p>"
+        parser = HTMLTextExtractor(max_chars=100)
+        fed = 0
+        while not parser.done:
+            parser.feed(html[fed:fed + 64])
+            fed += 64
+        parser.close()
+
+        assert fed < len(html)
+        assert len(parser.text()) <= 100 and parser.text().startswith("word word")
+
+    def test_long_text_runs_are_committed_as_they_stream(self):
+        parser = HTMLTextExtractor()
+        for _ in range(2_000):
+            parser.feed("lorem ipsum ")
+        assert parser._run_len < 5_000
+        parser.close()
+        assert parser.text() == " ".join(["lorem ipsum"] * 2_000)
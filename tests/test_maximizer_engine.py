@@ -0,0 +1,273 @@
+"""
+Tests for the async SceneIQMaximizer engine (maximizer.py) against a fake Prisma client
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from maximizer import ResultCache, SceneIQMaximizer
+from src.services.spatial_index import SpatialIndex, boundary_from_feature
+
+
+IL = {"id": "il", "name": "Illinois", "type": "state", "code": "IL"}
+COOK = {"id": "il-cook", "name": "Cook County", "type": "county", "code": "IL-COOK"}
+
+
+def _rule_row(jid, code, key, value, unit="percent", rule_type="tax_credit", requirements=None):
+    jur = {"il": IL, "il-cook": COOK}[jid]
+    return {
+        "jurisdiction_id": jid,
+        "jurisdiction_name": jur["name"],
+        "jurisdiction_type": jur["type"],
+        "jurisdiction_code": code,
+        "rule_key": key,
+        "rule_type": rule_type,
+        "raw_value": value,
+        "value_unit": unit,
+        "source_citation": None,
+        "effective_date": "2024-01-01T00:00:00+00:00",
+        "requirements_json": requirements,
+    }
+
+
+class FakeDB:
+    """Answers the maximizer's raw queries; records every call"""
+
+    def __init__(self, delay: float = 0.0):
+        self.calls = []
+        self.delay = delay
+
+    async def query_raw(self, sql, *args):
+        self.calls.append((sql, args))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if "FROM incentive_rules" in sql:
+            return [
+                _rule_row("il", "IL", "IL-FILM-BASE", 30.0),
+                _rule_row("il-cook", "IL-COOK", "IL-CHICAGO-BONUS", 5.0),
+                _rule_row("il", "IL", "IL-GREEN", 5.0, requirements='{"optIn": true}'),
+            ]
+        if "parent_code" in sql:
+            return [dict(IL, parent_code=None), dict(COOK, parent_code="IL")]
+        if "code IN" in sql:
+            return [j for j in (IL, COOK) if j["code"] in args]
+        return [IL, COOK]
+
+
+def _square(code, type_, x0, y0, x1, y1):
+    return boundary_from_feature({
+        "properties": {"code": code, "type": type_},
+        "geometry": {"type": "Polygon", "coordinates": [[[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]]},
+    })
+
+
+def _illinois_index():
+    return SpatialIndex([
+        _square("IL", "state", -91.5, 36.9, -87.0, 42.5),
+        _square("IL-COOK", "county", -88.3, 41.4, -87.5, 42.2),
+        _square("IL-LAKE", "county", -88.3, 42.2, -87.5, 42.5),
+    ])
+
+
+class TestSceneIQMaximizer:
+    """Async data access and stacking"""
+
+    @pytest.mark.asyncio
+    async def test_location_resolution_is_one_query(self):
+        db = FakeDB()
+        engine = SceneIQMaximizer(db, spatial_index=SpatialIndex([]))
+        jurisdictions, state = await engine.resolve_jurisdictions_by_location(41.88, -87.63)
+        assert state == "IL"
+        assert [j["code"] for j in jurisdictions] == ["IL", "IL-COOK"]
+        assert len(db.calls) == 1
+        assert db.calls[0][1] == ("IL",)
+
+    @pytest.mark.asyncio
+    async def test_maximize_with_split_spend(self):
+        db = FakeDB()
+        result = await SceneIQMaximizer(db).maximize(
+            jurisdiction_codes=["IL", "IL-COOK"],
+            qualified_spend=5_000_000,
+            spend_by_location={"IL-COOK": 2_000_000},
+        )
+        assert result.total_incentive_usd == pytest.approx(1_500_000 + 100_000)
+        assert result.jurisdictions_evaluated == 2
+        assert any("IL-GREEN" in w for w in result.warnings)
+        assert len(db.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_maximize_does_not_serialize(self):
+        db = FakeDB(delay=0.2)
+        engine = SceneIQMaximizer(db)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await asyncio.gather(*[
+            engine.maximize(jurisdiction_codes=["IL"], qualified_spend=1_000_000) for _ in range(5)
+        ])
+        # Two awaited queries per call; five calls overlap instead of taking 5 × 0.4s
+        assert loop.time() - started < 1.0
+        assert all(r.jurisdictions_evaluated == 1 for r in results)
+
+    def test_rules_from_rows_parses_timestamps(self):
+        engine = SceneIQMaximizer(SimpleNamespace())
+        rules, _ = engine.rules_from_rows([_rule_row("il", "IL", "IL-FILM-BASE", 30.0)], 1_000_000)
+        assert rules[0].effective_date.year == 2024
+        assert rules[0].computed_value == pytest.approx(300_000)
+
+    @pytest.mark.asyncio
+    async def test_polygon_chain_limits_layers(self):
+        db = FakeDB()
+        engine = SceneIQMaximizer(db, spatial_index=_illinois_index())
+
+        jurisdictions, state = await engine.resolve_jurisdictions_by_location(41.88, -87.63)
+        assert state == "IL"
+        assert [j["code"] for j in jurisdictions] == ["IL", "IL-COOK"]
+        assert db.calls[0][1] == ("IL", "IL-COOK")
+
+        jurisdictions, _ = await engine.resolve_jurisdictions_by_location(38.0, -89.0)
+        assert [j["code"] for j in jurisdictions] == ["IL"]
+
+
+class TestMaximizeBatch:
+    """Many points, one query per data set, one stack per distinct chain"""
+
+    @pytest.mark.asyncio
+    async def test_fallback_states_share_one_chain(self):
+        db = FakeDB()
+        engine = SceneIQMaximizer(db, spatial_index=SpatialIndex([]))
+        results = await engine.maximize_batch(
+            [(41.88, -87.63), (40.0, -89.0), (0.0, 0.0)], qualified_spend=1_000_000,
+        )
+        assert len(db.calls) == 2
+        assert results[0] is results[1]
+        assert results[0].jurisdiction_codes == ["IL", "IL-COOK"]
+        assert results[0].total_incentive_usd == pytest.approx(350_000)
+        assert results[2].total_incentive_usd == 0.0
+        assert results[2].resolved_state is None
+
+    @pytest.mark.asyncio
+    async def test_polygon_chains_get_their_own_rules(self):
+        db = FakeDB()
+        engine = SceneIQMaximizer(db, spatial_index=_illinois_index())
+        cook, downstate = await engine.maximize_batch(
+            [(41.88, -87.63), (38.0, -89.0)], qualified_spend=1_000_000,
+        )
+        assert len(db.calls) == 2
+        assert cook.jurisdiction_codes == ["IL", "IL-COOK"]
+        assert downstate.jurisdiction_codes == ["IL"]
+        assert cook.total_incentive_usd == pytest.approx(350_000)
+        assert downstate.total_incentive_usd == pytest.approx(300_000)
+
+    @pytest.mark.asyncio
+    async def test_matches_single_maximize(self):
+        engine = SceneIQMaximizer(FakeDB(), spatial_index=SpatialIndex([]))
+        single = await engine.maximize(lat=41.88, lng=-87.63, qualified_spend=2_000_000)
+        [batched] = await engine.maximize_batch([(41.88, -87.63)], qualified_spend=2_000_000)
+        assert batched.total_incentive_usd == single.total_incentive_usd
+        assert batched.breakdown == single.breakdown
+        assert batched.warnings == single.warnings
+
+
+class TestResultCache:
+    """Bounded LRU/TTL memoization keyed on chain, inputs and catalog version"""
+
+    @staticmethod
+    def _cache(version=1, **kwargs):
+        state = {"version": version}
+
+        async def version_source():
+            return state["version"]
+
+        cache = ResultCache(version_source=version_source, **kwargs)
+        return cache, state
+
+    def test_lru_eviction_and_ttl(self):
+        cache, _ = self._cache(maxsize=2, ttl=10)
+        now = [0.0]
+        cache._clock = lambda: now[0]
+        cache.put("a", "A")
+        cache.put("b", "B")
+        assert cache.get("a") == "A"
+        cache.put("c", "C")                 # evicts "b", the least recently used
+        assert cache.get("b") is None
+        now[0] = 11.0
+        assert cache.get("a") is None       # expired
+        assert cache.stats() == {
+            "hits": 1, "misses": 2, "hit_rate": pytest.approx(1 / 3), "size": 1,
+            "maxsize": 2, "ttl_seconds": 10, "evictions": 1, "expirations": 1,
+        }
+
+    def test_key_ignores_spend_split_order(self):
+        k1 = ResultCache.key(1, ["il"], "IL", "Film", 1.0, {"IL": 1, "IL-COOK": 2})
+        k2 = ResultCache.key(1, ["il"], "IL", "film", 1.0, {"IL-COOK": 2, "IL": 1})
+        assert k1 == k2
+        assert k1 != ResultCache.key(2, ["il"], "IL", "film", 1.0, {"IL-COOK": 2, "IL": 1})
+
+    @pytest.mark.asyncio
+    async def test_repeat_maximize_skips_rule_fetch(self):
+        cache, state = self._cache()
+        db = FakeDB()
+        engine = SceneIQMaximizer(db, spatial_index=SpatialIndex([]), cache=cache)
+        first = await engine.maximize(lat=41.88, lng=-87.63, qualified_spend=1_000_000)
+        second = await engine.maximize(lat=41.88, lng=-87.63, qualified_spend=1_000_000)
+        assert second is first
+        assert len(db.calls) == 3               # resolve + rules, then resolve only
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        state["version"] = 2                    # rule catalog reloaded
+        await engine.maximize(lat=41.88, lng=-87.63, qualified_spend=1_000_000)
+        assert len(db.calls) == 5
+        assert cache.misses == 2
+
+    @pytest.mark.asyncio
+    async def test_batch_shares_cache_with_maximize(self):
+        cache, _ = self._cache()
+        db = FakeDB()
+        engine = SceneIQMaximizer(db, spatial_index=_illinois_index(), cache=cache)
+        single = await engine.maximize(lat=41.88, lng=-87.63, qualified_spend=1_000_000)
+        db.calls.clear()
+        cook, downstate = await engine.maximize_batch([(41.88, -87.63), (38.0, -89.0)], qualified_spend=1_000_000)
+        assert cook is single
+        rule_queries = [sql for sql, _ in db.calls if "FROM incentive_rules" in sql]
+        assert len(rule_queries) == 1 and downstate.jurisdiction_codes == ["IL"]
+
+
+class TestMaximizeBatchEndpoint:
+    """POST /maximize/batch ranks and sorts candidate points"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from src.api import maximizer as api
+
+        monkeypatch.setattr(api, "_engine", SceneIQMaximizer(FakeDB(), spatial_index=_illinois_index()))
+        app = FastAPI()
+        app.include_router(api.router)
+        with TestClient(app) as client:
+            yield client
+
+    def test_results_are_ranked_by_total(self, client):
+        points = [
+            {"id": "downstate", "lat": 38.0, "lng": -89.0},
+            {"id": "chicago", "lat": 41.88, "lng": -87.63},
+            {"id": "ocean", "lat": 0.0, "lng": 0.0},
+        ]
+        body = client.post("/maximize/batch", json={"points": points, "qualified_spend": 1_000_000}).json()
+        assert body["points_evaluated"] == 3
+        assert body["chains_evaluated"] == 2
+        assert [r["id"] for r in body["results"]] == ["chicago", "downstate", "ocean"]
+        assert [r["rank"] for r in body["results"]] == [1, 2, 3]
+        assert body["results"][0]["index"] == 1
+
+    def test_input_order_and_limit(self, client):
+        points = [{"lat": 38.0, "lng": -89.0}, {"lat": 41.88, "lng": -87.63}]
+        body = client.post(
+            "/maximize/batch",
+            json={"points": points, "qualified_spend": 1_000_000, "sort_by": "input", "limit": 1},
+        ).json()
+        assert [(r["index"], r["rank"]) for r in body["results"]] == [(0, 2)]
+
+    def test_rejects_empty_batch(self, client):
+        assert client.post("/maximize/batch", json={"points": []}).status_code == 422
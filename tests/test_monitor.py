@@ -0,0 +1,362 @@
+"""
+Tests for the sub-jurisdiction monitor pipeline (monitor.py) with a stub extractor and mock HTTP transport
+"""
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+import monitor
+
+
+def _jur(id, page=None):
+    return SimpleNamespace(
+        id=id, name=f"County {id}", code=f"XX-{id.upper()}", feedUrl=f"https://gov.test/{id}.txt",
+        feedLastHash=monitor.page_hash(page) if page is not None else None, feedSnapshot=None,
+    )
+
+
+class StubExtractor:
+    """Thread-safe canned extractor that records its peak concurrency"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.active = self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, content):
+        with self._lock:
+            self.calls.append(content)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return monitor.mock_extract(content)
+
+
+@pytest.fixture
+def db():
+    fake = MagicMock()
+    fake.connect = AsyncMock()
+    fake.disconnect = AsyncMock()
+    fake.jurisdiction.find_many = AsyncMock()
+    fake.jurisdiction.update = AsyncMock()
+    fake.pendingrule.create = AsyncMock()
+    with patch.object(monitor, "Prisma", return_value=fake):
+        yield fake
+
+
+@pytest.fixture
+def site():
+    """Page text by jurisdiction id; anything missing serves f"page {id}" """
+    return {}
+
+
+@pytest.fixture
+def pages(site):
+    """Serves the site and records what was requested"""
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        id = request.url.path.strip("/").removesuffix(".txt")
+        return httpx.Response(200, text=site.get(id, f"page {id}"), headers={"content-type": "text/plain"})
+
+    transport = httpx.MockTransport(handler)
+    with patch.object(monitor, "http_client", side_effect=lambda: httpx.AsyncClient(transport=transport)):
+        yield requested
+
+
+def _hash_updates(db):
+    return [c.kwargs["where"]["id"] for c in db.jurisdiction.update.await_args_list if "feedLastHash" in c.kwargs["data"]]
+
+
+class TestMonitorPipeline:
+    """Concurrent fetch, hash short-circuit, bounded extraction"""
+
+    @pytest.mark.asyncio
+    async def test_unchanged_pages_never_reach_the_extractor(self, db, pages, tmp_path):
+        db.jurisdiction.find_many.return_value = [_jur("a", page="page a"), _jur("b")]
+        extractor = StubExtractor()
+
+        totals = await monitor.main(extractor=extractor, checkpoint_path=tmp_path / "cp.json")
+
+        assert extractor.calls == ["[Section 1]\npage b"]
+        assert totals["skipped"] == 1 and totals["changed"] == 1 and totals["rules"] == 1
+        assert _hash_updates(db) == ["b"]
+        assert db.pendingrule.create.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_extraction_concurrency_is_bounded(self, db, pages, tmp_path):
+        db.jurisdiction.find_many.return_value = [_jur(str(i)) for i in range(8)]
+        extractor = StubExtractor(delay=0.05)
+
+        totals = await monitor.main(extractor=extractor, extract_concurrency=2, checkpoint_path=tmp_path / "cp.json")
+
+        assert len(extractor.calls) == 8 and totals["changed"] == 8
+        assert extractor.peak == 2
+        assert len(pages) == 8
+
+    @pytest.mark.asyncio
+    async def test_token_budget_defers_the_rest(self, db, pages, tmp_path):
+        db.jurisdiction.find_many.return_value = [_jur("a"), _jur("b"), _jur("c")]
+        extractor = StubExtractor()
+        one_call = monitor.estimate_tokens("[Section 1]\npage a")
+
+        totals = await monitor.main(extractor=extractor, token_budget=one_call, checkpoint_path=tmp_path / "cp.json")
+
+        assert len(extractor.calls) == 1
+        assert totals["changed"] == 1 and totals["deferred"] == 2
+        # Deferred pages keep their old hash so the next run extracts them
+        assert len(_hash_updates(db)) == 1
+
+    @pytest.mark.asyncio
+    async def test_extractor_errors_are_isolated(self, db, pages, tmp_path):
+        db.jurisdiction.find_many.return_value = [_jur("a"), _jur("b")]
+
+        def flaky(content):
+            if "page a" in content:
+                raise ValueError("No valid JSON object found")
+            return monitor.mock_extract(content)
+
+        totals = await monitor.main(extractor=flaky, checkpoint_path=tmp_path / "cp.json")
+
+        assert totals["errors"] == 1 and totals["changed"] == 1
+        assert _hash_updates(db) == ["b"]
+
+    @pytest.mark.asyncio
+    async def test_html_is_reduced_to_visible_text_while_streaming(self):
+        html = "<html><head><title>x</title></head><body><h1>Film  permits</h1><p>Fee is <b>$250</b>.</p>" + "<p>more</p>" * 50_000
+
+        def handler(request):
+            return httpx.Response(200, content=html.encode(), headers={"content-type": "text/html; charset=utf-8"})
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+            with patch.object(monitor, "MAX_PAGE_CHARS", 100):
+                text = await monitor.fetch_url("https://gov.test/film", http)
+
+        assert text.splitlines()[:2] == ["Film permits", "Fee is $250 ."]
+        assert len(text) <= 100
+        # Hashes from before block splitting still match, so the upgrade does not re-extract every page
+        assert monitor.page_hash("Film permits\nFee is $250 .") == monitor.sha256("Film permits Fee is $250 .")
+
+    @pytest.mark.asyncio
+    async def test_dry_run_fetches_only(self, db, pages, tmp_path):
+        db.jurisdiction.find_many.return_value = [_jur("a"), _jur("b", page="page b")]
+        extractor = StubExtractor()
+
+        totals = await monitor.main(dry_run=True, extractor=extractor, checkpoint_path=tmp_path / "cp.json")
+
+        assert extractor.calls == [] and len(pages) == 2
+        assert totals["changed"] == 1 and totals["skipped"] == 1
+        db.jurisdiction.update.assert_not_awaited()
+        assert not (tmp_path / "cp.json").exists()
+
+
+class TestCheckpoint:
+    """Resume after a crash without redoing finished jurisdictions"""
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_finished_jurisdictions(self, db, pages, tmp_path):
+        path = tmp_path / "cp.json"
+        monitor.Checkpoint(path, "all").mark_done("a", {"name": "County a"})
+        db.jurisdiction.find_many.return_value = [_jur("a"), _jur("b")]
+        extractor = StubExtractor()
+
+        totals = await monitor.main(extractor=extractor, checkpoint_path=path)
+
+        assert pages == ["/b.txt"] and extractor.calls == ["[Section 1]\npage b"]
+        assert totals["resumed"] == 1
+        assert not path.exists()     # a completed run clears its checkpoint
+
+    @pytest.mark.asyncio
+    async def test_restart_ignores_checkpoint(self, db, pages, tmp_path):
+        path = tmp_path / "cp.json"
+        monitor.Checkpoint(path, "all").mark_done("a", {"name": "County a"})
+        db.jurisdiction.find_many.return_value = [_jur("a"), _jur("b")]
+
+        await monitor.main(extractor=StubExtractor(), checkpoint_path=path, resume=False)
+
+        assert sorted(pages) == ["/a.txt", "/b.txt"]
+
+    @pytest.mark.asyncio
+    async def test_crash_leaves_progress_behind(self, db, pages, tmp_path):
+        path = tmp_path / "cp.json"
+        db.jurisdiction.find_many.return_value = [_jur("a", page="page a"), _jur("b")]
+
+        class Killed(BaseException):
+            pass
+
+        def crash(content):
+            raise Killed
+
+        with pytest.raises(Killed):
+            await monitor.main(extractor=crash, checkpoint_path=path)
+
+        assert set(json.loads(path.read_text())["done"]) == {"a"}
+
+    def test_checkpoint_scope_and_age(self, tmp_path):
+        path = tmp_path / "cp.json"
+        monitor.Checkpoint(path, "all").mark_done("a", {})
+
+        assert set(monitor.Checkpoint.load(path, "all").done) == {"a"}
+        assert monitor.Checkpoint.load(path, "NY-ERIE").done == {}
+
+        stale = datetime.now(timezone.utc) - monitor.CHECKPOINT_MAX_AGE - timedelta(minutes=1)
+        monitor.Checkpoint(path, "all", started=stale).mark_done("a", {})
+        assert monitor.Checkpoint.load(path, "all").done == {}
+
+    def test_unreadable_checkpoint_starts_fresh(self, tmp_path):
+        path = tmp_path / "cp.json"
+        path.write_text("{not json")
+
+        assert monitor.Checkpoint.load(path, "all").done == {}
+
+
+def _persist(db, *jurs):
+    """Write jurisdiction updates back onto the fakes, as the next find_many would return them"""
+    by_id = {j.id: j for j in jurs}
+
+    async def update(where, data):
+        for key, value in data.items():
+            setattr(by_id[where["id"]], key, getattr(value, "data", value))
+
+    db.jurisdiction.find_many.return_value = list(jurs)
+    db.jurisdiction.update.side_effect = update
+
+
+def _rule(name, section=None):
+    return {"name": name, "category": "permit_fee", "rule_type": "fee", "section": section}
+
+
+class SectionExtractor:
+    """Returns one rule per [Section N] in its input, named after the section's first line"""
+
+    def __init__(self, attribute=True):
+        self.attribute = attribute
+        self.calls = []
+
+    def __call__(self, content):
+        self.calls.append(content)
+        rules = []
+        for n, part in enumerate(content.split("[Section ")[1:], 1):
+            first_line = part.split("\n")[1]
+            rules.append(_rule(first_line, n if self.attribute else None))
+        return {"rules": rules, "confidence": 0.9, "summary": "", "no_rules_found": not rules}
+
+
+PAGE = "\n".join([
+    "Film permits",
+    "Permit fee is $250 per day.",
+    "Insurance of $1M is required.",
+    "Page last updated October 5, 2026",
+])
+
+
+def _extracted(data):
+    """The PendingRule extractedData payload: a JSON string inside the prisma Json wrapper"""
+    return json.loads(data["extractedData"].data)
+
+
+def _names(data):
+    return [r["name"] for r in _extracted(data)["rules"]]
+
+
+class TestBlockDiff:
+    """Only new or changed blocks are extracted; unchanged rules carry forward"""
+
+    def test_changed_sections_splits_runs_and_size(self):
+        blocks = monitor.split_blocks("a\nb\nc\nd\ne")
+        seen = {blocks[2].hash}
+
+        sections = monitor.changed_sections(blocks, seen)
+
+        assert [[b.text for b in s] for s in sections] == [["a", "b"], ["d", "e"]]
+        with patch.object(monitor, "SECTION_CHARS", 1):
+            assert len(monitor.changed_sections(blocks, set())) == 5
+
+    @pytest.mark.asyncio
+    async def test_footer_change_extracts_one_block_and_carries_rules(self, db, site, pages, tmp_path):
+        jur = _jur("a")
+        _persist(db, jur)
+        extractor = SectionExtractor()
+        site["a"] = PAGE
+        with patch.object(monitor, "SECTION_CHARS", 30):
+            await monitor.main(extractor=extractor, checkpoint_path=tmp_path / "cp.json")
+            assert len(jur.feedSnapshot["rules"]) == 4
+            db.pendingrule.create.reset_mock()
+
+            site["a"] = PAGE.replace("October 5", "October 7")
+            totals = await monitor.main(extractor=extractor, checkpoint_path=tmp_path / "cp.json")
+
+        assert extractor.calls[-1] == "[Section 1]\nPage last updated October 7, 2026"
+        assert totals["changed"] == 1
+        data = db.pendingrule.create.await_args.kwargs["data"]
+        assert _names(data) == ["Page last updated October 7, 2026"]
+        assert _extracted(data)["carried_forward"] == 3
+        assert [e["rule"]["name"] for e in jur.feedSnapshot["rules"]] == [
+            "Film permits", "Permit fee is $250 per day.", "Insurance of $1M is required.",
+            "Page last updated October 7, 2026",
+        ]
+        assert jur.feedLastHash == monitor.page_hash(site["a"])
+
+    @pytest.mark.asyncio
+    async def test_removed_block_supersedes_its_rule_without_extraction(self, db, site, pages, tmp_path):
+        jur = _jur("a")
+        _persist(db, jur)
+        extractor = SectionExtractor()
+        site["a"] = "Film permits\n\nInsurance of $1M is required."
+        with patch.object(monitor, "SECTION_CHARS", 10):
+            await monitor.main(extractor=extractor, checkpoint_path=tmp_path / "cp.json")
+
+            site["a"] = "Film permits"
+            await monitor.main(extractor=extractor, checkpoint_path=tmp_path / "cp.json")
+
+        assert len(extractor.calls) == 1
+        extracted = _extracted(db.pendingrule.create.await_args.kwargs["data"])
+        assert extracted["rules"] == []
+        assert [r["name"] for r in extracted["superseded_rules"]] == ["Insurance of $1M is required."]
+
+    @pytest.mark.asyncio
+    async def test_unattributed_rules_resend_their_surviving_blocks(self, db, site, pages, tmp_path):
+        jur = _jur("a")
+        _persist(db, jur)
+        extractor = SectionExtractor(attribute=False)
+        site["a"] = PAGE
+        with patch.object(monitor, "SECTION_CHARS", 30):
+            await monitor.main(extractor=extractor, checkpoint_path=tmp_path / "cp.json")
+
+            site["a"] = PAGE.replace("October 5", "October 7")
+            await monitor.main(extractor=extractor, checkpoint_path=tmp_path / "cp.json")
+
+        # Those rules were tied to the whole page, so the whole page goes back for extraction
+        assert extractor.calls[-1].count("[Section") == 4
+        assert "Permit fee is $250 per day." in extractor.calls[-1]
+        extracted = _extracted(db.pendingrule.create.await_args.kwargs["data"])
+        assert len(extracted["superseded_rules"]) == 4 and len(extracted["rules"]) == 4
+
+    @pytest.mark.asyncio
+    async def test_sections_over_the_limit_wait_for_the_next_run(self, db, site, pages, tmp_path):
+        jur = _jur("a")
+        _persist(db, jur)
+        extractor = SectionExtractor()
+        site["a"] = PAGE
+        runs = 0
+        with patch.object(monitor, "SECTION_CHARS", 1), patch.object(monitor, "MAX_CONTENT_CHARS", 60):
+            while jur.feedLastHash is None and runs < 10:
+                await monitor.main(extractor=extractor, checkpoint_path=tmp_path / "cp.json")
+                runs += 1
+
+        # One block fits per call; the hash is only stored once nothing is left over
+        assert runs == 4
+        sent = [line for call in extractor.calls for line in call.splitlines() if not line.startswith("[")]
+        assert sent == PAGE.splitlines()
+        assert jur.feedLastHash == monitor.page_hash(PAGE)
+        assert len(jur.feedSnapshot["rules"]) == 4
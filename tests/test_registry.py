@@ -1,4 +1,5 @@
 import json
+import os
 from pathlib import Path
 import pytest
 
@@ -9,6 +10,9 @@ from src.rule_engine.registry import (
     find_rule_path,
     get_rule_path,
     list_rule_codes,
+    get_registry,
+    get_rule_file,
+    rules_version,
 )
 
 def test_normalize_code_uppercases_and_strips():
@@ -41,3 +45,86 @@ def test_il_rule_file_is_valid_json():
     data = json.loads(Path(p).read_text(encoding="utf-8"))
     assert isinstance(data, dict)
     assert data.get("jurisdiction_code", "").upper() == "IL"
+
+def _write_rule(path: Path, code: str, rate: float) -> None:
+    path.write_text(json.dumps({"jurisdiction_code": code, "rate": rate}), encoding="utf-8")
+
+def test_registry_serves_rules_from_memory(tmp_path, monkeypatch):
+    monkeypatch.setenv("TAX_RULES_DIR", str(tmp_path))
+    _write_rule(tmp_path / "TX.json", "TX", 0.2)
+    registry = get_registry()
+    assert registry.rules_dir == tmp_path
+    assert list_rule_codes() == {"TX"}
+
+    entry = get_rule_file("tx")
+    assert entry.data["rate"] == 0.2
+    # A deleted file stays served until the registry is told about it
+    (tmp_path / "TX.json").unlink()
+    assert get_rule_file("TX") is entry
+
+def test_registry_refresh_hot_swaps_only_changed_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("TAX_RULES_DIR", str(tmp_path))
+    _write_rule(tmp_path / "TX.json", "TX", 0.2)
+    _write_rule(tmp_path / "NM.json", "NM", 0.25)
+    registry = get_registry()
+    tx, nm = registry.get("TX"), registry.get("NM")
+    version = rules_version()
+
+    _write_rule(tmp_path / "TX.json", "TX", 0.3)
+    os.utime(tmp_path / "TX.json", ns=(tx.mtime_ns + 10**9, tx.mtime_ns + 10**9))
+    assert registry.refresh() == {"TX"}
+    assert rules_version() > version
+    assert registry.get("TX").data["rate"] == 0.3
+    assert registry.get("NM") is nm
+
+def test_registry_refresh_bumps_version_on_removal(tmp_path, monkeypatch):
+    monkeypatch.setenv("TAX_RULES_DIR", str(tmp_path))
+    _write_rule(tmp_path / "TX.json", "TX", 0.2)
+    registry = get_registry()
+    version = registry.version
+
+    (tmp_path / "TX.json").unlink()
+    assert registry.refresh() == {"TX"}
+    assert registry.version > version
+    assert registry.get("TX") is None
+
+def test_registry_reload_path_adds_and_removes(tmp_path, monkeypatch):
+    monkeypatch.setenv("TAX_RULES_DIR", str(tmp_path))
+    registry = get_registry()
+    assert registry.codes() == set()
+
+    _write_rule(tmp_path / "NM.json", "NM", 0.25)
+    assert registry.reload_path(tmp_path / "NM.json") is True
+    assert find_rule_path("NM") == tmp_path / "NM.json"
+
+    (tmp_path / "NM.json").unlink()
+    assert registry.reload_path(tmp_path / "NM.json") is True
+    with pytest.raises(FileNotFoundError):
+        get_rule_path("NM")
+
+def test_registry_keeps_previous_version_on_broken_edit(tmp_path, monkeypatch):
+    monkeypatch.setenv("TAX_RULES_DIR", str(tmp_path))
+    _write_rule(tmp_path / "TX.json", "TX", 0.2)
+    registry = get_registry()
+    before = registry.get("TX")
+
+    (tmp_path / "TX.json").write_text("{not json", encoding="utf-8")
+    os.utime(tmp_path / "TX.json", ns=(before.mtime_ns + 10**9, before.mtime_ns + 10**9))
+    assert registry.refresh() == set()
+    assert registry.get("TX") is before
+
+@pytest.mark.asyncio
+async def test_stop_rule_watcher_propagates_cancellation(tmp_path, monkeypatch):
+    import asyncio
+    from src.rule_engine import watcher
+
+    monkeypatch.setenv("TAX_RULES_DIR", str(tmp_path))
+    watcher.start_rule_watcher()
+    await asyncio.sleep(0.1)
+
+    stopper = asyncio.create_task(watcher.stop_rule_watcher())
+    await asyncio.sleep(0)
+    stopper.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await stopper
+    assert watcher._task is None
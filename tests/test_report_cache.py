@@ -0,0 +1,256 @@
+"""
+Tests for the on-disk report cache (src/services/report_cache.py) behind /reports and /excel
+"""
+import os
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.excel import router as excel_router
+from src.api.reports import router as reports_router
+from src.services import report_cache, report_renderer
+from src.services.report_cache import ReportCache, cache_key, etag_matches
+from src.services.rule_catalog import CatalogSnapshot
+
+
+def _jur(id, name):
+    return SimpleNamespace(id=id, name=name, code=id.upper(), parentId=None, active=True)
+
+
+def _rule(id, jid, pct):
+    return SimpleNamespace(
+        id=id, jurisdictionId=jid, active=True, ruleName=f"{jid} credit", ruleCode=id.upper(),
+        incentiveType="tax_credit", percentage=pct, fixedAmount=None, minSpend=None, maxCredit=None,
+        requirements={},
+    )
+
+
+def _catalog(ga_pct=30.0, version=1):
+    return CatalogSnapshot(
+        version=version,
+        jurisdictions=[_jur("ga", "Georgia"), _jur("nm", "New Mexico")],
+        incentive_rules=[_rule("ga-1", "ga", ga_pct), _rule("nm-1", "nm", 25.0)],
+        local_rules=[],
+        policies=[],
+    )
+
+
+COMPARISON = {"productionTitle": "Pilot", "budget": 5_000_000, "jurisdictionIds": ["ga", "nm"]}
+SCENARIO = {
+    "productionTitle": "Pilot", "jurisdictionId": "ga", "baseProductionBudget": 5_000_000,
+    "scenarios": [{"name": "Lean", "budget": 3_000_000}, {"name": "Full", "budget": 8_000_000}],
+}
+
+
+class TestReportCache:
+    """Content-addressed files with LRU eviction"""
+
+    def test_put_then_get(self, tmp_path):
+        cache = ReportCache(tmp_path)
+        key = cache_key("comparison", "pdf", COMPARISON, "abc")
+
+        assert cache.get(key, "pdf") is None
+        path = cache.put(key, "pdf", b"%PDF-1")
+
+        assert cache.get(key, "pdf") == path
+        assert path.read_bytes() == b"%PDF-1"
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+        assert not [p for p in tmp_path.iterdir() if p.name.startswith(".tmp-")]
+
+    def test_key_covers_request_catalog_and_format(self):
+        base = cache_key("comparison", "pdf", COMPARISON, "abc")
+
+        assert base == cache_key("comparison", "pdf", dict(reversed(list(COMPARISON.items()))), "abc")
+        assert base != cache_key("comparison", "pdf", {**COMPARISON, "budget": 6_000_000}, "abc")
+        assert base != cache_key("comparison", "pdf", COMPARISON, "def")
+        assert base != cache_key("comparison", "xlsx", COMPARISON, "abc")
+
+    def test_least_recently_used_is_evicted(self, tmp_path):
+        cache = ReportCache(tmp_path, max_bytes=250)
+        cache.put("a", "pdf", b"x" * 100)
+        cache.put("b", "pdf", b"x" * 100)
+        cache.get("a", "pdf")                   # b is now the oldest
+        cache.put("c", "pdf", b"x" * 100)
+
+        assert cache.get("b", "pdf") is None
+        assert cache.get("a", "pdf") is not None and cache.get("c", "pdf") is not None
+        assert cache.stats()["bytes"] == 200 and cache.stats()["evicted"] == 1
+
+    def test_recency_survives_a_restart(self, tmp_path):
+        first = ReportCache(tmp_path, max_bytes=250)
+        first.put("a", "pdf", b"x" * 100)
+        first.put("b", "pdf", b"x" * 100)
+        past = time.time() - 60
+        os.utime(tmp_path / "b.pdf", (past, past))
+
+        second = ReportCache(tmp_path, max_bytes=250)
+        second.put("c", "pdf", b"x" * 100)
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["a.pdf", "c.pdf"]
+
+    def test_file_written_by_another_worker_is_found(self, tmp_path):
+        cache = ReportCache(tmp_path)
+        cache.stats()                           # index the (empty) directory
+        ReportCache(tmp_path).put("k", "xlsx", b"PK")
+
+        assert cache.get("k", "xlsx") == tmp_path / "k.xlsx"
+
+    def test_etag_matching(self):
+        assert etag_matches('"k"', "k")
+        assert etag_matches('W/"other", W/"k"', "k")
+        assert etag_matches("*", "k", cached=True)
+        assert not etag_matches("*", "k")
+        assert not etag_matches('"other"', "k")
+        assert not etag_matches(None, "k")
+
+
+class TestCatalogFingerprint:
+    def test_same_rows_same_fingerprint_across_versions(self):
+        assert _catalog(version=1).fingerprint == _catalog(version=7).fingerprint
+
+    def test_changed_rule_changes_fingerprint(self):
+        assert _catalog(ga_pct=30.0).fingerprint != _catalog(ga_pct=35.0).fingerprint
+
+    def test_feed_monitoring_and_timestamps_do_not_change_fingerprint(self):
+        before = _catalog().fingerprint
+        monitored = _catalog()
+        ga = monitored.jurisdiction("ga")
+        ga.feedLastChecked, ga.feedLastHash, ga.feedSnapshot = datetime(2026, 10, 16), "abc", {"blocks": ["x"]}
+        ga.updatedAt = monitored.incentive_rule("ga-1").updatedAt = datetime(2026, 10, 16)
+
+        assert monitored.fingerprint == before
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ReportCache(tmp_path)
+    with patch.object(report_cache, "report_cache", cache):
+        yield cache
+
+
+@pytest.fixture
+def client(cache):
+    app = FastAPI()
+    app.include_router(reports_router)
+    app.include_router(excel_router)
+    pool = ThreadPoolExecutor(max_workers=1)
+    report_renderer._jobs.clear()
+    snapshot = AsyncMock(return_value=_catalog())
+    with patch.object(report_renderer, "get_render_pool", return_value=pool), \
+         patch("src.services.rule_catalog.rule_catalog.snapshot", new=snapshot):
+        with TestClient(app) as client:
+            client.snapshot = snapshot
+            yield client
+    pool.shutdown(wait=True)
+    report_renderer._jobs.clear()
+
+
+def _counting_render():
+    calls = []
+
+    def render(kind, kwargs):
+        calls.append(kind)
+        return b"%PDF-" + kind.encode(), time.time(), 0.0
+    return render, calls
+
+
+def _wait_for_store(cache, entries=1):
+    # The PDF is written from the job's done callback on a worker thread
+    deadline = time.time() + 5
+    while cache.stats()["entries"] < entries and time.time() < deadline:
+        time.sleep(0.01)
+
+
+class TestCachedEndpoints:
+    """Repeat requests are served from disk with an ETag"""
+
+    @pytest.mark.parametrize("path, body", [("/reports/comparison", COMPARISON), ("/reports/scenario", SCENARIO)])
+    def test_repeat_pdf_is_served_from_cache(self, client, cache, path, body):
+        render, calls = _counting_render()
+        with patch.object(report_renderer, "render_report", render):
+            first = client.post(path, json=body)
+            _wait_for_store(cache)
+            second = client.post(path, json=body)
+
+        assert first.status_code == 200 and second.status_code == 200
+        assert len(calls) == 1
+        assert second.content == first.content
+        assert second.headers["etag"] == first.headers["etag"]
+        assert second.headers["x-report-cache"] == "hit"
+        assert second.headers["content-type"] == "application/pdf"
+
+    def test_if_none_match_is_304(self, client, cache):
+        # 304 rather than RFC 9110's 412 for POST: see the report_cache docstring
+        render, calls = _counting_render()
+        with patch.object(report_renderer, "render_report", render):
+            first = client.post("/reports/comparison", json=COMPARISON)
+            revalidated = client.post(
+                "/reports/comparison", json=COMPARISON, headers={"If-None-Match": first.headers["etag"]}
+            )
+
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == first.headers["etag"]
+        assert revalidated.content == b""
+        assert len(calls) == 1
+
+    def test_if_none_match_star_needs_a_cached_document(self, client, cache):
+        # 304 rather than RFC 9110's 412 for POST: see the report_cache docstring
+        render, calls = _counting_render()
+        with patch.object(report_renderer, "render_report", render):
+            first = client.post("/reports/comparison", json=COMPARISON, headers={"If-None-Match": "*"})
+            _wait_for_store(cache)
+            second = client.post("/reports/comparison", json=COMPARISON, headers={"If-None-Match": "*"})
+
+        assert first.status_code == 200 and first.content.startswith(b"%PDF-")
+        assert second.status_code == 304
+        assert len(calls) == 1
+
+    def test_changed_rules_miss_the_cache(self, client, cache):
+        render, calls = _counting_render()
+        with patch.object(report_renderer, "render_report", render):
+            first = client.post("/reports/comparison", json=COMPARISON)
+            _wait_for_store(cache)
+            client.snapshot.return_value = _catalog(ga_pct=35.0, version=2)
+            second = client.post("/reports/comparison", json=COMPARISON)
+
+        assert len(calls) == 2
+        assert second.headers["etag"] != first.headers["etag"]
+        assert "x-report-cache" not in second.headers
+
+    def test_failed_render_is_not_cached(self, client, cache):
+        def broken(kind, kwargs):
+            raise RuntimeError("font missing")
+
+        with patch.object(report_renderer, "render_report", broken):
+            assert client.post("/reports/comparison", json=COMPARISON).status_code == 500
+        assert cache.stats()["entries"] == 0
+
+    @pytest.mark.parametrize("path, body", [("/excel/comparison", COMPARISON), ("/excel/scenario", SCENARIO)])
+    def test_repeat_workbook_is_served_from_cache(self, client, cache, path, body):
+        first = client.post(path, json=body)
+        with patch("src.api.excel.excel_generator") as generator:
+            second = client.post(path, json=body)
+
+        generator.generate_comparison_workbook.assert_not_called()
+        generator.generate_scenario_workbook.assert_not_called()
+        assert first.status_code == 200 and second.status_code == 200
+        assert first.content.startswith(b"PK")
+        assert second.content == first.content
+        assert second.headers["etag"] == first.headers["etag"]
+        assert second.headers["x-report-cache"] == "hit"
+
+    def test_pdf_and_workbook_have_separate_entries(self, client, cache):
+        render, _ = _counting_render()
+        with patch.object(report_renderer, "render_report", render):
+            pdf = client.post("/reports/comparison", json=COMPARISON)
+            xlsx = client.post("/excel/comparison", json=COMPARISON)
+            _wait_for_store(cache, entries=2)
+
+        assert pdf.headers["etag"] != xlsx.headers["etag"]
+        assert cache.stats()["entries"] == 2
@@ -0,0 +1,161 @@
+"""
+Tests for off-loop PDF rendering (src/services/report_renderer.py) behind /reports
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.reports import router
+from src.services import report_cache, report_renderer
+from src.services.rule_catalog import CatalogSnapshot
+
+
+def _jur(id, name):
+    return SimpleNamespace(id=id, name=name, code=id.upper(), parentId=None, active=True)
+
+
+def _rule(id, jid, pct):
+    return SimpleNamespace(
+        id=id, jurisdictionId=jid, active=True, ruleName=f"{jid} credit", ruleCode=id.upper(),
+        incentiveType="tax_credit", percentage=pct, fixedAmount=None, minSpend=None, maxCredit=None,
+        requirements={},
+    )
+
+
+def _catalog():
+    return CatalogSnapshot(
+        version=1,
+        jurisdictions=[_jur("ga", "Georgia"), _jur("nm", "New Mexico")],
+        incentive_rules=[_rule("ga-1", "ga", 30.0), _rule("nm-1", "nm", 25.0)],
+        local_rules=[],
+        policies=[],
+    )
+
+
+COMPARISON = {"productionTitle": "Pilot", "budget": 5_000_000, "jurisdictionIds": ["ga", "nm"]}
+
+
+@pytest.fixture(autouse=True)
+def renderer(tmp_path):
+    """Threads stand in for the process pool; jobs, counters and the report cache start empty"""
+    pool = ThreadPoolExecutor(max_workers=2)
+    report_renderer._jobs.clear()
+    with patch.object(report_renderer, "get_render_pool", return_value=pool), \
+         patch.object(report_cache, "report_cache", report_cache.ReportCache(tmp_path)):
+        yield
+    pool.shutdown(wait=True)
+    report_renderer._jobs.clear()
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router)
+    with patch("src.api.reports.rule_catalog.snapshot", new=AsyncMock(return_value=_catalog())):
+        with TestClient(app) as client:
+            yield client
+
+
+def _slow_render(delay):
+    def render(kind, kwargs):
+        time.sleep(delay)
+        return b"%PDF-slow", time.time() - delay, delay
+    return render
+
+
+class TestReportRendering:
+    """Reports render on the pool; slow ones come back as jobs"""
+
+    def test_small_report_is_returned_inline_with_timing(self, client):
+        resp = client.post("/reports/comparison", json=COMPARISON)
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/pdf"
+        assert resp.content.startswith(b"%PDF")
+        assert resp.headers["server-timing"].startswith("queue;dur=")
+
+        job = client.get(f"/reports/jobs/{resp.headers['x-report-job']}").json()
+        assert job["status"] == "done" and job["kind"] == "comparison"
+        assert job["renderSeconds"] >= 0 and job["sizeBytes"] == len(resp.content)
+
+    def test_async_mode_returns_a_job_to_poll(self, client):
+        with patch.object(report_renderer, "render_report", _slow_render(0.2)):
+            resp = client.post("/reports/comparison?mode=async", json=COMPARISON)
+            assert resp.status_code == 202
+            job = resp.json()
+            assert job["status"] == "pending"
+            assert resp.headers["location"].endswith(f"/reports/jobs/{job['jobId']}")
+
+            download = client.get(f"/reports/jobs/{job['jobId']}/download?wait=5")
+
+        assert download.status_code == 200 and download.content == b"%PDF-slow"
+        assert client.get(f"/reports/jobs/{job['jobId']}").json()["renderSeconds"] == pytest.approx(0.2)
+
+    def test_slow_report_falls_back_to_a_job(self, client):
+        with patch.object(report_renderer, "render_report", _slow_render(0.3)), \
+             patch.object(report_renderer, "INLINE_WAIT_SECONDS", 0.05):
+            resp = client.post("/reports/comparison", json=COMPARISON)
+            assert resp.status_code == 202
+            pending = client.get(f"/reports/jobs/{resp.json()['jobId']}/download")
+            assert pending.status_code == 202
+
+    def test_full_queue_is_503(self, client):
+        release = threading.Event()
+
+        def blocked(kind, kwargs):
+            release.wait(5)
+            return b"%PDF", time.time(), 0.0
+
+        with patch.object(report_renderer, "render_report", blocked), \
+             patch.object(report_renderer, "max_pending", return_value=1):
+            first = client.post("/reports/comparison?mode=async", json=COMPARISON)
+            second = client.post("/reports/comparison?mode=async", json=COMPARISON)
+            release.set()
+
+        assert first.status_code == 202
+        assert second.status_code == 503 and second.headers["retry-after"] == "5"
+        assert report_renderer.stats()["rejected"] >= 1
+
+    def test_failed_render_is_500(self, client):
+        def broken(kind, kwargs):
+            raise RuntimeError("font missing")
+
+        with patch.object(report_renderer, "render_report", broken):
+            resp = client.post("/reports/comparison", json=COMPARISON)
+
+        assert resp.status_code == 500
+        assert "font missing" in resp.json()["detail"]
+
+    def test_unknown_job_is_404(self, client):
+        assert client.get("/reports/jobs/nope").status_code == 404
+        assert client.get("/reports/jobs/nope/download").status_code == 404
+
+
+class TestProcessPool:
+    """The real pool: arguments and PDFs cross the process boundary"""
+
+    @pytest.mark.asyncio
+    async def test_renders_in_a_spawned_worker(self):
+        pool = report_renderer.ProcessPoolExecutor(max_workers=1, mp_context=report_renderer.multiprocessing.get_context("spawn"))
+        try:
+            with patch.object(report_renderer, "get_render_pool", return_value=pool):
+                job = report_renderer.submit("compliance", "c.pdf", {
+                    "production_title": "Pilot",
+                    "jurisdiction": "Georgia",
+                    "rule_name": "GA credit",
+                    "requirements": [{"requirement": "minimum_spend", "description": "Min spend", "status": "met"}],
+                    "overall_status": "compliant",
+                    "estimated_credit": 1_500_000.0,
+                })
+                assert await report_renderer.wait(job, 60)
+        finally:
+            pool.shutdown()
+
+        assert job.status == "done", job.error
+        assert job.pdf.startswith(b"%PDF") and job.queue_seconds is not None
@@ -0,0 +1,187 @@
+"""
+Tests for the in-process incentive rule catalog (src/services/rule_catalog.py)
+"""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.services.rule_catalog import _FINGERPRINT_SQL, FINGERPRINT_EXCLUDED_FIELDS, CatalogSnapshot, RuleCatalog
+
+
+def _jur(id, code, name, parentId=None, active=True):
+    return SimpleNamespace(id=id, code=code, name=name, parentId=parentId, active=active)
+
+
+def _rule(id, jurisdictionId, percentage=25.0, active=True):
+    return SimpleNamespace(id=id, jurisdictionId=jurisdictionId, percentage=percentage, active=active)
+
+
+def _policy(child, parent, priority=0):
+    return SimpleNamespace(childJurisdictionId=child, parentJurisdictionId=parent, priority=priority)
+
+
+def _snapshot():
+    jurisdictions = [
+        _jur("ca", "CA", "California"),
+        _jur("la-county", "CA-LA", "Los Angeles County", parentId="ca"),
+        _jur("ga", "GA", "Georgia", active=False),
+    ]
+    rules = [
+        _rule("r1", "ca", 20.0),
+        _rule("r2", "ca", 25.0, active=False),
+        _rule("r3", "ga", 30.0),
+    ]
+    local_rules = [_rule("l1", "la-county", 5.0)]
+    policies = [_policy("la-county", "ca", priority=2), _policy("la-county", "us", priority=1)]
+    return CatalogSnapshot(1, jurisdictions, rules, local_rules, policies)
+
+
+class TestCatalogSnapshot:
+    """Index lookups on a built snapshot"""
+
+    def test_jurisdiction_indexes(self):
+        snap = _snapshot()
+        assert snap.jurisdiction("ca").code == "CA"
+        assert snap.jurisdiction_by_code("CA-LA").id == "la-county"
+        assert snap.jurisdiction("missing") is None
+        assert [j.id for j in snap.children("ca")] == ["la-county"]
+
+    def test_jurisdictions_sorted_and_active_filter(self):
+        snap = _snapshot()
+        assert [j.name for j in snap.jurisdictions()] == ["California", "Georgia", "Los Angeles County"]
+        assert "ga" not in [j.id for j in snap.jurisdictions(active_only=True)]
+
+    def test_incentive_rules_by_jurisdiction(self):
+        snap = _snapshot()
+        assert {r.id for r in snap.incentive_rules("ca")} == {"r1", "r2"}
+        assert [r.id for r in snap.incentive_rules("ca", active_only=True)] == ["r1"]
+        assert snap.incentive_rule("r3").jurisdictionId == "ga"
+        assert snap.incentive_rules("nowhere") == []
+
+    def test_ancestry_closure(self):
+        snap = CatalogSnapshot(
+            1,
+            [_jur("us", "US", "United States"), _jur("ca", "CA", "California", parentId="us"),
+             _jur("la", "CA-LA", "Los Angeles County", parentId="ca"),
+             _jur("x", "X", "Loop A", parentId="y"), _jur("y", "Y", "Loop B", parentId="x")],
+            [], [], [],
+        )
+        assert [j.id for j in snap.ancestors("la")] == ["ca", "us"]
+        assert snap.ancestors("us") == []
+        assert [j.id for j in snap.ancestors("x")] == ["y"]     # cycles stop instead of looping
+
+    def test_policies_ordered_by_priority(self):
+        snap = _snapshot()
+        assert [p.parentJurisdictionId for p in snap.policies("la-county")] == ["us", "ca"]
+        assert snap.policy("la-county", "ca").priority == 2
+        assert snap.policy("la-county", "tx") is None
+        assert [p.priority for p in snap.policies_between("la-county", "ca")] == [2]
+
+
+class TestRuleCatalog:
+    """Read-through loading and invalidation"""
+
+    @staticmethod
+    def _fake_prisma():
+        fake = SimpleNamespace(
+            jurisdiction=SimpleNamespace(find_many=AsyncMock(return_value=[_jur("ca", "CA", "California")])),
+            incentiverule=SimpleNamespace(find_many=AsyncMock(return_value=[_rule("r1", "ca")])),
+            localrule=SimpleNamespace(find_many=AsyncMock(return_value=[])),
+            inheritancepolicy=SimpleNamespace(find_many=AsyncMock(return_value=[])),
+        )
+        return fake
+
+    @pytest.mark.asyncio
+    async def test_snapshot_is_cached_until_invalidated(self):
+        fake = self._fake_prisma()
+        catalog = RuleCatalog()
+        with patch("src.services.rule_catalog.prisma", fake):
+            first = await catalog.snapshot()
+            second = await catalog.snapshot()
+            assert first is second
+            assert fake.incentiverule.find_many.await_count == 1
+
+            catalog.invalidate()
+            third = await catalog.snapshot()
+            assert third is not first
+            assert third.version == first.version + 1
+            assert fake.incentiverule.find_many.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_during_load_discards_result(self):
+        fake = self._fake_prisma()
+        catalog = RuleCatalog()
+
+        async def _rules_then_invalidate(*args, **kwargs):
+            catalog.invalidate()
+            return [_rule("r1", "ca")]
+
+        fake.incentiverule.find_many = AsyncMock(side_effect=_rules_then_invalidate)
+        with patch("src.services.rule_catalog.prisma", fake):
+            snap = await catalog.load()
+            assert snap.incentive_rule("r1") is not None
+            assert catalog.is_loaded is False
+
+
+class TestCatalogStaleness:
+    """Fingerprint probes and max age catch writes made outside this process"""
+
+    @staticmethod
+    def _fake_prisma(updated_at="2026-01-01"):
+        fake = TestRuleCatalog._fake_prisma()
+        fake.query_raw = AsyncMock(return_value=[
+            {"table": "incentive_rules", "rows": 1, "marker": updated_at},
+        ])
+        return fake
+
+    @staticmethod
+    def _catalog(now):
+        catalog = RuleCatalog(probe_interval=30, max_age=600)
+        catalog._clock = lambda: now[0]
+        return catalog
+
+    @pytest.mark.asyncio
+    async def test_probe_reloads_when_fingerprint_moves(self):
+        fake, now = self._fake_prisma(), [0.0]
+        catalog = self._catalog(now)
+        with patch("src.services.rule_catalog.prisma", fake):
+            first = await catalog.snapshot()
+
+            now[0] = 10
+            assert await catalog.snapshot() is first
+            assert fake.query_raw.await_count == 1      # only the load-time fingerprint
+
+            now[0] = 31
+            assert await catalog.snapshot() is first    # probed, unchanged
+            assert fake.query_raw.await_count == 2
+
+            fake.query_raw.return_value = [{"table": "incentive_rules", "rows": 1, "marker": "2026-02-01"}]
+            now[0] = 62
+            reloaded = await catalog.snapshot()
+            assert reloaded is not first
+            assert fake.incentiverule.find_many.await_count == 2
+
+    def test_probe_ignores_feed_monitoring_writes(self):
+        jurisdictions = next(q for q in _FINGERPRINT_SQL.split("UNION ALL") if "FROM jurisdictions" in q)
+        assert "updatedAt" not in jurisdictions
+        assert not any(column in jurisdictions for column in FINGERPRINT_EXCLUDED_FIELDS)
+
+    @pytest.mark.asyncio
+    async def test_max_age_forces_reload(self):
+        fake, now = self._fake_prisma(), [0.0]
+        catalog = self._catalog(now)
+        with patch("src.services.rule_catalog.prisma", fake):
+            first = await catalog.snapshot()
+            now[0] = 601
+            assert await catalog.snapshot() is not first
+
+    @pytest.mark.asyncio
+    async def test_probe_failure_keeps_serving(self):
+        fake, now = self._fake_prisma(), [0.0]
+        catalog = self._catalog(now)
+        with patch("src.services.rule_catalog.prisma", fake):
+            first = await catalog.snapshot()
+            fake.query_raw.side_effect = RuntimeError("db down")
+            now[0] = 31
+            assert await catalog.snapshot() is first
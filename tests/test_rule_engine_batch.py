@@ -0,0 +1,152 @@
+"""
+Tests for batch rule evaluation (src/rule_engine/batch.py, /rule-engine/evaluate-batch)
+"""
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.rule_engine import router
+from src.rule_engine import batch
+from src.rule_engine.batch import BatchItemError, evaluate_batch_stream, evaluate_chunk, evaluate_item
+
+
+def _item(code="IL", amount="1000.00"):
+    return {"jurisdiction_code": code, "expenses": [{"category": "production", "amount": amount}]}
+
+
+class TestEvaluateItem:
+    """Per-item evaluation never raises and mirrors /evaluate status codes"""
+
+    def test_ok_item_uses_tight_contract(self):
+        out = evaluate_item(3, _item())
+        assert out["index"] == 3
+        assert out["status"] == 200
+        assert set(out["result"]) == {
+            "jurisdiction_code", "total_eligible_spend", "total_incentive_amount", "breakdown",
+        }
+
+    def test_debug_item_includes_meta(self):
+        out = evaluate_item(0, _item(), debug=True)
+        assert "warnings" in out["result"]
+
+    def test_unknown_jurisdiction_is_404(self):
+        assert evaluate_item(0, _item(code="ZZ"))["status"] == 404
+
+    def test_invalid_payload_is_422(self):
+        out = evaluate_item(0, {"expenses": []})
+        assert out["status"] == 422
+        assert out["error"][0]["loc"] == ["jurisdiction_code"]
+
+    def test_raw_ndjson_line_is_parsed(self):
+        assert evaluate_item(0, json.dumps(_item()).encode())["status"] == 200
+        assert evaluate_item(1, b"{not json")["status"] == 400
+
+    def test_pre_rejected_item_passes_through(self):
+        assert evaluate_item(2, BatchItemError(413, "too long")) == {"index": 2, "status": 413, "error": "too long"}
+
+    def test_chunk_encodes_decimals_as_numbers(self):
+        lines = evaluate_chunk([(0, _item()), (1, _item(code="ZZ"))], False, 0)
+        first = json.loads(lines[0])
+        assert first["result"]["total_incentive_amount"] == 300.0
+        assert json.loads(lines[1])["status"] == 404
+
+
+class TestEvaluateBatchEndpoint:
+    """Streaming NDJSON responses from the batch endpoint"""
+
+    @pytest.fixture(scope="class")
+    def client(self):
+        app = FastAPI()
+        app.include_router(router)
+        with TestClient(app) as client:
+            yield client
+        batch.shutdown_batch_pool()
+
+    @staticmethod
+    def _results(response):
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        return sorted(rows, key=lambda r: r["index"])
+
+    def test_json_items(self, client):
+        items = [_item(amount=str(100 * (i + 1))) for i in range(40)] + [_item(code="ZZ")]
+        rows = self._results(client.post("/rule-engine/evaluate-batch", json={"items": items}))
+        assert [r["index"] for r in rows] == list(range(41))
+        assert rows[0]["result"]["total_eligible_spend"] == 100.0
+        assert rows[-1]["status"] == 404
+
+    def test_ndjson_body(self, client):
+        body = "\n".join(json.dumps(_item()) for _ in range(5)) + "\n\n{bad\n"
+        rows = self._results(client.post(
+            "/rule-engine/evaluate-batch",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        ))
+        assert [r["status"] for r in rows] == [200] * 5 + [400]
+
+    def test_ndjson_oversized_line_is_413(self, client, monkeypatch):
+        monkeypatch.setattr("src.api.rule_engine.MAX_LINE_BYTES", 256)
+        body = json.dumps(_item()) + "\n" + "x" * 5000 + "\n" + json.dumps(_item()) + "\n"
+        rows = self._results(client.post(
+            "/rule-engine/evaluate-batch",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        ))
+        assert [r["status"] for r in rows] == [200, 413, 200]
+
+    def test_ndjson_body_spilled_to_disk(self, client, monkeypatch):
+        monkeypatch.setattr("src.api.rule_engine._SPOOL_MAX_MEMORY", 1024)
+        monkeypatch.setattr("src.api.rule_engine._READ_SIZE", 512)
+        monkeypatch.setattr("src.api.rule_engine._LINES_PER_READ", 4)
+        body = "\n".join(json.dumps(_item(amount=str(i + 1))) for i in range(30)) + "\n"
+        rows = self._results(client.post(
+            "/rule-engine/evaluate-batch",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        ))
+        assert [r["index"] for r in rows] == list(range(30))
+        assert [r["result"]["total_eligible_spend"] for r in rows] == [float(i + 1) for i in range(30)]
+
+    def test_ndjson_upload(self, client):
+        body = "\n".join(json.dumps(_item()) for _ in range(3))
+        rows = self._results(client.post(
+            "/rule-engine/evaluate-batch",
+            files={"file": ("batch.ndjson", body, "application/x-ndjson")},
+        ))
+        assert len(rows) == 3
+
+    def test_rejects_non_list_body(self, client):
+        assert client.post("/rule-engine/evaluate-batch", json={"items": "nope"}).status_code == 422
+
+
+class TestBrokenPool:
+    """A dead worker fails its queued chunks and the pool is replaced"""
+
+    @pytest.mark.asyncio
+    async def test_killed_worker_fails_chunks_and_restarts_pool(self, monkeypatch):
+        monkeypatch.setenv("RULE_ENGINE_BATCH_WORKERS", "1")
+        batch.shutdown_batch_pool()
+        old_pool = batch.get_batch_pool()
+        # Make sure the worker process exists before it is killed
+        await asyncio.get_running_loop().run_in_executor(old_pool, evaluate_chunk, [], False, 0)
+
+        async def items():
+            for i in range(200):
+                if i == 16:
+                    for proc in list(old_pool._processes.values()):
+                        proc.kill()
+                    await asyncio.sleep(0.5)
+                yield i, _item()
+
+        try:
+            rows = [json.loads(line) async for line in evaluate_batch_stream(items())]
+            assert sorted(r["index"] for r in rows) == list(range(200))
+            assert {r["status"] for r in rows} <= {200, 500}
+            assert batch._pool is not old_pool
+            assert any(r["status"] == 200 for r in rows if r["index"] >= 16)
+        finally:
+            batch.shutdown_batch_pool()
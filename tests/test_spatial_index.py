@@ -0,0 +1,87 @@
+"""
+Tests for the jurisdiction boundary index (src/services/spatial_index.py)
+"""
+import json
+
+import pytest
+
+from src.services.spatial_index import SpatialIndex, boundary_from_feature, load_boundaries
+
+
+def _feature(code, type_, *rings, multi=False):
+    coords = [[list(p) for p in ring] for ring in rings]
+    geometry = {"type": "MultiPolygon", "coordinates": [coords]} if multi else {"type": "Polygon", "coordinates": coords}
+    return {"type": "Feature", "properties": {"code": code, "type": type_}, "geometry": geometry}
+
+
+def _box(x0, y0, x1, y1):
+    return [(x0, y0), (x1, y0), (x1, y1), (x0, y1), (x0, y0)]
+
+
+def _circle(cx, cy, r, n=200):
+    import math
+    pts = [(cx + r * math.cos(2 * math.pi * i / n), cy + r * math.sin(2 * math.pi * i / n)) for i in range(n)]
+    return pts + [pts[0]]
+
+
+def _index(*features):
+    return SpatialIndex([boundary_from_feature(f) for f in features])
+
+
+class TestSpatialIndex:
+    """Exact point-in-polygon resolution"""
+
+    def test_chain_is_ordered_state_to_city(self):
+        index = _index(
+            _feature("XX-CITY", "city", _box(-1, -1, 1, 1)),
+            _feature("XX", "state", _box(-10, -10, 10, 10)),
+            _feature("XX-CNTY", "county", _box(-5, -5, 5, 5)),
+        )
+        assert [b.code for b in index.locate(0.5, 0.5)] == ["XX", "XX-CNTY", "XX-CITY"]
+        assert [b.code for b in index.locate(3, 3)] == ["XX", "XX-CNTY"]
+        assert index.locate(20, 20) == []
+
+    def test_border_uses_polygon_not_bbox(self):
+        # Two triangles share a diagonal border; their bounding boxes overlap completely
+        index = _index(
+            _feature("AA", "state", [(0, 0), (10, 0), (0, 10), (0, 0)]),
+            _feature("BB", "state", [(10, 0), (10, 10), (0, 10), (10, 0)]),
+        )
+        assert index.state_for_point(lat=5.0, lng=5.1) == "BB"
+        assert index.state_for_point(lat=5.0, lng=4.9) == "AA"
+        assert index.state_for_point(lat=1.0, lng=8.5) == "AA"
+
+    def test_holes_and_multipolygons(self):
+        index = _index(_feature("DN", "city", _box(0, 0, 4, 4), _box(1, 1, 3, 3)))
+        assert index.locate(0.5, 0.5)
+        assert index.locate(2, 2) == []
+
+        index = _index(_feature("MP", "county", _box(0, 0, 1, 1), multi=True))
+        assert index.locate(0.5, 0.5)[0].code == "MP"
+
+    def test_large_rings_use_numpy_path(self):
+        index = _index(_feature("RD", "county", _circle(0, 0, 1)))
+        assert index.locate(0.0, 0.99)
+        assert index.locate(0.72, 0.72) == []
+
+    def test_has_subdivisions(self):
+        index = _index(
+            _feature("XX", "state", _box(-10, -10, 10, 10)),
+            _feature("XX-CNTY", "county", _box(-5, -5, 5, 5)),
+            _feature("YY", "state", _box(10, 10, 20, 20)),
+        )
+        assert index.has_subdivisions("xx")
+        assert not index.has_subdivisions("YY")
+
+    def test_load_boundaries_skips_bad_files(self, tmp_path):
+        (tmp_path / "states.geojson").write_text(json.dumps({
+            "type": "FeatureCollection",
+            "features": [_feature("XX", "state", _box(0, 0, 1, 1)), {"properties": {}, "geometry": None}],
+        }))
+        (tmp_path / "broken.geojson").write_text("{nope")
+        (tmp_path / "list.json").write_text(json.dumps([_feature("YY", "state", _box(0, 0, 1, 1))]))
+        (tmp_path / "scalar.json").write_text("42")
+        (tmp_path / "odd.geojson").write_text(json.dumps({"type": "FeatureCollection", "features": {"a": 1}}))
+        index = load_boundaries(tmp_path)
+        assert len(index) == 1
+        assert index.state_for_point(0.5, 0.5) == "XX"
@@ -0,0 +1,327 @@
+"""
+Tests for the stacking engine (src/api/stacking_engine.py) against a stubbed rule catalog
+"""
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prisma import Json
+from prisma.errors import PrismaError
+
+from src.api.stacking_engine import ScenarioInput, _compute_stack, _load_graph, _result_fingerprint, router
+from src.services.rule_catalog import CatalogSnapshot
+
+
+_UPDATED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _jur(id, code, name, parentId=None):
+    return SimpleNamespace(id=id, code=code, name=name, parentId=parentId, active=True, updatedAt=_UPDATED)
+
+
+def _rule(id, jurisdictionId, percentage, minSpend=None, maxCredit=None, incentiveType="tax_credit",
+          eligibleExpenses=(), requirements=None):
+    return SimpleNamespace(
+        id=id, jurisdictionId=jurisdictionId, ruleName=id, ruleCode=id.upper(),
+        incentiveType=incentiveType, percentage=percentage, fixedAmount=None,
+        minSpend=minSpend, maxCredit=maxCredit, creditType="refundable",
+        eligibleExpenses=list(eligibleExpenses), excludedExpenses=[], requirements=requirements,
+        effectiveDate=datetime(2020, 1, 1), expirationDate=None, active=True, updatedAt=_UPDATED,
+    )
+
+
+def _local(id, jurisdictionId, percentage):
+    return SimpleNamespace(
+        id=id, jurisdictionId=jurisdictionId, name=id, code=id.upper(), category="bonus",
+        ruleType="local_bonus", percentage=percentage, amount=None, requirements=None,
+        effectiveDate=datetime(2020, 1, 1), expirationDate=None, extractedBy="manual", active=True,
+        updatedAt=_UPDATED,
+    )
+
+
+def _policy(child, parent, policyType="additive", ruleCategory=None, priority=0):
+    return SimpleNamespace(
+        id=f"{child}-{parent}-{ruleCategory}", childJurisdictionId=child, parentJurisdictionId=parent,
+        policyType=policyType, ruleCategory=ruleCategory, priority=priority, updatedAt=_UPDATED,
+    )
+
+
+def _catalog():
+    return CatalogSnapshot(
+        1,
+        [_jur("il", "IL", "Illinois"), _jur("cook", "IL-COOK", "Cook County", parentId="il"),
+         _jur("ga", "GA", "Georgia")],
+        [_rule("il-base", "il", 30.0), _rule("ga-base", "ga", 20.0, minSpend=500_000)],
+        [_local("cook-bonus", "cook", 5.0)],
+        [_policy("cook", "il")],
+    )
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def snapshot():
+    with patch(
+        "src.api.stacking_engine.rule_catalog.snapshot",
+        new=AsyncMock(return_value=_catalog()),
+    ) as mock:
+        yield mock
+
+
+def _scenario(code, spend=1_000_000):
+    return {"jurisdiction_code": code, "qualified_spend": spend}
+
+
+class TestStackingEngine:
+    """Stacks are computed from one prefetched graph per jurisdiction"""
+
+    def test_calculate_inherits_additive_parent_rules(self, client, snapshot):
+        body = client.post("/stacking-engine/calculate", json={"scenario": _scenario("IL-COOK")}).json()
+        assert [l["code"] for l in body["layers"]] == ["IL-BASE", "COOK-BONUS"]
+        assert body["total_incentive"] == pytest.approx(350_000)
+
+    def test_calculate_unknown_jurisdiction_is_404(self, client, snapshot):
+        assert client.post("/stacking-engine/calculate", json={"scenario": _scenario("ZZ")}).status_code == 404
+
+    def test_compare_uses_one_snapshot(self, client, snapshot):
+        scenarios = [_scenario("GA", 400_000), _scenario("IL-COOK"), _scenario("IL"), _scenario("ZZ"),
+                     _scenario("IL-COOK", 2_000_000)]
+        body = client.post("/stacking-engine/compare", json={"scenarios": scenarios}).json()
+        assert snapshot.await_count == 1
+        codes = [r["jurisdiction_code"] for r in body["scenarios"]]
+        assert codes == ["IL-COOK", "IL-COOK", "IL", "GA", "ZZ"]
+        assert body["best_total_incentive"] == pytest.approx(700_000)
+        assert body["scenarios"][-1]["error"] == "Jurisdiction 'ZZ' not found"
+        ga = body["scenarios"][3]
+        assert ga["total_incentive"] == 0
+        assert any("min spend" in w for w in ga["warnings"])
+
+
+class TestInheritanceResolution:
+    """Full ancestry chain, per-category policies ordered by priority"""
+
+    @staticmethod
+    def _deep_catalog(policies):
+        # city -> county -> state -> country
+        return CatalogSnapshot(
+            1,
+            [_jur("uk", "UK", "United Kingdom"), _jur("eng", "UK-ENG", "England", parentId="uk"),
+             _jur("gm", "UK-GM", "Greater Manchester", parentId="eng"),
+             _jur("mcr", "UK-MCR", "Manchester", parentId="gm")],
+            [_rule("uk-relief", "uk", 25.0), _rule("uk-rebate", "uk", 10.0, incentiveType="rebate"),
+             _rule("eng-rebate", "eng", 4.0, incentiveType="rebate")],
+            [_local("mcr-bonus", "mcr", 2.0), _local("gm-bonus", "gm", 3.0)],
+            policies,
+        )
+
+    def _stack(self, policies, code="UK-MCR"):
+        graph = _load_graph(self._deep_catalog(policies), code)
+        return _compute_stack(ScenarioInput(jurisdiction_code=code, qualified_spend=1_000_000), graph)
+
+    def test_additive_chain_reaches_the_root(self):
+        result = self._stack([
+            _policy("mcr", "gm"), _policy("gm", "eng"), _policy("eng", "uk"),
+        ])
+        assert [l.code for l in result.layers] == ["UK-RELIEF", "UK-REBATE", "ENG-REBATE", "GM-BONUS", "MCR-BONUS"]
+        assert result.layers[0].notes == "Inherited from United Kingdom (additive policy)"
+        assert result.total_incentive == pytest.approx(440_000)
+
+    def test_missing_edge_policy_stops_inheritance(self):
+        result = self._stack([_policy("mcr", "gm"), _policy("eng", "uk")])
+        assert [l.code for l in result.layers] == ["GM-BONUS", "MCR-BONUS"]
+
+    def test_override_keeps_the_nearer_rule(self):
+        result = self._stack([
+            _policy("mcr", "gm"), _policy("gm", "eng"),
+            _policy("eng", "uk", "override", ruleCategory="rebate", priority=1),
+            _policy("eng", "uk", "additive", priority=5),
+        ])
+        assert [l.code for l in result.layers] == ["UK-RELIEF", "ENG-REBATE", "GM-BONUS", "MCR-BONUS"]
+        assert any("UK-REBATE".lower() in w and "overridden by England" in w for w in result.warnings)
+
+    def test_strict_replaces_everything_below(self):
+        result = self._stack([
+            _policy("mcr", "gm"), _policy("gm", "eng"),
+            _policy("eng", "uk", "strict", ruleCategory="rebate"),
+            _policy("eng", "uk", "additive"),
+        ])
+        assert [l.code for l in result.layers] == ["UK-RELIEF", "UK-REBATE", "GM-BONUS", "MCR-BONUS"]
+        assert any("'eng-rebate' blocked by strict United Kingdom policy" in w for w in result.warnings)
+
+
+class TestScenarioResults:
+    """ProductionScenario stacks are persisted and served while their fingerprint holds"""
+
+    @staticmethod
+    def _scenario(result=None):
+        production = SimpleNamespace(id="prod-1", jurisdictionId="cook", startDate=datetime(2026, 3, 1))
+        return SimpleNamespace(
+            id="sc-1", name="Chicago shoot", production=production, optimizationResult=result,
+            qualifiedSpend=1_000_000.0, totalBudget=None, localHirePercent=None, shootingDays=20,
+        )
+
+    @pytest.fixture
+    def db(self):
+        fake = MagicMock()
+        fake.productionscenario.find_unique = AsyncMock()
+        fake.productionscenario.find_many = AsyncMock()
+        fake.scenariooptimizationresult.upsert = AsyncMock()
+        with patch("src.api.stacking_engine.prisma", fake):
+            yield fake
+
+    def _stored_row(self, fingerprint, expires_in=timedelta(days=1)):
+        now = datetime.now(timezone.utc)
+        return SimpleNamespace(
+            recommendedStack=[{
+                "source": "state_incentive_rule", "name": "stored", "code": "STORED", "category": "tax_credit",
+                "rule_type": "refundable", "rate": 30.0, "fixed_amount": None, "incentive_value": 300_000.0,
+            }],
+            totalIncentiveValue=300_000.0, warnings=[], stackFingerprint=fingerprint,
+            createdAt=now, expiresAt=now + expires_in,
+        )
+
+    def _fingerprint(self, catalog):
+        scenario = ScenarioInput(
+            production_id="prod-1", jurisdiction_code="IL-COOK", qualified_spend=1_000_000.0,
+            shooting_days=20, production_start="2026-03-01",
+        )
+        return _result_fingerprint(scenario, _load_graph(catalog, "IL-COOK"))
+
+    def test_computes_and_persists_missing_result(self, client, snapshot, db):
+        db.productionscenario.find_unique.return_value = self._scenario()
+        body = client.get("/stacking-engine/scenarios/sc-1").json()
+        assert body["cached"] is False
+        assert body["result"]["total_incentive"] == pytest.approx(350_000)
+        kwargs = db.scenariooptimizationresult.upsert.await_args.kwargs
+        assert kwargs["where"] == {"scenarioId": "sc-1"}
+        update, create = kwargs["data"]["update"], kwargs["data"]["create"]
+        assert update["stackFingerprint"] == self._fingerprint(_catalog())
+        assert create["scenarioId"] == "sc-1"
+        # Json columns go to the client wrapped, with plain JSON values inside
+        for row in (update, create):
+            assert isinstance(row["recommendedStack"], Json) and isinstance(row["warnings"], Json)
+            assert row["recommendedStack"].data == body["result"]["layers"]
+            assert row["warnings"].data == body["result"]["warnings"]
+
+    def test_failed_save_still_returns_the_stack(self, client, snapshot, db):
+        db.productionscenario.find_unique.return_value = self._scenario()
+        db.scenariooptimizationresult.upsert.side_effect = PrismaError("write failed")
+        resp = client.get("/stacking-engine/scenarios/sc-1")
+        assert resp.status_code == 200
+        assert resp.json()["result"]["total_incentive"] == pytest.approx(350_000)
+
+    def test_serves_fresh_result_without_recomputing(self, client, snapshot, db):
+        row = self._stored_row(self._fingerprint(_catalog()))
+        db.productionscenario.find_unique.return_value = self._scenario(row)
+        body = client.get("/stacking-engine/scenarios/sc-1").json()
+        assert body["cached"] is True
+        assert [l["code"] for l in body["result"]["layers"]] == ["STORED"]
+        db.scenariooptimizationresult.upsert.assert_not_awaited()
+
+    def test_rule_change_in_the_chain_makes_result_stale(self, client, snapshot, db):
+        row = self._stored_row(self._fingerprint(_catalog()))
+        changed = _catalog()
+        changed.incentive_rule("il-base").percentage = 35.0
+        snapshot.return_value = changed
+        db.productionscenario.find_unique.return_value = self._scenario(row)
+        body = client.get("/stacking-engine/scenarios/sc-1").json()
+        assert body["cached"] is False
+        db.scenariooptimizationresult.upsert.assert_awaited_once()
+
+    def test_monitor_pass_keeps_result_fresh(self, client, snapshot, db):
+        row = self._stored_row(self._fingerprint(_catalog()))
+        monitored = _catalog()
+        for code in ("IL", "IL-COOK"):
+            jur = monitored.jurisdiction_by_code(code)
+            jur.feedLastChecked, jur.feedSnapshot = datetime.now(timezone.utc), {"hash": "abc"}
+            jur.updatedAt = _UPDATED + timedelta(hours=1)
+        monitored.incentive_rule("il-base").updatedAt = _UPDATED + timedelta(hours=1)
+        snapshot.return_value = monitored
+        db.productionscenario.find_unique.return_value = self._scenario(row)
+        assert client.get("/stacking-engine/scenarios/sc-1").json()["cached"] is True
+        db.scenariooptimizationresult.upsert.assert_not_awaited()
+
+    def test_expired_result_is_recomputed(self, client, snapshot, db):
+        row = self._stored_row(self._fingerprint(_catalog()), expires_in=timedelta(seconds=-1))
+        db.productionscenario.find_unique.return_value = self._scenario(row)
+        assert client.get("/stacking-engine/scenarios/sc-1").json()["cached"] is False
+
+    def test_production_listing_recomputes_only_stale(self, client, snapshot, db):
+        fresh = self._scenario(self._stored_row(self._fingerprint(_catalog())))
+        stale = self._scenario(self._stored_row("outdated"))
+        stale.id = "sc-2"
+        db.productionscenario.find_many.return_value = [fresh, stale]
+        body = client.get("/stacking-engine/productions/prod-1/scenarios").json()
+        assert (body["cached"], body["computed"]) == (1, 1)
+        assert snapshot.await_count == 1
+        assert db.scenariooptimizationresult.upsert.await_count == 1
+
+
+class TestBudgetOptimizer:
+    """/optimize reduces each candidate's stack to solver terms"""
+
+    @staticmethod
+    def _catalog():
+        return CatalogSnapshot(
+            1,
+            [_jur("il", "IL", "Illinois"), _jur("cook", "IL-COOK", "Cook County", parentId="il"),
+             _jur("ga", "GA", "Georgia"), _jur("nm", "NM", "New Mexico")],
+            [_rule("il-base", "il", 30.0, minSpend=100_000, requirements='{"minShootDays": 15}'),
+             _rule("ga-base", "ga", 20.0, minSpend=500_000),
+             _rule("nm-base", "nm", 25.0, maxCredit=1_000_000, eligibleExpenses=["labor"])],
+            [_local("cook-bonus", "cook", 5.0)],
+            [_policy("cook", "il")],
+        )
+
+    @pytest.fixture
+    def optimize_snapshot(self):
+        with patch("src.api.stacking_engine.rule_catalog.snapshot", new=AsyncMock(return_value=self._catalog())):
+            yield
+
+    def _optimize(self, client, candidates, budget=10_000_000, **extra):
+        body = {"total_budget": budget, "candidates": candidates, **extra}
+        return client.post("/stacking-engine/optimize", json=body)
+
+    def test_allocates_to_inherited_stack_and_respects_caps(self, client, optimize_snapshot):
+        body = self._optimize(client, [
+            {"jurisdiction_code": "IL-COOK", "shooting_days": 20, "max_spend": 6_000_000},
+            {"jurisdiction_code": "GA"},
+            {"jurisdiction_code": "NM"},
+        ]).json()
+        spend = {a["jurisdiction_code"]: a["spend"] for a in body["allocations"]}
+        # Cook earns 35% up to its ceiling, NM 25% until its cap, GA 20% for the rest
+        assert spend == {"IL-COOK": 6_000_000, "GA": 0, "NM": 4_000_000}
+        assert body["total_incentive"] == pytest.approx(3_100_000)
+        cook = body["allocations"][0]
+        assert [l["code"] for l in cook["layers"]] == ["IL-BASE", "COOK-BONUS"]
+
+    def test_shooting_day_requirement_drops_the_rule(self, client, optimize_snapshot):
+        body = self._optimize(client, [{"jurisdiction_code": "IL", "shooting_days": 10}, {"jurisdiction_code": "GA"}]).json()
+        spend = {a["jurisdiction_code"]: a["spend"] for a in body["allocations"]}
+        assert spend == {"IL": 0, "GA": 10_000_000}
+        assert any("requires 15 shooting days" in w for w in body["allocations"][0]["warnings"])
+
+    def test_category_mix_scales_eligible_spend(self, client, optimize_snapshot):
+        body = self._optimize(
+            client, [{"jurisdiction_code": "NM"}, {"jurisdiction_code": "GA"}],
+            spend_by_category={"labor": 2_000_000, "rentals": 8_000_000},
+        ).json()
+        nm = body["allocations"][0]
+        assert nm["spend"] == 0
+        assert body["total_incentive"] == pytest.approx(2_000_000)
+
+    def test_errors(self, client, optimize_snapshot):
+        assert self._optimize(client, [{"jurisdiction_code": "ZZ"}]).status_code == 404
+        assert self._optimize(client, [{"jurisdiction_code": "GA"}, {"jurisdiction_code": "GA"}]).status_code == 422
+        infeasible = self._optimize(client, [{"jurisdiction_code": "GA", "min_spend": 20_000_000}])
+        assert infeasible.status_code == 422
+